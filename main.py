@@ -1,10 +1,6 @@
-import traceback
-import os
-from dotenv import load_dotenv
+from src.logger import log
 from src.market_making import market_making
-
-# Load environment variables
-load_dotenv()
+from src.utils import CONFIG_FILE, CONFIG_HOT_RELOAD, METRICS_ENABLED, config_watcher, metrics_server
 
 if __name__ == "__main__":
     try:
@@ -25,118 +21,37 @@ if __name__ == "__main__":
         # Note: With 104.50 USDT, we can buy ~145 tokens at 0.2475, so min_order_size of 100
         # means we can only place 1 order. Lowering to allow more orders.
         
-        # LBank Compliance Mode: Concentrates 500-1000 USDT within ±1% of market price
+        # LBank Compliance Mode (ENABLE_COMPLIANCE_MODE): Concentrates 500-1000 USDT within ±1% of market price
         # Enable this when you have sufficient balance (500+ USDT) to meet LBank market making requirements
-        ENABLE_COMPLIANCE_MODE = os.getenv("ENABLE_COMPLIANCE_MODE", "true").lower() == "true"
-        
-        # Read safety features from environment variables with defaults
-        MAX_SPREAD_PCT = float(os.getenv("MAX_SPREAD_PCT", "30.0"))
-        MAX_LOSS_PCT = float(os.getenv("MAX_LOSS_PCT", "20.0"))
-        MAX_EXPOSURE_PCT = float(os.getenv("MAX_EXPOSURE_PCT", "80.0"))
-        REDUCE_DISTANCE_ON_WIDE_SPREAD = os.getenv("REDUCE_DISTANCE_ON_WIDE_SPREAD", "true").lower() == "true"
-        WIDE_SPREAD_THRESHOLD = float(os.getenv("WIDE_SPREAD_THRESHOLD", "20.0"))
-        
-        # Read adaptive pricing from environment variables
-        ENABLE_ADAPTIVE_PRICING = os.getenv("ENABLE_ADAPTIVE_PRICING", "true").lower() == "true"
-        TIGHTENING_RATE = float(os.getenv("TIGHTENING_RATE", "0.001"))
-        TIGHTENING_TRIGGER = int(os.getenv("TIGHTENING_TRIGGER", "2"))
-        
-        # Read max buy price from environment (optional - set to 0 or empty to disable)
-        MAX_BUY_PRICE_STR = os.getenv("MAX_BUY_PRICE", "").strip()
-        MAX_BUY_PRICE = float(MAX_BUY_PRICE_STR) if MAX_BUY_PRICE_STR and float(MAX_BUY_PRICE_STR) > 0 else None
         
-        # Read reference price mode configuration
-        ENABLE_REFERENCE_PRICE_MODE = os.getenv("ENABLE_REFERENCE_PRICE_MODE", "false").lower() == "true"
-        REFERENCE_PRICE_STR = os.getenv("REFERENCE_PRICE", "").strip()
-        REFERENCE_PRICE = float(REFERENCE_PRICE_STR) if REFERENCE_PRICE_STR and float(REFERENCE_PRICE_STR) > 0 else None
-        ORDER_VALUE_PER_SIDE = float(os.getenv("ORDER_VALUE_PER_SIDE", "250"))
-        ORDERS_PER_SIDE = int(os.getenv("ORDERS_PER_SIDE", "10"))
-        
-        # Parse ladder order sizes
-        LADDER_STR = os.getenv("LADDER_ORDER_SIZES", "").strip()
-        LADDER_ORDER_SIZES = None
-        if LADDER_STR:
+        # All other settings (safety features, adaptive pricing, reference price / adjustments modes,
+        # ladder publication, streaming, risk watchdog) are read from .env into one typed BotConfig
+        # (src/bot_config.py). The watcher reloads it when .env changes and the running loop applies
+        # the new values at its next tick - no restart needed for changes made through /api/config.
+        config = config_watcher.config
+        if CONFIG_HOT_RELOAD:
+            config_watcher.start()
+            log(f"[CONFIG] Watching {CONFIG_FILE} for changes")
+        # Request latency histograms, error/retry counters and iteration timing for Prometheus
+        if METRICS_ENABLED:
             try:
-                LADDER_ORDER_SIZES = [float(x.strip()) for x in LADDER_STR.split(",") if x.strip()]
-                if len(LADDER_ORDER_SIZES) != ORDERS_PER_SIDE:
-                    print(f"[WARNING] Ladder order sizes count ({len(LADDER_ORDER_SIZES)}) doesn't match orders per side ({ORDERS_PER_SIDE}), using equal distribution")
-                    LADDER_ORDER_SIZES = None
-            except:
-                print(f"[WARNING] Invalid ladder order sizes format, using equal distribution")
-                LADDER_ORDER_SIZES = None
-        
-        MIN_RANDOM_DELAY = float(os.getenv("MIN_RANDOM_DELAY", "1"))
-        MAX_RANDOM_DELAY = float(os.getenv("MAX_RANDOM_DELAY", "3"))
-        
-        # Adjustments mode (from adjustments.md): mid-based ±1% ladder, 0.8% spread, capital protections
-        ENABLE_ADJUSTMENTS_MODE = os.getenv("ENABLE_ADJUSTMENTS_MODE", "false").lower() == "true"
-        TARGET_DEPTH_PER_SIDE = float(os.getenv("TARGET_DEPTH_PER_SIDE", "500"))
-        LEVELS_PER_SIDE = int(os.getenv("LEVELS_PER_SIDE", "10"))
-        BEST_SPREAD_SIDE_PCT = float(os.getenv("BEST_SPREAD_SIDE_PCT", "0.4"))
-        REFRESH_SECONDS_MIN = float(os.getenv("REFRESH_SECONDS_MIN", "25"))
-        REFRESH_SECONDS_MAX = float(os.getenv("REFRESH_SECONDS_MAX", "45"))
-        REFRESH_RANDOM_SECONDS = float(os.getenv("REFRESH_RANDOM_SECONDS", "3"))
-        REPRICE_ON_MOVE = os.getenv("REPRICE_ON_MOVE", "true").lower() == "true"
-        REPRICE_MOVE_PCT = float(os.getenv("REPRICE_MOVE_PCT", "0.3"))
-        VOLATILITY_PAUSE_2PCT_60S_MINUTES = float(os.getenv("VOLATILITY_PAUSE_2PCT_60S_MINUTES", "10"))
-        VOLATILITY_PAUSE_5PCT_5M_MINUTES = float(os.getenv("VOLATILITY_PAUSE_5PCT_5M_MINUTES", "30"))
-        SPREAD_GUARD_THRESHOLD_PCT = float(os.getenv("SPREAD_GUARD_THRESHOLD_PCT", "1.5"))
-        SPREAD_GUARD_DURATION_SECONDS = float(os.getenv("SPREAD_GUARD_DURATION_SECONDS", "120"))
-        SPREAD_GUARD_REBUILD_SPREAD_PCT = float(os.getenv("SPREAD_GUARD_REBUILD_SPREAD_PCT", "1.2"))
-        INVENTORY_GUARD_MAX_SIDE_PCT = float(os.getenv("INVENTORY_GUARD_MAX_SIDE_PCT", "65"))
-        INVENTORY_REDUCE_SCALE = float(os.getenv("INVENTORY_REDUCE_SCALE", "0.5"))
-        ANTI_SNIPE_MAX_FILLS_IN_30S = int(os.getenv("ANTI_SNIPE_MAX_FILLS_IN_30S", "3"))
-        ANTI_SNIPE_COOLDOWN_SECONDS = float(os.getenv("ANTI_SNIPE_COOLDOWN_SECONDS", "300"))
+                log(f"[METRICS] Serving metrics on {metrics_server.start()}")
+            except OSError as e:
+                log(f"[METRICS] Could not start the metrics endpoint: {e}")
         
         market_making(
             max_order_size=10000,  # Maximum order size in tokens (will be capped by available balance)
             min_order_size=10,     # Minimum order size in tokens (lowered to allow more orders with limited balance)
             num_orders=20,         # Number of positions (used in standard mode, limited to ±1% in compliance mode)
             base_price_step_percentage=0.0025,  # Base step: 0.25% (orders will range from 0.25% to 10% in standard mode)
-            compliance_mode=ENABLE_COMPLIANCE_MODE,  # Enable LBank compliance mode
             compliance_min_usdt=500,  # Minimum USDT within ±1% (LBank requirement)
             compliance_max_usdt=1000,  # Maximum USDT within ±1% (LBank requirement)
-            enable_adaptive_pricing=ENABLE_ADAPTIVE_PRICING,  # Gradually move prices closer to market if orders don't fill
-            tightening_rate=TIGHTENING_RATE,  # Move closer per iteration after trigger
-            tightening_trigger=TIGHTENING_TRIGGER,  # Start tightening after N unfilled iterations
-            # Safety features (from environment variables)
-            max_spread_pct=MAX_SPREAD_PCT,  # Skip trading if spread exceeds this
-            max_loss_pct=MAX_LOSS_PCT,  # Stop bot if loss exceeds this
-            max_exposure_pct=MAX_EXPOSURE_PCT,  # Limit total exposure to this % of balance
-            reduce_distance_on_wide_spread=REDUCE_DISTANCE_ON_WIDE_SPREAD,  # Reduce max distance when spread is wide
-            wide_spread_threshold=WIDE_SPREAD_THRESHOLD,  # Spread threshold for distance reduction
-            max_buy_price=MAX_BUY_PRICE,  # Maximum buy price limit (None to disable)
-            # Reference price mode
-            enable_reference_price_mode=ENABLE_REFERENCE_PRICE_MODE,
-            reference_price=REFERENCE_PRICE,
-            order_value_per_side=ORDER_VALUE_PER_SIDE,
-            orders_per_side=ORDERS_PER_SIDE,
-            ladder_order_sizes=LADDER_ORDER_SIZES,
-            min_random_delay=MIN_RANDOM_DELAY,
-            max_random_delay=MAX_RANDOM_DELAY,
-            # Adjustments mode (from adjustments.md)
-            enable_adjustments_mode=ENABLE_ADJUSTMENTS_MODE,
-            target_depth_per_side=TARGET_DEPTH_PER_SIDE,
-            levels_per_side=LEVELS_PER_SIDE,
-            best_spread_side_pct=BEST_SPREAD_SIDE_PCT,
-            refresh_seconds_min=REFRESH_SECONDS_MIN,
-            refresh_seconds_max=REFRESH_SECONDS_MAX,
-            refresh_random_seconds=REFRESH_RANDOM_SECONDS,
-            reprice_on_move=REPRICE_ON_MOVE,
-            reprice_move_pct=REPRICE_MOVE_PCT,
-            volatility_pause_2pct_60s_minutes=VOLATILITY_PAUSE_2PCT_60S_MINUTES,
-            volatility_pause_5pct_5m_minutes=VOLATILITY_PAUSE_5PCT_5M_MINUTES,
-            spread_guard_threshold_pct=SPREAD_GUARD_THRESHOLD_PCT,
-            spread_guard_duration_seconds=SPREAD_GUARD_DURATION_SECONDS,
-            spread_guard_rebuild_spread_pct=SPREAD_GUARD_REBUILD_SPREAD_PCT,
-            inventory_guard_max_side_pct=INVENTORY_GUARD_MAX_SIDE_PCT,
-            inventory_reduce_scale=INVENTORY_REDUCE_SCALE,
-            anti_snipe_max_fills_in_30s=ANTI_SNIPE_MAX_FILLS_IN_30S,
-            anti_snipe_cooldown_seconds=ANTI_SNIPE_COOLDOWN_SECONDS,
+            # Everything else from .env (see BotConfig for the variables and defaults)
+            **config.strategy_kwargs(),
+            config_watcher=config_watcher if CONFIG_HOT_RELOAD else None,
         )
 
     except KeyboardInterrupt:
-        print("Main process interrupted")
+        log("Main process interrupted")
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        traceback.print_exc()
+        log(f"[ERROR] An unexpected error occurred: {e}", exc_info=True)
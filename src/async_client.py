@@ -0,0 +1,225 @@
+import asyncio
+import json
+import threading
+import time
+
+import aiohttp
+from lbank.error import CommonError, ServerError
+
+from src.request_metrics import classify_error, is_rejected
+
+# BlockHttpClient keeps the timestamp/echostr of the request being signed on the
+# instance, so signing must never interleave between threads.
+_SIGN_LOCK = threading.Lock()
+
+
+def sign_request(signer, payload=None):
+    """
+    Build signed headers and payload exactly like BlockHttpClient.http_request.
+
+    Parameters:
+    - signer: lbank.old_api.BlockHttpClient holding the API key/secret and sign method
+    - payload: Request parameters (not modified)
+
+    Returns:
+    - tuple: (headers, signed payload)
+    """
+    payload = dict(payload or {})
+    with _SIGN_LOCK:
+        headers = signer.build_header()
+        payload = signer.build_payload(payload)
+    for key in ("signature_method", "echostr", "timestamp"):
+        payload.pop(key, None)
+    return headers, payload
+
+
+def _retry_after(headers, default=1.0):
+    """
+    Seconds to back off after a 429 (Retry-After header if present).
+    """
+    try:
+        return max(float(headers.get("Retry-After", default)), 0.1)
+    except (TypeError, ValueError):
+        return default
+
+
+class AsyncExchangeClient:
+    """
+    Asyncio REST client for LBank with a persistent keep-alive connection pool.
+
+    The event loop runs in a daemon thread so the synchronous strategy code can
+    use it through request_sync()/gather() while the pooled connections stay open
+    across iterations. At most max_concurrency requests are in flight at once.
+    With a scheduler (RequestScheduler), every request first waits for a token
+    of its endpoint class, and a 429 response makes the scheduler back off.
+    With metrics (RequestMetrics), every request's latency and failure class
+    is recorded per endpoint.
+    Errors are raised as the same lbank.error types BlockHttpClient uses.
+    """
+
+    def __init__(
+        self,
+        signer,
+        base_url,
+        max_concurrency=8,
+        pool_size=16,
+        keepalive_seconds=30,
+        timeout_seconds=10,
+        scheduler=None,
+        metrics=None,
+    ):
+        self.signer = signer
+        self.scheduler = scheduler
+        self.metrics = metrics
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.keepalive_seconds = keepalive_seconds
+        self.timeout_seconds = timeout_seconds
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._semaphore = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._loop is not None:
+            return
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="lbank-async-client", daemon=True
+            )
+            thread.start()
+            asyncio.run_coroutine_threadsafe(self._open_session(), loop).result()
+            self._thread = thread
+            self._loop = loop
+
+    async def _open_session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            keepalive_timeout=self.keepalive_seconds,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout_seconds),
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def request(self, method, path, payload=None):
+        """
+        Send one signed request (coroutine, must run on this client's loop).
+        The scheduler token is taken by the synchronous callers, not here.
+
+        Parameters:
+        - method: HTTP method ("get"/"post")
+        - path: API path relative to base_url (e.g., "v2/supplement/ticker/bookTicker.do")
+        - payload: Request parameters
+
+        Returns:
+        - dict: Decoded JSON response
+        """
+        async with self._semaphore:
+            # Sign once a slot is free so the timestamp is fresh when the request leaves
+            headers, payload = sign_request(self.signer, payload)
+            url = self.base_url + path
+            if method.upper() == "GET":
+                kwargs = {"params": payload}
+            else:
+                kwargs = {"data": payload}
+            started = time.perf_counter()
+            try:
+                async with self._session.request(
+                    method.upper(), url, headers=headers, **kwargs
+                ) as response:
+                    if response.status == 429 and self.scheduler is not None:
+                        self.scheduler.penalize(path, _retry_after(response.headers))
+                    if response.status != 200:
+                        raise ServerError(response.status, response.reason)
+                    text = await response.text()
+            except ServerError as e:
+                self._record(path, started, classify_error(e))
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = CommonError(str(e) or e.__class__.__name__)
+                self._record(path, started, classify_error(error))
+                raise error
+        try:
+            result = json.loads(text)
+        except ValueError:
+            self._record(path, started, "invalid_json")
+            raise CommonError(f"response is not json format response is {text}")
+        self._record(path, started, classify_error(result) if is_rejected(result) else None)
+        return result
+
+    def _record(self, path, started, error=None):
+        if self.metrics is not None:
+            self.metrics.record_request(path, time.perf_counter() - started, error)
+
+    def run(self, coro):
+        """
+        Run a coroutine on the client's loop and block until it finishes.
+
+        Parameters:
+        - coro: Coroutine (typically built from request())
+
+        Returns:
+        - The coroutine's result
+        """
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def request_sync(self, method, path, payload=None, priority=None):
+        """
+        Blocking wrapper around request() for synchronous callers.
+
+        Waits for the scheduler token in the calling thread, so queued requests
+        never tie up the event loop and priority lanes are honored across threads.
+        """
+        if self.scheduler is not None:
+            try:
+                self.scheduler.acquire(path, priority)
+            except CommonError as e:
+                if self.metrics is not None:
+                    self.metrics.record_error(path, classify_error(e))
+                raise
+        return self.run(self.request(method, path, payload))
+
+    def gather(self, *requests):
+        """
+        Send several independent requests concurrently.
+
+        Parameters:
+        - requests: (method, path, payload) tuples
+
+        Returns:
+        - list: One entry per request, in order: the response dict or the raised exception
+        """
+        self._ensure_started()
+        if self.scheduler is not None:
+            for _, path, _ in requests:
+                self.scheduler.acquire(path)
+
+        async def _gather():
+            return await asyncio.gather(
+                *(self.request(method, path, payload) for method, path, payload in requests),
+                return_exceptions=True,
+            )
+
+        return self.run(_gather())
+
+    def close(self):
+        """
+        Close the connection pool and stop the loop thread.
+        """
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+        self._thread = None
+        self._session = None
+
@@ -0,0 +1,495 @@
+import argparse
+import contextlib
+import csv
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from dotenv import dotenv_values
+
+from src.exchange_simulator import SimClock, SimulatorServer, simulator_from_env
+from src.tick_journal import load_journal
+
+# Quoting modes and the market_making() switches that select them
+MODES = {
+    "standard": {"compliance_mode": False, "enable_reference_price_mode": False, "enable_adjustments_mode": False},
+    "compliance": {"compliance_mode": True, "enable_reference_price_mode": False, "enable_adjustments_mode": False},
+    "reference": {"compliance_mode": False, "enable_reference_price_mode": True, "enable_adjustments_mode": False},
+    "adjustments": {"compliance_mode": False, "enable_reference_price_mode": False, "enable_adjustments_mode": True},
+}
+
+# Unix time synthetic replays start at (2024-01-01 00:00 UTC); SIM_START_TIME overrides it
+SYNTHETIC_START = 1704067200
+
+# Modules whose `time` is swapped for the virtual clock during a replay
+STRATEGY_TIME_MODULES = (
+    "src.market_making",
+    "src.utils",
+    "src.event_scheduler",
+    "src.balance_ledger",
+    "src.snapshot",
+    "src.tick_journal",
+)
+
+
+class BacktestFinished(KeyboardInterrupt):
+    """
+    Raised by the virtual clock at the end of the replay.
+
+    market_making() handles it like Ctrl+C: the resting orders are cancelled and
+    the function returns.
+    """
+
+
+class VirtualTime:
+    """
+    Stand-in for the `time` module of the strategy during a replay.
+
+    time()/monotonic() read the simulated clock and sleep() advances it instantly,
+    so the waits between iterations cost no wall time. Anything else (perf_counter,
+    strftime, ...) is the real time module.
+    """
+
+    def __init__(self, clock, end):
+        """
+        Parameters:
+        - clock: SimClock in manual mode (shared with the simulated exchange)
+        - end: Unix time at which sleep() stops the replay
+        """
+        self.clock = clock
+        self.end = end
+        self.sleeps = 0
+        self.slept_seconds = 0.0
+
+    def time(self):
+        return self.clock.now()
+
+    def monotonic(self):
+        return self.clock.now() - self.clock.start
+
+    def sleep(self, seconds):
+        seconds = max(float(seconds), 0.0)
+        self.clock.advance(seconds)
+        self.sleeps += 1
+        self.slept_seconds += seconds
+        if self.clock.now() >= self.end:
+            raise BacktestFinished()
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def load_ticks(path):
+    """
+    Read recorded ticks into a price path.
+
+    CSV files need a header with a timestamp column (ts, timestamp or time) and
+    either price or bid and ask; JSON-lines files hold one object per tick with
+    the same keys. Timestamps are unix seconds or milliseconds. A tick journal
+    (.bin, see src/tick_journal.py) replays the bid/ask the bot saw.
+
+    Parameters:
+    - path: Tick file (.csv, .jsonl, .json or .bin)
+
+    Returns:
+    - tuple: (unix time of the first tick, [(seconds from the first tick, mid price)])
+    """
+    if path.endswith(".bin"):
+        records = load_journal(path)
+        records = records[~np.isnan(records["bid"])]  # ticks that ended before the book was read
+        rows = [{"ts": ts, "bid": bid, "ask": ask} for ts, bid, ask in records[["ts", "bid", "ask"]].tolist()]
+    else:
+        with open(path, newline="") as f:
+            if path.endswith(".csv"):
+                rows = list(csv.DictReader(f))
+            else:
+                rows = [json.loads(line) for line in f if line.strip()]
+    ticks = []
+    for row in rows:
+        ts = row.get("ts", row.get("timestamp", row.get("time")))
+        if ts in (None, ""):
+            continue
+        ts = float(ts)
+        if ts > 1e12:
+            ts /= 1000.0  # milliseconds
+        if row.get("price") not in (None, ""):
+            price = float(row["price"])
+        elif row.get("bid") not in (None, "") and row.get("ask") not in (None, ""):
+            price = (float(row["bid"]) + float(row["ask"])) / 2
+        else:
+            continue
+        if price > 0:
+            ticks.append((ts, price))
+    if not ticks:
+        raise ValueError(f"no ticks in {path}")
+    ticks.sort()
+    start = ticks[0][0]
+    return start, [(ts - start, price) for ts, price in ticks]
+
+
+class BacktestRecorder:
+    """
+    Exchange observer collecting the replay metrics at every matching step.
+
+    Compliance follows the platform requirement in adjustments.md: at least
+    min_depth_usdt of our orders within ±depth_band_pct of the mid on each side,
+    with our best bid/ask no wider than max_spread_pct apart.
+    """
+
+    def __init__(self, depth_band_pct=1.0, min_depth_usdt=500.0, max_spread_pct=1.0, sample_seconds=60.0):
+        """
+        Parameters:
+        - depth_band_pct: Band around the mid counted as depth (percent)
+        - min_depth_usdt: Depth each side needs to be compliant
+        - max_spread_pct: Widest spread between our best bid and ask that is compliant
+        - sample_seconds: Interval of the inventory path samples
+        """
+        self.depth_band = depth_band_pct / 100.0
+        self.min_depth_usdt = min_depth_usdt
+        self.max_spread_pct = max_spread_pct
+        self.sample_seconds = sample_seconds
+        self.steps = 0
+        self.compliant_steps = 0
+        self.depth_ok_steps = 0
+        self.spread_ok_steps = 0
+        self.quoted_steps = 0  # at least one order on each side
+        self.bid_depth_sum = 0.0
+        self.ask_depth_sum = 0.0
+        self.inventory = []  # [ts, base, quote, mid, equity]
+        self._next_sample = None
+
+    def __call__(self, ts, exchange):
+        bid, ask = exchange.quote(ts)
+        mid = (bid + ask) / 2
+        book = exchange.book
+        bid_depth = book.value_between("buy", mid * (1 - self.depth_band), mid)
+        ask_depth = book.value_between("sell", mid, mid * (1 + self.depth_band))
+        best_bid, best_ask = book.best("buy"), book.best("sell")
+        quoted = best_bid is not None and best_ask is not None
+        spread_ok = quoted and (best_ask - best_bid) / mid * 100 <= self.max_spread_pct
+        depth_ok = min(bid_depth, ask_depth) >= self.min_depth_usdt
+        self.steps += 1
+        self.quoted_steps += quoted
+        self.spread_ok_steps += spread_ok
+        self.depth_ok_steps += depth_ok
+        self.compliant_steps += spread_ok and depth_ok
+        self.bid_depth_sum += bid_depth
+        self.ask_depth_sum += ask_depth
+        if self._next_sample is None or ts >= self._next_sample:
+            self.sample(ts, exchange, mid)
+            self._next_sample = ts + self.sample_seconds
+
+    def sample(self, ts, exchange, mid):
+        base, quote = exchange.balances[exchange.base_asset], exchange.balances[exchange.quote_asset]
+        base_total, quote_total = base[0] + base[1], quote[0] + quote[1]
+        self.inventory.append([ts, base_total, quote_total, mid, quote_total + base_total * mid])
+
+    def pct(self, steps):
+        return steps / self.steps * 100 if self.steps else 0.0
+
+
+def fill_statistics(fills, hours):
+    """
+    Summarize our executions.
+
+    Parameters:
+    - fills: SimulatedExchange.fills
+    - hours: Simulated duration
+
+    Returns:
+    - dict: Counts, volumes, average prices and fees per side
+    """
+    stats = {"count": len(fills), "maker": 0, "taker": 0, "fees_usdt": 0.0, "notional_usdt": 0.0}
+    for side in ("buy", "sell"):
+        side_fills = [f for f in fills if f["side"] == side]
+        qty = sum(f["qty"] for f in side_fills)
+        notional = sum(f["qty"] * f["price"] for f in side_fills)
+        stats[side] = {
+            "count": len(side_fills),
+            "quantity": qty,
+            "notional_usdt": notional,
+            "avg_price": notional / qty if qty else None,
+        }
+        stats["notional_usdt"] += notional
+    for f in fills:
+        stats[f["liquidity"]] += 1
+        stats["fees_usdt"] += f["fee"]
+    stats["fills_per_hour"] = len(fills) / hours if hours > 0 else 0.0
+    if stats["buy"]["avg_price"] and stats["sell"]["avg_price"]:
+        stats["avg_sell_minus_buy_pct"] = (stats["sell"]["avg_price"] / stats["buy"]["avg_price"] - 1) * 100
+    return stats
+
+
+def parse_overrides(items):
+    """
+    Parse KEY=VALUE settings (the .env names, e.g. TIGHTENING_RATE=0.002).
+
+    Returns:
+    - dict: Variable name -> value string
+    """
+    overrides = {}
+    for item in items or []:
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            raise ValueError(f"expected KEY=VALUE, got {item!r}")
+        overrides[key.strip()] = value.strip()
+    return overrides
+
+
+def run_backtest(
+    mode="standard",
+    hours=6.0,
+    ticks_file=None,
+    overrides=None,
+    seed=1,
+    log_path=None,
+    compliance_depth_usdt=500.0,
+    compliance_spread_pct=1.0,
+    sample_seconds=60.0,
+):
+    """
+    Replay a price path through market_making() against the simulated exchange.
+
+    The strategy runs unmodified: its REST calls go to an in-process
+    SimulatedExchange, and its `time` is a VirtualTime on the exchange's clock,
+    so every wait between iterations is skipped and fills happen at the
+    simulated time they would have. The stream, event-driven waits, risk
+    watchdog thread, rate limiter and state store are off (they run on wall
+    time). Strategy settings come from the environment and .env like a live
+    run, with `overrides` on top.
+
+    Must run in a fresh process: src.utils reads its settings at import.
+
+    Parameters:
+    - mode: "standard", "compliance", "reference" or "adjustments"
+    - hours: Simulated duration (recorded ticks: None = until the last tick)
+    - ticks_file: Recorded ticks (see load_ticks); None = synthetic path from SIM_* settings
+    - overrides: {ENV_NAME: value} applied over the environment and .env
+    - seed: Seed for the price walk, the taker flow and the strategy's random delays
+    - log_path: File for the strategy's output (None = discarded)
+    - compliance_depth_usdt: Depth per side within ±1% counted as compliant
+    - compliance_spread_pct: Widest spread counted as compliant
+    - sample_seconds: Interval of the inventory path samples
+
+    Returns:
+    - dict: Report (period, pnl, inventory, compliance, fills, exchange stats)
+    """
+    if mode not in MODES:
+        raise ValueError(f"unknown mode {mode!r} (choose from {', '.join(MODES)})")
+    if "src.utils" in sys.modules:
+        raise RuntimeError("run_backtest needs a fresh process (src.utils is already imported)")
+
+    env = dict(os.environ)
+    config_file = env.get("BOT_CONFIG_FILE", ".env")
+    if config_file and os.path.exists(config_file):
+        env.update({k: v for k, v in dotenv_values(config_file).items() if v is not None})
+    env.setdefault("SIM_SEED", str(seed))
+    if ticks_file:
+        # Recorded prices already carry their own noise
+        env.setdefault("SIM_VOLATILITY_PCT", "0")
+    env.update(overrides or {})
+
+    waypoints = None
+    # Synthetic runs start at a fixed time so a seed always replays the same candles
+    start = float(env.get("SIM_START_TIME", SYNTHETIC_START))
+    if ticks_file:
+        start, waypoints = load_ticks(ticks_file)
+        if not hours:
+            hours = waypoints[-1][0] / 3600.0
+    end = start + hours * 3600.0
+
+    clock = SimClock(start=start, speed=0)
+    recorder = BacktestRecorder(
+        min_depth_usdt=compliance_depth_usdt,
+        max_spread_pct=compliance_spread_pct,
+        sample_seconds=sample_seconds,
+    )
+    symbol = env.get("TRADING_PAIR", "acces_usdt")
+    exchange = simulator_from_env(symbol, env, clock=clock, waypoints=waypoints, observer=recorder)
+    server = SimulatorServer(exchange)
+    base_url = server.start()
+
+    # Point utils at the simulator before it is imported; settings are fixed through the
+    # environment (BOT_CONFIG_FILE="" keeps the .env file from overriding the overrides).
+    # Log lines are written inline so all of them land in the redirected log file.
+    env.update({
+        "EXCHANGE_SIMULATOR": "true",
+        "SIM_URL": base_url,
+        "STATE_STORE_ENABLED": "false",
+        "RATE_LIMIT_ENABLED": "false",
+        "BOT_CONFIG_FILE": "",
+        "LOG_ASYNC": "false",
+    })
+    os.environ.update({k: str(v) for k, v in env.items()})
+
+    import src.utils as utils
+    import src.market_making as strategy
+
+    virtual_time = VirtualTime(clock, end)
+    for name in STRATEGY_TIME_MODULES:
+        sys.modules[name].time = virtual_time
+    random.seed(seed)
+
+    config = utils.config_watcher.config
+    kwargs = dict(
+        max_order_size=10000,
+        min_order_size=10,
+        num_orders=20,
+        base_price_step_percentage=0.0025,
+        compliance_min_usdt=500,
+        compliance_max_usdt=1000,
+    )
+    kwargs.update(config.strategy_kwargs())
+    kwargs.update(MODES[mode])
+    if mode == "reference" and not kwargs.get("reference_price"):
+        kwargs["reference_price"] = exchange.path.mid(0.0)
+    # Wall-clock machinery stays off in a replay
+    kwargs.update(enable_market_stream=False, event_driven_loop=False, enable_risk_watchdog=False)
+
+    start_mid = exchange.path.mid(0.0)
+    recorder.sample(start, exchange, start_mid)
+    start_base, start_quote, start_equity = recorder.inventory[0][1], recorder.inventory[0][2], recorder.inventory[0][4]
+
+    wall_started = time.monotonic()
+    log = open(log_path, "w") if log_path else open(os.devnull, "w")
+    try:
+        with contextlib.redirect_stdout(log):
+            try:
+                strategy.market_making(**kwargs)
+            except BacktestFinished:
+                pass
+    finally:
+        log.close()
+        wall_seconds = time.monotonic() - wall_started
+        server.stop()
+
+    end_ts = clock.now()
+    end_mid = exchange.path.mid(end_ts - start)
+    recorder.sample(end_ts, exchange, end_mid)
+    _, end_base, end_quote, _, end_equity = recorder.inventory[-1]
+    simulated_hours = (end_ts - start) / 3600.0
+    hold_pnl = start_base * (end_mid - start_mid)
+    bases = [row[1] for row in recorder.inventory]
+
+    return {
+        "mode": mode,
+        "settings": {k: v for k, v in kwargs.items() if not callable(v)},
+        "period": {
+            "start": start,
+            "end": end_ts,
+            "simulated_hours": simulated_hours,
+            "wall_seconds": wall_seconds,
+            "speedup": (end_ts - start) / wall_seconds if wall_seconds > 0 else None,
+            "iterations_slept": virtual_time.sleeps,
+        },
+        "pnl": {
+            "start_equity_usdt": start_equity,
+            "end_equity_usdt": end_equity,
+            "pnl_usdt": end_equity - start_equity,
+            "pnl_pct": (end_equity / start_equity - 1) * 100 if start_equity else 0.0,
+            "hold_pnl_usdt": hold_pnl,
+            "pnl_vs_hold_usdt": end_equity - start_equity - hold_pnl,
+            "start_mid": start_mid,
+            "end_mid": end_mid,
+        },
+        "inventory": {
+            "start_base": start_base,
+            "end_base": end_base,
+            "start_quote": start_quote,
+            "end_quote": end_quote,
+            "min_base": min(bases),
+            "max_base": max(bases),
+            "path": recorder.inventory,  # [ts, base, quote, mid, equity]
+        },
+        "compliance": {
+            "time_in_compliance_pct": recorder.pct(recorder.compliant_steps),
+            "depth_ok_pct": recorder.pct(recorder.depth_ok_steps),
+            "spread_ok_pct": recorder.pct(recorder.spread_ok_steps),
+            "two_sided_pct": recorder.pct(recorder.quoted_steps),
+            "avg_bid_depth_usdt": recorder.bid_depth_sum / recorder.steps if recorder.steps else 0.0,
+            "avg_ask_depth_usdt": recorder.ask_depth_sum / recorder.steps if recorder.steps else 0.0,
+            "min_depth_usdt": compliance_depth_usdt,
+            "max_spread_pct": compliance_spread_pct,
+        },
+        "fills": fill_statistics(exchange.fills, simulated_hours),
+        "exchange": dict(exchange.stats),
+    }
+
+
+def format_report(report):
+    """
+    Human-readable summary of a run_backtest() report.
+
+    Returns:
+    - str: Report text
+    """
+    period, pnl, inventory = report["period"], report["pnl"], report["inventory"]
+    compliance, fills = report["compliance"], report["fills"]
+    lines = [
+        "=" * 60,
+        f"[BACKTEST] Mode: {report['mode']} | {period['simulated_hours']:.2f}h simulated in {period['wall_seconds']:.1f}s"
+        + (f" ({period['speedup']:.0f}x)" if period["speedup"] else ""),
+        f"[PNL] Equity {pnl['start_equity_usdt']:.2f} -> {pnl['end_equity_usdt']:.2f} USDT "
+        f"({pnl['pnl_usdt']:+.2f}, {pnl['pnl_pct']:+.2f}%) | Hold: {pnl['hold_pnl_usdt']:+.2f} | "
+        f"vs hold: {pnl['pnl_vs_hold_usdt']:+.2f} USDT",
+        f"[PNL] Mid {pnl['start_mid']:.6f} -> {pnl['end_mid']:.6f}",
+        f"[INVENTORY] Base {inventory['start_base']:.2f} -> {inventory['end_base']:.2f} "
+        f"(min {inventory['min_base']:.2f}, max {inventory['max_base']:.2f}) | "
+        f"Quote {inventory['start_quote']:.2f} -> {inventory['end_quote']:.2f}",
+        f"[COMPLIANCE] In compliance {compliance['time_in_compliance_pct']:.1f}% of the time "
+        f"(depth ≥{compliance['min_depth_usdt']:.0f} USDT/side: {compliance['depth_ok_pct']:.1f}%, "
+        f"spread ≤{compliance['max_spread_pct']}%: {compliance['spread_ok_pct']:.1f}%, "
+        f"two-sided: {compliance['two_sided_pct']:.1f}%)",
+        f"[COMPLIANCE] Average depth within ±1%: bid {compliance['avg_bid_depth_usdt']:.2f} / "
+        f"ask {compliance['avg_ask_depth_usdt']:.2f} USDT",
+        f"[FILLS] {fills['count']} fills ({fills['fills_per_hour']:.1f}/h, {fills['maker']} maker, {fills['taker']} taker) | "
+        f"Notional {fills['notional_usdt']:.2f} USDT | Fees {fills['fees_usdt']:.4f} USDT",
+    ]
+    for side in ("buy", "sell"):
+        s = fills[side]
+        avg = f"{s['avg_price']:.6f}" if s["avg_price"] else "-"
+        lines.append(f"[FILLS] {side.upper()}: {s['count']} fills, {s['quantity']:.2f} @ avg {avg} ({s['notional_usdt']:.2f} USDT)")
+    if "avg_sell_minus_buy_pct" in fills:
+        lines.append(f"[FILLS] Average sell vs buy price: {fills['avg_sell_minus_buy_pct']:+.3f}%")
+    stats = report["exchange"]
+    lines.append(
+        f"[ORDERS] {stats['created']} created, {stats['cancelled']} cancelled, {stats['rejected']} rejected, "
+        f"{stats['requests']} requests"
+    )
+    lines.append("=" * 60)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # python -m src.backtest --mode adjustments --hours 6 --set BEST_SPREAD_SIDE_PCT=0.3
+    parser = argparse.ArgumentParser(description="Replay a price path through the market making strategy")
+    parser.add_argument("--mode", choices=sorted(MODES), default="standard")
+    parser.add_argument("--hours", type=float, default=None, help="Simulated hours (default 6, or the whole tick file)")
+    parser.add_argument("--ticks", help="Recorded ticks (.csv or .jsonl with ts and price or bid/ask, or a .bin tick journal)")
+    parser.add_argument("--set", dest="overrides", action="append", metavar="KEY=VALUE",
+                        help="Setting by its .env name (repeatable), e.g. TIGHTENING_RATE=0.002")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log", help="Write the strategy output to this file")
+    parser.add_argument("--output", help="Write the full report (with the inventory path) as JSON")
+    parser.add_argument("--compliance-depth", type=float, default=500.0)
+    parser.add_argument("--compliance-spread", type=float, default=1.0)
+    args = parser.parse_args()
+
+    report = run_backtest(
+        mode=args.mode,
+        hours=args.hours if args.hours is not None else (None if args.ticks else 6.0),
+        ticks_file=args.ticks,
+        overrides=parse_overrides(args.overrides),
+        seed=args.seed,
+        log_path=args.log,
+        compliance_depth_usdt=args.compliance_depth,
+        compliance_spread_pct=args.compliance_spread,
+    )
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[BACKTEST] Report written to {args.output}")
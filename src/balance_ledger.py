@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import deque
+
+from src.logger import log
+
+
+class BalanceLedger:
+    """
+    Local USDT / token balances, kept current from our own order flow.
+
+    Seeded from one authoritative balance query, then updated in place:
+    - placement: the order's value moves from free to locked
+    - cancel: the remaining value moves back from locked to free
+    - fill: the filled value leaves locked on one asset and lands in free on the other
+
+    fetch_account_balance() serves balances from here and only goes back to the
+    exchange when needs_reconcile() says so: every reconcile_seconds, or sooner
+    when drift is suspected (a balance went negative, or orders vanished without
+    us knowing whether they were filled or cancelled). Trading fees are not
+    modelled; the periodic reconciliation absorbs them.
+    """
+
+    def __init__(self, assets, reconcile_seconds=60.0, drift_tolerance_pct=1.0, max_journal=1000):
+        """
+        Parameters:
+        - assets: (quote asset, base asset), e.g. ("usdt", "acces")
+        - reconcile_seconds: Longest time between two authoritative balance queries
+        - drift_tolerance_pct: Difference from the exchange (% of the total) worth reporting
+        - max_journal: Balance changes kept for replay over an in-flight query
+        """
+        self.quote, self.base = assets
+        self.reconcile_seconds = reconcile_seconds
+        self.drift_tolerance_pct = drift_tolerance_pct
+        self._balances = None  # asset -> {"free", "locked"}; None until seeded
+        self._reconciled_at = 0.0  # monotonic time of the last reconcile()
+        self._drift_reason = None
+        self._seq = 0  # increases with every local change
+        self._journal = deque(maxlen=max_journal)  # (seq, asset, free delta, locked delta)
+        self._lock = threading.Lock()
+        self.reconciles = 0
+        self.served = 0
+
+    # ---------- local updates ----------
+
+    def _apply(self, asset, free_delta, locked_delta):
+        # Caller holds the lock
+        self._seq += 1
+        self._journal.append((self._seq, asset, free_delta, locked_delta))
+        if self._balances is None:
+            return
+        entry = self._balances[asset]
+        entry["free"] += free_delta
+        entry["locked"] += locked_delta
+        if (entry["free"] < -1e-9 or entry["locked"] < -1e-9) and self._drift_reason is None:
+            self._drift_reason = f"{asset} balance went negative"
+
+    def on_place(self, side, price, qty):
+        """
+        An order was accepted: lock its funds.
+        """
+        with self._lock:
+            if side == "buy":
+                self._apply(self.quote, -qty * price, qty * price)
+            else:
+                self._apply(self.base, -qty, qty)
+
+    def on_release(self, side, price, qty):
+        """
+        An order (or its unfilled remainder) was cancelled: unlock its funds.
+        """
+        if qty <= 0:
+            return
+        with self._lock:
+            if side == "buy":
+                self._apply(self.quote, qty * price, -qty * price)
+            else:
+                self._apply(self.base, qty, -qty)
+
+    def on_fill(self, side, price, qty):
+        """
+        Part of an order was filled: pay from locked, receive into free.
+        """
+        if qty <= 0:
+            return
+        with self._lock:
+            if side == "buy":
+                self._apply(self.quote, 0.0, -qty * price)
+                self._apply(self.base, qty, 0.0)
+            else:
+                self._apply(self.base, 0.0, -qty)
+                self._apply(self.quote, qty * price, 0.0)
+
+    def mark_drift(self, reason):
+        """
+        Ask for a reconciliation at the next balance read.
+        """
+        with self._lock:
+            if self._drift_reason is None:
+                self._drift_reason = reason
+
+    # ---------- reconciliation ----------
+
+    def needs_reconcile(self, now=None):
+        """
+        Check whether balances must be re-read from the exchange.
+
+        Returns:
+        - bool: True if never seeded, drift is suspected, or the interval has elapsed
+        """
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            return (
+                self._balances is None
+                or self._drift_reason is not None
+                or now - self._reconciled_at >= self.reconcile_seconds
+            )
+
+    def checkpoint(self):
+        """
+        Mark the start of an authoritative balance query.
+
+        Returns:
+        - int: Token to pass to reconcile(), so changes made while the query is in
+          flight are replayed on top of the exchange's answer
+        """
+        with self._lock:
+            return self._seq
+
+    def reconcile(self, balances, since=None):
+        """
+        Replace the local balances with an authoritative exchange read.
+
+        Parameters:
+        - balances: {asset: {"free", "locked"}} from parse_account_balance
+        - since: checkpoint() taken before the query was sent (optional)
+
+        Returns:
+        - dict: {asset: difference between the exchange and the local total}, empty on first seed
+        """
+        with self._lock:
+            fresh = {
+                asset: {"free": float(balances.get(asset, {}).get("free", 0.0)), "locked": float(balances.get(asset, {}).get("locked", 0.0))}
+                for asset in (self.quote, self.base)
+            }
+            if since is not None:
+                for seq, asset, free_delta, locked_delta in self._journal:
+                    if seq > since and asset in fresh:
+                        fresh[asset]["free"] += free_delta
+                        fresh[asset]["locked"] += locked_delta
+
+            drift = {}
+            if self._balances is not None:
+                for asset in (self.quote, self.base):
+                    local_total = self._balances[asset]["free"] + self._balances[asset]["locked"]
+                    drift[asset] = fresh[asset]["free"] + fresh[asset]["locked"] - local_total
+            reason = self._drift_reason
+            self._balances = fresh
+            self._reconciled_at = time.monotonic()
+            self._drift_reason = None
+            self.reconciles += 1
+
+        for asset, difference in drift.items():
+            total = fresh[asset]["free"] + fresh[asset]["locked"]
+            if total > 0 and abs(difference) / total * 100 > self.drift_tolerance_pct:
+                log(f"[LEDGER] {asset.upper()} drifted {difference:+.4f} from the exchange" + (f" ({reason})" if reason else ""))
+        return drift
+
+    # ---------- reads ----------
+
+    @property
+    def seeded(self):
+        with self._lock:
+            return self._balances is not None
+
+    def balances(self):
+        """
+        Current local balances, in the fetch_account_balance format (a copy).
+
+        Returns:
+        - dict: {asset: {"free", "locked"}}, or None if not seeded yet
+        """
+        with self._lock:
+            if self._balances is None:
+                return None
+            self.served += 1
+            return {asset: {"free": max(0.0, v["free"]), "locked": max(0.0, v["locked"])} for asset, v in self._balances.items()}
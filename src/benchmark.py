@@ -0,0 +1,535 @@
+import argparse
+import contextlib
+import gc
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+import urllib.request
+
+import numpy as np
+
+from src.backtest import MODES, STRATEGY_TIME_MODULES, BacktestFinished, VirtualTime
+from src.exchange_simulator import SimClock
+from src.logger import flush_logs
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_PREFIX = "BENCHMARK_RESULT "
+
+# Lower is better for every compared metric; the rest of a result is informational
+COMPARED_METRICS = (
+    "tick_ms_p50",
+    "tick_ms_p95",
+    "tick_to_quote_ms_p50",
+    "tick_to_quote_ms_p95",
+    "requests_per_tick",
+    "cpu_ms_per_tick",
+    "peak_alloc_kib_per_tick",
+    "us_per_op",
+    "cpu_us_per_op",
+    "peak_alloc_kib_per_op",
+)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(values, q):
+    return float(np.percentile(values, q)) if values else None
+
+
+def _mean(values):
+    return float(np.mean(values)) if values else None
+
+
+class TickTimer(VirtualTime):
+    """
+    Virtual clock that also measures every strategy iteration.
+
+    An iteration runs from the end of one sleep() to the next, so the waits
+    themselves cost nothing and the measured time is the work of the tick:
+    wall time, CPU time of this process (the mocked exchange runs in another
+    one), requests sent, time until the last order of the tick was acknowledged
+    (tick-to-quote) and gen-0 garbage collections.
+    """
+
+    def __init__(self, clock, ticks, warmup, requests, trace_allocations=False):
+        """
+        Parameters:
+        - clock: SimClock in manual mode
+        - ticks: Number of measured iterations before the run is stopped
+        - warmup: Iterations dropped first (startup, route discovery, history fetch)
+        - requests: Shared list the request wrapper appends (path, started, finished) to
+        - trace_allocations: Record the tracemalloc peak of every tick
+        """
+        super().__init__(clock, end=float("inf"))
+        self.ticks = ticks
+        self.warmup = warmup
+        self.requests = requests
+        self.trace_allocations = trace_allocations
+        self.samples = []
+        self._seen = 0
+        self.begin()
+
+    def begin(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._request_index = len(self.requests)
+        self._gc = gc.get_stats()[0]["collections"]
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            self._traced = tracemalloc.get_traced_memory()[0]
+
+    def sleep(self, seconds):
+        wall = time.perf_counter()
+        sample = {
+            "tick_ms": (wall - self._wall) * 1000,
+            "cpu_ms": (time.process_time() - self._cpu) * 1000,
+            "gc_gen0": gc.get_stats()[0]["collections"] - self._gc,
+        }
+        tick_requests = self.requests[self._request_index:]
+        sample["requests"] = len(tick_requests)
+        creates = [finished for path, _, finished in tick_requests if "create_order" in path]
+        sample["creates"] = len(creates)
+        sample["tick_to_quote_ms"] = (max(creates) - self._wall) * 1000 if creates else None
+        if self.trace_allocations:
+            sample["peak_alloc_kib"] = (tracemalloc.get_traced_memory()[1] - self._traced) / 1024
+        self._seen += 1
+        if self._seen > self.warmup:
+            self.samples.append(sample)
+        super().sleep(seconds)
+        if len(self.samples) >= self.ticks:
+            raise BacktestFinished()
+        self.begin()
+
+
+def summarize_ticks(samples):
+    """
+    Aggregate per-tick samples into the benchmark metrics.
+
+    Returns:
+    - dict: Metric name -> value
+    """
+    ticks = [s["tick_ms"] for s in samples]
+    quotes = [s["tick_to_quote_ms"] for s in samples if s["tick_to_quote_ms"] is not None]
+    summary = {
+        "ticks": len(samples),
+        "quoted_ticks": len(quotes),
+        "tick_ms_mean": _mean(ticks),
+        "tick_ms_p50": _percentile(ticks, 50),
+        "tick_ms_p95": _percentile(ticks, 95),
+        "tick_to_quote_ms_p50": _percentile(quotes, 50),
+        "tick_to_quote_ms_p95": _percentile(quotes, 95),
+        "requests_per_tick": _mean([s["requests"] for s in samples]),
+        "creates_per_tick": _mean([s["creates"] for s in samples]),
+        "cpu_ms_per_tick": _mean([s["cpu_ms"] for s in samples]),
+        "gc_gen0_per_tick": _mean([s["gc_gen0"] for s in samples]),
+    }
+    if samples and "peak_alloc_kib" in samples[0]:
+        summary["peak_alloc_kib_per_tick"] = _mean([s["peak_alloc_kib"] for s in samples])
+    return summary
+
+
+def _import_strategy(sim_url):
+    """
+    Import utils/market_making pointed at the mocked exchange (worker processes only).
+    """
+    os.environ.update({
+        "EXCHANGE_SIMULATOR": "true",
+        "SIM_URL": sim_url,
+        "STATE_STORE_ENABLED": "false",
+        "RATE_LIMIT_ENABLED": "false",
+        "BOT_CONFIG_FILE": "",
+    })
+    import src.utils as utils
+    import src.market_making as strategy
+
+    return utils, strategy
+
+
+def run_loop_benchmark(sim_url, mode, ticks=20, warmup=1, trace_allocations=False):
+    """
+    Drive market_making() against a running simulator and measure its ticks.
+
+    Parameters:
+    - sim_url: Base URL of the mocked exchange
+    - mode: Quoting mode (see backtest.MODES)
+    - ticks: Iterations to measure
+    - warmup: Iterations to drop first
+    - trace_allocations: Also record the tracemalloc peak per tick (slows the ticks down)
+
+    Returns:
+    - dict: summarize_ticks() metrics
+    """
+    utils, strategy = _import_strategy(sim_url)
+
+    # Time every request from the moment it is handed to the pooled client until its response
+    requests = []
+    send = utils.async_client.request
+
+    async def timed_request(method, path, payload=None):
+        started = time.perf_counter()
+        try:
+            return await send(method, path, payload)
+        finally:
+            requests.append((path, started, time.perf_counter()))
+
+    utils.async_client.request = timed_request
+
+    if trace_allocations:
+        tracemalloc.start()
+    timer = TickTimer(SimClock(speed=0), ticks, warmup, requests, trace_allocations)
+    for name in STRATEGY_TIME_MODULES:
+        sys.modules[name].time = timer
+
+    kwargs = dict(
+        max_order_size=10000,
+        min_order_size=10,
+        num_orders=20,
+        base_price_step_percentage=0.0025,
+        compliance_min_usdt=500,
+        compliance_max_usdt=1000,
+    )
+    kwargs.update(utils.config_watcher.config.strategy_kwargs())
+    kwargs.update(MODES[mode])
+    if mode == "reference" and not kwargs.get("reference_price"):
+        kwargs["reference_price"] = utils.fetch_mid_price(utils.pair)
+    kwargs.update(enable_market_stream=False, event_driven_loop=False, enable_risk_watchdog=False)
+
+    timer.begin()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            strategy.market_making(**kwargs)
+        except BacktestFinished:
+            pass
+        # Lines still queued for the log writer thread go to /dev/null too
+        flush_logs()
+    return summarize_ticks(timer.samples)
+
+
+def _measure(fn, min_seconds=0.2, trace_calls=200):
+    """
+    Time a callable: wall and CPU per call, then its allocation peak per call.
+
+    Returns:
+    - dict: us_per_op, cpu_us_per_op, peak_alloc_kib_per_op, retained_bytes_per_op, loops
+    """
+    fn()  # warm caches and lazy imports
+    loops = 0
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    while True:
+        fn()
+        loops += 1
+        elapsed = time.perf_counter() - wall_started
+        if elapsed >= min_seconds:
+            break
+    cpu = time.process_time() - cpu_started
+
+    calls = min(loops, trace_calls)
+    tracemalloc.start()
+    peak_total = 0
+    current_before = tracemalloc.get_traced_memory()[0]
+    for _ in range(calls):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        fn()
+        peak_total += tracemalloc.get_traced_memory()[1] - current
+    retained = tracemalloc.get_traced_memory()[0] - current_before
+    tracemalloc.stop()
+    return {
+        "loops": loops,
+        "us_per_op": elapsed / loops * 1e6,
+        "cpu_us_per_op": cpu / loops * 1e6,
+        "peak_alloc_kib_per_op": peak_total / calls / 1024,
+        "retained_bytes_per_op": retained / calls,
+    }
+
+
+def open_orders_response(count=200, price=0.2):
+    """
+    orders_info_no_deal.do response with `count` open orders (half buys, half sells).
+    """
+    orders = []
+    for i in range(count):
+        side = "buy" if i % 2 == 0 else "sell"
+        level_price = price * (1 - 0.001 * (i // 2 + 1)) if side == "buy" else price * (1 + 0.001 * (i // 2 + 1))
+        orders.append({
+            "symbol": "acces_usdt",
+            "orderId": f"bench-{i}",
+            "price": f"{level_price:.6f}",
+            "origQty": "250.0",
+            "executedQty": "25.0" if i % 7 == 0 else "0",
+            "status": 1 if i % 7 == 0 else 0,
+            "type": side,
+            "time": 1704067200000 + i,
+        })
+    return {"result": "true", "data": {"total": count, "page_length": 200, "current_page": 1, "orders": orders}}
+
+
+def run_helper_benchmarks(sim_url, min_seconds=0.2):
+    """
+    Time the sizing/ladder helpers and open-order parsing in isolation.
+
+    calculate_order_size reads the price and balances through the snapshot
+    cache, so after its first call it measures the cached path.
+
+    Returns:
+    - dict: Benchmark name -> _measure() metrics
+    """
+    utils, _ = _import_strategy(sim_url)
+    from src import ladder_builder
+
+    prices = np.linspace(0.2, 0.18, 20)
+    sizes = ladder_builder.geometric_sizes(5000.0, 20)
+    levels = ladder_builder.make_levels(prices, sizes)
+    response = open_orders_response()
+
+    def standard_ladder():
+        distances = ladder_builder.step_distances(20, 0.0025, 0.10)
+        ladder_prices = 0.2 * (1 - distances)
+        built = ladder_builder.make_levels(ladder_prices, ladder_builder.geometric_sizes(5000.0, 20), distance_pct=distances * 100)
+        return ladder_builder.filter_levels(built, 10, 5.0)
+
+    benchmarks = {
+        "calculate_order_sizes": lambda: utils.calculate_order_sizes(5000, 20, 10),
+        "calculate_order_size": lambda: utils.calculate_order_size("buy", 0.01, 10000, 10),
+        "ladder.step_distances": lambda: ladder_builder.step_distances(20, 0.0025, 0.10),
+        "ladder.linear_prices": lambda: ladder_builder.linear_prices(0.199, 0.198, 10, decimals=6),
+        "ladder.build_ladder": lambda: ladder_builder.build_ladder(prices, sizes, budget=900.0, min_size=10, min_value=5.0),
+        "ladder.consolidate_largest": lambda: ladder_builder.consolidate_largest(levels, 300.0, 10, 5.0),
+        "ladder.standard_pipeline": standard_ladder,
+        "parse_open_orders[200]": lambda: utils.parse_open_orders(response),
+    }
+    return {name: _measure(fn, min_seconds) for name, fn in benchmarks.items()}
+
+
+class SimulatorProcess:
+    """
+    The mocked exchange in its own process, so its CPU time is not the bot's.
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, env=None):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}/"
+        env = dict(os.environ if env is None else env)
+        env.update({"SIM_LATENCY_MS": str(latency_ms), "SIM_LATENCY_JITTER_MS": str(jitter_ms)})
+        env.setdefault("SIM_SPEED", "10")
+        self._proc = subprocess.Popen(
+            [sys.executable, "-m", "src.exchange_simulator", "--port", str(self.port)],
+            cwd=REPO_ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 15
+        while True:
+            try:
+                urllib.request.urlopen(self.url + "sim/state", timeout=1).read()
+                return
+            except OSError:
+                if self._proc.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError("exchange simulator did not start")
+                time.sleep(0.1)
+
+    def stop(self):
+        if self._proc.poll() is None:
+            self._proc.terminate()
+            self._proc.wait(timeout=10)
+
+
+def _run_worker(spec, env=None):
+    """
+    Run one benchmark in a fresh interpreter (utils binds its settings at import).
+
+    Returns:
+    - dict: The worker's result
+    """
+    output = subprocess.run(
+        [sys.executable, "-m", "src.benchmark", "--worker", json.dumps(spec)],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    for line in reversed(output.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"benchmark worker failed: {output.stderr.strip()[-2000:]}")
+
+
+def run_suite(modes=("standard", "adjustments"), latencies_ms=(0.0, 20.0), jitter_ms=0.0, ticks=20, warmup=1,
+              trace_allocations=False, helper_seconds=0.2, helpers=True):
+    """
+    Run the helper benchmarks and the loop benchmark for every mode x latency.
+
+    Parameters:
+    - modes: Quoting modes to drive
+    - latencies_ms: Injected exchange latencies
+    - jitter_ms: Extra random latency per request
+    - ticks / warmup: Iterations measured / dropped per loop benchmark
+    - trace_allocations: tracemalloc peak per tick in the loop benchmarks
+    - helper_seconds: Minimum timing duration per helper benchmark
+    - helpers: Include the helper benchmarks
+
+    Returns:
+    - dict: Benchmark name -> metrics
+    """
+    env = dict(os.environ)
+    # The .env file must not point the workers at a live exchange or change the bench settings
+    env.pop("LBANK_BASE_URL", None)
+    results = {}
+    if helpers:
+        simulator = SimulatorProcess(env=env)
+        try:
+            spec = {"kind": "helpers", "sim_url": simulator.url, "min_seconds": helper_seconds}
+            for name, metrics in _run_worker(spec, env).items():
+                results[f"helper/{name}"] = metrics
+        finally:
+            simulator.stop()
+    for mode in modes:
+        for latency in latencies_ms:
+            simulator = SimulatorProcess(latency, jitter_ms, env=env)
+            try:
+                spec = {
+                    "kind": "loop",
+                    "sim_url": simulator.url,
+                    "mode": mode,
+                    "ticks": ticks,
+                    "warmup": warmup,
+                    "trace_allocations": trace_allocations,
+                }
+                results[f"loop/{mode}@{latency:g}ms"] = _run_worker(spec, env)
+            finally:
+                simulator.stop()
+    return results
+
+
+def compare(results, baseline, tolerance_pct=10.0):
+    """
+    Compare results with a baseline.
+
+    Parameters:
+    - results / baseline: Benchmark name -> metrics
+    - tolerance_pct: Slowdown allowed before a metric counts as a regression
+
+    Returns:
+    - list: (benchmark, metric, current, baseline, change %, regressed) for every shared metric
+    """
+    rows = []
+    for name, metrics in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric in COMPARED_METRICS:
+            current, previous = metrics.get(metric), reference.get(metric)
+            if current is None or not previous:
+                continue
+            change = (current / previous - 1) * 100
+            rows.append((name, metric, current, previous, change, change > tolerance_pct))
+    return rows
+
+
+def format_results(results):
+    lines = []
+    for name, m in results.items():
+        if name.startswith("loop/"):
+            quote = (
+                f"{m['tick_to_quote_ms_p50']:.1f}/{m['tick_to_quote_ms_p95']:.1f} ms"
+                if m["tick_to_quote_ms_p50"] is not None else "-"
+            )
+            line = (
+                f"[BENCH] {name}: tick {m['tick_ms_p50']:.1f}/{m['tick_ms_p95']:.1f} ms (p50/p95), "
+                f"tick-to-quote {quote}, {m['requests_per_tick']:.1f} req/tick, "
+                f"cpu {m['cpu_ms_per_tick']:.1f} ms/tick, gc0 {m['gc_gen0_per_tick']:.2f}/tick"
+            )
+            if "peak_alloc_kib_per_tick" in m:
+                line += f", peak alloc {m['peak_alloc_kib_per_tick']:.0f} KiB/tick"
+        else:
+            line = (
+                f"[BENCH] {name}: {m['us_per_op']:.2f} us/op, cpu {m['cpu_us_per_op']:.2f} us/op, "
+                f"peak alloc {m['peak_alloc_kib_per_op']:.2f} KiB/op, retained {m['retained_bytes_per_op']:.0f} B/op"
+            )
+        lines.append(line)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # python -m src.benchmark                      run the suite and compare with the stored baseline
+    # python -m src.benchmark --save-baseline      store this run as the new baseline
+    parser = argparse.ArgumentParser(description="Benchmark the trading loop against a mocked exchange")
+    parser.add_argument("--modes", default="standard,adjustments", help=f"Comma-separated, from {', '.join(MODES)}")
+    parser.add_argument("--latency-ms", default="0,20", help="Comma-separated injected exchange latencies")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--trace-allocations", action="store_true", help="tracemalloc peak per tick (slower ticks)")
+    parser.add_argument("--no-helpers", action="store_true", help="Skip the helper benchmarks")
+    parser.add_argument(
+        "--baseline",
+        default=os.getenv("BENCHMARK_BASELINE_FILE") or os.path.join(os.getenv("BOT_DATA_DIR", "data"), "benchmark_baseline.json"),
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance-pct", type=float, default=10.0)
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on a regression")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        spec = json.loads(args.worker)
+        if spec["kind"] == "helpers":
+            result = run_helper_benchmarks(spec["sim_url"], spec["min_seconds"])
+        else:
+            result = run_loop_benchmark(
+                spec["sim_url"], spec["mode"], spec["ticks"], spec["warmup"], spec["trace_allocations"]
+            )
+        print(RESULT_PREFIX + json.dumps(result), flush=True)
+        sys.exit(0)
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+    results = run_suite(
+        modes=modes,
+        latencies_ms=[float(x) for x in args.latency_ms.split(",") if x.strip()],
+        jitter_ms=args.jitter_ms,
+        ticks=args.ticks,
+        warmup=args.warmup,
+        trace_allocations=args.trace_allocations,
+        helpers=not args.no_helpers,
+    )
+    print(format_results(results))
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.tolerance_pct)
+        for name, metric, current, previous, change, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"[BASELINE] {name} {metric}: {current:.2f} vs {previous:.2f} ({change:+.1f}%){flag}")
+        regressions = [row for row in rows if row[5]]
+        print(f"[BASELINE] {len(regressions)} of {len(rows)} metrics slower than the baseline by more than {args.tolerance_pct:g}%")
+    elif not args.save_baseline:
+        print(f"[BASELINE] No baseline at {args.baseline} (store one with --save-baseline)")
+
+    if args.save_baseline:
+        directory = os.path.dirname(args.baseline)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"[BASELINE] Saved to {args.baseline}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
@@ -0,0 +1,348 @@
+import os
+import threading
+from dataclasses import dataclass, fields
+
+from dotenv import dotenv_values
+
+from src.logger import log
+
+# Settings the running loop cannot switch over to: they decide which threads and
+# feeds are started, so a change is reported and applies after a restart
+RESTART_REQUIRED = {
+    "enable_adjustments_mode",
+    "enable_reference_price_mode",
+    "enable_market_stream",
+    "event_driven_loop",
+    "enable_risk_watchdog",
+    "risk_watchdog_interval_seconds",
+}
+
+# Settings read by get_dynamic_sleep_time rather than passed to market_making()
+LOOP_TIMING_FIELDS = {"base_sleep_time", "max_sleep_time", "min_sleep_time"}
+
+
+def _flag(env, name, default):
+    return str(env.get(name, default)).strip().lower() == "true"
+
+
+def _number(env, name, default, cast=float):
+    value = str(env.get(name) or "").strip()
+    try:
+        return cast(value) if value else cast(default)
+    except ValueError:
+        raise ValueError(f"{name}={value!r} is not a valid {cast.__name__}")
+
+
+def _optional_price(env, name):
+    # Empty or 0 disables the price
+    value = _number(env, name, "0")
+    return value if value > 0 else None
+
+
+def parse_ladder_sizes(value, orders_per_side):
+    """
+    Parse LADDER_ORDER_SIZES ("15,15,25,...", USDT per order).
+
+    Parameters:
+    - value: Comma-separated sizes (empty = equal distribution)
+    - orders_per_side: Expected number of sizes
+
+    Returns:
+    - list: Sizes, or None to use the equal distribution
+    """
+    value = str(value or "").strip()
+    if not value:
+        return None
+    try:
+        sizes = [float(x.strip()) for x in value.split(",") if x.strip()]
+    except ValueError:
+        log(f"[WARNING] Invalid ladder order sizes format, using equal distribution")
+        return None
+    if len(sizes) != orders_per_side:
+        log(f"[WARNING] Ladder order sizes count ({len(sizes)}) doesn't match orders per side ({orders_per_side}), using equal distribution")
+        return None
+    return sizes
+
+
+@dataclass(frozen=True)
+class BotConfig:
+    """
+    Typed strategy settings from .env.
+
+    Field names match the market_making() keyword arguments; defaults match the
+    ones main.py used before. Instances are immutable: a reload builds a new
+    BotConfig and swaps it in whole (see ConfigWatcher).
+    """
+
+    # LBank compliance mode: concentrate 500-1000 USDT within ±1% of the market price
+    compliance_mode: bool = True
+    # Safety features
+    max_spread_pct: float = 30.0
+    max_loss_pct: float = 20.0
+    max_exposure_pct: float = 80.0
+    reduce_distance_on_wide_spread: bool = True
+    wide_spread_threshold: float = 20.0
+    # Adaptive pricing
+    enable_adaptive_pricing: bool = True
+    tightening_rate: float = 0.001
+    tightening_trigger: int = 2
+    # Maximum buy price (None = disabled)
+    max_buy_price: float = None
+    # Reference price mode
+    enable_reference_price_mode: bool = False
+    reference_price: float = None
+    order_value_per_side: float = 250.0
+    orders_per_side: int = 10
+    ladder_order_sizes: tuple = None
+    min_random_delay: float = 1.0
+    max_random_delay: float = 3.0
+    # Adjustments mode (adjustments.md): mid-based ±1% ladder, 0.8% spread, capital protections
+    enable_adjustments_mode: bool = False
+    target_depth_per_side: float = 500.0
+    levels_per_side: int = 10
+    best_spread_side_pct: float = 0.4
+    refresh_seconds_min: float = 25.0
+    refresh_seconds_max: float = 45.0
+    refresh_random_seconds: float = 3.0
+    reprice_on_move: bool = True
+    reprice_move_pct: float = 0.3
+    volatility_pause_2pct_60s_minutes: float = 10.0
+    volatility_pause_5pct_5m_minutes: float = 30.0
+    spread_guard_threshold_pct: float = 1.5
+    spread_guard_duration_seconds: float = 120.0
+    spread_guard_rebuild_spread_pct: float = 1.2
+    inventory_guard_max_side_pct: float = 65.0
+    inventory_reduce_scale: float = 0.5
+    anti_snipe_max_fills_in_30s: int = 3
+    anti_snipe_cooldown_seconds: float = 300.0
+    # Ladder publication and diff-based requoting
+    ladder_max_in_flight: int = 8
+    enable_diff_requote: bool = True
+    requote_price_tolerance_pct: float = 0.05
+    requote_size_tolerance_pct: float = 10.0
+    # Streaming market data, event-driven loop and risk watchdog
+    enable_market_stream: bool = True
+    event_driven_loop: bool = True
+    enable_risk_watchdog: bool = True
+    risk_watchdog_interval_seconds: float = 1.0
+    # Loop timing (get_dynamic_sleep_time)
+    base_sleep_time: float = 8.0
+    max_sleep_time: float = 20.0
+    min_sleep_time: float = 1.0
+
+    @classmethod
+    def from_env(cls, env):
+        """
+        Build a config from environment-style string values.
+
+        Parameters:
+        - env: Mapping of variable name -> string (e.g., os.environ)
+
+        Returns:
+        - BotConfig: Parsed settings
+
+        Raises:
+        - ValueError: If a numeric setting cannot be parsed
+        """
+        orders_per_side = _number(env, "ORDERS_PER_SIDE", "10", int)
+        ladder_sizes = parse_ladder_sizes(env.get("LADDER_ORDER_SIZES"), orders_per_side)
+        return cls(
+            compliance_mode=_flag(env, "ENABLE_COMPLIANCE_MODE", "true"),
+            max_spread_pct=_number(env, "MAX_SPREAD_PCT", "30.0"),
+            max_loss_pct=_number(env, "MAX_LOSS_PCT", "20.0"),
+            max_exposure_pct=_number(env, "MAX_EXPOSURE_PCT", "80.0"),
+            reduce_distance_on_wide_spread=_flag(env, "REDUCE_DISTANCE_ON_WIDE_SPREAD", "true"),
+            wide_spread_threshold=_number(env, "WIDE_SPREAD_THRESHOLD", "20.0"),
+            enable_adaptive_pricing=_flag(env, "ENABLE_ADAPTIVE_PRICING", "true"),
+            tightening_rate=_number(env, "TIGHTENING_RATE", "0.001"),
+            tightening_trigger=_number(env, "TIGHTENING_TRIGGER", "2", int),
+            max_buy_price=_optional_price(env, "MAX_BUY_PRICE"),
+            enable_reference_price_mode=_flag(env, "ENABLE_REFERENCE_PRICE_MODE", "false"),
+            reference_price=_optional_price(env, "REFERENCE_PRICE"),
+            order_value_per_side=_number(env, "ORDER_VALUE_PER_SIDE", "250"),
+            orders_per_side=orders_per_side,
+            ladder_order_sizes=tuple(ladder_sizes) if ladder_sizes else None,
+            min_random_delay=_number(env, "MIN_RANDOM_DELAY", "1"),
+            max_random_delay=_number(env, "MAX_RANDOM_DELAY", "3"),
+            enable_adjustments_mode=_flag(env, "ENABLE_ADJUSTMENTS_MODE", "false"),
+            target_depth_per_side=_number(env, "TARGET_DEPTH_PER_SIDE", "500"),
+            levels_per_side=_number(env, "LEVELS_PER_SIDE", "10", int),
+            best_spread_side_pct=_number(env, "BEST_SPREAD_SIDE_PCT", "0.4"),
+            refresh_seconds_min=_number(env, "REFRESH_SECONDS_MIN", "25"),
+            refresh_seconds_max=_number(env, "REFRESH_SECONDS_MAX", "45"),
+            refresh_random_seconds=_number(env, "REFRESH_RANDOM_SECONDS", "3"),
+            reprice_on_move=_flag(env, "REPRICE_ON_MOVE", "true"),
+            reprice_move_pct=_number(env, "REPRICE_MOVE_PCT", "0.3"),
+            volatility_pause_2pct_60s_minutes=_number(env, "VOLATILITY_PAUSE_2PCT_60S_MINUTES", "10"),
+            volatility_pause_5pct_5m_minutes=_number(env, "VOLATILITY_PAUSE_5PCT_5M_MINUTES", "30"),
+            spread_guard_threshold_pct=_number(env, "SPREAD_GUARD_THRESHOLD_PCT", "1.5"),
+            spread_guard_duration_seconds=_number(env, "SPREAD_GUARD_DURATION_SECONDS", "120"),
+            spread_guard_rebuild_spread_pct=_number(env, "SPREAD_GUARD_REBUILD_SPREAD_PCT", "1.2"),
+            inventory_guard_max_side_pct=_number(env, "INVENTORY_GUARD_MAX_SIDE_PCT", "65"),
+            inventory_reduce_scale=_number(env, "INVENTORY_REDUCE_SCALE", "0.5"),
+            anti_snipe_max_fills_in_30s=_number(env, "ANTI_SNIPE_MAX_FILLS_IN_30S", "3", int),
+            anti_snipe_cooldown_seconds=_number(env, "ANTI_SNIPE_COOLDOWN_SECONDS", "300"),
+            ladder_max_in_flight=_number(env, "LADDER_MAX_IN_FLIGHT", "8", int),
+            enable_diff_requote=_flag(env, "ENABLE_DIFF_REQUOTE", "true"),
+            requote_price_tolerance_pct=_number(env, "REQUOTE_PRICE_TOLERANCE_PCT", "0.05"),
+            requote_size_tolerance_pct=_number(env, "REQUOTE_SIZE_TOLERANCE_PCT", "10.0"),
+            enable_market_stream=_flag(env, "ENABLE_MARKET_STREAM", "true"),
+            event_driven_loop=_flag(env, "EVENT_DRIVEN_LOOP", "true"),
+            enable_risk_watchdog=_flag(env, "RISK_WATCHDOG_ENABLED", "true"),
+            risk_watchdog_interval_seconds=_number(env, "RISK_WATCHDOG_INTERVAL_SECONDS", "1"),
+            base_sleep_time=_number(env, "BASE_SLEEP_TIME", "8"),
+            max_sleep_time=_number(env, "MAX_SLEEP_TIME", "20"),
+            min_sleep_time=_number(env, "MIN_SLEEP_TIME", "1"),
+        )
+
+    def strategy_kwargs(self):
+        """
+        The settings as market_making() keyword arguments.
+
+        Returns:
+        - dict: Field name -> value (loop timing fields excluded)
+        """
+        kwargs = {f.name: getattr(self, f.name) for f in fields(self) if f.name not in LOOP_TIMING_FIELDS}
+        if kwargs["ladder_order_sizes"] is not None:
+            kwargs["ladder_order_sizes"] = list(kwargs["ladder_order_sizes"])
+        return kwargs
+
+    def changes(self, other):
+        """
+        Settings that differ from another config.
+
+        Returns:
+        - dict: Field name -> (value here, value in other)
+        """
+        return {
+            f.name: (getattr(self, f.name), getattr(other, f.name))
+            for f in fields(self)
+            if getattr(self, f.name) != getattr(other, f.name)
+        }
+
+
+def load_config(path):
+    """
+    Read a BotConfig from the process environment and the .env file at path.
+
+    Values in the file win over the process environment, so edits to .env (for
+    example through the api-server /api/config endpoint) take effect even when
+    docker also passed the file in as env_file at container start.
+
+    Parameters:
+    - path: .env file (a missing file means environment only)
+
+    Returns:
+    - BotConfig: Parsed settings
+    """
+    env = dict(os.environ)
+    if path and os.path.exists(path):
+        env.update({k: v for k, v in dotenv_values(path).items() if v is not None})
+    return BotConfig.from_env(env)
+
+
+class ConfigWatcher:
+    """
+    Holds the current BotConfig and hot-swaps it when the .env file changes.
+
+    A daemon thread polls the file's modification time every interval_seconds
+    (one stat() call, no file reads unless it changed). A changed file is parsed
+    into a new BotConfig and published by replacing a single reference, so a
+    reader always sees either the old or the new config, never a mix. A file that
+    fails to parse is reported and the previous config is kept.
+
+    The strategy loop compares `version` at the start of every tick and rebinds
+    its settings when it moved; on_change can wake the loop early.
+    """
+
+    def __init__(self, path, interval_seconds=2.0, on_change=None):
+        """
+        Parameters:
+        - path: .env file to watch
+        - interval_seconds: Time between modification checks
+        - on_change: Callable(changes dict) run on the watcher thread after a swap (optional)
+        """
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.on_change = on_change
+        self._signature = self._file_signature()
+        self._config = load_config(path)
+        self.version = 1
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def config(self):
+        """
+        The current BotConfig (immutable; read once and use that object for a whole tick).
+        """
+        return self._config
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def check(self):
+        """
+        Reload the config if the file changed since the last check.
+
+        Returns:
+        - dict: Changed settings {name: (old, new)}, or None if nothing was swapped
+        """
+        with self._lock:
+            signature = self._file_signature()
+            if signature == self._signature:
+                return None
+            self._signature = signature
+            try:
+                new_config = load_config(self.path)
+            except Exception as e:
+                log(f"[CONFIG] {self.path} changed but could not be loaded ({e}), keeping the current settings")
+                return None
+            changes = self._config.changes(new_config)
+            if not changes:
+                return None
+            self._config = new_config
+            self.version += 1
+            self.reloads += 1
+
+        for name, (old, new) in changes.items():
+            note = " (takes effect after a restart)" if name in RESTART_REQUIRED else ""
+            log(f"[CONFIG] {name}: {old} -> {new}{note}")
+        if self.on_change is not None:
+            try:
+                self.on_change(changes)
+            except Exception as e:
+                log(f"[CONFIG] Change listener failed: {e}")
+        return changes
+
+    def start(self):
+        """
+        Start watching the file on a daemon thread (no-op if already running).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop watching the file.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds + 1)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                log(f"[CONFIG] Watcher error: {e}")
@@ -0,0 +1,134 @@
+import threading
+import time
+
+from src.logger import log
+
+# Wake-up reasons returned by EventScheduler.wait()
+WAKE_DEADLINE = "deadline"
+WAKE_PRICE_MOVE = "price_move"
+WAKE_FILL = "fill"
+WAKE_RISK = "risk"
+WAKE_CONFIG = "config"
+
+
+class EventScheduler:
+    """
+    Lets the strategy loop sleep until the refresh deadline *or* a market event.
+
+    Instead of time.sleep(refresh), the loop calls wait(refresh, reference_mid)
+    and is woken by whichever comes first:
+    - the deadline (the old sleep length)
+    - a mid-price move of more than reprice_move_pct from reference_mid
+      (the mid the ladder was built around), seen on the market stream
+    - a fill pushed by the market stream
+    - a risk trigger raised with notify(WAKE_RISK), e.g. by the risk watchdog
+    - a settings change raised with notify(WAKE_CONFIG) by the config watcher
+
+    Events raised while the loop is busy stay pending until reset() is called at
+    the start of the next tick, so a fill that lands mid-iteration still cuts the
+    following wait short.
+    """
+
+    def __init__(self, stream=None, reprice_move_pct=0.3, enabled=True):
+        self.stream = stream
+        self.reprice_move_pct = reprice_move_pct
+        self.enabled = enabled
+        self.reference_mid = None
+        self.wakeups = {}  # reason -> count
+        self._cond = threading.Condition()
+        self._pending = None  # (reason, info) of the first event since reset()
+        if stream is not None:
+            stream.add_listener(self.on_stream_event)
+
+    def reset(self):
+        """
+        Drop pending events (call at the start of a tick, once state has been read).
+        """
+        with self._cond:
+            self._pending = None
+
+    def notify(self, reason, **info):
+        """
+        Wake the loop (thread-safe). The first reason since the last reset wins.
+
+        Parameters:
+        - reason: WAKE_PRICE_MOVE, WAKE_FILL, WAKE_RISK, ...
+        - info: Details to report with the wake-up
+        """
+        with self._cond:
+            if self._pending is None or reason == WAKE_RISK:
+                self._pending = (reason, info)
+            self._cond.notify_all()
+
+    def _price_moved(self, mid):
+        reference = self.reference_mid
+        if not reference or not mid or self.reprice_move_pct is None:
+            return None
+        move_pct = abs(mid - reference) / reference * 100
+        return move_pct if move_pct > self.reprice_move_pct else None
+
+    def on_stream_event(self, event):
+        """
+        MarketStream listener: turn fills and large mid moves into wake-ups.
+        """
+        if event["type"] == "fill":
+            self.notify(WAKE_FILL, side=event.get("side"), qty=event.get("qty"), price=event.get("price"))
+        elif event["type"] == "price":
+            move_pct = self._price_moved(event.get("mid"))
+            if move_pct is not None:
+                self.notify(WAKE_PRICE_MOVE, mid=event.get("mid"), move_pct=move_pct)
+
+    def wait(self, timeout, reference_mid=None):
+        """
+        Block until the deadline or the first event, whichever comes first.
+
+        Parameters:
+        - timeout: Seconds until the refresh deadline
+        - reference_mid: Mid price the current ladder was built around (for price-move wake-ups)
+
+        Returns:
+        - tuple: (reason, info dict)
+        """
+        if not self.enabled:
+            time.sleep(timeout)
+            return WAKE_DEADLINE, {}
+
+        self.reference_mid = reference_mid
+        # The stream may already be past the threshold
+        if self.stream is not None:
+            move_pct = self._price_moved(self.stream.mid_price())
+            if move_pct is not None:
+                self.notify(WAKE_PRICE_MOVE, mid=self.stream.mid_price(), move_pct=move_pct)
+
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._cond:
+            while self._pending is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            pending = self._pending
+            self._pending = None
+        self.reference_mid = None
+
+        reason, info = pending if pending is not None else (WAKE_DEADLINE, {})
+        self.wakeups[reason] = self.wakeups.get(reason, 0) + 1
+        return reason, info
+
+    def sleep(self, timeout, reference_mid=None):
+        """
+        wait() for the strategy loop, printing early wake-ups.
+
+        Parameters:
+        - timeout: Seconds until the refresh deadline
+        - reference_mid: Mid price the current ladder was built around
+
+        Returns:
+        - str: Wake-up reason
+        """
+        started = time.monotonic()
+        reason, info = self.wait(timeout, reference_mid)
+        if reason != WAKE_DEADLINE:
+            details = ", ".join(f"{k}={v:.4f}" if isinstance(v, float) else f"{k}={v}" for k, v in info.items())
+            log(f"[WAKE] {reason} after {time.monotonic() - started:.1f}s of {timeout:.1f}s" + (f" ({details})" if details else ""))
+        return reason
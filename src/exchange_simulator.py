@@ -0,0 +1,1124 @@
+import argparse
+import asyncio
+import bisect
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from aiohttp import WSCloseCode, WSMsgType, web
+
+# LBank order states as orders_info_no_deal.do reports them
+STATUS_CANCELLED = -1
+STATUS_OPEN = 0
+STATUS_PARTIAL = 1
+STATUS_FILLED = 2
+STATUS_PARTIAL_CANCELLED = 3
+
+# Error codes the simulator answers with (same numbers LBank uses for these cases)
+ERR_INVALID_PARAMETER = 10003
+ERR_INVALID_PAIR = 10008
+ERR_BELOW_MINIMUM = 10009
+ERR_NOT_POSITIVE = 10010
+ERR_INVALID_ORDER_TYPE = 10015
+ERR_INSUFFICIENT_BALANCE = 10016
+ERR_ORDER_FILLED = 10025
+ERR_ORDER_CANCELLED = 10026
+ERR_CREATE_FAILED = 10033
+
+
+class SimulatorError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def parse_waypoints(text):
+    """
+    Parse a scripted price path ("seconds:price,seconds:price,...").
+
+    Parameters:
+    - text: Comma-separated waypoints, seconds counted from the start of the session
+
+    Returns:
+    - list: [(seconds, price)] sorted by time (raises ValueError on a malformed entry)
+    """
+    waypoints = []
+    for item in str(text or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        seconds, _, price = item.partition(":")
+        waypoints.append((float(seconds), float(price)))
+    return sorted(waypoints)
+
+
+def parse_balances(text):
+    """
+    Parse starting balances ("usdt:1000,acces:10000").
+
+    Returns:
+    - dict: asset -> free amount
+    """
+    balances = {}
+    for item in str(text or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        asset, _, amount = item.partition(":")
+        balances[asset.strip().lower()] = float(amount)
+    return balances
+
+
+class SimClock:
+    """
+    Simulated exchange time.
+
+    With speed > 0 the clock runs `speed` times faster than the wall clock from
+    `start`; with speed == 0 it only moves when advance() is called, which makes
+    a session fully reproducible (same seed + same requests = same fills).
+    """
+
+    def __init__(self, start=None, speed=1.0):
+        """
+        Parameters:
+        - start: Unix time the session starts at (default: now)
+        - speed: Simulated seconds per wall-clock second (0 = manual)
+        """
+        self.start = float(start if start is not None else time.time())
+        self.speed = float(speed)
+        self._wall_start = time.monotonic()
+        self._manual = 0.0
+
+    def now(self):
+        if self.speed > 0:
+            return self.start + (time.monotonic() - self._wall_start) * self.speed + self._manual
+        return self.start + self._manual
+
+    def advance(self, seconds):
+        self._manual += max(float(seconds), 0.0)
+
+
+class PricePath:
+    """
+    Scripted mid price: waypoints joined linearly, times a seeded random walk.
+
+    The walk has `volatility` standard deviation of log return per minute and
+    is drawn one step at a time from its own Random(seed), so a given seed
+    always produces the same path. Before the first waypoint the price stays at
+    the first waypoint; after the last one it stays at the last.
+    """
+
+    def __init__(self, waypoints, volatility=0.0, seed=1, step_seconds=1.0, origin=0.0):
+        """
+        Parameters:
+        - waypoints: [(seconds from session start, price)], at least one
+        - volatility: Std of log returns per minute added on top of the script
+        - seed: Random seed of the walk
+        - step_seconds: Resolution of the walk
+        - origin: Earliest time (seconds from session start) the path is asked for
+        """
+        if not waypoints:
+            raise ValueError("price path needs at least one waypoint")
+        self.waypoints = list(waypoints)
+        self._times = [t for t, _ in self.waypoints]
+        self.volatility = volatility
+        self.step_seconds = step_seconds
+        self._step_sigma = volatility * math.sqrt(step_seconds / 60.0)
+        self._rng = random.Random(seed)
+        self._origin_step = int(math.floor(origin / step_seconds))
+        self._walk = [0.0]  # cumulative log noise from the origin step
+
+    def _scripted(self, t):
+        i = bisect.bisect_right(self._times, t)
+        if i == 0:
+            return self.waypoints[0][1]
+        if i == len(self.waypoints):
+            return self.waypoints[-1][1]
+        (t0, p0), (t1, p1) = self.waypoints[i - 1], self.waypoints[i]
+        return p0 + (p1 - p0) * (t - t0) / (t1 - t0)
+
+    def mid(self, t):
+        """
+        Mid price at `t` seconds from session start.
+        """
+        k = max(int(math.floor(t / self.step_seconds)) - self._origin_step, 0)
+        if self._step_sigma > 0:
+            while len(self._walk) <= k:
+                self._walk.append(self._walk[-1] + self._rng.gauss(0.0, self._step_sigma))
+            return self._scripted(t) * math.exp(self._walk[k])
+        return self._scripted(t)
+
+
+@dataclass(eq=False)
+class SimOrder:
+    order_id: str
+    side: str  # "buy" / "sell"
+    order_type: str  # as sent: buy, sell, buy_maker, sell_maker
+    price: float
+    quantity: float
+    created: float  # simulated unix time
+    seq: int  # arrival order, breaks ties at one price
+    filled: float = 0.0
+    status: int = STATUS_OPEN
+
+    @property
+    def remaining(self):
+        return max(self.quantity - self.filled, 0.0)
+
+    def to_lbank(self, symbol):
+        return {
+            "symbol": symbol,
+            "orderId": self.order_id,
+            "clientOrderId": "",
+            "price": f"{self.price:.12g}",
+            "origQty": f"{self.quantity:.12g}",
+            "executedQty": f"{self.filled:.12g}",
+            "cummulativeQuoteQty": f"{self.filled * self.price:.12g}",
+            "status": self.status,
+            "type": self.order_type,
+            "time": int(self.created * 1000),
+            "updateTime": int(self.created * 1000),
+        }
+
+
+class OrderBook:
+    """
+    Resting limit orders of one pair with price-time priority.
+
+    Each side keeps its price levels sorted and a FIFO queue per level, so a
+    taker is matched against the best price first and, within a price, against
+    the order that arrived first.
+    """
+
+    def __init__(self):
+        self._queues = {"buy": {}, "sell": {}}
+        self._prices = {"buy": [], "sell": []}  # ascending on both sides
+
+    def add(self, order):
+        queues = self._queues[order.side]
+        if order.price not in queues:
+            queues[order.price] = deque()
+            bisect.insort(self._prices[order.side], order.price)
+        queues[order.price].append(order)
+
+    def remove(self, order):
+        queues = self._queues[order.side]
+        queue = queues.get(order.price)
+        if queue is None:
+            return
+        try:
+            queue.remove(order)
+        except ValueError:
+            return
+        if not queue:
+            self._drop_level(order.side, order.price)
+
+    def _drop_level(self, side, price):
+        del self._queues[side][price]
+        prices = self._prices[side]
+        prices.pop(bisect.bisect_left(prices, price))
+
+    def best(self, side):
+        """
+        Best resting price on a side (highest bid / lowest ask), or None.
+        """
+        prices = self._prices[side]
+        if not prices:
+            return None
+        return prices[-1] if side == "buy" else prices[0]
+
+    def match(self, taker_side, quantity, limit):
+        """
+        Fill a taker against the opposite side up to a limit price.
+
+        Parameters:
+        - taker_side: "buy" (takes asks) or "sell" (takes bids)
+        - quantity: Amount to fill (math.inf sweeps everything through the limit)
+        - limit: Worst price the taker accepts
+
+        Returns:
+        - list: [(resting order, quantity, price)] in execution order
+        """
+        side = "sell" if taker_side == "buy" else "buy"
+        prices = self._prices[side]
+        queues = self._queues[side]
+        fills = []
+        while quantity > 1e-12 and prices:
+            price = prices[0] if side == "sell" else prices[-1]
+            if (side == "sell" and price > limit) or (side == "buy" and price < limit):
+                break
+            queue = queues[price]
+            while quantity > 1e-12 and queue:
+                order = queue[0]
+                qty = min(order.remaining, quantity)
+                fills.append((order, qty, price))
+                order.filled += qty
+                quantity -= qty
+                if order.remaining <= 1e-12:
+                    queue.popleft()
+            if not queue:
+                self._drop_level(side, price)
+        return fills
+
+    def depth(self, side):
+        return sum(len(q) for q in self._queues[side].values())
+
+    def levels(self, side, count):
+        """
+        The best `count` price levels of a side as [(price, remaining quantity)], best first.
+        """
+        prices = self._prices[side]
+        queues = self._queues[side]
+        best = reversed(prices) if side == "buy" else prices
+        return [(price, sum(o.remaining for o in queues[price])) for price in itertools.islice(best, count)]
+
+    def value_between(self, side, low, high):
+        """
+        Quote value (price x remaining) of the resting orders priced within [low, high].
+        """
+        prices = self._prices[side]
+        queues = self._queues[side]
+        total = 0.0
+        for price in prices[bisect.bisect_left(prices, low):bisect.bisect_right(prices, high)]:
+            total += price * sum(order.remaining for order in queues[price])
+        return total
+
+
+class SimulatedExchange:
+    """
+    Deterministic stand-in for LBank's spot market on one pair.
+
+    The outside market is a scripted price path with a background quote of
+    `spread_pct` around it. Our orders rest in an OrderBook and are filled with
+    price-time priority by:
+    - the market trading through them (a bid at or above the background ask,
+      an ask at or below the background bid, fills completely), and
+    - seeded taker flow: Poisson arrivals of `taker_rate` per second with
+      exponentially distributed sizes (mean `taker_size`) that sweep our side
+      of the book up to the background quote.
+    Time is stepped in `step_seconds` increments up to the clock before every
+    request, so the same seed, clock and requests always give the same fills.
+    Balances are locked on placement and settled per fill, with maker/taker fees.
+    """
+
+    def __init__(
+        self,
+        symbol,
+        balances,
+        path,
+        clock,
+        spread_pct=0.2,
+        taker_rate=0.5,
+        taker_size=100.0,
+        maker_fee=0.0,
+        taker_fee=0.0,
+        price_decimals=6,
+        quantity_decimals=2,
+        min_quantity=0.0,
+        seed=1,
+        step_seconds=1.0,
+        history_minutes=400,
+        observer=None,
+    ):
+        """
+        Parameters:
+        - symbol: Pair traded (e.g., "acces_usdt")
+        - balances: Starting free balances {asset: amount}
+        - path: PricePath of the outside market
+        - clock: SimClock driving the session
+        - spread_pct: Background bid/ask spread in percent of mid
+        - taker_rate: Taker orders per simulated second
+        - taker_size: Mean taker size in base asset
+        - maker_fee / taker_fee: Fee rates charged on the received asset
+        - price_decimals / quantity_decimals / min_quantity: Pair precision (v1/accuracy.do)
+        - seed: Random seed of the taker flow
+        - step_seconds: Matching step
+        - history_minutes: One-minute candles generated before the session starts
+        - observer: Callable(ts, exchange) run after every matching step (e.g. backtest metrics)
+        """
+        self.symbol = symbol.lower()
+        self.base_asset, _, self.quote_asset = self.symbol.partition("_")
+        self.path = path
+        self.clock = clock
+        self.half_spread = spread_pct / 200.0
+        self.taker_rate = taker_rate
+        self.taker_size = taker_size
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.price_decimals = price_decimals
+        self.quantity_decimals = quantity_decimals
+        self.min_quantity = min_quantity
+        self.step_seconds = step_seconds
+        self.observer = observer
+        self.book = OrderBook()
+        self.orders = {}  # order_id -> SimOrder (open and finished)
+        self.balances = {asset.lower(): [float(free), 0.0] for asset, free in balances.items()}
+        for asset in (self.base_asset, self.quote_asset):
+            self.balances.setdefault(asset, [0.0, 0.0])
+        self._flow_rng = random.Random(seed + 1)
+        self._ids = itertools.count(1)
+        self._seq = itertools.count(1)
+        self._lock = threading.RLock()
+        self.candles = []  # [minute open ts, open, high, low, close, volume]
+        self.last_price = None
+        self.fills = []  # our executions: {"ts", "order_id", "side", "qty", "price", "fee", "liquidity"}
+        self.stats = {"created": 0, "rejected": 0, "cancelled": 0, "fills": 0, "volume": 0.0, "requests": 0}
+        self._now = clock.start - history_minutes * 60
+        # History: the path alone (no flow, no orders) so volatility has candles from the first tick
+        while self._now < clock.start:
+            self._record(self._now, self.path.mid(self._now - clock.start), 0.0)
+            self._now += 60.0
+        self._now = clock.start
+
+    # --- time ---
+
+    def advance(self):
+        """
+        Step the market up to the clock (called before every request).
+        """
+        with self._lock:
+            target = self.clock.now()
+            while self._now + self.step_seconds <= target:
+                self._now += self.step_seconds
+                self._step(self._now)
+
+    def quote(self, ts=None):
+        """
+        Background bid and ask at a simulated time (default: now).
+        """
+        mid = self.path.mid((self._now if ts is None else ts) - self.clock.start)
+        return mid * (1 - self.half_spread), mid * (1 + self.half_spread)
+
+    def _step(self, ts):
+        bid, ask = self.quote(ts)
+        traded = 0.0
+        # The market trades through our stale quotes first
+        traded += self._settle_all(self.book.match("buy", math.inf, bid))
+        traded += self._settle_all(self.book.match("sell", math.inf, ask))
+        # Then the taker flow of this step
+        arrivals = self._poisson(self.taker_rate * self.step_seconds)
+        for _ in range(arrivals):
+            side = "buy" if self._flow_rng.random() < 0.5 else "sell"
+            size = self._flow_rng.expovariate(1.0 / self.taker_size) if self.taker_size > 0 else 0.0
+            limit = ask if side == "buy" else bid
+            traded += self._settle_all(self.book.match(side, size, limit))
+        self._record(ts, (bid + ask) / 2, traded)
+        if self.observer is not None:
+            self.observer(ts, self)
+
+    def _poisson(self, lam):
+        # Knuth's method; lam is small (arrivals per step)
+        if lam <= 0:
+            return 0
+        threshold = math.exp(-lam)
+        k, p = 0, 1.0
+        while True:
+            p *= self._flow_rng.random()
+            if p <= threshold:
+                return k
+            k += 1
+
+    def _record(self, ts, price, volume):
+        minute = int(ts // 60) * 60
+        price = self.last_price if volume > 0 and self.last_price is not None else price
+        if self.candles and self.candles[-1][0] == minute:
+            candle = self.candles[-1]
+            candle[2] = max(candle[2], price)
+            candle[3] = min(candle[3], price)
+            candle[4] = price
+            candle[5] += volume
+        else:
+            self.candles.append([minute, price, price, price, price, volume])
+
+    # --- settlement ---
+
+    def _settle_all(self, fills):
+        volume = 0.0
+        for order, qty, price in fills:
+            self._settle(order, qty, price, self.maker_fee)
+            volume += qty
+        return volume
+
+    def _settle(self, order, qty, price, fee, liquidity="maker"):
+        base, quote = self.balances[self.base_asset], self.balances[self.quote_asset]
+        if order.side == "buy":
+            # Funds were locked at the order's own limit; refund any price improvement
+            quote[1] -= order.price * qty
+            quote[0] += (order.price - price) * qty
+            base[0] += qty * (1 - fee)
+        else:
+            base[1] -= qty
+            quote[0] += qty * price * (1 - fee)
+        self.fills.append({
+            "ts": self._now,
+            "order_id": order.order_id,
+            "side": order.side,
+            "qty": qty,
+            "price": price,
+            "fee": qty * price * fee,  # in quote terms
+            "liquidity": liquidity,
+        })
+        # Locked amounts are sums of float products; snap the rounding residue of an emptied lock to 0
+        for balance in (base, quote):
+            if abs(balance[1]) < 1e-9:
+                balance[1] = 0.0
+        order.status = STATUS_FILLED if order.remaining <= 1e-12 else STATUS_PARTIAL
+        self.last_price = price
+        self.stats["fills"] += 1
+        self.stats["volume"] += qty
+
+    # --- account API ---
+
+    def _on_grid(self, value, decimals):
+        return decimals is None or abs(round(value, decimals) - value) < 1e-9 * max(1.0, abs(value))
+
+    def create_order(self, symbol, order_type, price, amount):
+        """
+        Place a limit order for our account.
+
+        buy_maker / sell_maker are post-only (rejected if they would take);
+        buy / sell take the background quote and our own crossing orders first
+        and rest the remainder.
+
+        Returns:
+        - str: Order id (raises SimulatorError)
+        """
+        with self._lock:
+            if str(symbol).lower() != self.symbol:
+                raise SimulatorError(ERR_INVALID_PAIR, f"invalid trading pair {symbol}")
+            order_type = str(order_type).lower()
+            if order_type not in ("buy", "sell", "buy_maker", "sell_maker"):
+                raise SimulatorError(ERR_INVALID_ORDER_TYPE, f"invalid order type {order_type}")
+            try:
+                price, amount = float(price), float(amount)
+            except (TypeError, ValueError):
+                raise SimulatorError(ERR_INVALID_PARAMETER, "price and amount must be numbers")
+            if price <= 0 or amount <= 0:
+                raise SimulatorError(ERR_NOT_POSITIVE, "price and amount must be more than 0")
+            if not self._on_grid(price, self.price_decimals) or not self._on_grid(amount, self.quantity_decimals):
+                raise SimulatorError(ERR_INVALID_PARAMETER, "price or amount has too many decimals")
+            if amount < self.min_quantity:
+                raise SimulatorError(ERR_BELOW_MINIMUM, f"amount below minimum {self.min_quantity}")
+            side = "buy" if order_type.startswith("buy") else "sell"
+            bid, ask = self.quote()
+            own_best = self.book.best("sell" if side == "buy" else "buy")
+            crosses = (side == "buy" and (price >= ask or (own_best is not None and price >= own_best))) or (
+                side == "sell" and (price <= bid or (own_best is not None and price <= own_best))
+            )
+            if crosses and order_type.endswith("_maker"):
+                self.stats["rejected"] += 1
+                raise SimulatorError(ERR_CREATE_FAILED, "maker order would take liquidity")
+            locked_asset, need = (self.quote_asset, price * amount) if side == "buy" else (self.base_asset, amount)
+            balance = self.balances[locked_asset]
+            if balance[0] + 1e-12 < need:
+                self.stats["rejected"] += 1
+                raise SimulatorError(ERR_INSUFFICIENT_BALANCE, f"insufficient {locked_asset} balance")
+            balance[0] -= need
+            balance[1] += need
+            order = SimOrder(
+                order_id=f"sim-{next(self._ids)}",
+                side=side,
+                order_type=order_type,
+                price=price,
+                quantity=amount,
+                created=self._now,
+                seq=next(self._seq),
+            )
+            self.orders[order.order_id] = order
+            self.stats["created"] += 1
+            if crosses:
+                # Our own resting orders first (price-time), then the outside market at its quote
+                for resting, qty, fill_price in self.book.match(side, order.remaining, price):
+                    self._settle(resting, qty, fill_price, self.maker_fee)
+                    order.filled += qty
+                    self._settle(order, qty, fill_price, self.taker_fee, "taker")
+                outside = ask if side == "buy" else bid
+                if order.remaining > 1e-12 and ((side == "buy" and price >= outside) or (side == "sell" and price <= outside)):
+                    qty = order.remaining
+                    order.filled += qty
+                    self._settle(order, qty, outside, self.taker_fee, "taker")
+            if order.remaining > 1e-12:
+                self.book.add(order)
+            return order.order_id
+
+    def cancel_order(self, order_id):
+        """
+        Cancel one order and release its locked funds (raises SimulatorError).
+        """
+        with self._lock:
+            order = self.orders.get(str(order_id))
+            if order is None:
+                raise SimulatorError(ERR_INVALID_PARAMETER, f"order {order_id} does not exist")
+            if order.status == STATUS_FILLED:
+                raise SimulatorError(ERR_ORDER_FILLED, f"order {order_id} has been filled")
+            if order.status in (STATUS_CANCELLED, STATUS_PARTIAL_CANCELLED):
+                raise SimulatorError(ERR_ORDER_CANCELLED, f"order {order_id} has been cancelled")
+            self.book.remove(order)
+            if order.side == "buy":
+                asset, amount = self.quote_asset, order.remaining * order.price
+            else:
+                asset, amount = self.base_asset, order.remaining
+            balance = self.balances[asset]
+            balance[1] -= amount
+            balance[0] += amount
+            if abs(balance[1]) < 1e-9:
+                balance[1] = 0.0
+            order.status = STATUS_PARTIAL_CANCELLED if order.filled > 1e-12 else STATUS_CANCELLED
+            self.stats["cancelled"] += 1
+
+    def cancel_all(self, symbol):
+        """
+        Cancel every open order of a pair.
+
+        Returns:
+        - list: Cancelled order ids
+        """
+        with self._lock:
+            if str(symbol).lower() != self.symbol:
+                raise SimulatorError(ERR_INVALID_PAIR, f"invalid trading pair {symbol}")
+            ids = [o.order_id for o in self.open_orders()]
+            for order_id in ids:
+                self.cancel_order(order_id)
+            return ids
+
+    def open_orders(self):
+        with self._lock:
+            return sorted(
+                (o for o in self.orders.values() if o.status in (STATUS_OPEN, STATUS_PARTIAL)),
+                key=lambda o: o.seq,
+            )
+
+    def book_ticker(self):
+        """
+        Best bid/ask: the background quote or our own orders if they are better.
+        """
+        with self._lock:
+            bid, ask = self.quote()
+            own_bid, own_ask = self.book.best("buy"), self.book.best("sell")
+            if own_bid is not None:
+                bid = max(bid, own_bid)
+            if own_ask is not None:
+                ask = min(ask, own_ask)
+            return bid, ask
+
+    def depth(self, levels=10):
+        """
+        Order book snapshot: our resting orders plus the background quote (shown with taker_size).
+
+        Returns:
+        - tuple: (bids, asks) as [(price, quantity)] lists, best price first
+        """
+        with self._lock:
+            bid, ask = self.quote()
+            book = []
+            for side, outside in (("buy", bid), ("sell", ask)):
+                merged = dict(self.book.levels(side, levels))
+                merged[outside] = merged.get(outside, 0.0) + self.taker_size
+                book.append(sorted(merged.items(), reverse=side == "buy")[:levels])
+            return book[0], book[1]
+
+    def klines(self, size, since=None):
+        """
+        The newest `size` one-minute candles opened at or after `since`.
+
+        The bot asks from wall-clock time; when the simulated clock runs at a
+        different speed nothing may match, and the newest candles are returned.
+        """
+        with self._lock:
+            size = max(int(size), 1)
+            candles = self.candles
+            if since is not None:
+                start = bisect.bisect_left(candles, [int(since)])
+                if start < len(candles):
+                    candles = candles[start:]
+            return [list(c) for c in candles[-size:]]
+
+    def state(self):
+        """
+        Snapshot for tests and benchmarks.
+        """
+        with self._lock:
+            bid, ask = self.quote()
+            return {
+                "time": self._now,
+                "mid": (bid + ask) / 2,
+                "last_price": self.last_price,
+                "balances": {a: {"free": b[0], "locked": b[1]} for a, b in self.balances.items()},
+                "open_orders": {"buy": self.book.depth("buy"), "sell": self.book.depth("sell")},
+                "stats": dict(self.stats),
+            }
+
+
+def _ok(data=None, **extra):
+    body = {"result": "true", "data": data if data is not None else {}, "error_code": 0, "ts": int(time.time() * 1000)}
+    body.update(extra)
+    return web.json_response(body)
+
+
+def _error(code, message):
+    return web.json_response({"result": "false", "error_code": code, "msg": message, "ts": int(time.time() * 1000)})
+
+
+# Counters of the WebSocket feed (connections, pings sent, pongs received)
+STREAM_STATS = web.AppKey("stream_stats", dict)
+
+
+def build_app(exchange, latency_ms=0.0, jitter_ms=0.0, seed=1, push_seconds=0.5, ping_seconds=30.0):
+    """
+    aiohttp application serving the REST endpoints the bot uses and a
+    stand-in for LBank's V2 WebSocket feed (/ws/V2/).
+
+    Signatures are not checked; any key/secret is accepted. Every exchange
+    endpoint answers after latency_ms plus a seeded uniform 0..jitter_ms delay,
+    to stand in for the round trip to LBank (the /sim endpoints answer at once).
+
+    The feed accepts depth, trade and orderUpdate subscriptions for the pair
+    and, every push_seconds, steps the market and pushes the book, our new
+    executions and the orders whose status or filled amount changed. Like
+    LBank it pings every ping_seconds and expects a pong with the same id.
+
+    Parameters:
+    - exchange: SimulatedExchange
+    - latency_ms: Fixed delay added to every response
+    - jitter_ms: Extra random delay (uniform, seeded)
+    - seed: Seed of the jitter
+    - push_seconds: Interval between feed pushes (wall-clock)
+    - ping_seconds: Interval between feed pings (wall-clock)
+
+    Returns:
+    - web.Application
+    """
+
+    async def params(request):
+        values = dict(request.query)
+        if request.method == "POST":
+            values.update(await request.post())
+        return values
+
+    async def book_ticker(request):
+        bid, ask = exchange.book_ticker()
+        return _ok({
+            "symbol": exchange.symbol,
+            "bidPrice": f"{bid:.12g}",
+            "bidQty": "0",
+            "askPrice": f"{ask:.12g}",
+            "askQty": "0",
+        })
+
+    async def price(request):
+        bid, ask = exchange.book_ticker()
+        last = exchange.last_price or (bid + ask) / 2
+        return _ok([{"symbol": exchange.symbol, "price": f"{last:.12g}"}])
+
+    async def kline(request):
+        p = await params(request)
+        since = p.get("time")
+        return _ok(exchange.klines(p.get("size", 60), int(float(since)) if since else None))
+
+    async def accuracy(request):
+        # v1 answers with a bare list
+        return web.json_response([{
+            "symbol": exchange.symbol,
+            "priceAccuracy": str(exchange.price_decimals),
+            "quantityAccuracy": str(exchange.quantity_decimals),
+            "minTranQua": f"{exchange.min_quantity:g}",
+        }])
+
+    async def user_info_account(request):
+        balances = [
+            {"asset": asset, "free": f"{free:.12g}", "locked": f"{locked:.12g}"}
+            for asset, (free, locked) in exchange.balances.items()
+        ]
+        return _ok({"makerCommission": exchange.maker_fee, "takerCommission": exchange.taker_fee, "balances": balances})
+
+    async def user_info_v1(request):
+        return web.json_response({
+            "result": "true",
+            "info": {
+                "free": {a: f"{b[0]:.12g}" for a, b in exchange.balances.items()},
+                "freeze": {a: f"{b[1]:.12g}" for a, b in exchange.balances.items()},
+            },
+        })
+
+    async def orders_info_no_deal(request):
+        p = await params(request)
+        current_page = max(int(p.get("current_page", 1)), 1)
+        page_length = max(int(p.get("page_length", 200)), 1)
+        orders = exchange.open_orders()
+        page = orders[(current_page - 1) * page_length:current_page * page_length]
+        return _ok({
+            "total": len(orders),
+            "page_length": page_length,
+            "current_page": current_page,
+            "orders": [o.to_lbank(exchange.symbol) for o in page],
+        })
+
+    async def create_order(request):
+        p = await params(request)
+        try:
+            order_id = exchange.create_order(p.get("symbol"), p.get("type"), p.get("price"), p.get("amount"))
+        except SimulatorError as e:
+            return _error(e.code, e.message)
+        return _ok({"symbol": exchange.symbol, "order_id": order_id})
+
+    async def cancel_order(request):
+        p = await params(request)
+        try:
+            exchange.cancel_order(p.get("orderId", p.get("order_id")))
+        except SimulatorError as e:
+            return _error(e.code, e.message)
+        return _ok({"symbol": exchange.symbol, "orderId": p.get("orderId", p.get("order_id"))})
+
+    async def cancel_order_v1(request):
+        # Up to 3 comma-joined ids; per-id outcome in "success" / "error"
+        p = await params(request)
+        success, failed = [], []
+        for order_id in str(p.get("order_id", "")).split(","):
+            order_id = order_id.strip()
+            if not order_id:
+                continue
+            try:
+                exchange.cancel_order(order_id)
+                success.append(order_id)
+            except SimulatorError:
+                failed.append(order_id)
+        return web.json_response({"result": "true", "success": ",".join(success), "error": ",".join(failed)})
+
+    async def cancel_order_by_symbol(request):
+        p = await params(request)
+        try:
+            ids = exchange.cancel_all(p.get("symbol", exchange.symbol))
+        except SimulatorError as e:
+            return _error(e.code, e.message)
+        return _ok([{"orderId": order_id} for order_id in ids])
+
+    async def subscribe_key(request):
+        # Any key works for the feed's orderUpdate subscription
+        return _ok({"key": "sim-subscribe-key"})
+
+    stream_stats = {"connections": 0, "pings": 0, "pongs": 0}
+    sockets = set()
+
+    def push_time():
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(exchange.clock.now()))
+
+    def order_update(order):
+        return {
+            "type": "orderUpdate",
+            "pair": exchange.symbol,
+            "SERVER": "V2",
+            "TS": push_time(),
+            "orderUpdate": {
+                "uuid": order.order_id,
+                "symbol": exchange.symbol,
+                "type": order.order_type,
+                "orderPrice": f"{order.price:.12g}",
+                "orderAmt": f"{order.quantity:.12g}",
+                "accAmt": f"{order.filled:.12g}",
+                "orderStatus": order.status,
+                "updateTime": int(exchange.clock.now() * 1000),
+            },
+        }
+
+    async def push(ws, subscriptions):
+        seen = {o.order_id: (o.status, o.filled) for o in list(exchange.orders.values())}
+        fills_sent = len(exchange.fills)
+        loop = asyncio.get_running_loop()
+        next_ping = loop.time() + ping_seconds
+        ping_ids = itertools.count(1)
+        while not ws.closed:
+            exchange.advance()
+            messages = []
+            depth = subscriptions.get("depth")
+            if depth is not None:
+                bids, asks = exchange.depth(int(depth.get("depth", 10) or 10))
+                messages.append({
+                    "type": "depth",
+                    "pair": exchange.symbol,
+                    "SERVER": "V2",
+                    "TS": push_time(),
+                    "depth": {
+                        "bids": [[float(f"{p:.12g}"), float(f"{q:.12g}")] for p, q in bids],
+                        "asks": [[float(f"{p:.12g}"), float(f"{q:.12g}")] for p, q in asks],
+                    },
+                })
+            fills = exchange.fills[fills_sent:]
+            fills_sent += len(fills)
+            if "trade" in subscriptions:
+                for fill in fills:
+                    messages.append({
+                        "type": "trade",
+                        "pair": exchange.symbol,
+                        "SERVER": "V2",
+                        "TS": push_time(),
+                        "trade": {
+                            "price": fill["price"],
+                            "volume": fill["qty"],
+                            "amount": fill["price"] * fill["qty"],
+                            # Side of the taker
+                            "direction": "sell" if fill["side"] == "buy" else "buy",
+                            "TS": push_time(),
+                        },
+                    })
+            for order in list(exchange.orders.values()):
+                key = (order.status, order.filled)
+                if seen.get(order.order_id) != key:
+                    seen[order.order_id] = key
+                    if "orderUpdate" in subscriptions:
+                        messages.append(order_update(order))
+            if loop.time() >= next_ping:
+                next_ping = loop.time() + ping_seconds
+                messages.append({"action": "ping", "ping": f"sim-{next(ping_ids)}"})
+                stream_stats["pings"] += 1
+            try:
+                for message in messages:
+                    await ws.send_str(json.dumps(message))
+            except ConnectionResetError:
+                return
+            await asyncio.sleep(push_seconds)
+
+    async def stream(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        stream_stats["connections"] += 1
+        sockets.add(ws)
+        subscriptions = {}  # "depth" / "trade" / "orderUpdate" -> subscribe message
+        pusher = asyncio.create_task(push(ws, subscriptions))
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    data = json.loads(msg.data)
+                except ValueError:
+                    continue
+                if not isinstance(data, dict):
+                    continue
+                if data.get("action") == "subscribe" and str(data.get("pair", "")).lower() == exchange.symbol:
+                    subscriptions[data.get("subscribe")] = data
+                elif data.get("action") == "pong":
+                    stream_stats["pongs"] += 1
+        finally:
+            pusher.cancel()
+            sockets.discard(ws)
+        return ws
+
+    async def close_streams(app):
+        # Open feeds would otherwise hold the shutdown until they time out
+        for ws in list(sockets):
+            await ws.close(code=WSCloseCode.GOING_AWAY, message=b"server shutdown")
+
+    async def sim_state(request):
+        return web.json_response(exchange.state())
+
+    async def sim_advance(request):
+        p = await params(request)
+        exchange.clock.advance(float(p.get("seconds", 0)))
+        exchange.advance()
+        return web.json_response(exchange.state())
+
+    routes = {
+        "v2/supplement/ticker/bookTicker.do": book_ticker,
+        "v2/supplement/ticker/price.do": price,
+        "v2/kline.do": kline,
+        "v1/accuracy.do": accuracy,
+        "v2/supplement/user_info_account.do": user_info_account,
+        "v1/user_info.do": user_info_v1,
+        "v2/supplement/orders_info_no_deal.do": orders_info_no_deal,
+        "v2/supplement/create_order.do": create_order,
+        "v2/create_order.do": create_order,
+        "v2/supplement/cancel_order.do": cancel_order,
+        "v1/cancel_order.do": cancel_order_v1,
+        "v2/supplement/cancel_order_by_symbol.do": cancel_order_by_symbol,
+        "v2/subscribe/get_key.do": subscribe_key,
+        "v2/subscribe/refresh_key.do": subscribe_key,
+        "sim/state": sim_state,
+        "sim/advance": sim_advance,
+        "ws/V2/": stream,
+    }
+
+    latency_rng = random.Random(seed)
+
+    @web.middleware
+    async def step_market(request, handler):
+        if (latency_ms > 0 or jitter_ms > 0) and not request.path.startswith("/sim/"):
+            await asyncio.sleep((latency_ms + latency_rng.uniform(0.0, jitter_ms)) / 1000.0)
+        # Bring the market up to the clock before answering
+        exchange.advance()
+        exchange.stats["requests"] += 1
+        return await handler(request)
+
+    app = web.Application(middlewares=[step_market])
+    app[STREAM_STATS] = stream_stats
+    app.on_shutdown.append(close_streams)
+    for path, handler in routes.items():
+        app.router.add_route("*", "/" + path, handler)
+    return app
+
+
+class SimulatorServer:
+    """
+    Runs the simulator's HTTP server on a daemon thread (in-process use).
+    """
+
+    def __init__(
+        self, exchange, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0, push_seconds=0.5, ping_seconds=30.0
+    ):
+        """
+        Parameters:
+        - exchange: SimulatedExchange to serve
+        - host: Interface to bind
+        - port: TCP port (0 = any free port)
+        - latency_ms / jitter_ms: Injected response delay (see build_app)
+        - push_seconds / ping_seconds: WebSocket feed intervals (see build_app)
+        """
+        self.exchange = exchange
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.push_seconds = push_seconds
+        self.ping_seconds = ping_seconds
+        self.stream_stats = {}
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    @property
+    def ws_url(self):
+        return f"ws://{self.host}:{self.port}/ws/V2/"
+
+    def start(self):
+        """
+        Start serving; returns once the port is bound.
+
+        Returns:
+        - str: Base URL to point SIM_URL at
+        """
+        if self._thread is not None:
+            return self.base_url
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="exchange-simulator", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._serve(), self._loop).result()
+        return self.base_url
+
+    async def _serve(self):
+        app = build_app(
+            self.exchange, self.latency_ms, self.jitter_ms, push_seconds=self.push_seconds, ping_seconds=self.ping_seconds
+        )
+        self.stream_stats = app[STREAM_STATS]
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def stop(self):
+        if self._thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+
+def simulator_from_env(symbol, env=None, clock=None, waypoints=None, observer=None):
+    """
+    Build a SimulatedExchange from SIM_* settings.
+
+    Parameters:
+    - symbol: Pair to simulate
+    - env: Mapping to read (default: os.environ)
+    - clock: SimClock to use (default: one running at SIM_SPEED from now)
+    - waypoints: Price path to use instead of SIM_PRICE_PATH (e.g. recorded ticks)
+    - observer: Callable(ts, exchange) run after every matching step
+
+    Returns:
+    - SimulatedExchange
+    """
+    env = os.environ if env is None else env
+    base, _, quote = symbol.lower().partition("_")
+    seed = int(env.get("SIM_SEED", "1"))
+    step_seconds = float(env.get("SIM_STEP_SECONDS", "1"))
+    history_minutes = int(env.get("SIM_HISTORY_MINUTES", "400"))
+    if waypoints is None:
+        waypoints = parse_waypoints(env.get("SIM_PRICE_PATH", "0:0.2"))
+    if clock is None:
+        clock = SimClock(speed=float(env.get("SIM_SPEED", "1")))
+    path = PricePath(
+        waypoints,
+        volatility=float(env.get("SIM_VOLATILITY_PCT", "0.1")) / 100,
+        seed=seed,
+        step_seconds=step_seconds,
+        origin=-history_minutes * 60,
+    )
+    return SimulatedExchange(
+        symbol,
+        balances=parse_balances(env.get("SIM_BALANCES", f"{quote}:1000,{base}:10000")),
+        path=path,
+        clock=clock,
+        spread_pct=float(env.get("SIM_SPREAD_PCT", "0.2")),
+        taker_rate=float(env.get("SIM_TAKER_RATE", "0.5")),
+        taker_size=float(env.get("SIM_TAKER_SIZE", "100")),
+        maker_fee=float(env.get("SIM_MAKER_FEE", "0")),
+        taker_fee=float(env.get("SIM_TAKER_FEE", "0")),
+        price_decimals=int(env.get("SIM_PRICE_DECIMALS", "6")),
+        quantity_decimals=int(env.get("SIM_QUANTITY_DECIMALS", "2")),
+        min_quantity=float(env.get("SIM_MIN_QUANTITY", "0")),
+        seed=seed,
+        step_seconds=step_seconds,
+        history_minutes=history_minutes,
+        observer=observer,
+    )
+
+
+def start_simulator(symbol, env=None, host="127.0.0.1", port=0):
+    """
+    Build a simulator from SIM_* settings and serve it in this process.
+
+    Returns:
+    - SimulatorServer: Running server (base_url holds its address)
+    """
+    env = os.environ if env is None else env
+    server = SimulatorServer(
+        simulator_from_env(symbol, env),
+        host=host,
+        port=port,
+        latency_ms=float(env.get("SIM_LATENCY_MS", "0")),
+        jitter_ms=float(env.get("SIM_LATENCY_JITTER_MS", "0")),
+    )
+    server.start()
+    return server
+
+
+if __name__ == "__main__":
+    # Standalone: python -m src.exchange_simulator --symbol acces_usdt --port 18080
+    # then run the bot with EXCHANGE_SIMULATOR=true SIM_URL=http://127.0.0.1:18080/
+    # (and LBANK_WS_URL=ws://127.0.0.1:18080/ws/V2/ to use its WebSocket feed)
+    parser = argparse.ArgumentParser(description="Local LBank exchange simulator")
+    parser.add_argument("--symbol", default=os.getenv("TRADING_PAIR", "acces_usdt"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("SIM_PORT", "18080")))
+    args = parser.parse_args()
+    exchange = simulator_from_env(args.symbol)
+    latency_ms = float(os.getenv("SIM_LATENCY_MS", "0"))
+    jitter_ms = float(os.getenv("SIM_LATENCY_JITTER_MS", "0"))
+    print(
+        f"[SIM] Simulating {exchange.symbol} on http://{args.host}:{args.port}/ "
+        f"(speed {exchange.clock.speed:g}x, latency {latency_ms:g}+{jitter_ms:g} ms)",
+        flush=True,
+    )
+    app = build_app(exchange, latency_ms, jitter_ms, seed=int(os.getenv("SIM_SEED", "1")))
+    web.run_app(app, host=args.host, port=args.port, print=None, access_log=None)
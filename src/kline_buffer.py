@@ -0,0 +1,189 @@
+import math
+
+import numpy as np
+
+# Below this a standard deviation is treated as exactly zero (rolling updates leave ~1e-19 residue)
+ZERO_VOLATILITY_EPSILON = 1e-12
+
+
+class RollingStats:
+    """
+    Welford mean/variance over a sliding window of the last `window` values.
+
+    add() and remove() are both O(1), so the window slides one candle at a
+    time without re-reading it.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x):
+        if self.n <= 1:
+            self.n = 0
+            self.mean = 0.0
+            self.m2 = 0.0
+            return
+        self.n -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.n
+        self.m2 -= delta * (x - self.mean)
+        if self.m2 < 0:
+            self.m2 = 0.0
+
+    def std(self):
+        """
+        Population standard deviation (same as np.std), or None when empty.
+        """
+        if self.n == 0:
+            return None
+        return math.sqrt(self.m2 / self.n)
+
+
+class KlineRingBuffer:
+    """
+    Array-backed ring of one-minute candle closes with rolling volatility.
+
+    Holds the last `capacity` candles (open timestamp + close). After the
+    initial backfill only candles from the last held one onward are requested:
+    the last candle is re-read once (it may still have been forming when it was
+    fetched) and newer ones are appended. Returns (close / previous close - 1)
+    feed one RollingStats per volatility window, so volatility(period) is O(1).
+
+    Windows are in candles, like get_dynamic_volatilit's period: a period of 60
+    means the last 60 closes, i.e. 59 returns.
+    """
+
+    def __init__(self, capacity=301, periods=(60, 120, 180, 240, 300)):
+        self.capacity = max(capacity, max(periods) + 1)
+        self._times = np.zeros(self.capacity, dtype=np.int64)
+        self._closes = np.zeros(self.capacity, dtype=np.float64)
+        self._returns = np.zeros(self.capacity, dtype=np.float64)  # return of candle i vs i-1
+        self._next = 0  # slot the next candle is written to
+        self.size = 0
+        self._stats = {period: RollingStats(period - 1) for period in periods}
+        self.fetches = 0
+
+    def _slot(self, back):
+        # Slot of the candle `back` positions before the newest one (0 = newest)
+        return (self._next - 1 - back) % self.capacity
+
+    @property
+    def last_timestamp(self):
+        return int(self._times[self._slot(0)]) if self.size else None
+
+    def next_request(self, symbol, now_ts):
+        """
+        Build the kline.do payload needed to bring the buffer up to date.
+
+        Parameters:
+        - symbol: Trading pair symbol
+        - now_ts: Current unix time in seconds
+
+        Returns:
+        - dict: Request payload, or None if no new candle can exist yet
+        """
+        last_ts = self.last_timestamp
+        if last_ts is None or now_ts - last_ts > (self.capacity - 1) * 60:
+            # Empty or too far behind: backfill the whole ring
+            start_ts = int(now_ts) - self.capacity * 60
+            size = self.capacity
+        elif now_ts < last_ts + 60:
+            return None  # Still inside the newest candle we hold
+        else:
+            start_ts = last_ts
+            size = int((now_ts - last_ts) // 60) + 1
+        return {"symbol": symbol, "type": "minute1", "size": size, "time": start_ts}
+
+    def ingest(self, candles):
+        """
+        Merge fetched candles into the ring.
+
+        Parameters:
+        - candles: List of (open timestamp seconds, close), oldest first
+        """
+        self.fetches += 1
+        for ts, close in candles:
+            ts = int(ts)
+            close = float(close)
+            last_ts = self.last_timestamp
+            if last_ts is not None and ts < last_ts:
+                continue
+            if last_ts is not None and ts == last_ts:
+                self._replace_last(close)
+            else:
+                self._append(ts, close)
+
+    def _return_against_previous(self, close):
+        previous = self._closes[self._slot(0)]
+        return close / previous - 1 if previous > 0 else 0.0
+
+    def _append(self, ts, close):
+        has_previous = self.size > 0
+        r = self._return_against_previous(close) if has_previous else None
+        slot = self._next
+        self._times[slot] = ts
+        self._closes[slot] = close
+        self._next = (slot + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        if r is None:
+            return
+        self._returns[slot] = r
+        for stats in self._stats.values():
+            stats.add(r)
+            if stats.n > stats.window:
+                # Evict the return that just slid out of this window
+                stats.remove(self._returns[(slot - stats.window) % self.capacity])
+
+    def _replace_last(self, close):
+        slot = self._slot(0)
+        if self.size > 1:
+            old_r = self._returns[slot]
+            previous = self._closes[self._slot(1)]
+            new_r = close / previous - 1 if previous > 0 else 0.0
+            for stats in self._stats.values():
+                stats.remove(old_r)
+                stats.add(new_r)
+            self._returns[slot] = new_r
+        self._closes[slot] = close
+
+    def closes(self, count=None):
+        """
+        The newest `count` closes (all by default), oldest first.
+        """
+        count = self.size if count is None else min(count, self.size)
+        if count == 0:
+            return []
+        slots = [(self._next - count + i) % self.capacity for i in range(count)]
+        return self._closes[slots].tolist()
+
+    def volatility(self, period):
+        """
+        Standard deviation of one-minute returns over the last `period` candles.
+
+        Parameters:
+        - period: Number of candles (minutes)
+
+        Returns:
+        - float: Volatility, or None if fewer than 2 candles are held
+        """
+        if self.size < 2:
+            return None
+        stats = self._stats.get(period)
+        if stats is not None:
+            value = stats.std()
+        else:
+            # Untracked window: compute it from the ring directly
+            prices = np.array(self.closes(period))
+            value = float(np.std(np.diff(prices) / prices[:-1]))
+        if value is not None and value < ZERO_VOLATILITY_EPSILON:
+            return 0.0
+        return value
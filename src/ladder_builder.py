@@ -0,0 +1,232 @@
+import numpy as np
+
+# One ladder level per row: original level index, price, size (tokens), value (USDT)
+# and distance from the best price in %
+LEVEL_DTYPE = np.dtype([
+    ("index", np.int32),
+    ("price", np.float64),
+    ("size", np.float64),
+    ("value", np.float64),
+    ("distance_pct", np.float64),
+])
+
+
+def linear_prices(start, end, count, decimals=None):
+    """
+    Evenly spaced prices from start to end (both included).
+
+    Parameters:
+    - start: Price of level 0 (e.g., the best bid)
+    - end: Price of the last level (e.g., the -1% bound)
+    - count: Number of levels
+    - decimals: Round prices to this many decimals (optional)
+
+    Returns:
+    - np.ndarray: Prices, level 0 first
+    """
+    if count <= 0:
+        return np.empty(0)
+    progress = np.arange(count) / (count - 1) if count > 1 else np.zeros(1)
+    prices = start + (end - start) * progress
+    return np.round(prices, decimals) if decimals is not None else prices
+
+
+def price_step_percentages(count, base_price_step_percentage):
+    """
+    Vectorized get_price_step_percentage: base step for levels 0-8, 2.5x for 9-11, 4x beyond.
+
+    Parameters:
+    - count: Number of levels
+    - base_price_step_percentage: Step between the first levels (fraction, e.g. 0.0025)
+
+    Returns:
+    - np.ndarray: Step per level
+    """
+    i = np.arange(count)
+    return np.where(i < 9, 1.0, np.where(i < 12, 2.5, 4.0)) * base_price_step_percentage
+
+
+def step_distances(count, base_price_step_percentage, max_distance, min_first_distance=0.0025):
+    """
+    Cumulative distance of every level from the best price.
+
+    Level 0 sits at the best price, level 1 at least min_first_distance away, and
+    every further level adds its price step; distances are capped at max_distance.
+
+    Parameters:
+    - count: Number of levels
+    - base_price_step_percentage: Base step (fraction)
+    - max_distance: Largest distance from the best price (fraction, e.g. 0.10)
+    - min_first_distance: Smallest distance of level 1 (fraction)
+
+    Returns:
+    - np.ndarray: Distance per level (fraction), 0.0 for level 0
+    """
+    if count <= 0:
+        return np.empty(0)
+    steps = price_step_percentages(count, base_price_step_percentage)
+    steps[0] = 0.0
+    distances = np.cumsum(steps)
+    if count > 1 and distances[1] < min_first_distance:
+        distances[1:] += min_first_distance - distances[1]
+    return np.minimum(distances, max_distance)
+
+
+def geometric_sizes(total, count, first_share=0.30, decay=0.70):
+    """
+    Decreasing size distribution: level 0 gets first_share of the total and every
+    following level first_share * decay**i of it.
+
+    Parameters:
+    - total: Total size to distribute
+    - count: Number of levels
+
+    Returns:
+    - np.ndarray: Sizes, level 0 first
+    """
+    return total * first_share * decay ** np.arange(count, dtype=np.float64)
+
+
+def merge_same_prices(prices, sizes, decimals=5):
+    """
+    Merge levels that round to the same price (one order per price).
+
+    Parameters:
+    - prices: Level prices
+    - sizes: Level sizes
+    - decimals: Price rounding used to detect duplicates
+
+    Returns:
+    - tuple: (prices, sizes) as arrays sorted by ascending price
+    """
+    rounded = np.round(np.asarray(prices, dtype=np.float64), decimals)
+    unique_prices, inverse = np.unique(rounded, return_inverse=True)
+    merged_sizes = np.bincount(inverse, weights=np.asarray(sizes, dtype=np.float64), minlength=len(unique_prices))
+    return unique_prices, merged_sizes
+
+
+def scale_to_budget(prices, sizes, budget):
+    """
+    Scale all sizes down proportionally so the total value fits a budget.
+
+    Parameters:
+    - prices: Level prices
+    - sizes: Level sizes
+    - budget: Maximum total value in USDT (None = no limit)
+
+    Returns:
+    - tuple: (sizes, scale factor applied - 1.0 if it already fit)
+    """
+    sizes = np.asarray(sizes, dtype=np.float64)
+    if budget is None or len(sizes) == 0:
+        return sizes, 1.0
+    total = float(np.sum(sizes * np.asarray(prices, dtype=np.float64)))
+    if total > budget and total > 0:
+        scale = max(budget, 0.0) / total
+        return sizes * scale, scale
+    return sizes, 1.0
+
+
+def make_levels(prices, sizes, index=None, distance_pct=None):
+    """
+    Pack price/size arrays into a LEVEL_DTYPE structured array.
+
+    Parameters:
+    - prices: Level prices
+    - sizes: Level sizes
+    - index: Original level numbers (default 0..n-1)
+    - distance_pct: Distance from the best price in % (default 0)
+
+    Returns:
+    - np.ndarray: Structured array of levels
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    levels = np.zeros(len(prices), dtype=LEVEL_DTYPE)
+    levels["index"] = np.arange(len(prices)) if index is None else index
+    levels["price"] = prices
+    levels["size"] = sizes
+    levels["value"] = levels["price"] * levels["size"]
+    if distance_pct is not None:
+        levels["distance_pct"] = distance_pct
+    return levels
+
+
+def filter_levels(levels, min_size=0.0, min_value=0.0):
+    """
+    Split levels into those meeting the minimum size and value and those that don't.
+
+    Parameters:
+    - levels: LEVEL_DTYPE array
+    - min_size: Minimum order size in tokens
+    - min_value: Minimum order value in USDT
+
+    Returns:
+    - tuple: (kept levels, rejected levels)
+    """
+    mask = (levels["size"] >= min_size) & (levels["value"] >= min_value) & (levels["size"] > 0)
+    return levels[mask], levels[~mask]
+
+
+def consolidate_largest(levels, budget, min_size=0.0, min_value=0.0):
+    """
+    Keep the largest levels that fit a budget (fewer, larger orders for small balances).
+
+    Walks from the last (largest) level backwards and keeps every level that meets
+    the minimums and still fits what is left of the budget. The walk is greedy, so
+    it stays a loop, but over at most one row per level.
+
+    Parameters:
+    - levels: LEVEL_DTYPE array
+    - budget: Value available in USDT
+    - min_size: Minimum order size in tokens
+    - min_value: Minimum order value in USDT
+
+    Returns:
+    - np.ndarray: Kept levels, in their original order
+    """
+    eligible = (levels["value"] >= min_value) & (levels["size"] >= min_size)
+    keep = np.zeros(len(levels), dtype=bool)
+    remaining = budget
+    for i in np.flatnonzero(eligible)[::-1]:
+        if remaining < min_value:
+            break
+        if levels["value"][i] <= remaining:
+            keep[i] = True
+            remaining -= levels["value"][i]
+    return levels[keep]
+
+
+def build_ladder(prices, sizes, budget=None, min_size=0.0, min_value=0.0, merge_decimals=None, distance_pct=None):
+    """
+    Turn raw level prices and sizes into the levels to place, in one pass.
+
+    Steps: merge duplicate prices (optional) -> scale to the budget -> compute
+    values -> drop levels under the minimum size or value.
+
+    Parameters:
+    - prices: Level prices
+    - sizes: Level sizes in tokens
+    - budget: Maximum total value in USDT (optional)
+    - min_size: Minimum order size in tokens
+    - min_value: Minimum order value in USDT
+    - merge_decimals: Merge levels whose prices round to the same value (optional)
+    - distance_pct: Distance from the best price in % per level (optional, ignored when merging)
+
+    Returns:
+    - tuple: (kept LEVEL_DTYPE array, rejected LEVEL_DTYPE array, scale factor applied)
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    sizes = np.asarray(sizes, dtype=np.float64)
+    if merge_decimals is not None:
+        prices, sizes = merge_same_prices(prices, sizes, merge_decimals)
+        distance_pct = None
+    sizes, scale = scale_to_budget(prices, sizes, budget)
+    kept, rejected = filter_levels(make_levels(prices, sizes, distance_pct=distance_pct), min_size, min_value)
+    return kept, rejected, scale
+
+
+def level_pairs(levels):
+    """
+    (size, price) tuples of plain floats, as publish_ladder and reconcile_ladder expect.
+    """
+    return list(zip(levels["size"].tolist(), levels["price"].tolist()))
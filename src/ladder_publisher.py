@@ -0,0 +1,120 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.logger import log
+from src.utils import order_registry, place_order, prepare_order
+
+# Running totals for ladder publication timing (read by the loop and the metrics layer)
+publish_stats = {
+    "ladders": 0,
+    "orders": 0,
+    "last_seconds": 0.0,
+    "total_seconds": 0.0,
+    "rejected_locally": 0,
+}
+
+
+def is_order_success(res):
+    """
+    Check whether a create_order response reports success.
+
+    Parameters:
+    - res: Response dict from place_order
+
+    Returns:
+    - bool: True if the order was accepted
+    """
+    if not res:
+        return False
+    return (
+        res.get("result") == "true"
+        or res.get("result") is True
+        or res.get("msg") == "Success"
+    )
+
+
+def order_id_from_response(res):
+    """
+    Extract the order ID from a create_order response.
+
+    Parameters:
+    - res: Response dict from place_order
+
+    Returns:
+    - str: Order ID, or None if missing
+    """
+    data = res.get("data") if res else None
+    if not isinstance(data, dict):
+        return None
+    return data.get("orderId") or data.get("order_id")
+
+
+def publish_ladder(symbol, buy_levels, sell_levels, max_in_flight=8):
+    """
+    Place every level of a ladder concurrently.
+
+    All buy and sell levels are submitted together through a worker pool, with at
+    most max_in_flight place_order calls running at once, so rebuilding the book
+    takes about one round trip per max_in_flight orders instead of one per order.
+    Levels are rounded to the pair's precision first; levels that would break the
+    pair's minimums get an error response without being sent. Accepted orders
+    are recorded in order_registry with their rounded size and price.
+
+    Parameters:
+    - symbol: Trading pair symbol (e.g., pair)
+    - buy_levels: List of (size, price) for buy orders
+    - sell_levels: List of (size, price) for sell orders
+    - max_in_flight: Maximum number of orders being placed at the same time
+
+    Returns:
+    - dict: {"buy": [response, ...], "sell": [response, ...], "elapsed_seconds": float}
+      Responses are in the same order as the input levels.
+    """
+    jobs = [("buy_maker", size, price) for size, price in buy_levels]
+    jobs += [("sell_maker", size, price) for size, price in sell_levels]
+
+    started = time.monotonic()
+    # Round every level and keep back the ones the exchange would reject anyway
+    responses = [None] * len(jobs)
+    for n, (side, size, price) in enumerate(jobs):
+        size, price, error = prepare_order(symbol, side, size, price)
+        jobs[n] = (side, size, price)
+        if error:
+            responses[n] = {"result": False, "error": error, "msg": error, "precheck": True}
+    to_send = [n for n, res in enumerate(responses) if res is None]
+
+    if to_send:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(to_send)))) as pool:
+            futures = {n: pool.submit(place_order, symbol, *jobs[n]) for n in to_send}
+            for n, future in futures.items():
+                try:
+                    responses[n] = future.result()
+                except Exception as e:
+                    responses[n] = {"result": False, "error": str(e), "msg": str(e)}
+    elapsed = time.monotonic() - started
+
+    # Register accepted orders so the loop sees them without re-reading the open-order list
+    for (side, size, price), res in zip(jobs, responses):
+        if is_order_success(res):
+            order_registry.record_placement(order_id_from_response(res), side.split("_")[0], price, size)
+
+    publish_stats["ladders"] += 1
+    publish_stats["orders"] += len(jobs)
+    publish_stats["last_seconds"] = elapsed
+    publish_stats["total_seconds"] += elapsed
+    publish_stats["rejected_locally"] += len(jobs) - len(to_send)
+    if jobs:
+        rejected = len(jobs) - len(to_send)
+        if rejected:
+            log(
+                "[LADDER] Published %s orders in %.0f ms (max in flight: %s), %s rejected by the pre-flight check",
+                len(to_send), elapsed * 1000, max_in_flight, rejected,
+            )
+        else:
+            log("[LADDER] Published %s orders in %.0f ms (max in flight: %s)", len(to_send), elapsed * 1000, max_in_flight)
+
+    return {
+        "buy": responses[:len(buy_levels)],
+        "sell": responses[len(buy_levels):],
+        "elapsed_seconds": elapsed,
+    }
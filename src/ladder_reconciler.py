@@ -0,0 +1,135 @@
+import logging
+import time
+
+from src.logger import log
+from src.utils import cancel_list_of_orders
+from src.ladder_publisher import publish_ladder
+
+
+def match_levels(target_levels, live_orders, price_tolerance_pct, size_tolerance_pct):
+    """
+    Match target ladder levels of one side against live open orders.
+
+    A live order keeps a target level when its price is within price_tolerance_pct
+    and its remaining size within size_tolerance_pct of the target. Each live
+    order can keep at most one level; the closest price wins.
+
+    Parameters:
+    - target_levels: List of (size, price) for the side
+    - live_orders: Open orders of the same side (dicts from parse_open_orders)
+    - price_tolerance_pct: Allowed price difference in % of the target price
+    - size_tolerance_pct: Allowed size difference in % of the target size
+
+    Returns:
+    - tuple: (matches, unmatched_live)
+      matches: one entry per target level, the matched live order or None
+      unmatched_live: live orders that match no target level
+    """
+    unmatched = [o for o in live_orders if o.get("order_id") and o["remaining_qty"] > 0]
+    matches = []
+    for size, price in target_levels:
+        best = None
+        best_diff = None
+        for order in unmatched:
+            price_diff_pct = abs(order["price"] - price) / price * 100 if price > 0 else float("inf")
+            size_diff_pct = abs(order["remaining_qty"] - size) / size * 100 if size > 0 else float("inf")
+            if price_diff_pct <= price_tolerance_pct and size_diff_pct <= size_tolerance_pct:
+                if best is None or price_diff_pct < best_diff:
+                    best = order
+                    best_diff = price_diff_pct
+        if best is not None:
+            unmatched.remove(best)
+        matches.append(best)
+    return matches, unmatched
+
+
+def reconcile_ladder(
+    symbol,
+    buy_levels,
+    sell_levels,
+    live_orders,
+    price_tolerance_pct=0.05,
+    size_tolerance_pct=10.0,
+    max_in_flight=8,
+):
+    """
+    Move the live book to the target ladder with the fewest cancels and places.
+
+    Resting orders that already sit on a target level (within tolerance) are
+    kept, so they keep their queue position. Live orders that match nothing are
+    cancelled first (to free their funds), then only the missing levels are placed.
+    If a stale order of a side could not be cancelled, that side places nothing
+    this tick (its levels get a failed "skipped" response), so the replacement
+    never rests on top of funds that are still locked.
+
+    Parameters:
+    - symbol: Trading pair symbol (e.g., pair)
+    - buy_levels: Target list of (size, price) for buy orders
+    - sell_levels: Target list of (size, price) for sell orders
+    - live_orders: Current open orders (dicts from parse_open_orders)
+    - price_tolerance_pct: Allowed price difference in % before a level is requoted
+    - size_tolerance_pct: Allowed size difference in % before a level is requoted
+    - max_in_flight: Maximum number of orders being placed (or cancel requests sent) at the same time
+
+    Returns:
+    - dict: Same shape as publish_ladder(): {"buy": [...], "sell": [...], "elapsed_seconds": float}
+      plus "kept" and "cancelled" counts. Kept levels get a synthetic success response
+      {"result": True, "kept": True, "data": {"order_id": ...}}.
+    """
+    started = time.monotonic()
+    buy_matches, stale_buys = match_levels(
+        buy_levels, [o for o in live_orders if o["side"] == "buy"], price_tolerance_pct, size_tolerance_pct
+    )
+    sell_matches, stale_sells = match_levels(
+        sell_levels, [o for o in live_orders if o["side"] == "sell"], price_tolerance_pct, size_tolerance_pct
+    )
+
+    # Cancel what no longer belongs to the ladder before placing (frees balance)
+    stale_ids = [o["order_id"] for o in stale_buys + stale_sells]
+    cancelled = 0
+    still_live = set()
+    if stale_ids:
+        report = cancel_list_of_orders(symbol, stale_ids, max_in_flight=max_in_flight)
+        cancelled = len(report.cancelled)
+        still_live = set(report.failed)
+
+    missing = {
+        "buy": [level for level, match in zip(buy_levels, buy_matches) if match is None],
+        "sell": [level for level, match in zip(sell_levels, sell_matches) if match is None],
+    }
+    # The placement budget counts the stale orders' funds as free: while a stale order of a
+    # side is still resting, that side is not topped up (the cancel is retried next tick)
+    blocked = set()
+    for side, stale in (("buy", stale_buys), ("sell", stale_sells)):
+        resting = sum(1 for o in stale if o["order_id"] in still_live)
+        if resting and missing[side]:
+            blocked.add(side)
+            log(
+                "[REQUOTE] %s stale %s orders could not be cancelled, skipping %s new %s levels",
+                resting, side, len(missing[side]), side, level=logging.WARNING,
+            )
+    to_place = {side: [] if side in blocked else levels for side, levels in missing.items()}
+    published = publish_ladder(symbol, to_place["buy"], to_place["sell"], max_in_flight=max_in_flight)
+    for side in blocked:
+        error = "stale orders could not be cancelled"
+        published[side] = [{"result": False, "error": error, "msg": error, "skipped": True} for _ in missing[side]]
+
+    def merge(matches, placed_responses):
+        placed = iter(placed_responses)
+        results = []
+        for match in matches:
+            if match is not None:
+                results.append({"result": True, "kept": True, "data": {"order_id": match["order_id"]}})
+            else:
+                results.append(next(placed))
+        return results
+
+    kept = sum(1 for m in buy_matches + sell_matches if m is not None)
+    log("[REQUOTE] Kept %s resting orders, cancelled %s, placed %s", kept, cancelled, len(to_place["buy"]) + len(to_place["sell"]))
+    return {
+        "buy": merge(buy_matches, published["buy"]),
+        "sell": merge(sell_matches, published["sell"]),
+        "kept": kept,
+        "cancelled": cancelled,
+        "elapsed_seconds": time.monotonic() - started,
+    }
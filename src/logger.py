@@ -0,0 +1,349 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
+
+# Level of a line from its [TAG] when the caller doesn't pass one
+TAG_LEVELS = {
+    "ERROR": logging.ERROR,
+    "WARNING": logging.WARNING,
+    "SAFETY": logging.WARNING,
+    "RISK": logging.WARNING,
+    "STOP": logging.WARNING,
+    "DEBUG": logging.DEBUG,
+}
+
+# Per-tick categories written on every 10th iteration by default (LOG_SAMPLE)
+DEFAULT_LOG_SAMPLE = (
+    "MARKET=10,PRICE=10,CALC=10,BUY=10,SELL=10,ADAPTIVE=10,REFERENCE_PRICE=10,"
+    "COMPLIANCE=10,SUMMARY=10,BALANCE=10,ORDERS=10,WAIT=10,ITERATION=10,ADJUSTMENTS=10,LADDER=10,"
+    "REQUOTE=10,CANCEL=10,RATE=10"
+)
+
+# State categories whose unchanged lines are collapsed by default (LOG_DEDUP)
+DEFAULT_LOG_DEDUP = (
+    "BALANCE,MARKET,PRICE,CALC,ORDERS,CANCEL,WAIT,SUMMARY,RATE,STREAM,ADAPTIVE,"
+    "REFERENCE_PRICE,ADJUSTMENTS,COMPLIANCE,MAX_PRICE,PAUSE"
+)
+
+# Fields added to every record (market_making() sets "iteration" at the top of each tick)
+context = {}
+
+_logger = logging.getLogger("market_making_bot")
+_logger.propagate = False
+
+
+def category_of(message):
+    """
+    Category of a log line: the first word of its leading [TAG] ("bot" if untagged).
+
+    Parameters:
+    - message: Log message (e.g. "[BUY #3] Price: ...")
+
+    Returns:
+    - str: e.g. "BUY"
+    """
+    message = message.lstrip()
+    if message.startswith("["):
+        end = message.find("]")
+        if end > 1:
+            return message[1:end].split(" ", 1)[0]
+    return "bot"
+
+
+class StdoutHandler(logging.Handler):
+    """
+    Writes to the current sys.stdout (looked up per record, so redirect_stdout
+    in backtests keeps working) or to a fixed stream.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__()
+        self.stream = stream
+
+    def emit(self, record):
+        try:
+            stream = self.stream or sys.stdout
+            stream.write(self.format(record) + "\n")
+            stream.flush()
+        except Exception:
+            self.handleError(record)
+
+
+class TextFormatter(logging.Formatter):
+    """
+    "2024-01-01 00:00:00 INFO    [BALANCE] USDT: ... (unchanged x12)" lines.
+    """
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(message)s", "%Y-%m-%d %H:%M:%S")
+
+    def format(self, record):
+        line = super().format(record)
+        repeats = getattr(record, "repeats", 0)
+        if repeats:
+            line += f" (unchanged x{repeats})"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: ts, level, category, msg, the context/extra fields,
+    repeats (if deduplicated) and exc (traceback, if any).
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "category": getattr(record, "category", "bot"),
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        repeats = getattr(record, "repeats", 0)
+        if repeats:
+            entry["repeats"] = repeats
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks and never formats in the caller's thread.
+
+    Records are queued as they are (message and arguments are merged by the
+    listener thread); the arguments must not be mutated after logging, which
+    holds for the numbers and strings the bot logs. When the queue is full the
+    record is dropped and counted, and a warning with the count is queued as
+    soon as there is room again.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        if self.dropped:
+            try:
+                self.queue.put_nowait(_make_record(
+                    logging.WARNING, f"[LOG] {self.dropped} lines dropped (log queue full)", (), "LOG", {}, 0, None
+                ))
+                self.dropped = 0
+            except queue.Full:
+                pass
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _make_record(level, message, args, category, fields, repeats, exc_info):
+    record = _logger.makeRecord(_logger.name, level, "(bot)", 0, message, args, exc_info)
+    record.category = category
+    record.fields = fields
+    record.repeats = repeats
+    return record
+
+
+class LogPolicy:
+    """
+    Decides in the caller's thread, before anything is formatted, whether a line is written.
+
+    - level: lines below it are dropped
+    - sample: {category: N}: INFO/DEBUG lines of that category are only kept on every
+      Nth loop iteration (iteration 1, N+1, ...); categories not listed (fills, ledger
+      drift, state and config changes, ...) are kept on every iteration
+    - dedup: categories whose INFO/DEBUG lines are dropped while they read the same as
+      the last one written from the same template; they are written again after
+      dedup_seconds with the number of repeats
+    Warnings and errors are always written.
+    """
+
+    def __init__(self, level=logging.INFO, sample=None, dedup=(), dedup_seconds=300.0, max_tracked=1024):
+        self.level = level
+        self.sample = dict(sample or {})
+        self.dedup = frozenset(dedup)
+        self.dedup_seconds = dedup_seconds
+        self.max_tracked = max_tracked
+        self._last = OrderedDict()  # (category, template) -> [text, repeats, written at]
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def admit(self, level, category, message, args):
+        """
+        Returns:
+        - tuple or None: None to drop the line, otherwise (message, args, repeats it stands for);
+          deduplicated categories come back already formatted
+        """
+        if level < self.level:
+            return None
+        if level >= logging.WARNING:
+            return message, args, 0
+        rate = self.sample.get(category)
+        if rate and rate > 1:
+            iteration = context.get("iteration")
+            if iteration is not None and iteration % rate != 1 % rate:
+                self.suppressed += 1
+                return None
+        if category not in self.dedup:
+            return message, args, 0
+        # Compared as written, so values that only differ beyond the printed digits still collapse
+        text = message % args if args else message
+        key = (category, message)
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and last[0] == text and now - last[2] < self.dedup_seconds:
+                last[1] += 1
+                self.suppressed += 1
+                return None
+            repeats = last[1] if last is not None and last[0] == text else 0
+            self._last[key] = [text, 0, now]
+            self._last.move_to_end(key)
+            if len(self._last) > self.max_tracked:
+                self._last.popitem(last=False)
+        return text, (), repeats
+
+
+_policy = LogPolicy()
+_handler = StdoutHandler()
+_handler.setFormatter(TextFormatter())
+_logger.addHandler(_handler)
+_logger.setLevel(logging.DEBUG)
+_listener = None
+_output = _handler
+
+
+def log(message, *args, level=None, exc_info=False, **fields):
+    """
+    Write a log line (replacement for print in the bot).
+
+    The [TAG] prefix sets the category (and the level, see TAG_LEVELS, unless
+    `level` is given). Pass values as %-style arguments to have the line
+    formatted only if it is written, by the writer thread:
+        log("[BALANCE] USDT: %.2f free", usdt_free)
+
+    Parameters:
+    - message: Line or %-style template (leading/trailing newlines are dropped)
+    - args: Template arguments
+    - level: logging level (default from the tag)
+    - exc_info: Attach the exception being handled (traceback)
+    - fields: Extra structured fields (JSON output)
+    """
+    message = message.strip("\n")
+    category = category_of(message)
+    if level is None:
+        level = TAG_LEVELS.get(category, logging.INFO)
+    admitted = _policy.admit(level, category, message, args)
+    if admitted is None:
+        return
+    message, args, repeats = admitted
+    if exc_info:
+        exc_info = sys.exc_info()
+    _logger.handle(_make_record(
+        level, message, args, category, {**context, **fields} if fields or context else {}, repeats, exc_info or None
+    ))
+
+
+def parse_sample(text):
+    """
+    Parse "MARKET=10,BUY=10" into {"MARKET": 10, "BUY": 10}.
+    """
+    sample = {}
+    for part in (text or "").split(","):
+        if "=" in part:
+            name, rate = part.split("=", 1)
+            try:
+                sample[name.strip().upper()] = max(int(rate), 1)
+            except ValueError:
+                continue
+    return sample
+
+
+def configure_logging(
+    level="INFO",
+    fmt="text",
+    sample=None,
+    dedup=(),
+    dedup_seconds=300.0,
+    asynchronous=True,
+    queue_size=10000,
+    stream=None,
+):
+    """
+    (Re)configure the bot logger.
+
+    Parameters:
+    - level: Lowest level written ("DEBUG", "INFO", "WARNING", "ERROR")
+    - fmt: "text" (human readable) or "json" (one object per line)
+    - sample: {category: N} (see LogPolicy)
+    - dedup: Categories whose identical consecutive lines are collapsed
+    - dedup_seconds: Write a collapsed line again after this long
+    - asynchronous: Write from a background thread through a bounded queue (the trading
+      thread never waits for stdout); False writes inline (backtests)
+    - queue_size: Lines buffered before new ones are dropped
+    - stream: Output stream (default the current sys.stdout)
+    """
+    global _policy, _listener, _output
+    _policy = LogPolicy(
+        level=getattr(logging, str(level).upper(), logging.INFO),
+        sample=sample,
+        dedup=dedup,
+        dedup_seconds=dedup_seconds,
+    )
+    stop_logging()
+    output = StdoutHandler(stream)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    for handler in list(_logger.handlers):
+        _logger.removeHandler(handler)
+    _output = output
+    if asynchronous:
+        handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        _listener = QueueListener(handler.queue, output)
+        _listener.start()
+        _logger.addHandler(handler)
+    else:
+        _logger.addHandler(output)
+
+
+def set_log_stream(stream):
+    """
+    Send log output to `stream` (None = the current sys.stdout).
+    """
+    _output.stream = stream
+
+
+def flush_logs(timeout=5.0):
+    """
+    Block until every queued line has been written (no-op when logging inline).
+    """
+    if _listener is None:
+        return
+    deadline = time.monotonic() + timeout
+    while _listener.queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def stop_logging():
+    """
+    Write what is queued and stop the writer thread (registered with atexit).
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        for handler in list(_logger.handlers):
+            _logger.removeHandler(handler)
+        _logger.addHandler(_output)
+
+
+atexit.register(stop_logging)
@@ -1,29 +1,56 @@
+import logging
+import signal
 import time
-import traceback
 import random
 from collections import deque
+import numpy as np
+from src import logger
+from src.logger import log
 from src.utils import (
-    place_order,
     cancel_all_orders,
     cancel_list_of_orders,
     calculate_order_size,
     get_dynamic_sleep_time,
     get_dynamic_volatilit,
     calculate_order_sizes,
-    get_price_step_percentage,
     fetch_account_balance,
     calculate_percentage_change,
-    get_num_of_orders,
-    get_current_orders,
     get_order_book,
     get_buy_price_in_spread,
     get_sell_price_in_spread,
+    market_snapshot,
+    order_registry,
+    pair_rules,
+    phase_tracer,
+    prefetch_market_snapshot,
+    request_metrics,
+    request_scheduler,
+    resolve_order_routes,
+    fetch_mid_price,
+    open_state_store,
+    start_market_stream,
+    STATE_MAX_AGE_SECONDS,
+    tick_journal,
     pair,
     token_symbol,
 )
+from src.ladder_publisher import publish_ladder, is_order_success, order_id_from_response
+from src.ladder_reconciler import reconcile_ladder
+from src.ladder_builder import (
+    build_ladder,
+    consolidate_largest,
+    filter_levels,
+    level_pairs,
+    linear_prices,
+    make_levels,
+    scale_to_budget,
+    step_distances,
+)
+from src.open_orders import fetch_open_orders
+from src.event_scheduler import EventScheduler, WAKE_CONFIG
+from src.risk_watchdog import RiskWatchdog
+from src.request_scheduler import PRIORITY_RISK
 
-buy_order_ids = []
-sell_order_ids = []
 SYMBOL = pair  # Use the pair from utils.py
 
 # Track iterations for adaptive pricing (gradual spread narrowing)
@@ -79,6 +106,20 @@ def market_making(
     inventory_reduce_scale=0.5,  # Reduce depth by this when one side > 65%
     anti_snipe_max_fills_in_30s=3,
     anti_snipe_cooldown_seconds=300,
+    # Ladder publication
+    ladder_max_in_flight=8,  # Maximum orders being placed concurrently
+    # Diff-based requoting (adjustments and reference price modes)
+    enable_diff_requote=True,  # Keep resting orders that already match the target ladder
+    requote_price_tolerance_pct=0.05,  # Requote a level only if its price is off by more than this %
+    requote_size_tolerance_pct=10.0,  # ...or its remaining size is off by more than this %
+    # Streaming market data
+    enable_market_stream=True,  # WebSocket depth/trade/order-update feeds (REST polling when down)
+    event_driven_loop=True,  # Wake before the refresh deadline on a mid move > reprice_move_pct, a fill or a risk trigger
+    # Risk watchdog (adjustments mode): kill-switch evaluated on its own thread
+    enable_risk_watchdog=True,  # Sample the mid every risk_watchdog_interval_seconds and cancel/pause immediately
+    risk_watchdog_interval_seconds=1.0,
+    # Hot reload: ConfigWatcher whose BotConfig replaces the settings above when .env changes
+    config_watcher=None,
 ):
     global SYMBOL, unfilled_iterations, _price_history, _fill_timestamps  # Declare global at function level
     
@@ -87,60 +128,60 @@ def market_making(
     MAX_BUY_PRICE = max_buy_price if max_buy_price and max_buy_price > 0 else None
     
     if MAX_BUY_PRICE:
-        print(f"[MAX_BUY_PRICE] Maximum buy price limit: {MAX_BUY_PRICE:.6f} USDT")
+        log("[MAX_BUY_PRICE] Maximum buy price limit: %.6f USDT", MAX_BUY_PRICE)
     else:
-        print("[MAX_BUY_PRICE] Maximum buy price limit: DISABLED")
+        log("[MAX_BUY_PRICE] Maximum buy price limit: DISABLED")
     
     # REFERENCE PRICE MODE: Price bands based on reference price
     if enable_reference_price_mode and reference_price:
-        print(f"[REFERENCE_PRICE] Mode: ENABLED")
-        print(f"[REFERENCE_PRICE] Reference Price: {reference_price:.6f}")
-        print()
-        print(f"[REFERENCE_PRICE] Buy Band: {reference_price * 0.99:.6f} to {reference_price * 0.999:.6f} (-1% band, safety buffer)")
-        print(f"[REFERENCE_PRICE] Sell Band: {reference_price * 1.001:.6f} to {reference_price * 1.01:.6f} (+1% band, safety buffer)")
-        print()
-        print(f"[REFERENCE_PRICE] Orders per side: {orders_per_side}")
-        print(f"[REFERENCE_PRICE] Value per side: {order_value_per_side} USDT")
+        log("[REFERENCE_PRICE] Mode: ENABLED")
+        log("[REFERENCE_PRICE] Reference Price: %.6f", reference_price)
+        log("[REFERENCE_PRICE] Buy Band: %.6f to %.6f (-1%% band, safety buffer)", reference_price * 0.99, reference_price * 0.999)
+        log("[REFERENCE_PRICE] Sell Band: %.6f to %.6f (+1%% band, safety buffer)", reference_price * 1.001, reference_price * 1.01)
+        log("[REFERENCE_PRICE] Orders per side: %s", orders_per_side)
+        log("[REFERENCE_PRICE] Value per side: %s USDT", order_value_per_side)
         if ladder_order_sizes:
-            print()
-            print(f"[REFERENCE_PRICE] Ladder sizes (per side, USDT):")
-            print(f"[REFERENCE_PRICE] {ladder_order_sizes}")
+            log("[REFERENCE_PRICE] Ladder sizes (per side, USDT):")
+            log("[REFERENCE_PRICE] %s", ladder_order_sizes)
     else:
         enable_reference_price_mode = False
 
     # Adjustments mode (adjustments.md): mid-based ±1% ladder, 0.8% spread, protections
     if enable_adjustments_mode:
-        print(f"[ADJUSTMENTS] Mode: ENABLED (mid-based ±1% ladder)")
-        print(f"[ADJUSTMENTS] Target depth per side: {target_depth_per_side} USDT | Levels per side: {levels_per_side}")
-        print(f"[ADJUSTMENTS] Best spread: {best_spread_side_pct}% each side ({best_spread_side_pct*2}% total)")
-        print(f"[ADJUSTMENTS] Refresh: {refresh_seconds_min}-{refresh_seconds_max}s + ±{refresh_random_seconds}s")
-        print(f"[ADJUSTMENTS] Reprice on move: {reprice_move_pct}% | Volatility pause: 2%/1m→{volatility_pause_2pct_60s_minutes}m, 5%/5m→{volatility_pause_5pct_5m_minutes}m")
-        print(f"[ADJUSTMENTS] Spread guard: >{spread_guard_threshold_pct}% for {spread_guard_duration_seconds}s → rebuild at {spread_guard_rebuild_spread_pct}%")
-        print(f"[ADJUSTMENTS] Inventory guard: reduce side when >{inventory_guard_max_side_pct}% | Anti-snipe: >{anti_snipe_max_fills_in_30s} fills/30s → pause {anti_snipe_cooldown_seconds}s")
+        log("[ADJUSTMENTS] Mode: ENABLED (mid-based ±1% ladder)")
+        log("[ADJUSTMENTS] Target depth per side: %s USDT | Levels per side: %s", target_depth_per_side, levels_per_side)
+        log("[ADJUSTMENTS] Best spread: %s%% each side (%s%% total)", best_spread_side_pct, best_spread_side_pct*2)
+        log("[ADJUSTMENTS] Refresh: %s-%ss + ±%ss", refresh_seconds_min, refresh_seconds_max, refresh_random_seconds)
+        log("[ADJUSTMENTS] Reprice on move: %s%% | Volatility pause: 2%%/1m→%sm, 5%%/5m→%sm", reprice_move_pct, volatility_pause_2pct_60s_minutes, volatility_pause_5pct_5m_minutes)
+        log("[ADJUSTMENTS] Spread guard: >%s%% for %ss → rebuild at %s%%", spread_guard_threshold_pct, spread_guard_duration_seconds, spread_guard_rebuild_spread_pct)
+        log("[ADJUSTMENTS] Inventory guard: reduce side when >%s%% | Anti-snipe: >%s fills/30s → pause %ss", inventory_guard_max_side_pct, anti_snipe_max_fills_in_30s, anti_snipe_cooldown_seconds)
     else:
         enable_adjustments_mode = False
 
-    print("=" * 60)
-    print("Market Making Bot Starting...")
-    print(f"Trading Pair: {SYMBOL}")
-    print(f"Token Symbol: {token_symbol}")
+    log("=" * 60)
+    log("Market Making Bot Starting...")
+    log("Trading Pair: %s", SYMBOL)
+    log("Token Symbol: %s", token_symbol)
     if compliance_mode:
-        print(f"Compliance Mode: ENABLED (LBank requirement: {compliance_min_usdt}-{compliance_max_usdt} USDT within ±1%)")
-        print(f"Number of Positions: Concentrated within ±1% range")
+        log("Compliance Mode: ENABLED (LBank requirement: %s-%s USDT within ±1%%)", compliance_min_usdt, compliance_max_usdt)
+        log("Number of Positions: Concentrated within ±1% range")
     else:
-        print(f"Number of Positions: {num_orders} (per side)")
-        print(f"Order Distance Range: 0.25% - 10% from market price")
-        print(f"Max Order Size: {max_order_size} tokens")
-        print(f"Min Order Size: {min_order_size} tokens")
-        print(f"Safety Features:")
-        print(f"  - Max Spread: {max_spread_pct}% (skip if exceeded)")
-        print(f"  - Max Loss: {max_loss_pct}% (stop if exceeded)")
-        print(f"  - Max Exposure: {max_exposure_pct}% of balance")
-        print(f"  - Wide Spread Protection: {'Enabled' if reduce_distance_on_wide_spread else 'Disabled'}")
-        print("=" * 60)
+        log("Number of Positions: %s (per side)", num_orders)
+        log("Order Distance Range: 0.25% - 10% from market price")
+        log("Max Order Size: %s tokens", max_order_size)
+        log("Min Order Size: %s tokens", min_order_size)
+        log("Safety Features:")
+        log("  - Max Spread: %s%% (skip if exceeded)", max_spread_pct)
+        log("  - Max Loss: %s%% (stop if exceeded)", max_loss_pct)
+        log("  - Max Exposure: %s%% of balance", max_exposure_pct)
+        log("  - Wide Spread Protection: %s", "Enabled" if reduce_distance_on_wide_spread else "Disabled")
+        log("=" * 60)
     
+    # Replaced by the real checkpoint once the loop state exists
+    checkpoint_state = lambda: None
+
     try:
-        print("\n[INIT] Fetching initial account balance...")
+        log("\n[INIT] Fetching initial account balance...")
         initial_balance = fetch_account_balance()
         initial_usdt_balance = (
             initial_balance["usdt"]["free"] + initial_balance["usdt"]["locked"]
@@ -167,10 +208,35 @@ def market_making(
         except:
             initial_total_balance_usdt = initial_usdt_balance  # Fallback if price fetch fails
         
-        print(f"[INIT] Initial USDT Balance: {initial_usdt_balance:.2f} USDT")
-        print(f"[INIT] Initial {token_symbol.upper()} Balance: {initial_token_balance:.2f} {token_symbol.upper()}")
-        print(f"[INIT] Initial Total Balance: {initial_total_balance_usdt:.2f} USDT")
-        print("\n[INFO] Bot is now running. Press Ctrl+C to stop.\n")
+        log("[INIT] Initial USDT Balance: %.2f USDT", initial_usdt_balance)
+        log("[INIT] Initial %s Balance: %.2f %s", token_symbol.upper(), initial_token_balance, token_symbol.upper())
+        log("[INIT] Initial Total Balance: %.2f USDT", initial_total_balance_usdt)
+        
+        # Resolve endpoint/symbol formats once so the hot path doesn't retry combinations
+        resolve_order_routes(SYMBOL)
+        stream = start_market_stream(SYMBOL) if enable_market_stream else None
+        stream_was_live = False
+        # Waits between iterations end early on market events (plain sleeps when disabled)
+        scheduler = EventScheduler(stream=stream, reprice_move_pct=reprice_move_pct, enabled=event_driven_loop)
+        # Volatility kill-switch on its own thread: cancels and pauses without waiting for the loop
+        risk_watchdog = None
+        if enable_adjustments_mode and enable_risk_watchdog:
+            risk_watchdog = RiskWatchdog(
+                SYMBOL,
+                sample_mid=fetch_mid_price,
+                cancel_all=lambda symbol: cancel_all_orders(symbol, priority=PRIORITY_RISK),
+                on_trigger=scheduler.notify,
+                interval_seconds=risk_watchdog_interval_seconds,
+                pause_2pct_60s_minutes=volatility_pause_2pct_60s_minutes,
+                pause_5pct_5m_minutes=volatility_pause_5pct_5m_minutes,
+            )
+            risk_watchdog.start()
+            log("[RISK] Watchdog sampling mid every %ss (2%%/60s, 5%%/5min kill-switch)", risk_watchdog_interval_seconds)
+        # Settings edited in .env while running are applied at the start of the next tick
+        config_version = config_watcher.version if config_watcher is not None else None
+        if config_watcher is not None:
+            config_watcher.on_change = lambda changes: scheduler.notify(WAKE_CONFIG)
+        log("\n[INFO] Bot is now running. Press Ctrl+C to stop.\n")
 
         iteration = 0
         # Adjustments mode state (persists across iterations)
@@ -180,18 +246,190 @@ def market_making(
         cooldown_until = 0.0  # Anti-snipe: no place until this timestamp
         use_temporary_wide_spread = False  # Spread guard: use 1.2% until next cycle
 
+        state_store = open_state_store()
+        # Warm restart: continue from the last checkpoint (counters, pauses, history, starting
+        # balances) and adopt the orders still resting on the book instead of rebuilding it.
+        # The first tick's open-order query checks the adopted orders against the live book.
+        if state_store is not None:
+            saved, saved_at = state_store.load()
+            saved_age = time.time() - saved_at if saved_at else None
+            if saved_age is None:
+                log("[STATE] No saved state, starting cold")
+            elif saved.get("meta", {}).get("symbol") != SYMBOL:
+                log("[STATE] Saved state is for %s, starting cold", saved.get("meta", {}).get("symbol"))
+            elif saved_age > STATE_MAX_AGE_SECONDS:
+                log("[STATE] Saved state is %.0f min old (> %.0f min), starting cold", saved_age / 60, STATE_MAX_AGE_SECONDS / 60)
+            else:
+                loop_state = saved.get("loop", {})
+                iteration = saved["meta"].get("iteration", 0)
+                unfilled_iterations = loop_state.get("unfilled_iterations", 0)
+                last_ladder_mid = loop_state.get("last_ladder_mid")
+                pause_until = loop_state.get("pause_until", 0.0)
+                spread_wide_since = loop_state.get("spread_wide_since")
+                cooldown_until = loop_state.get("cooldown_until", 0.0)
+                use_temporary_wide_spread = loop_state.get("use_temporary_wide_spread", False)
+                _price_history.extend(tuple(sample) for sample in saved.get("price_history", []))
+                _fill_timestamps.extend(saved.get("fill_timestamps", []))
+                if risk_watchdog is not None and pause_until > time.time():
+                    risk_watchdog.hold_until(pause_until)
+                # Loss and balance-change tracking keep measuring from the original start
+                saved_balance = saved.get("initial_balance")
+                if saved_balance:
+                    initial_usdt_balance = saved_balance["usdt"]
+                    initial_token_balance = saved_balance["token"]
+                    initial_total_balance_usdt = saved_balance["total_usdt"]
+                adopted = order_registry.restore(saved.get("orders", []))
+                log("[STATE] Warm start from a checkpoint %.0fs old (iteration %s): adopting %s resting orders", saved_age, iteration, adopted)
+                if pause_until > time.time():
+                    log("[STATE] Kill-switch pause still active for %.1f min", (pause_until - time.time()) / 60)
+                if cooldown_until > time.time():
+                    log("[STATE] Anti-snipe cooldown still active for %.0fs", cooldown_until - time.time())
+
+        def checkpoint_state():
+            # Saved at the start of every tick and on shutdown; unchanged parts are not rewritten
+            if state_store is None:
+                return
+            try:
+                state_store.save({
+                    "meta": {"symbol": SYMBOL, "iteration": iteration},
+                    "loop": {
+                        "unfilled_iterations": unfilled_iterations,
+                        "last_ladder_mid": last_ladder_mid,
+                        "pause_until": pause_until,
+                        "spread_wide_since": spread_wide_since,
+                        "cooldown_until": cooldown_until,
+                        "use_temporary_wide_spread": use_temporary_wide_spread,
+                    },
+                    "price_history": list(_price_history),
+                    "fill_timestamps": list(_fill_timestamps),
+                    "initial_balance": {
+                        "usdt": initial_usdt_balance,
+                        "token": initial_token_balance,
+                        "total_usdt": initial_total_balance_usdt,
+                    },
+                    "orders": order_registry.orders(),
+                })
+            except Exception as e:
+                log("[STATE] Checkpoint failed: %s", e)
+
+        # docker stop / a restart from the web UI: save state and leave the book in place for the next start
+        def on_sigterm(signum, frame):
+            checkpoint_state()
+            log("\n[STOP] SIGTERM received: state saved, orders left on the book for the next start")
+            raise SystemExit(0)
+
+        def end_tick(outcome):
+            # The tick is over (the loop sleeps next): active time for /metrics, spans for the phase
+            # trace, the record for the tick journal
+            request_metrics.end_iteration(failed=outcome == "error")
+            phase_tracer.end_tick(outcome)
+            tick_journal.end_tick(outcome)
+
+        if state_store is not None:
+            try:
+                signal.signal(signal.SIGTERM, on_sigterm)
+            except ValueError:
+                pass  # Not on the main thread (e.g. embedded in a test harness)
+
         while True:
             iteration += 1
+            # Log sampling keeps or drops whole ticks, and JSON lines carry the iteration
+            logger.context["iteration"] = iteration
+            # Active time of the tick (until the loop starts sleeping) for /metrics and the phase trace
+            request_metrics.begin_iteration()
+            phase_tracer.begin_tick(iteration)
+            tick_journal.begin_tick(iteration)
+            phase_tracer.phase("setup")
             try:
-                print(f"\n[ITERATION {iteration}] Fetching market data...")
+                # Hot reload: swap in the settings from the latest config (one object, read once per tick)
+                if config_watcher is not None and config_watcher.version != config_version:
+                    config_version = config_watcher.version
+                    cfg = config_watcher.config
+                    compliance_mode = cfg.compliance_mode
+                    max_spread_pct = cfg.max_spread_pct
+                    max_loss_pct = cfg.max_loss_pct
+                    max_exposure_pct = cfg.max_exposure_pct
+                    reduce_distance_on_wide_spread = cfg.reduce_distance_on_wide_spread
+                    wide_spread_threshold = cfg.wide_spread_threshold
+                    enable_adaptive_pricing = cfg.enable_adaptive_pricing
+                    tightening_rate = cfg.tightening_rate
+                    tightening_trigger = cfg.tightening_trigger
+                    MAX_BUY_PRICE = cfg.max_buy_price
+                    if cfg.reference_price:
+                        reference_price = cfg.reference_price
+                    order_value_per_side = cfg.order_value_per_side
+                    orders_per_side = cfg.orders_per_side
+                    ladder_order_sizes = list(cfg.ladder_order_sizes) if cfg.ladder_order_sizes else None
+                    min_random_delay = cfg.min_random_delay
+                    max_random_delay = cfg.max_random_delay
+                    target_depth_per_side = cfg.target_depth_per_side
+                    levels_per_side = cfg.levels_per_side
+                    best_spread_side_pct = cfg.best_spread_side_pct
+                    refresh_seconds_min = cfg.refresh_seconds_min
+                    refresh_seconds_max = cfg.refresh_seconds_max
+                    refresh_random_seconds = cfg.refresh_random_seconds
+                    reprice_on_move = cfg.reprice_on_move
+                    reprice_move_pct = cfg.reprice_move_pct
+                    volatility_pause_2pct_60s_minutes = cfg.volatility_pause_2pct_60s_minutes
+                    volatility_pause_5pct_5m_minutes = cfg.volatility_pause_5pct_5m_minutes
+                    spread_guard_threshold_pct = cfg.spread_guard_threshold_pct
+                    spread_guard_duration_seconds = cfg.spread_guard_duration_seconds
+                    spread_guard_rebuild_spread_pct = cfg.spread_guard_rebuild_spread_pct
+                    inventory_guard_max_side_pct = cfg.inventory_guard_max_side_pct
+                    inventory_reduce_scale = cfg.inventory_reduce_scale
+                    anti_snipe_max_fills_in_30s = cfg.anti_snipe_max_fills_in_30s
+                    anti_snipe_cooldown_seconds = cfg.anti_snipe_cooldown_seconds
+                    ladder_max_in_flight = cfg.ladder_max_in_flight
+                    enable_diff_requote = cfg.enable_diff_requote
+                    requote_price_tolerance_pct = cfg.requote_price_tolerance_pct
+                    requote_size_tolerance_pct = cfg.requote_size_tolerance_pct
+                    # Long-lived helpers built from the old values
+                    scheduler.reprice_move_pct = reprice_move_pct
+                    if risk_watchdog is not None:
+                        risk_watchdog.pause_2pct_60s_minutes = volatility_pause_2pct_60s_minutes
+                        risk_watchdog.pause_5pct_5m_minutes = volatility_pause_5pct_5m_minutes
+                    log("[CONFIG] Applied settings version %s", config_version)
+
+                checkpoint_state()
+                # New tick: every utils helper re-reads the exchange at most once from here on
+                market_snapshot.begin_tick()
+                log("\n[ITERATION %d] Fetching market data...", iteration)
+                # Requests that had to queue for a rate-limit token since the last tick
+                rate_summary = request_scheduler.summary()
+                if rate_summary:
+                    log("[RATE] %s", rate_summary)
+                # Tick size, lot size and minimums for this pair (cached, reloaded every few hours)
+                order_rules = pair_rules.rules(SYMBOL)
+                phase_tracer.phase("stream")
+                if stream is not None:
+                    # Events pushed since the last tick (fills are already in order_registry)
+                    stream_events = stream.drain_events()
+                    stream_fills = [e for e in stream_events if e["type"] == "fill"]
+                    stream_live = stream.is_live()
+                    tick_journal.flag("stream_live", stream_live)
+                    if stream_live:
+                        price_updates = sum(1 for e in stream_events if e["type"] == "price")
+                        log("[STREAM] Live: %s price updates, %s fills since last tick", price_updates, len(stream_fills))
+                    elif stream_was_live:
+                        log("[STREAM] Stream down or stale, falling back to REST polling")
+                    for fill in stream_fills:
+                        log("[STREAM] Fill: %s %.2f @ %.6f (order %s)", fill["side"], fill["qty"], fill["price"], fill["order_id"])
+                    stream_was_live = stream_live
+                # State is read from here on: only newer events should cut the next wait short
+                scheduler.reset()
+                # Book ticker, balances, open orders and klines in one concurrent round trip
+                phase_tracer.phase("fetch_book")
+                prefetch_market_snapshot(SYMBOL)
                 order_book = get_order_book(SYMBOL)
                 
                 # Validate order book response
                 if not order_book:
-                    print("[WARNING] Failed to get order book, skipping this iteration")
+                    log("[WARNING] Failed to get order book, skipping this iteration")
+                    end_tick("skipped")
                     time.sleep(get_dynamic_sleep_time(0.01))
                     continue
 
+                phase_tracer.phase("balances")
                 balance = fetch_account_balance()
                 usdt_free = balance["usdt"]["free"]
                 usdt_locked = balance["usdt"]["locked"]
@@ -199,6 +437,7 @@ def market_making(
                 token_free = balance[token_symbol]["free"]
                 token_locked = balance[token_symbol]["locked"]
                 token_total = token_free + token_locked
+                tick_journal.set(usdt_free=usdt_free, usdt_locked=usdt_locked, token_free=token_free, token_locked=token_locked)
 
                 usdt_change = calculate_percentage_change(
                     initial_usdt_balance, usdt_total
@@ -207,12 +446,12 @@ def market_making(
                     initial_token_balance, token_total
                 )
                 
-                print(f"[BALANCE] USDT: {usdt_free:.2f} free, {usdt_locked:.2f} locked, {usdt_total:.2f} total (Change: {usdt_change:+.2f}%)")
-                print(f"[BALANCE] {token_symbol.upper()}: {token_free:.2f} free, {token_locked:.2f} locked, {token_total:.2f} total (Change: {token_change:+.2f}%)")
+                log("[BALANCE] USDT: %.2f free, %.2f locked, %.2f total (Change: %+.2f%%)", usdt_free, usdt_locked, usdt_total, usdt_change)
+                log("[BALANCE] %s: %.2f free, %.2f locked, %.2f total (Change: %+.2f%%)", token_symbol.upper(), token_free, token_locked, token_total, token_change)
                 
                 # Warn if USDT is decreasing significantly
                 if usdt_change < -1.0:  # More than 1% decrease
-                    print(f"[WARNING] ⚠ USDT balance decreased by {abs(usdt_change):.2f}% - check if buy orders are filling without matching sells")
+                    log("[WARNING] ⚠ USDT balance decreased by %.2f%% - check if buy orders are filling without matching sells", abs(usdt_change))
 
                 # Initialize pause flags
                 usdt_pause = False
@@ -229,6 +468,8 @@ def market_making(
                     usdt_pause = False
                 if token_change > -1:
                     token_pause = False
+                tick_journal.flag("usdt_pause", usdt_pause)
+                tick_journal.flag("token_pause", token_pause)
 
                 # Check if order book response is valid
                 result = order_book.get("result")
@@ -236,7 +477,8 @@ def market_making(
                     # Example of data: {'symbol': 'safi_usdt', 'askPrice': '0.055', 'askQty': '78.43', 'bidQty': '724.1', 'bidPrice': '0.054761'
                     data = order_book.get("data", {})
                     if not data:
-                        print("No data in order book response, skipping this iteration")
+                        log("No data in order book response, skipping this iteration")
+                        end_tick("skipped")
                         time.sleep(get_dynamic_sleep_time(0.01))
                         continue
                     
@@ -252,13 +494,15 @@ def market_making(
                     ask_price = float(data.get("askPrice", 0))
                     
                     if bid_price == 0 or ask_price == 0:
-                        print("[WARNING] Invalid bid/ask prices, skipping this iteration")
+                        log("[WARNING] Invalid bid/ask prices, skipping this iteration")
+                        end_tick("skipped")
                         time.sleep(get_dynamic_sleep_time(0.01))
                         continue
 
                     spread_pct = ((ask_price - bid_price) / bid_price) * 100
                     mid_price = (bid_price + ask_price) / 2
-                    print(f"[MARKET] Bid: {bid_price:.6f} | Ask: {ask_price:.6f} | Spread: {spread_pct:.3f}%")
+                    tick_journal.set(bid=bid_price, ask=ask_price)
+                    log("[MARKET] Bid: %.6f | Ask: %.6f | Spread: %.3f%%", bid_price, ask_price, spread_pct)
                     
                     # Price history for adjustments mode (volatility kill-switch)
                     if enable_adjustments_mode:
@@ -270,110 +514,100 @@ def market_making(
                     # SAFETY FEATURE 1: Spread validation - skip trading if spread too wide
                     # BUT: In wide spreads, we can still trade to help narrow it (market making mode)
                     if spread_pct > max_spread_pct:
-                        print(f"[SAFETY] ⚠ Spread very wide ({spread_pct:.2f}% > {max_spread_pct}%)")
-                        print(f"[SAFETY] Continuing to trade to help narrow spread (market making mode)")
+                        log("[SAFETY] ⚠ Spread very wide (%.2f%% > %s%%)", spread_pct, max_spread_pct)
+                        log("[SAFETY] Continuing to trade to help narrow spread (market making mode)")
                         # Don't skip - continue trading to provide liquidity and narrow spread
 
                     # Calculate market volatility
-                    print("[CALC] Calculating market volatility...")
+                    phase_tracer.phase("volatility")
+                    log("[CALC] Calculating market volatility...", level=logging.DEBUG)
                     current_volatility = get_dynamic_volatilit(60)
-                    print(f"[CALC] Current Volatility: {current_volatility:.4f}")
+                    tick_journal.set(volatility=current_volatility)
+                    log("[CALC] Current Volatility: %.4f", current_volatility)
 
                     # Dynamic Spread: More sophisticated and responsive strategy that adapts to market volatility.
                     # spread = calculate_dynamic_spread(current_volatility)
                     spread = 0.01
                     base_buy_price = bid_price * (1 - spread)
                     base_sell_price = ask_price * (1 + spread)
-                    print(f"[PRICE] Base Buy Price: {base_buy_price:.6f} | Base Sell Price: {base_sell_price:.6f}")
+                    log("[PRICE] Base Buy Price: %.6f | Base Sell Price: %.6f", base_buy_price, base_sell_price)
 
                     # Check if there are existing orders BEFORE cancelling (for adaptive pricing tracking)
-                    print("[ORDERS] Checking existing orders...")
-                    current_orders_number = get_num_of_orders(SYMBOL)
-                    print(f"[ORDERS] Found {current_orders_number} existing orders")
+                    # One paginated fetch per tick: count, fills, depth and order IDs all come from it
+                    phase_tracer.phase("open_orders")
+                    log("[ORDERS] Checking existing orders...", level=logging.DEBUG)
+                    open_orders = fetch_open_orders(SYMBOL, registry=order_registry)
+                    current_orders_number = open_orders.count
+                    if open_orders.pages > 1:
+                        log("[ORDERS] Found %s existing orders (%s pages)", current_orders_number, open_orders.pages)
+                    else:
+                        log("[ORDERS] Found %s existing orders", current_orders_number)
                     
                     # Check order status to detect filled orders BEFORE cancelling
                     # Also check for buy orders above MAX_BUY_PRICE to cancel them
                     # Also compute open order depth (USDT) per side for depth-balance check
-                    filled_buy_value = 0.0
-                    filled_sell_value = 0.0
-                    filled_buy_qty = 0.0
-                    filled_sell_qty = 0.0
+                    phase_tracer.phase("fill_detection")
+                    filled_buy_value = open_orders.filled_buy_value
+                    filled_sell_value = open_orders.filled_sell_value
+                    filled_buy_qty = open_orders.filled_buy_qty
+                    filled_sell_qty = open_orders.filled_sell_qty
                     cancelled_orders = 0
                     buy_orders_above_limit = []  # Store order IDs to cancel
-                    open_buy_depth_usdt = 0.0
-                    open_sell_depth_usdt = 0.0
+                    open_buy_depth_usdt = open_orders.buy_depth_usdt
+                    open_sell_depth_usdt = open_orders.sell_depth_usdt
+                    live_orders = []  # Open orders (parsed) for diff-based requoting
+                    tick_journal.set(
+                        open_orders=current_orders_number,
+                        filled_buy_qty=filled_buy_qty,
+                        filled_sell_qty=filled_sell_qty,
+                        filled_buy_value=filled_buy_value,
+                        filled_sell_value=filled_sell_value,
+                    )
                     
                     if current_orders_number > 0:
                         try:
-                            orders_response = get_current_orders(SYMBOL)
-                            if orders_response and (orders_response.get("result") == "true" or orders_response.get("result") is True):
-                                data = orders_response.get("data", {})
-                                orders = data.get("orders", []) if isinstance(data, dict) else []
-                                
-                                for order in orders:
-                                    if isinstance(order, dict):
-                                        executed_qty = float(order.get("executedQty", 0) or 0)
-                                        orig_qty = float(order.get("origQty", 0) or 0)
-                                        price = float(order.get("price", 0) or 0)
-                                        trade_type = order.get("tradeType", "").lower()
-                                        status = order.get("status", 0)
-                                        order_id = order.get("orderId") or order.get("order_id")
-                                        remaining_qty = orig_qty - executed_qty if orig_qty >= executed_qty else 0.0
-                                        
-                                        # Check if order was filled (executedQty > 0 or status indicates fill)
-                                        if executed_qty > 0:
-                                            if "buy" in trade_type:
-                                                filled_buy_qty += executed_qty
-                                                filled_buy_value += executed_qty * price
-                                            elif "sell" in trade_type:
-                                                filled_sell_qty += executed_qty
-                                                filled_sell_value += executed_qty * price
-                                        # Open order depth: remaining size * price (for depth-balance check)
-                                        if remaining_qty > 0 and price > 0:
-                                            if "buy" in trade_type:
-                                                open_buy_depth_usdt += remaining_qty * price
-                                            elif "sell" in trade_type:
-                                                open_sell_depth_usdt += remaining_qty * price
-                                        if orig_qty > 0 and remaining_qty <= 0:
-                                            pass  # fully filled, not open
-                                        elif orig_qty > 0:
-                                            # Check if this is a buy order above MAX_BUY_PRICE (if enabled)
-                                            if MAX_BUY_PRICE and "buy" in trade_type and price > MAX_BUY_PRICE:
-                                                if order_id:
-                                                    buy_orders_above_limit.append(order_id)
-                                                    print(f"[MAX_PRICE] Found buy order above {MAX_BUY_PRICE}: Order ID {order_id}, Price: {price:.6f}")
-                                            # Order exists but not filled - will be cancelled
-                                            cancelled_orders += 1
+                            # Orders exist but not (fully) filled - will be cancelled or requoted
+                            cancelled_orders = order_registry.count()
+                            # Check for buy orders above MAX_BUY_PRICE (if enabled)
+                            if MAX_BUY_PRICE:
+                                buy_orders_above_limit = order_registry.ids_above("buy", MAX_BUY_PRICE)
+                                for order_id in buy_orders_above_limit:
+                                    price = order_registry.get(order_id)["price"]
+                                    log("[MAX_PRICE] Found buy order above %s: Order ID %s, Price: %.6f", MAX_BUY_PRICE, order_id, price)
                             
                             # Cancel buy orders above MAX_BUY_PRICE (if enabled)
                             if MAX_BUY_PRICE and buy_orders_above_limit:
-                                print(f"[MAX_PRICE] Cancelling {len(buy_orders_above_limit)} buy orders above {MAX_BUY_PRICE} USDT...")
-                                cancel_result = cancel_list_of_orders(SYMBOL, buy_orders_above_limit)
-                                print(f"[MAX_PRICE] Cancelled buy orders above {MAX_BUY_PRICE} USDT")
+                                log("[MAX_PRICE] Cancelling %s buy orders above %s USDT...", len(buy_orders_above_limit), MAX_BUY_PRICE)
+                                cancel_result = cancel_list_of_orders(SYMBOL, buy_orders_above_limit, max_in_flight=ladder_max_in_flight)
+                                log("[MAX_PRICE] Cancelled %s buy orders above %s USDT", len(cancel_result.cancelled), MAX_BUY_PRICE)
+                                for order_id, error in cancel_result.failed.items():
+                                    log("[MAX_PRICE] Could not cancel order %s: %s", order_id, error)
+                            live_orders = order_registry.orders()
                             
                             if filled_buy_qty > 0 or filled_sell_qty > 0:
-                                print(f"[FILLED] ⚠ Orders filled this iteration:")
+                                log("[FILLED] ⚠ Orders filled this iteration:")
                                 if filled_buy_qty > 0:
-                                    print(f"[FILLED]   Buy: {filled_buy_qty:.2f} tokens (~{filled_buy_value:.2f} USDT)")
+                                    log("[FILLED]   Buy: %.2f tokens (~%.2f USDT)", filled_buy_qty, filled_buy_value)
                                 if filled_sell_qty > 0:
-                                    print(f"[FILLED]   Sell: {filled_sell_qty:.2f} tokens (~{filled_sell_value:.2f} USDT)")
-                                print(f"[FILLED]   Net USDT change: {filled_sell_value - filled_buy_value:.2f} USDT")
+                                    log("[FILLED]   Sell: %.2f tokens (~%.2f USDT)", filled_sell_qty, filled_sell_value)
+                                log("[FILLED]   Net USDT change: %.2f USDT", filled_sell_value - filled_buy_value)
                         except Exception as e:
-                            print(f"[WARNING] Could not check order fill status: {e}")
+                            log("[WARNING] Could not check order fill status: %s", e)
                     
                     # Track unfilled orders for adaptive pricing BEFORE cancelling
                     if enable_adaptive_pricing:
                         if current_orders_number > 0 and cancelled_orders > 0:
                             unfilled_iterations += 1
-                            print(f"[ADAPTIVE] Unfilled orders detected, iteration count: {unfilled_iterations}")
+                            log("[ADAPTIVE] Unfilled orders detected, iteration count: %s", unfilled_iterations)
                         else:
                             # Orders filled or no orders - reset counter
                             if unfilled_iterations > 0:
-                                print(f"[ADAPTIVE] Orders filled or none exist, resetting tightening counter")
+                                log("[ADAPTIVE] Orders filled or none exist, resetting tightening counter")
                             unfilled_iterations = 0
                     
                     # ---------- ADJUSTMENTS MODE (from adjustments.md) ----------
                     if enable_adjustments_mode:
+                        phase_tracer.phase("guards")
                         now_ts = time.time()
                         # Record fills for anti-snipe (once per iteration when any fill)
                         if filled_buy_qty > 0 or filled_sell_qty > 0:
@@ -383,7 +617,7 @@ def market_making(
                         if len(_fill_timestamps) > anti_snipe_max_fills_in_30s:
                             cooldown_until = now_ts + anti_snipe_cooldown_seconds
                             _fill_timestamps.clear()
-                            print(f"[ADJUSTMENTS] Anti-snipe: >{anti_snipe_max_fills_in_30s} fills in 30s → cooldown {anti_snipe_cooldown_seconds}s")
+                            log("[ADJUSTMENTS] Anti-snipe: >%s fills in 30s → cooldown %ss", anti_snipe_max_fills_in_30s, anti_snipe_cooldown_seconds, level=logging.WARNING)
                         
                         # Volatility kill-switch: check last 60s and 5min
                         if len(_price_history) >= 2:
@@ -394,46 +628,51 @@ def market_making(
                                 move_60 = (max(mids_60) - min(mids_60)) / min(mids_60) if min(mids_60) > 0 else 0
                                 if move_60 >= 0.02:
                                     pause_until = now_ts + (volatility_pause_2pct_60s_minutes * 60)
-                                    print(f"[ADJUSTMENTS] Volatility kill-switch: ≥2% move in 60s → pause {volatility_pause_2pct_60s_minutes} min")
+                                    log("[ADJUSTMENTS] Volatility kill-switch: ≥2%% move in 60s → pause %s min", volatility_pause_2pct_60s_minutes, level=logging.WARNING)
                             if recent_300:
                                 mids_300 = [m for _, m in recent_300]
                                 move_300 = (max(mids_300) - min(mids_300)) / min(mids_300) if min(mids_300) > 0 else 0
                                 if move_300 >= 0.05:
                                     pause_until = now_ts + (volatility_pause_5pct_5m_minutes * 60)
-                                    print(f"[ADJUSTMENTS] Volatility kill-switch: ≥5% move in 5min → pause {volatility_pause_5pct_5m_minutes} min")
+                                    log("[ADJUSTMENTS] Volatility kill-switch: ≥5%% move in 5min → pause %s min", volatility_pause_5pct_5m_minutes, level=logging.WARNING)
+                        
+                        # The watchdog may have paused us between iterations
+                        if risk_watchdog is not None:
+                            pause_until = max(pause_until, risk_watchdog.pause_until)
                         
                         # During volatility pause: cancel all, sleep, continue
                         if now_ts < pause_until:
+                            tick_journal.flag("volatility_pause")
                             if current_orders_number > 0:
-                                cancel_all_orders(SYMBOL)
-                                buy_order_ids.clear()
-                                sell_order_ids.clear()
+                                cancel_all_orders(SYMBOL, priority=PRIORITY_RISK)
                             remaining = pause_until - now_ts
                             sleep_adj = min(remaining, refresh_seconds_max + refresh_random_seconds)
-                            print(f"[ADJUSTMENTS] Volatility pause: sleeping {sleep_adj:.1f}s (pause for {remaining:.0f}s remaining)")
+                            log("[ADJUSTMENTS] Volatility pause: sleeping %.1fs (pause for %.0fs remaining)", sleep_adj, remaining)
+                            end_tick("paused")
                             time.sleep(sleep_adj)
                             continue
                         
                         # Spread guard: if spread > threshold for duration, use temporary wider spread
                         if spread_pct > spread_guard_threshold_pct:
+                            tick_journal.flag("spread_wide")
                             if spread_wide_since is None:
                                 spread_wide_since = now_ts
                             elif now_ts - spread_wide_since >= spread_guard_duration_seconds:
                                 use_temporary_wide_spread = True
                                 spread_wide_since = None
-                                print(f"[ADJUSTMENTS] Spread guard: spread >{spread_guard_threshold_pct}% for {spread_guard_duration_seconds}s → rebuild at {spread_guard_rebuild_spread_pct}%")
+                                log("[ADJUSTMENTS] Spread guard: spread >%s%% for %ss → rebuild at %s%%", spread_guard_threshold_pct, spread_guard_duration_seconds, spread_guard_rebuild_spread_pct, level=logging.WARNING)
                         else:
                             spread_wide_since = None
                             use_temporary_wide_spread = False
                         
                         # Anti-snipe cooldown: no new orders
                         if now_ts < cooldown_until:
+                            tick_journal.flag("cooldown")
                             if current_orders_number > 0:
                                 cancel_all_orders(SYMBOL)
-                                buy_order_ids.clear()
-                                sell_order_ids.clear()
                             sleep_adj = min(cooldown_until - now_ts, refresh_seconds_max + refresh_random_seconds)
-                            print(f"[ADJUSTMENTS] Anti-snipe cooldown: sleeping {sleep_adj:.1f}s")
+                            log("[ADJUSTMENTS] Anti-snipe cooldown: sleeping %.1fs", sleep_adj)
+                            end_tick("paused")
                             time.sleep(sleep_adj)
                             continue
                         
@@ -443,23 +682,26 @@ def market_making(
                         usdt_pct = 1.0 - token_pct
                         buy_scale = inventory_reduce_scale if token_pct > (inventory_guard_max_side_pct / 100.0) else 1.0
                         sell_scale = inventory_reduce_scale if usdt_pct > (inventory_guard_max_side_pct / 100.0) else 1.0
+                        tick_journal.flag("inventory_buy", buy_scale < 1.0)
+                        tick_journal.flag("inventory_sell", sell_scale < 1.0)
                         if buy_scale < 1.0 or sell_scale < 1.0:
-                            print(f"[ADJUSTMENTS] Inventory guard: token {token_pct*100:.1f}% / USDT {usdt_pct*100:.1f}% → buy_scale={buy_scale}, sell_scale={sell_scale}")
+                            log("[ADJUSTMENTS] Inventory guard: token %.1f%% / USDT %.1f%% → buy_scale=%s, sell_scale=%s", token_pct*100, usdt_pct*100, buy_scale, sell_scale)
                         
                         # 1) Depth balance: force rebuild if one side is > 5% stronger than the other
                         force_rebuild = False
                         if open_buy_depth_usdt > 0 or open_sell_depth_usdt > 0:
                             if open_buy_depth_usdt > open_sell_depth_usdt * 1.05 or open_sell_depth_usdt > open_buy_depth_usdt * 1.05:
                                 force_rebuild = True
-                                print(f"[ADJUSTMENTS] Depth balance: buy_depth={open_buy_depth_usdt:.0f} USDT, sell_depth={open_sell_depth_usdt:.0f} USDT → force rebuild (imbalance > 5%)")
+                                log("[ADJUSTMENTS] Depth balance: buy_depth=%.0f USDT, sell_depth=%.0f USDT → force rebuild (imbalance > 5%%)", open_buy_depth_usdt, open_sell_depth_usdt)
                         
                         # 2) Rebuild after any significant fill (price protection: rebuild both sides together)
                         filled_total_usdt = filled_buy_value + filled_sell_value
                         fill_threshold = max(50.0, target_depth_per_side * 0.10)
                         if filled_total_usdt >= fill_threshold:
                             force_rebuild = True
-                            print(f"[ADJUSTMENTS] Significant fill: {filled_total_usdt:.0f} USDT (≥ {fill_threshold:.0f}) → force rebuild")
+                            log("[ADJUSTMENTS] Significant fill: %.0f USDT (≥ %.0f) → force rebuild", filled_total_usdt, fill_threshold)
                         
+                        tick_journal.flag("force_rebuild", force_rebuild)
                         # Reprice on move: skip rebuild only if mid moved ≤ threshold, we have orders, and no force_rebuild
                         skip_rebuild = False
                         if not force_rebuild and reprice_on_move and last_ladder_mid is not None and current_orders_number > 0:
@@ -468,20 +710,23 @@ def market_making(
                                 skip_rebuild = True
                                 refresh_sleep = random.uniform(refresh_seconds_min, refresh_seconds_max) + random.uniform(-refresh_random_seconds, refresh_random_seconds)
                                 refresh_sleep = max(1, refresh_sleep)
-                                print(f"[ADJUSTMENTS] Reprice on move: mid moved {move_pct:.2f}% (≤{reprice_move_pct}%) → skip rebuild, sleep {refresh_sleep:.1f}s")
-                                time.sleep(refresh_sleep)
+                                log("[ADJUSTMENTS] Reprice on move: mid moved %.2f%% (≤%s%%) → skip rebuild, sleep %.1fs", move_pct, reprice_move_pct, refresh_sleep)
+                                end_tick("kept")
+                                scheduler.sleep(refresh_sleep, reference_mid=last_ladder_mid)
                                 continue
                         
-                        # Cancel all before rebuilding ladder
-                        if current_orders_number > 0:
+                        # Cancel all before rebuilding ladder (diff requoting reconciles against live orders instead)
+                        phase_tracer.phase("cancel")
+                        if current_orders_number > 0 and not enable_diff_requote:
                             cancel_all_orders(SYMBOL)
-                            buy_order_ids.clear()
-                            sell_order_ids.clear()
+                            live_orders = []
                         
                         # Build ±1% ladder from mid (adjustments.md)
+                        phase_tracer.phase("ladder_build")
                         low_bound = mid_price * 0.99
                         high_bound = mid_price * 1.01
                         if use_temporary_wide_spread:
+                            tick_journal.flag("wide_rebuild")
                             half_spread = (spread_guard_rebuild_spread_pct / 100.0) / 2
                             best_bid_adj = mid_price * (1 - half_spread)
                             best_ask_adj = mid_price * (1 + half_spread)
@@ -491,97 +736,120 @@ def market_making(
                             best_ask_adj = mid_price * (1 + best_spread_side_pct / 100.0)
                         
                         # 10 buy levels from best_bid down to low_bound, 10 sell from best_ask up to high_bound
-                        buy_prices_adj = []
-                        for i in range(levels_per_side):
-                            progress = i / (levels_per_side - 1) if levels_per_side > 1 else 0
-                            p = best_bid_adj - (best_bid_adj - low_bound) * progress
-                            buy_prices_adj.append(round(p, 5))
-                        sell_prices_adj = []
-                        for i in range(levels_per_side):
-                            progress = i / (levels_per_side - 1) if levels_per_side > 1 else 0
-                            p = best_ask_adj + (high_bound - best_ask_adj) * progress
-                            sell_prices_adj.append(round(p, 5))
+                        price_decimals = order_rules.price_decimals if order_rules.price_decimals is not None else 5
+                        buy_prices_adj = linear_prices(best_bid_adj, low_bound, levels_per_side, decimals=price_decimals)
+                        sell_prices_adj = linear_prices(best_ask_adj, high_bound, levels_per_side, decimals=price_decimals)
                         
                         depth_per_level_buy_usdt = (target_depth_per_side * buy_scale) / levels_per_side
                         depth_per_level_sell_usdt = (target_depth_per_side * sell_scale) / levels_per_side
-                        min_tokens_per_order = 10.0  # adjustments.md: ≥ 10 ACCES
-                        buy_sizes_adj = [max(min_tokens_per_order, depth_per_level_buy_usdt / p) for p in buy_prices_adj]
-                        sell_sizes_adj = [max(min_tokens_per_order, depth_per_level_sell_usdt / p) for p in sell_prices_adj]
-                        
-                        # 3) Prevent accumulation at same price: merge duplicate price levels (one order per price)
-                        def merge_same_prices(prices, sizes, round_decimals=5):
-                            by_price = {}
-                            for p, s in zip(prices, sizes):
-                                pk = round(p, round_decimals)
-                                by_price[pk] = by_price.get(pk, 0) + s
-                            merged_prices = sorted(by_price.keys())
-                            merged_sizes = [by_price[p] for p in merged_prices]
-                            return merged_prices, merged_sizes
-                        buy_prices_adj, buy_sizes_adj = merge_same_prices(buy_prices_adj, buy_sizes_adj)
-                        sell_prices_adj, sell_sizes_adj = merge_same_prices(sell_prices_adj, sell_sizes_adj)
+                        min_tokens_per_order = max(10.0, order_rules.min_quantity)  # adjustments.md: ≥ 10 ACCES
+                        buy_sizes_adj = np.maximum(min_tokens_per_order, depth_per_level_buy_usdt / buy_prices_adj)
+                        sell_sizes_adj = np.maximum(min_tokens_per_order, depth_per_level_sell_usdt / sell_prices_adj)
                         
                         # Balance check: scale down if needed
                         balance_adj = fetch_account_balance()
                         avail_usdt = balance_adj["usdt"]["free"]
                         avail_tok = balance_adj[token_symbol]["free"]
-                        total_buy_val = sum(s * p for s, p in zip(buy_sizes_adj, buy_prices_adj))
-                        total_sell_val = sum(s * p for s, p in zip(sell_sizes_adj, sell_prices_adj))
-                        if total_buy_val > avail_usdt * 0.95:
-                            scale_b = (avail_usdt * 0.95) / total_buy_val
-                            buy_sizes_adj = [s * scale_b for s in buy_sizes_adj]
-                        if total_sell_val > avail_tok * best_ask_adj * 0.95:
-                            scale_s = (avail_tok * best_ask_adj * 0.95) / total_sell_val
-                            sell_sizes_adj = [s * scale_s for s in sell_sizes_adj]
-                        
-                        # Filter: min 10 tokens and min order value 10 USDT
-                        MIN_ORDER_VALUE_ADJ = 10.0
-                        filtered_buy_adj = [(i, s, p) for i, (s, p) in enumerate(zip(buy_sizes_adj, buy_prices_adj)) if s >= min_tokens_per_order and s * p >= MIN_ORDER_VALUE_ADJ]
-                        filtered_sell_adj = [(i, s, p) for i, (s, p) in enumerate(zip(sell_sizes_adj, sell_prices_adj)) if s >= min_tokens_per_order and s * p >= MIN_ORDER_VALUE_ADJ]
+                        if enable_diff_requote:
+                            # Funds locked in our own resting orders are available to the ladder we reconcile to
+                            avail_usdt += sum(o["remaining_qty"] * o["price"] for o in live_orders if o["side"] == "buy")
+                            avail_tok += sum(o["remaining_qty"] for o in live_orders if o["side"] == "sell")
+                        
+                        # Merge duplicate price levels (one order per price, prevents accumulation),
+                        # scale to 95% of the balance, then filter: min 10 tokens and min order value 10 USDT
+                        MIN_ORDER_VALUE_ADJ = max(10.0, order_rules.min_notional)
+                        filtered_buy_adj, _, _ = build_ladder(
+                            buy_prices_adj,
+                            buy_sizes_adj,
+                            budget=avail_usdt * 0.95,
+                            min_size=min_tokens_per_order,
+                            min_value=MIN_ORDER_VALUE_ADJ,
+                            merge_decimals=price_decimals,
+                        )
+                        filtered_sell_adj, _, _ = build_ladder(
+                            sell_prices_adj,
+                            sell_sizes_adj,
+                            budget=avail_tok * best_ask_adj * 0.95,
+                            min_size=min_tokens_per_order,
+                            min_value=MIN_ORDER_VALUE_ADJ,
+                            merge_decimals=price_decimals,
+                        )
                         
+                        # Kill-switch fired while this iteration was computing: don't place
+                        if risk_watchdog is not None and risk_watchdog.paused():
+                            log("[RISK] Kill-switch active, skipping ladder rebuild")
+                            tick_journal.flag("risk_pause")
+                            tick_journal.ladder(filtered_buy_adj, filtered_sell_adj)
+                            end_tick("paused")
+                            continue
+                        
+                        phase_tracer.phase("placement")
                         placed_buy = 0
                         placed_sell = 0
-                        for i, size, price in filtered_buy_adj:
-                            res = place_order(SYMBOL, "buy_maker", size, price)
-                            if res and (res.get("result") == "true" or res.get("result") is True or res.get("msg") == "Success"):
-                                oid = res.get("data", {}).get("orderId") or res.get("data", {}).get("order_id")
-                                if oid:
-                                    buy_order_ids.append(oid)
-                                    placed_buy += 1
-                        for i, size, price in filtered_sell_adj:
-                            res = place_order(SYMBOL, "sell_maker", size, price)
-                            if res and (res.get("result") == "true" or res.get("result") is True or res.get("msg") == "Success"):
-                                oid = res.get("data", {}).get("orderId") or res.get("data", {}).get("order_id")
-                                if oid:
-                                    sell_order_ids.append(oid)
-                                    placed_sell += 1
+                        target_buy_adj = level_pairs(filtered_buy_adj)
+                        target_sell_adj = level_pairs(filtered_sell_adj)
+                        if enable_diff_requote:
+                            published = reconcile_ladder(
+                                SYMBOL,
+                                target_buy_adj,
+                                target_sell_adj,
+                                live_orders,
+                                price_tolerance_pct=requote_price_tolerance_pct,
+                                size_tolerance_pct=requote_size_tolerance_pct,
+                                max_in_flight=ladder_max_in_flight,
+                            )
+                        else:
+                            published = publish_ladder(SYMBOL, target_buy_adj, target_sell_adj, max_in_flight=ladder_max_in_flight)
+                        tick_journal.ladder(filtered_buy_adj, filtered_sell_adj, published)
+                        for res in published["buy"]:
+                            oid = order_id_from_response(res) if is_order_success(res) else None
+                            if oid:
+                                placed_buy += 1
+                        for res in published["sell"]:
+                            oid = order_id_from_response(res) if is_order_success(res) else None
+                            if oid:
+                                placed_sell += 1
+                        if risk_watchdog is not None and risk_watchdog.paused():
+                            # Fired while orders were in flight: pull what was just placed
+                            log("[RISK] Kill-switch fired during placement, cancelling all orders")
+                            tick_journal.flag("risk_pause")
+                            cancel_all_orders(SYMBOL, priority=PRIORITY_RISK)
                         
                         last_ladder_mid = mid_price
-                        print(f"[ADJUSTMENTS] Placed {placed_buy} buy, {placed_sell} sell | Total active: {len(buy_order_ids) + len(sell_order_ids)}")
+                        log("[ADJUSTMENTS] Placed %s buy, %s sell | Total active: %s", placed_buy, placed_sell, order_registry.count())
                         refresh_sleep = random.uniform(refresh_seconds_min, refresh_seconds_max) + random.uniform(-refresh_random_seconds, refresh_random_seconds)
                         refresh_sleep = max(1, refresh_sleep)
-                        print(f"[ADJUSTMENTS] Sleeping {refresh_sleep:.1f}s before next iteration")
-                        time.sleep(refresh_sleep)
+                        log("[ADJUSTMENTS] Sleeping %.1fs before next iteration", refresh_sleep)
+                        end_tick("quoted")
+                        scheduler.sleep(refresh_sleep, reference_mid=last_ladder_mid)
                         continue
                     
+                    # Reference price mode with diff requoting reconciles against the live orders instead
+                    diff_requote_reference = enable_diff_requote and enable_reference_price_mode and reference_price
+                    
                     # Always cancel all orders to start fresh each iteration
                     # This prevents order accumulation and ensures clean state
-                    if current_orders_number > 0:
-                        print("[CANCEL] Cancelling all existing orders to start fresh...")
+                    phase_tracer.phase("cancel")
+                    if current_orders_number > 0 and not diff_requote_reference:
+                        log("[CANCEL] Cancelling all existing orders to start fresh...")
                         cancel_all_orders(SYMBOL)
-                        sell_order_ids.clear()
-                        buy_order_ids.clear()
                         if cancelled_orders > 0:
-                            print(f"[CANCEL] Cancelled {cancelled_orders} unfilled orders")
-                        print("[CANCEL] All orders cancelled")
+                            log("[CANCEL] Cancelled %s unfilled orders", cancelled_orders)
+                        log("[CANCEL] All orders cancelled")
 
                     # REFERENCE PRICE MODE: Use reference price-based bands instead of market price
                     if enable_reference_price_mode and reference_price:
+                        phase_tracer.phase("ladder_build")
                         # Get current balances FIRST (needed for validation)
                         balance_before_orders = fetch_account_balance()
                         available_usdt = balance_before_orders["usdt"]["free"]
                         available_tokens = balance_before_orders[token_symbol]["free"]
                         usdt_locked_before = balance_before_orders["usdt"]["locked"]
                         token_locked_before = balance_before_orders[token_symbol]["locked"]
+                        if diff_requote_reference:
+                            # Funds locked in our own resting orders are available to the ladder we reconcile to
+                            available_usdt += sum(o["remaining_qty"] * o["price"] for o in live_orders if o["side"] == "buy")
+                            available_tokens += sum(o["remaining_qty"] for o in live_orders if o["side"] == "sell")
                         
                         # Calculate price bands based on reference price
                         # Buy band: -1% (0.1980 to 0.1998 for ref=0.2000) with safety buffer
@@ -595,15 +863,15 @@ def market_making(
                         best_buy_price = reference_price * 0.995  # ~0.1990 for ref=0.2000
                         best_sell_price = reference_price * 1.005  # ~0.2010 for ref=0.2000
                         
-                        print(f"[REFERENCE_PRICE] Using reference price mode")
-                        print(f"[REFERENCE_PRICE] Buy Band: {buy_band_min:.6f} to {buy_band_max:.6f} (-1% band, safety buffer)")
-                        print(f"[REFERENCE_PRICE] Sell Band: {sell_band_min:.6f} to {sell_band_max:.6f} (+1% band, safety buffer)")
-                        print(f"[REFERENCE_PRICE] Orders per side: {orders_per_side}")
-                        print(f"[REFERENCE_PRICE] Value per side: {order_value_per_side} USDT")
+                        log("[REFERENCE_PRICE] Using reference price mode")
+                        log("[REFERENCE_PRICE] Buy Band: %.6f to %.6f (-1%% band, safety buffer)", buy_band_min, buy_band_max)
+                        log("[REFERENCE_PRICE] Sell Band: %.6f to %.6f (+1%% band, safety buffer)", sell_band_min, sell_band_max)
+                        log("[REFERENCE_PRICE] Orders per side: %s", orders_per_side)
+                        log("[REFERENCE_PRICE] Value per side: %s USDT", order_value_per_side)
                         if ladder_order_sizes:
-                            print(f"[REFERENCE_PRICE] Ladder sizes (per side, USDT):")
-                            print(f"[REFERENCE_PRICE] {ladder_order_sizes}")
-                        print(f"[REFERENCE_PRICE] Available: {available_usdt:.2f} USDT, {available_tokens:.2f} {token_symbol.upper()}")
+                            log("[REFERENCE_PRICE] Ladder sizes (per side, USDT):")
+                            log("[REFERENCE_PRICE] %s", ladder_order_sizes)
+                        log("[REFERENCE_PRICE] Available: %.2f USDT, %.2f %s", available_usdt, available_tokens, token_symbol.upper())
                         
                         # Prepare ladder order sizes
                         if ladder_order_sizes and isinstance(ladder_order_sizes, list) and len(ladder_order_sizes) == orders_per_side:
@@ -614,71 +882,40 @@ def market_making(
                         
                         # Ensure all orders ≥ 10 USDT
                         min_order_value = 10.0
-                        order_values_usdt = [max(val, min_order_value) for val in order_values_usdt]
+                        order_values_usdt = np.maximum(np.asarray(order_values_usdt, dtype=np.float64), min_order_value)
                         # Re-normalize to maintain total
-                        total_value = sum(order_values_usdt)
+                        total_value = order_values_usdt.sum()
                         if total_value != order_value_per_side:
-                            scale = order_value_per_side / total_value
-                            order_values_usdt = [val * scale for val in order_values_usdt]
-                        
-                        print(f"[REFERENCE_PRICE] Order values (USDT): {[f'{v:.2f}' for v in order_values_usdt]}")
-                        
-                        # Calculate buy prices (10 levels from buy_band_max down to buy_band_min)
-                        buy_prices = []
-                        for i in range(orders_per_side):
-                            # Distribute evenly across buy band
-                            progress = i / (orders_per_side - 1) if orders_per_side > 1 else 0
-                            price = buy_band_max - (buy_band_max - buy_band_min) * progress
-                            buy_prices.append(price)
-                        
-                        # Calculate sell prices (10 levels from sell_band_min up to sell_band_max)
-                        sell_prices = []
-                        for i in range(orders_per_side):
-                            # Distribute evenly across sell band
-                            progress = i / (orders_per_side - 1) if orders_per_side > 1 else 0
-                            price = sell_band_min + (sell_band_max - sell_band_min) * progress
-                            sell_prices.append(price)
-                        
-                        # Convert USDT values to token amounts
-                        buy_order_sizes = [val / price for val, price in zip(order_values_usdt, buy_prices)]
-                        sell_order_sizes = [val / price for val, price in zip(order_values_usdt, sell_prices)]
-                        
-                        # Validate against available balance
-                        total_buy_value = sum(order_values_usdt)
-                        total_sell_value = sum(order_values_usdt)
-                        
-                        buy_scale = 1.0
-                        sell_scale = 1.0
-                        
-                        if total_buy_value > available_usdt * 0.95:
-                            buy_scale = (available_usdt * 0.95) / total_buy_value
-                            buy_order_sizes = [s * buy_scale for s in buy_order_sizes]
-                            # Also scale the order values
-                            order_values_usdt_buy = [v * buy_scale for v in order_values_usdt]
-                            print(f"[REFERENCE_PRICE] Scaled down buy orders by {buy_scale:.3f} to fit available USDT")
-                        else:
-                            order_values_usdt_buy = order_values_usdt.copy()
-                        
-                        if total_sell_value > (available_tokens * best_sell_price * 0.95):
-                            sell_scale = (available_tokens * best_sell_price * 0.95) / total_sell_value
-                            sell_order_sizes = [s * sell_scale for s in sell_order_sizes]
-                            # Also scale the order values
-                            order_values_usdt_sell = [v * sell_scale for v in order_values_usdt]
-                            print(f"[REFERENCE_PRICE] Scaled down sell orders by {sell_scale:.3f} to fit available tokens")
-                        else:
-                            order_values_usdt_sell = order_values_usdt.copy()
+                            order_values_usdt = order_values_usdt * (order_value_per_side / total_value)
+                        
+                        log("[REFERENCE_PRICE] Order values (USDT): %s", [f"{v:.2f}" for v in order_values_usdt])
+                        
+                        # Levels spread evenly across the bands: buys from buy_band_max down to buy_band_min,
+                        # sells from sell_band_min up to sell_band_max
+                        buy_prices = linear_prices(buy_band_max, buy_band_min, orders_per_side)
+                        sell_prices = linear_prices(sell_band_min, sell_band_max, orders_per_side)
+                        
+                        # Convert USDT values to token amounts, scaled to the available balance
+                        buy_order_sizes, buy_scale = scale_to_budget(buy_prices, order_values_usdt / buy_prices, available_usdt * 0.95)
+                        sell_order_sizes, sell_scale = scale_to_budget(
+                            sell_prices, order_values_usdt / sell_prices, available_tokens * best_sell_price * 0.95
+                        )
+                        if buy_scale < 1.0:
+                            log("[REFERENCE_PRICE] Scaled down buy orders by %.3f to fit available USDT", buy_scale)
+                        if sell_scale < 1.0:
+                            log("[REFERENCE_PRICE] Scaled down sell orders by %.3f to fit available tokens", sell_scale)
+                        buy_ladder = make_levels(buy_prices, buy_order_sizes)
+                        sell_ladder = make_levels(sell_prices, sell_order_sizes)
                         
                         # Check if market price is far from reference price (warning)
                         if bid_price < buy_band_min * 0.95 or ask_price > sell_band_max * 1.05:
-                            print(f"[REFERENCE_PRICE] ⚠ WARNING: Market price far from reference price!")
-                            print(f"[REFERENCE_PRICE]   Market: Bid {bid_price:.6f}, Ask {ask_price:.6f}")
-                            print(f"[REFERENCE_PRICE]   Reference bands: Buy {buy_band_min:.6f}-{buy_band_max:.6f}, Sell {sell_band_min:.6f}-{sell_band_max:.6f}")
-                            print(f"[REFERENCE_PRICE]   Buy orders may not fill (too high), sell orders may fill too quickly")
+                            log("[REFERENCE_PRICE] ⚠ WARNING: Market price far from reference price!", level=logging.WARNING)
+                            log("[REFERENCE_PRICE]   Market: Bid %.6f, Ask %.6f", bid_price, ask_price, level=logging.WARNING)
+                            log("[REFERENCE_PRICE]   Reference bands: Buy %.6f-%.6f, Sell %.6f-%.6f", buy_band_min, buy_band_max, sell_band_min, sell_band_max, level=logging.WARNING)
+                            log("[REFERENCE_PRICE]   Buy orders may not fill (too high), sell orders may fill too quickly", level=logging.WARNING)
                         
                         # Filter orders that meet minimum size/value requirements
-                        MIN_ORDER_VALUE = 10.0  # Client requirement: ≥ 10 USDT
-                        filtered_buy = []
-                        filtered_sell = []
+                        MIN_ORDER_VALUE = max(10.0, order_rules.min_notional)  # Client requirement: ≥ 10 USDT
                         
                         # Check if scaling was too aggressive - if all orders are below minimum after scaling
                         # Calculate how many orders we can actually place with available balance
@@ -686,115 +923,93 @@ def market_making(
                         
                         # If we scaled too much and can't place any orders, reduce minimum or consolidate
                         if buy_scale < 0.4 or max_affordable_orders < 3:
-                            print(f"[REFERENCE_PRICE] ⚠ Available balance ({available_usdt:.2f} USDT) too low")
-                            print(f"[REFERENCE_PRICE]   Can afford ~{max_affordable_orders} orders at {MIN_ORDER_VALUE} USDT each")
+                            log("[REFERENCE_PRICE] ⚠ Available balance (%.2f USDT) too low", available_usdt, level=logging.WARNING)
+                            log("[REFERENCE_PRICE]   Can afford ~%s orders at %s USDT each", max_affordable_orders, MIN_ORDER_VALUE)
                             
                             # Try to place fewer, larger orders by using only the largest orders from ladder
-                            # Reverse the order: use largest orders first (end of ladder)
-                            consolidated_buy = []
-                            consolidated_sell = []
-                            remaining_usdt = available_usdt * 0.95
-                            
-                            # Start from the end (largest orders) and work backwards
-                            for i in range(orders_per_side - 1, -1, -1):
-                                if i < len(buy_order_sizes) and remaining_usdt >= MIN_ORDER_VALUE:
-                                    size = buy_order_sizes[i]
-                                    price = buy_prices[i]
-                                    actual_value = size * price
-                                    
-                                    if actual_value >= MIN_ORDER_VALUE and size >= min_order_size and actual_value <= remaining_usdt:
-                                        consolidated_buy.append((i, size, price, actual_value))
-                                        remaining_usdt -= actual_value
-                            
-                            # Reverse to maintain price order (lowest to highest)
-                            consolidated_buy.reverse()
-                            
-                            # Same for sell orders
-                            remaining_tokens_value = (available_tokens * best_sell_price * 0.95)
-                            for i in range(orders_per_side - 1, -1, -1):
-                                if i < len(sell_order_sizes) and remaining_tokens_value >= MIN_ORDER_VALUE:
-                                    size = sell_order_sizes[i]
-                                    price = sell_prices[i]
-                                    actual_value = size * price
-                                    
-                                    if actual_value >= MIN_ORDER_VALUE and size >= min_order_size and actual_value <= remaining_tokens_value:
-                                        consolidated_sell.append((i, size, price, actual_value))
-                                        remaining_tokens_value -= actual_value
-                            
-                            consolidated_sell.reverse()
-                            
-                            filtered_buy = consolidated_buy
-                            filtered_sell = consolidated_sell
-                            print(f"[REFERENCE_PRICE] Consolidated to {len(filtered_buy)} buy and {len(filtered_sell)} sell orders (using largest orders)")
+                            # (end of ladder first, as long as they fit the balance)
+                            filtered_buy = consolidate_largest(buy_ladder, available_usdt * 0.95, min_order_size, MIN_ORDER_VALUE)
+                            filtered_sell = consolidate_largest(
+                                sell_ladder, available_tokens * best_sell_price * 0.95, min_order_size, MIN_ORDER_VALUE
+                            )
+                            log("[REFERENCE_PRICE] Consolidated to %s buy and %s sell orders (using largest orders)", len(filtered_buy), len(filtered_sell))
                         else:
                             # Normal filtering - check all orders
-                            for i, (size, price) in enumerate(zip(buy_order_sizes, buy_prices)):
-                                actual_value = size * price
-                                if actual_value >= MIN_ORDER_VALUE and size >= min_order_size:
-                                    filtered_buy.append((i, size, price, actual_value))
-                                elif i < 3:  # Only log first few filtered orders to avoid spam
-                                    print(f"[REFERENCE_PRICE] Buy order #{i+1} filtered: value {actual_value:.2f} USDT < {MIN_ORDER_VALUE} or size {size:.2f} < {min_order_size}")
-                            
-                            for i, (size, price) in enumerate(zip(sell_order_sizes, sell_prices)):
-                                actual_value = size * price
-                                if actual_value >= MIN_ORDER_VALUE and size >= min_order_size:
-                                    filtered_sell.append((i, size, price, actual_value))
-                                elif i < 3:  # Only log first few filtered orders to avoid spam
-                                    print(f"[REFERENCE_PRICE] Sell order #{i+1} filtered: value {actual_value:.2f} USDT < {MIN_ORDER_VALUE} or size {size:.2f} < {min_order_size}")
+                            filtered_buy, rejected_buy = filter_levels(buy_ladder, min_order_size, MIN_ORDER_VALUE)
+                            filtered_sell, rejected_sell = filter_levels(sell_ladder, min_order_size, MIN_ORDER_VALUE)
+                            # Only log first few filtered orders to avoid spam
+                            for side_name, rejected in (("Buy", rejected_buy), ("Sell", rejected_sell)):
+                                for i, price, size, value, _ in rejected[rejected["index"] < 3].tolist():
+                                    log("[REFERENCE_PRICE] %s order #%s filtered: value %.2f USDT < %s or size %.2f < %s", side_name, i+1, value, MIN_ORDER_VALUE, size, min_order_size)
                         
-                        print(f"[REFERENCE_PRICE] Placing {len(filtered_buy)} buy orders and {len(filtered_sell)} sell orders")
+                        log("[REFERENCE_PRICE] Placing %s buy orders and %s sell orders", len(filtered_buy), len(filtered_sell))
                         
-                        # Place orders
+                        # Place orders (all levels concurrently)
+                        phase_tracer.phase("placement")
                         buy_placed = 0
                         sell_placed = 0
                         buy_failed = 0
                         sell_failed = 0
                         
-                        for i, size, price, value in filtered_buy:
-                            order_result = place_order(SYMBOL, "buy_maker", size, price)
+                        target_buy = level_pairs(filtered_buy)
+                        target_sell = level_pairs(filtered_sell)
+                        if diff_requote_reference:
+                            published = reconcile_ladder(
+                                SYMBOL,
+                                target_buy,
+                                target_sell,
+                                live_orders,
+                                price_tolerance_pct=requote_price_tolerance_pct,
+                                size_tolerance_pct=requote_size_tolerance_pct,
+                                max_in_flight=ladder_max_in_flight,
+                            )
+                        else:
+                            published = publish_ladder(SYMBOL, target_buy, target_sell, max_in_flight=ladder_max_in_flight)
+                        tick_journal.ladder(filtered_buy, filtered_sell, published)
+                        
+                        for (i, price, size, value, _), order_result in zip(filtered_buy.tolist(), published["buy"]):
                             if order_result and (order_result.get("result") == "true" or order_result.get("result") is True):
-                                order_id = order_result.get("data", {}).get("orderId") or order_result.get("data", {}).get("order_id")
+                                order_id = order_id_from_response(order_result)
                                 if order_id:
-                                    buy_order_ids.append(order_id)
                                     buy_placed += 1
                                     if i < 3:
-                                        print(f"  [BUY #{i+1}] Price: {price:.6f} | Size: {size:.2f} | Value: {value:.2f} USDT | Order ID: {order_id}")
+                                        log("  [BUY #%d] Price: %.6f | Size: %.2f | Value: %.2f USDT | Order ID: %s", i+1, price, size, value, order_id)
                                 else:
                                     buy_failed += 1
                             else:
                                 buy_failed += 1
                                 if i < 3:
                                     error = order_result.get("msg", order_result.get("error", "Unknown error")) if order_result else "No response"
-                                    print(f"  [BUY #{i+1}] FAILED: {error}")
+                                    log("  [BUY #%d] FAILED: %s", i+1, error, level=logging.WARNING)
                         
-                        for i, size, price, value in filtered_sell:
-                            order_result = place_order(SYMBOL, "sell_maker", size, price)
+                        for (i, price, size, value, _), order_result in zip(filtered_sell.tolist(), published["sell"]):
                             if order_result and (order_result.get("result") == "true" or order_result.get("result") is True):
-                                order_id = order_result.get("data", {}).get("orderId") or order_result.get("data", {}).get("order_id")
+                                order_id = order_id_from_response(order_result)
                                 if order_id:
-                                    sell_order_ids.append(order_id)
                                     sell_placed += 1
                                     if i < 3:
-                                        print(f"  [SELL #{i+1}] Price: {price:.6f} | Size: {size:.2f} | Value: {value:.2f} USDT | Order ID: {order_id}")
+                                        log("  [SELL #%d] Price: %.6f | Size: %.2f | Value: %.2f USDT | Order ID: %s", i+1, price, size, value, order_id)
                                 else:
                                     sell_failed += 1
                             else:
                                 sell_failed += 1
                                 if i < 3:
                                     error = order_result.get("msg", order_result.get("error", "Unknown error")) if order_result else "No response"
-                                    print(f"  [SELL #{i+1}] FAILED: {error}")
+                                    log("  [SELL #%d] FAILED: %s", i+1, error, level=logging.WARNING)
                         
-                        print(f"\n[SUMMARY] Buy Orders: {buy_placed} placed, {buy_failed} failed | Sell Orders: {sell_placed} placed, {sell_failed} failed")
-                        print(f"[SUMMARY] Total Active Orders: {len(buy_order_ids) + len(sell_order_ids)}")
+                        log("\n[SUMMARY] Buy Orders: %s placed, %s failed | Sell Orders: %s placed, %s failed", buy_placed, buy_failed, sell_placed, sell_failed)
+                        log("[SUMMARY] Total Active Orders: %s", order_registry.count())
                         
                         # Add random delay before next iteration
                         random_delay = random.uniform(min_random_delay, max_random_delay)
                         sleep_time = get_dynamic_sleep_time(current_volatility) + random_delay
-                        print(f"\n[WAIT] Sleeping for {sleep_time:.1f} seconds (base: {sleep_time - random_delay:.1f}s + random: {random_delay:.1f}s) before next iteration...")
-                        time.sleep(sleep_time)
+                        log("\n[WAIT] Sleeping for %.1f seconds (base: %.1fs + random: %.1fs) before next iteration...", sleep_time, sleep_time - random_delay, random_delay)
+                        end_tick("quoted")
+                        scheduler.sleep(sleep_time, reference_mid=mid_price)
                         continue  # Skip the rest of the iteration for reference price mode
                     
                     # STANDARD MODE: Use market price-based pricing
+                    phase_tracer.phase("ladder_build")
                     # Get the best prices for selling and buying for a low market
                     base_best_buy_price = get_buy_price_in_spread()  # This should already be below bid
                     base_best_sell_price = get_sell_price_in_spread()
@@ -802,17 +1017,17 @@ def market_making(
                     # CRITICAL: Ensure buy price NEVER exceeds bid price
                     # Buy orders must be below bid to be maker orders and not push price up
                     if base_best_buy_price > bid_price:
-                        print(f"[WARNING] base_best_buy_price ({base_best_buy_price:.6f}) exceeds bid ({bid_price:.6f}), capping at bid")
+                        log("[WARNING] base_best_buy_price (%.6f) exceeds bid (%.6f), capping at bid", base_best_buy_price, bid_price)
                         base_best_buy_price = bid_price * 0.999
                     
                     # CRITICAL: Ensure buy price NEVER exceeds MAX_BUY_PRICE (if enabled)
                     if MAX_BUY_PRICE and base_best_buy_price > MAX_BUY_PRICE:
-                        print(f"[MAX_PRICE] base_best_buy_price ({base_best_buy_price:.6f}) exceeds MAX_BUY_PRICE ({MAX_BUY_PRICE:.6f}), capping at {MAX_BUY_PRICE}")
+                        log("[MAX_PRICE] base_best_buy_price (%.6f) exceeds MAX_BUY_PRICE (%.6f), capping at %s", base_best_buy_price, MAX_BUY_PRICE, MAX_BUY_PRICE)
                         base_best_buy_price = MAX_BUY_PRICE
                     
                     # Validate sell price is above ask price (critical for sell orders)
                     if base_best_sell_price <= 0 or base_best_sell_price < ask_price:
-                        print(f"[WARNING] best_sell_price ({base_best_sell_price:.6f}) is invalid or below ask ({ask_price:.6f}), recalculating")
+                        log("[WARNING] best_sell_price (%.6f) is invalid or below ask (%.6f), recalculating", base_best_sell_price, ask_price)
                         base_best_sell_price = ask_price * 1.02
                     
                     # ADAPTIVE PRICING: Gradually move sell prices down toward bid to drive price down
@@ -828,12 +1043,12 @@ def market_making(
                         
                         # Double-check: ensure it's never above bid
                         if best_buy_price > bid_price:
-                            print(f"[ERROR] best_buy_price ({best_buy_price:.6f}) exceeds bid ({bid_price:.6f}), forcing to bid * 0.999")
+                            log("[ERROR] best_buy_price (%.6f) exceeds bid (%.6f), forcing to bid * 0.999", best_buy_price, bid_price)
                             best_buy_price = bid_price * 0.999
                         
                         # Double-check: ensure it's never above MAX_BUY_PRICE (if enabled)
                         if MAX_BUY_PRICE and best_buy_price > MAX_BUY_PRICE:
-                            print(f"[MAX_PRICE] best_buy_price ({best_buy_price:.6f}) exceeds MAX_BUY_PRICE ({MAX_BUY_PRICE:.6f}), forcing to {MAX_BUY_PRICE}")
+                            log("[MAX_PRICE] best_buy_price (%.6f) exceeds MAX_BUY_PRICE (%.6f), forcing to %s", best_buy_price, MAX_BUY_PRICE, MAX_BUY_PRICE)
                             best_buy_price = MAX_BUY_PRICE
                         
                         # SELL ORDERS: Gradually move down from ask toward bid
@@ -887,15 +1102,15 @@ def market_making(
                             best_sell_price = bid_price * 1.001  # Minimum 0.1% above bid
                         
                         if is_wide_spread or (unfilled_iterations >= tightening_trigger and progress_toward_bid > 0):
-                            print(f"[ADAPTIVE] Driving price down (unfilled iterations: {unfilled_iterations}):")
-                            print(f"[ADAPTIVE]   Buy: Capped at bid {bid_price:.6f} (using {best_buy_price:.6f})")
-                            print(f"[ADAPTIVE]   Sell: Progress {progress_toward_bid*100:.2f}% toward bid")
-                            print(f"[ADAPTIVE]   Sell: {base_best_sell_price:.6f} → {best_sell_price:.6f} (target: {bid_price:.6f}, ask: {ask_price:.6f})")
+                            log("[ADAPTIVE] Driving price down (unfilled iterations: %s):", unfilled_iterations)
+                            log("[ADAPTIVE]   Buy: Capped at bid %.6f (using %.6f)", bid_price, best_buy_price)
+                            log("[ADAPTIVE]   Sell: Progress %.2f%% toward bid", progress_toward_bid*100)
+                            log("[ADAPTIVE]   Sell: %.6f → %.6f (target: %.6f, ask: %.6f)", base_best_sell_price, best_sell_price, bid_price, ask_price)
                         else:
                             # Use base prices initially
                             best_sell_price = base_best_sell_price
                             if unfilled_iterations > 0:
-                                print(f"[ADAPTIVE] Waiting for {tightening_trigger - unfilled_iterations} more iteration(s) before moving sell prices down")
+                                log("[ADAPTIVE] Waiting for %s more iteration(s) before moving sell prices down", tightening_trigger - unfilled_iterations)
                     else:
                         # No adaptive pricing - use base prices
                         best_buy_price = base_best_buy_price
@@ -903,17 +1118,17 @@ def market_making(
                         
                         # CRITICAL: Still ensure buy price doesn't exceed bid
                         if best_buy_price > bid_price:
-                            print(f"[WARNING] best_buy_price ({best_buy_price:.6f}) exceeds bid ({bid_price:.6f}), capping at bid * 0.999")
+                            log("[WARNING] best_buy_price (%.6f) exceeds bid (%.6f), capping at bid * 0.999", best_buy_price, bid_price)
                             best_buy_price = bid_price * 0.999
                         
                         # CRITICAL: Still ensure buy price doesn't exceed MAX_BUY_PRICE (if enabled)
                         if MAX_BUY_PRICE and best_buy_price > MAX_BUY_PRICE:
-                            print(f"[MAX_PRICE] best_buy_price ({best_buy_price:.6f}) exceeds MAX_BUY_PRICE ({MAX_BUY_PRICE:.6f}), capping at {MAX_BUY_PRICE}")
+                            log("[MAX_PRICE] best_buy_price (%.6f) exceeds MAX_BUY_PRICE (%.6f), capping at %s", best_buy_price, MAX_BUY_PRICE, MAX_BUY_PRICE)
                             best_buy_price = MAX_BUY_PRICE
                     
-                    print(f"[PRICE] Best Buy Price: {best_buy_price:.6f} | Best Sell Price: {best_sell_price:.6f} (Ask: {ask_price:.6f}, Bid: {bid_price:.6f})")
+                    log("[PRICE] Best Buy Price: %.6f | Best Sell Price: %.6f (Ask: %.6f, Bid: %.6f)", best_buy_price, best_sell_price, ask_price, bid_price)
 
-                    print("[CALC] Calculating order sizes...")
+                    log("[CALC] Calculating order sizes...", level=logging.DEBUG)
                     
                     # Get current balances for validation (BEFORE placing orders)
                     balance_before_orders = fetch_account_balance()
@@ -936,13 +1151,13 @@ def market_making(
                     if initial_total_balance_usdt > 0:
                         loss_pct = ((initial_total_balance_usdt - current_total_balance_usdt) / initial_total_balance_usdt) * 100
                         if loss_pct > max_loss_pct:
-                            print(f"[SAFETY] 🛑 MAXIMUM LOSS REACHED: {loss_pct:.2f}% loss exceeds {max_loss_pct}% limit")
-                            print(f"[SAFETY] Initial Balance: {initial_total_balance_usdt:.2f} USDT")
-                            print(f"[SAFETY] Current Balance: {current_total_balance_usdt:.2f} USDT")
-                            print(f"[SAFETY] Stopping bot to prevent further losses...")
+                            log("[SAFETY] 🛑 MAXIMUM LOSS REACHED: %.2f%% loss exceeds %s%% limit", loss_pct, max_loss_pct)
+                            log("[SAFETY] Initial Balance: %.2f USDT", initial_total_balance_usdt)
+                            log("[SAFETY] Current Balance: %.2f USDT", current_total_balance_usdt)
+                            log("[SAFETY] Stopping bot to prevent further losses...")
                             break  # Exit the main loop
                         elif loss_pct > max_loss_pct * 0.8:  # Warning at 80% of limit
-                            print(f"[SAFETY] ⚠ Warning: Loss at {loss_pct:.2f}% (approaching {max_loss_pct}% limit)")
+                            log("[SAFETY] ⚠ Warning: Loss at %.2f%% (approaching %s%% limit)", loss_pct, max_loss_pct)
                     else:
                         loss_pct = 0.0
                     
@@ -959,27 +1174,27 @@ def market_making(
                     
                     # CRITICAL: Validate buy order size doesn't exceed available USDT
                     if buy_total_order_size > max_buy_tokens:
-                        print(f"[WARNING] Buy order size ({buy_total_order_size:.2f}) exceeds available USDT. Limiting to {max_buy_tokens:.2f} tokens")
+                        log("[WARNING] Buy order size (%.2f) exceeds available USDT. Limiting to %.2f tokens", buy_total_order_size, max_buy_tokens)
                         buy_total_order_size = max_buy_tokens
                     
                     # Double-check: ensure total doesn't exceed available
                     estimated_total_value = buy_total_order_size * best_buy_price
                     if estimated_total_value > available_usdt * 0.95:
                         buy_total_order_size = (available_usdt * 0.95) / best_buy_price
-                        print(f"[WARNING] Adjusted buy total to {buy_total_order_size:.2f} tokens to match available USDT")
+                        log("[WARNING] Adjusted buy total to %.2f tokens to match available USDT", buy_total_order_size)
                     
                     # If total is less than minimum for one order, adjust minimum or skip
                     effective_min_buy = min_order_size
                     if buy_total_order_size < min_order_size:
                         if buy_total_order_size > 0:
-                            print(f"[WARNING] Total buy size ({buy_total_order_size:.2f}) is below minimum per order ({min_order_size}). Using total as single order.")
+                            log("[WARNING] Total buy size (%.2f) is below minimum per order (%s). Using total as single order.", buy_total_order_size, min_order_size)
                             effective_min_buy = buy_total_order_size * 0.5  # Allow smaller orders
                         else:
                             effective_min_buy = 0
 
                     # Calculate how many orders we can realistically place with available USDT
-                    # Target: each order should be at least 5 USDT value
-                    MIN_ORDER_VALUE = 5.0
+                    # Target: each order should be at least the pair's minimum value (ORDER_MIN_NOTIONAL_USDT, 5 USDT)
+                    MIN_ORDER_VALUE = order_rules.min_notional or 5.0
                     min_tokens_per_order = MIN_ORDER_VALUE / best_buy_price
                     max_realistic_orders = min(
                         num_orders,
@@ -991,7 +1206,7 @@ def market_making(
                     if max_realistic_orders < num_orders * 0.5:
                         # Create fewer, larger orders that will definitely meet minimums
                         target_orders = max(1, max_realistic_orders)
-                        print(f"[INFO] Adjusting to {target_orders} buy orders to ensure all meet {MIN_ORDER_VALUE} USDT minimum")
+                        log("[INFO] Adjusting to %s buy orders to ensure all meet %s USDT minimum", target_orders, MIN_ORDER_VALUE)
                         buy_order_sizes = calculate_order_sizes(
                             buy_total_order_size, target_orders, max(min_tokens_per_order, effective_min_buy)
                         )
@@ -1001,16 +1216,10 @@ def market_making(
                         )
                     
                     # Final safety check: ensure total value doesn't exceed available USDT
-                    if len(buy_order_sizes) > 0:
-                        total_buy_value_check = sum(size * best_buy_price for size in buy_order_sizes)
-                        if total_buy_value_check > available_usdt * 0.95:
-                            # Scale down all orders proportionally
-                            scale_factor = (available_usdt * 0.95) / total_buy_value_check
-                            buy_order_sizes = [size * scale_factor for size in buy_order_sizes]
-                            print(f"[WARNING] Scaled down buy orders by {scale_factor:.3f} to fit available USDT")
-                            
-                            # After scaling, we'll filter based on order value in the validation step below
-                            # Don't filter here - let the value-based check handle it
+                    # (after scaling, the value-based check below filters what became too small)
+                    buy_order_sizes, scale_factor = scale_to_budget(best_buy_price, buy_order_sizes, available_usdt * 0.95)
+                    if scale_factor < 1.0:
+                        log("[WARNING] Scaled down buy orders by %.3f to fit available USDT", scale_factor)
 
                     sell_total_order_size = calculate_order_size(
                         "sell",
@@ -1022,93 +1231,81 @@ def market_making(
                     # Validate sell order size doesn't exceed available tokens
                     max_sell_tokens = available_tokens * 0.90  # 90% of tokens, leave 10% buffer
                     if sell_total_order_size > max_sell_tokens:
-                        print(f"[WARNING] Sell order size ({sell_total_order_size:.2f}) exceeds available tokens. Limiting to {max_sell_tokens:.2f} tokens")
+                        log("[WARNING] Sell order size (%.2f) exceeds available tokens. Limiting to %.2f tokens", sell_total_order_size, max_sell_tokens)
                         sell_total_order_size = max_sell_tokens
 
                     sell_order_sizes = calculate_order_sizes(
                         sell_total_order_size, num_orders, min_order_size
                     )
                     
-                    # Filter out zero-sized orders
-                    buy_order_sizes = [s for s in buy_order_sizes if s > 0]
-                    sell_order_sizes = [s for s in sell_order_sizes if s > 0]
-                    
-                    # For buy orders: filter based on minimum order value (5 USDT for safety) and minimum size
-                    # Exchange seems to require higher minimums than 1 USDT
-                    MIN_ORDER_VALUE = 5.0  # Minimum order value in USDT
-                    filtered_buy_sizes = []
-                    for size in buy_order_sizes:
-                        order_value = size * best_buy_price
-                        # Accept if order value >= MIN_ORDER_VALUE AND size >= min_order_size
-                        # Be more strict to avoid exchange rejections
-                        if order_value >= MIN_ORDER_VALUE and size >= min_order_size:
-                            filtered_buy_sizes.append(size)
-                    buy_order_sizes = filtered_buy_sizes
-                    
-                    # For sell orders: filter based on minimum order value AND minimum size
-                    filtered_sell_sizes = []
-                    for size in sell_order_sizes:
-                        order_value = size * best_sell_price
-                        # Accept if order value >= MIN_ORDER_VALUE AND size >= min_order_size
-                        if order_value >= MIN_ORDER_VALUE and size >= min_order_size:
-                            filtered_sell_sizes.append(size)
-                    sell_order_sizes = filtered_sell_sizes
+                    # Filter out zero-sized orders and orders below the minimum order value (5 USDT for safety)
+                    # or minimum size - exchange seems to require higher minimums than 1 USDT, so be strict
+                    # here to avoid exchange rejections
+                    MIN_ORDER_VALUE = order_rules.min_notional or 5.0  # Minimum order value in USDT
+                    buy_order_sizes = np.asarray(buy_order_sizes, dtype=np.float64)
+                    sell_order_sizes = np.asarray(sell_order_sizes, dtype=np.float64)
+                    buy_order_sizes = buy_order_sizes[
+                        (buy_order_sizes > 0) & (buy_order_sizes * best_buy_price >= MIN_ORDER_VALUE) & (buy_order_sizes >= min_order_size)
+                    ]
+                    sell_order_sizes = sell_order_sizes[
+                        (sell_order_sizes > 0) & (sell_order_sizes * best_sell_price >= MIN_ORDER_VALUE) & (sell_order_sizes >= min_order_size)
+                    ]
                     
                     # Adjust num_orders to actual number of orders we can place
                     actual_buy_orders = len(buy_order_sizes)
                     actual_sell_orders = len(sell_order_sizes)
                     if actual_buy_orders < num_orders or actual_sell_orders < num_orders:
-                        print(f"[INFO] Adjusted order count: {actual_buy_orders} buy orders, {actual_sell_orders} sell orders (due to minimum size/value requirements)")
+                        log("[CALC] Adjusted order count: %s buy orders, %s sell orders (due to minimum size/value requirements)", actual_buy_orders, actual_sell_orders)
                     
                     if actual_buy_orders == 0:
-                        print(f"[WARNING] Cannot place any buy orders - orders don't meet minimum value (5 USDT) and size ({min_order_size}) requirements")
+                        log("[WARNING] Cannot place any buy orders - orders don't meet minimum value (5 USDT) and size (%s) requirements", min_order_size)
                     if actual_sell_orders == 0:
-                        print(f"[WARNING] Cannot place any sell orders - orders don't meet minimum value (5 USDT) and size ({min_order_size}) requirements")
+                        log("[WARNING] Cannot place any sell orders - orders don't meet minimum value (5 USDT) and size (%s) requirements", min_order_size)
                     
-                    total_buy_value = sum(size * best_buy_price for size in buy_order_sizes)
-                    total_sell_value = sum(size * best_sell_price for size in sell_order_sizes)
+                    total_buy_value = float(buy_order_sizes.sum()) * best_buy_price
+                    total_sell_value = float(sell_order_sizes.sum()) * best_sell_price
                     total_exposure = total_buy_value + total_sell_value
                     
                     # SAFETY FEATURE 3: Position size cap - limit total exposure
                     max_exposure_usdt = current_total_balance_usdt * (max_exposure_pct / 100.0)
                     if total_exposure > max_exposure_usdt:
                         exposure_scale = max_exposure_usdt / total_exposure
-                        print(f"[SAFETY] ⚠ Total exposure {total_exposure:.2f} USDT exceeds {max_exposure_pct}% limit ({max_exposure_usdt:.2f} USDT)")
-                        print(f"[SAFETY] Scaling down orders by {exposure_scale:.3f} to meet exposure limit")
+                        log("[SAFETY] ⚠ Total exposure %.2f USDT exceeds %s%% limit (%.2f USDT)", total_exposure, max_exposure_pct, max_exposure_usdt)
+                        log("[SAFETY] Scaling down orders by %.3f to meet exposure limit", exposure_scale)
                         
                         # Scale down both buy and sell orders proportionally
-                        buy_order_sizes = [s * exposure_scale for s in buy_order_sizes]
-                        sell_order_sizes = [s * exposure_scale for s in sell_order_sizes]
+                        buy_order_sizes = buy_order_sizes * exposure_scale
+                        sell_order_sizes = sell_order_sizes * exposure_scale
                         
                         # Recalculate values after scaling
-                        total_buy_value = sum(size * best_buy_price for size in buy_order_sizes)
-                        total_sell_value = sum(size * best_sell_price for size in sell_order_sizes)
+                        total_buy_value = float(buy_order_sizes.sum()) * best_buy_price
+                        total_sell_value = float(sell_order_sizes.sum()) * best_sell_price
                         total_exposure = total_buy_value + total_sell_value
                         
                         # Update actual order counts
-                        buy_order_sizes = [s for s in buy_order_sizes if s > 0 and s >= min_order_size]
-                        sell_order_sizes = [s for s in sell_order_sizes if s > 0 and s >= min_order_size]
+                        buy_order_sizes = buy_order_sizes[(buy_order_sizes > 0) & (buy_order_sizes >= min_order_size)]
+                        sell_order_sizes = sell_order_sizes[(sell_order_sizes > 0) & (sell_order_sizes >= min_order_size)]
                         actual_buy_orders = len(buy_order_sizes)
                         actual_sell_orders = len(sell_order_sizes)
                     
-                    print(f"[CALC] Available: {available_usdt:.2f} USDT, {available_tokens:.2f} {token_symbol.upper()}")
-                    print(f"[CALC] Total Buy Orders: {sum(buy_order_sizes):.2f} {token_symbol.upper()} (~{total_buy_value:.2f} USDT)")
-                    print(f"[CALC] Total Sell Orders: {sum(sell_order_sizes):.2f} {token_symbol.upper()} (~{total_sell_value:.2f} USDT)")
+                    log("[CALC] Available: %.2f USDT, %.2f %s", available_usdt, available_tokens, token_symbol.upper())
+                    log("[CALC] Total Buy Orders: %.2f %s (~%.2f USDT)", sum(buy_order_sizes), token_symbol.upper(), total_buy_value)
+                    log("[CALC] Total Sell Orders: %.2f %s (~%.2f USDT)", sum(sell_order_sizes), token_symbol.upper(), total_sell_value)
                     exposure_pct_str = f"{total_exposure/current_total_balance_usdt*100:.1f}%" if current_total_balance_usdt > 0 else "N/A"
-                    print(f"[CALC] Total Exposure: {total_exposure:.2f} USDT ({exposure_pct_str} of balance)")
+                    log("[CALC] Total Exposure: %.2f USDT (%s of balance)", total_exposure, exposure_pct_str)
                     
                     # Final validation: ensure we're not trying to spend more than available
                     if total_buy_value > available_usdt * 0.95:
-                        print(f"[ERROR] Total buy value {total_buy_value:.2f} USDT exceeds available {available_usdt:.2f} USDT!")
-                        print(f"[ERROR] This should not happen - recalculating order sizes...")
+                        log("[ERROR] Total buy value %.2f USDT exceeds available %.2f USDT!", total_buy_value, available_usdt)
+                        log("[ERROR] This should not happen - recalculating order sizes...")
                         # Recalculate with stricter limit
                         max_buy_tokens = (available_usdt * 0.90) / best_buy_price
                         buy_total_order_size = min(buy_total_order_size, max_buy_tokens)
-                        buy_order_sizes = calculate_order_sizes(buy_total_order_size, num_orders, effective_min_buy)
-                        buy_order_sizes = [s for s in buy_order_sizes if s > 0]
+                        buy_order_sizes = np.asarray(calculate_order_sizes(buy_total_order_size, num_orders, effective_min_buy), dtype=np.float64)
+                        buy_order_sizes = buy_order_sizes[buy_order_sizes > 0]
                         actual_buy_orders = len(buy_order_sizes)
-                        total_buy_value = sum(size * best_buy_price for size in buy_order_sizes)
-                        print(f"[CALC] Recalculated: {actual_buy_orders} buy orders, {total_buy_value:.2f} USDT total")
+                        total_buy_value = float(buy_order_sizes.sum()) * best_buy_price
+                        log("[CALC] Recalculated: %s buy orders, %.2f USDT total", actual_buy_orders, total_buy_value)
                     
                     # COMPLIANCE MODE: Adjust order distribution to meet LBank requirement
                     # Requirement: 500-1000 USDT TOTAL (buy + sell) within ±1% of market price
@@ -1125,24 +1322,24 @@ def market_making(
                         sell_order_sizes_1pct = sell_order_sizes[:min(orders_within_1pct, len(sell_order_sizes))]
                         
                         # Calculate current value within ±1%
-                        buy_value_within_1pct = sum(size * best_buy_price for size in buy_order_sizes_1pct)
-                        sell_value_within_1pct = sum(size * best_sell_price for size in sell_order_sizes_1pct)
+                        buy_value_within_1pct = float(buy_order_sizes_1pct.sum()) * best_buy_price
+                        sell_value_within_1pct = float(sell_order_sizes_1pct.sum()) * best_sell_price
                         total_value_within_1pct = buy_value_within_1pct + sell_value_within_1pct
                         
-                        print(f"[COMPLIANCE] Target: {target_compliance_value:.2f} USDT TOTAL within ±1%")
-                        print(f"[COMPLIANCE] Current within ±1%: {total_value_within_1pct:.2f} USDT (Buy: {buy_value_within_1pct:.2f}, Sell: {sell_value_within_1pct:.2f})")
+                        log("[COMPLIANCE] Target: %.2f USDT TOTAL within ±1%%", target_compliance_value)
+                        log("[COMPLIANCE] Current within ±1%%: %.2f USDT (Buy: %.2f, Sell: %.2f)", total_value_within_1pct, buy_value_within_1pct, sell_value_within_1pct)
                         
                         # If total exceeds max, scale down proportionally
                         if total_value_within_1pct > compliance_max_usdt:
                             scale_factor = compliance_max_usdt / total_value_within_1pct
-                            print(f"[COMPLIANCE] Scaling down by {scale_factor:.3f} to meet {compliance_max_usdt} USDT max")
+                            log("[COMPLIANCE] Scaling down by %.3f to meet %s USDT max", scale_factor, compliance_max_usdt)
                             
                             # Scale both buy and sell proportionally
-                            buy_order_sizes_1pct = [s * scale_factor for s in buy_order_sizes_1pct]
-                            sell_order_sizes_1pct = [s * scale_factor for s in sell_order_sizes_1pct]
+                            buy_order_sizes_1pct = buy_order_sizes_1pct * scale_factor
+                            sell_order_sizes_1pct = sell_order_sizes_1pct * scale_factor
                             
-                            buy_value_within_1pct = sum(size * best_buy_price for size in buy_order_sizes_1pct)
-                            sell_value_within_1pct = sum(size * best_sell_price for size in sell_order_sizes_1pct)
+                            buy_value_within_1pct = float(buy_order_sizes_1pct.sum()) * best_buy_price
+                            sell_value_within_1pct = float(sell_order_sizes_1pct.sum()) * best_sell_price
                             total_value_within_1pct = buy_value_within_1pct + sell_value_within_1pct
                         
                         # If total is below minimum, try to increase (if balance allows)
@@ -1163,19 +1360,19 @@ def market_making(
                                 if buy_additional > 0 and len(buy_order_sizes_1pct) > 0:
                                     additional_buy_tokens = buy_additional / best_buy_price
                                     per_order = additional_buy_tokens / len(buy_order_sizes_1pct)
-                                    buy_order_sizes_1pct = [s + per_order for s in buy_order_sizes_1pct]
+                                    buy_order_sizes_1pct = buy_order_sizes_1pct + per_order
                                 
                                 if sell_additional > 0 and len(sell_order_sizes_1pct) > 0:
                                     additional_sell_tokens = sell_additional / best_sell_price
                                     per_order = additional_sell_tokens / len(sell_order_sizes_1pct)
-                                    sell_order_sizes_1pct = [s + per_order for s in sell_order_sizes_1pct]
+                                    sell_order_sizes_1pct = sell_order_sizes_1pct + per_order
                                 
                                 if buy_additional > 0 or sell_additional > 0:
-                                    print(f"[COMPLIANCE] Increased orders within ±1% (+{buy_additional:.2f} buy, +{sell_additional:.2f} sell)")
+                                    log("[COMPLIANCE] Increased orders within ±1%% (+%.2f buy, +%.2f sell)", buy_additional, sell_additional)
                             
                             # Recalculate after adjustment
-                            buy_value_within_1pct = sum(size * best_buy_price for size in buy_order_sizes_1pct)
-                            sell_value_within_1pct = sum(size * best_sell_price for size in sell_order_sizes_1pct)
+                            buy_value_within_1pct = float(buy_order_sizes_1pct.sum()) * best_buy_price
+                            sell_value_within_1pct = float(sell_order_sizes_1pct.sum()) * best_sell_price
                             total_value_within_1pct = buy_value_within_1pct + sell_value_within_1pct
                         
                         # Replace order sizes with compliance-adjusted sizes
@@ -1183,251 +1380,190 @@ def market_making(
                         sell_order_sizes = sell_order_sizes_1pct
                         
                         # Filter out orders that don't meet minimums
-                        buy_order_sizes = [s for s in buy_order_sizes if s > 0 and s >= min_order_size]
-                        sell_order_sizes = [s for s in sell_order_sizes if s > 0 and s >= min_order_size]
+                        buy_order_sizes = buy_order_sizes[(buy_order_sizes > 0) & (buy_order_sizes >= min_order_size)]
+                        sell_order_sizes = sell_order_sizes[(sell_order_sizes > 0) & (sell_order_sizes >= min_order_size)]
                         actual_buy_orders = len(buy_order_sizes)
                         actual_sell_orders = len(sell_order_sizes)
                         
                         # Final compliance check
-                        final_buy_value_1pct = sum(size * best_buy_price for size in buy_order_sizes)
-                        final_sell_value_1pct = sum(size * best_sell_price for size in sell_order_sizes)
+                        final_buy_value_1pct = float(buy_order_sizes.sum()) * best_buy_price
+                        final_sell_value_1pct = float(sell_order_sizes.sum()) * best_sell_price
                         final_total_1pct = final_buy_value_1pct + final_sell_value_1pct
                         
-                        print(f"[COMPLIANCE] Final value within ±1%: {final_total_1pct:.2f} USDT (Buy: {final_buy_value_1pct:.2f}, Sell: {final_sell_value_1pct:.2f})")
+                        log("[COMPLIANCE] Final value within ±1%%: %.2f USDT (Buy: %.2f, Sell: %.2f)", final_total_1pct, final_buy_value_1pct, final_sell_value_1pct)
                         
                         if compliance_min_usdt <= final_total_1pct <= compliance_max_usdt:
-                            print(f"[COMPLIANCE] ✓ Requirement met: {final_total_1pct:.2f} USDT is within {compliance_min_usdt}-{compliance_max_usdt} USDT range")
+                            log("[COMPLIANCE] ✓ Requirement met: %.2f USDT is within %s-%s USDT range", final_total_1pct, compliance_min_usdt, compliance_max_usdt)
                         elif final_total_1pct < compliance_min_usdt:
-                            print(f"[COMPLIANCE] ⚠ Warning: {final_total_1pct:.2f} USDT < {compliance_min_usdt} USDT (insufficient balance)")
+                            log("[COMPLIANCE] ⚠ Warning: %.2f USDT < %s USDT (insufficient balance)", final_total_1pct, compliance_min_usdt, level=logging.WARNING)
                         else:
-                            print(f"[COMPLIANCE] ⚠ Warning: {final_total_1pct:.2f} USDT > {compliance_max_usdt} USDT (scaled but still high)")
-
-                    # Clear order ID lists for new orders
-                    buy_order_ids.clear()
-                    sell_order_ids.clear()
+                            log("[COMPLIANCE] ⚠ Warning: %.2f USDT > %s USDT (scaled but still high)", final_total_1pct, compliance_max_usdt, level=logging.WARNING)
 
-                    # A loop for placing multiple orders
-                    # Calculate cumulative price steps for proper distribution
-                    cumulative_buy_step = 0
-                    cumulative_sell_step = 0
-                    
+                    # Build both sides of the ladder as arrays (placed concurrently below):
+                    # level i sits step_distances()[i] away from the best price (cumulative price steps)
                     buy_placed = 0
                     sell_placed = 0
                     buy_failed = 0
                     sell_failed = 0
                     
+                    # Levels that passed the local checks (LEVEL_DTYPE rows: index, price, size, value, distance_pct)
+                    buy_levels = make_levels([], [])
+                    sell_levels = make_levels([], [])
+                    
                     # Use the actual number of orders we can place
                     max_orders = max(actual_buy_orders, actual_sell_orders)
+                    # Check minimum order value (price * quantity >= 5 USDT) and minimum size
+                    # Exchange requires higher minimums - be strict here
+                    MIN_ORDER_VALUE = order_rules.min_notional or 5.0
                     
-                    for i in range(max_orders):
-                        price_step_percentage = get_price_step_percentage(
-                            i, base_price_step_percentage
-                        )
-
-                        # BUY Orders
-                        if not usdt_pause and i < actual_buy_orders:
-                            if token_pause:
-                                temp_buy_price = get_buy_price_in_spread()
-                            else:
-                                temp_buy_price = best_buy_price  # Use the already-capped best_buy_price from above
-                            
-                            # CRITICAL: Ensure buy price NEVER exceeds bid price
-                            if temp_buy_price > bid_price:
-                                print(f"[WARNING] Buy price ({temp_buy_price:.6f}) exceeds bid ({bid_price:.6f}), capping")
-                                temp_buy_price = bid_price * 0.999
-                            
-                            # CRITICAL: Ensure buy price NEVER exceeds MAX_BUY_PRICE (if enabled)
-                            if MAX_BUY_PRICE and temp_buy_price > MAX_BUY_PRICE:
-                                print(f"[MAX_PRICE] Buy price ({temp_buy_price:.6f}) exceeds MAX_BUY_PRICE ({MAX_BUY_PRICE:.6f}), capping")
-                                temp_buy_price = MAX_BUY_PRICE
-
-                            if i == 0:
-                                buy_price = temp_buy_price
-                                cumulative_buy_step = 0
-                            else:
-                                # Accumulate the step percentage
-                                cumulative_buy_step += price_step_percentage
-                                # Ensure minimum 0.25% distance for first order after base
-                                if i == 1 and cumulative_buy_step < 0.0025:
-                                    cumulative_buy_step = 0.0025
-                                # In compliance mode, cap at 1% instead of 10%
-                                max_distance = 0.01 if compliance_mode else 0.10
-                                if cumulative_buy_step > max_distance:
-                                    cumulative_buy_step = max_distance
-                                buy_price = temp_buy_price * (1 - cumulative_buy_step)
-                            
-                            # FINAL CHECK: Ensure buy_price never exceeds bid
-                            if buy_price > bid_price:
-                                print(f"[ERROR] Calculated buy_price ({buy_price:.6f}) exceeds bid ({bid_price:.6f}), forcing to bid * 0.999")
-                                buy_price = bid_price * 0.999
-                            
-                            # FINAL CHECK: Ensure buy_price never exceeds MAX_BUY_PRICE (if enabled)
-                            if MAX_BUY_PRICE and buy_price > MAX_BUY_PRICE:
-                                print(f"[MAX_PRICE] Calculated buy_price ({buy_price:.6f}) exceeds MAX_BUY_PRICE ({MAX_BUY_PRICE:.6f}), forcing to {MAX_BUY_PRICE}")
-                                buy_price = MAX_BUY_PRICE
-
-                            distance_pct = (cumulative_buy_step * 100) if i > 0 else 0
-                            
-                            # Skip if index out of range
-                            if i >= len(buy_order_sizes):
-                                buy_failed += 1
-                                if i < 3:
-                                    print(f"  [BUY #{i+1}] SKIPPED: Order not available (index out of range)")
-                                continue
-                            
-                            # Check minimum order value (price * quantity >= 5 USDT) and minimum size
-                            # Exchange requires higher minimums - be strict here
-                            MIN_ORDER_VALUE = 5.0
-                            order_value = buy_order_sizes[i] * buy_price
-                            if order_value < MIN_ORDER_VALUE or buy_order_sizes[i] < min_order_size:
-                                buy_failed += 1
-                                if i < 3:
-                                    print(f"  [BUY #{i+1}] SKIPPED: Order value {order_value:.2f} USDT < {MIN_ORDER_VALUE} or size {buy_order_sizes[i]:.2f} < {min_order_size}")
-                                continue
-                            
-                            res = place_order(
-                                SYMBOL,
-                                "buy_maker",
-                                buy_order_sizes[i],
-                                buy_price,
-                            )
-                            # Check for success - handle different response formats
-                            is_success = (
-                                res.get("msg") == "Success" or 
-                                res.get("result") == "true" or 
-                                res.get("result") is True or
-                                (res.get("data") and res.get("data").get("order_id"))
-                            )
-                            if is_success:
-                                order_id = res.get("data", {}).get("order_id", "N/A")
-                                buy_order_ids.append(order_id)
-                                buy_placed += 1
-                                if i < 3 or i == num_orders - 1:  # Show first 3 and last order
-                                    print(f"  [BUY #{i+1}] Price: {buy_price:.6f} | Size: {buy_order_sizes[i]:.2f} | Distance: {distance_pct:.2f}% | Order ID: {order_id}")
-                            else:
-                                buy_failed += 1
-                                error_msg = res.get("error", res.get("msg", "Unknown error"))
-                                error_lower = str(error_msg).lower()
-                                
-                                # Handle insufficient balance - stop trying more buy orders
-                                if "currency is not enough" in error_lower or "insufficient" in error_lower or "not enough" in error_lower:
-                                    if i == 0:  # First order failed due to balance
-                                        print(f"  [BUY #{i+1}] FAILED: Insufficient USDT balance. Need more USDT for buy orders.")
-                                        print(f"  [INFO] Skipping remaining buy orders due to insufficient balance")
-                                    break  # Stop trying more buy orders
-                                # Handle minimum value/quantity errors
-                                elif "minimum value" in error_lower or "minimum" in error_lower and ("quantity" in error_lower or "value" in error_lower):
-                                    print(f"  [BUY #{i+1}] FAILED: {error_msg}")
-                                    print(f"  [INFO] Order size {buy_order_sizes[i]:.2f} or value {buy_order_sizes[i] * buy_price:.2f} below exchange minimum")
-                                    # Skip this and remaining orders (they'll all be too small)
-                                    break
-                                elif i < 3:  # Show first few other failures
-                                    print(f"  [BUY #{i+1}] FAILED: {error_msg}")
+                    # BUY Orders
+                    if not usdt_pause and actual_buy_orders > 0:
+                        if token_pause:
+                            temp_buy_price = get_buy_price_in_spread()
                         else:
-                            if i == 0:
-                                print("[PAUSE] Buy orders paused (USDT balance protection)")
-
-                        # SELL Orders
-                        if not token_pause and i < actual_sell_orders:
-                            # Ensure best_sell_price is valid (must be above ask price)
-                            if best_sell_price <= 0 or best_sell_price < ask_price:
-                                print(f"[WARNING] Invalid best_sell_price ({best_sell_price:.6f}), recalculating from ask_price {ask_price:.6f}")
-                                best_sell_price = ask_price * 1.02
-                            
-                            if i == 0:
-                                sell_price = best_sell_price
-                                cumulative_sell_step = 0
-                            else:
-                                # Accumulate the step percentage
-                                cumulative_sell_step += price_step_percentage
-                                # Ensure minimum 0.25% distance for first order after base
-                                if i == 1 and cumulative_sell_step < 0.0025:
-                                    cumulative_sell_step = 0.0025
-                                # SAFETY FEATURE 4: Dynamic distance adjustment for wide spreads
-                                if compliance_mode:
-                                    max_distance = 0.01  # 1% in compliance mode
-                                elif reduce_distance_on_wide_spread and spread_pct > wide_spread_threshold:
-                                    # Reduce max distance to 5% when spread > 20%
-                                    max_distance = 0.05
-                                else:
-                                    max_distance = 0.10  # Default 10%
-                                
-                                if cumulative_sell_step > max_distance:
-                                    cumulative_sell_step = max_distance
-                                # Use best_sell_price (which is above ask) as base
-                                sell_price = best_sell_price * (1 + cumulative_sell_step)
-                            
-                            # Final validation: ensure sell price is above ask price
-                            if sell_price < ask_price:
-                                print(f"[WARNING] Sell price {sell_price:.6f} below ask {ask_price:.6f}, adjusting")
-                                sell_price = ask_price * 1.02
-                            
-                            # Skip if index out of range
-                            if i >= len(sell_order_sizes):
-                                sell_failed += 1
-                                if i < 3:
-                                    print(f"  [SELL #{i+1}] SKIPPED: Order not available (index out of range)")
-                                continue
-                            
-                            # Check minimum order value (price * quantity >= 5 USDT) and minimum size
-                            # Exchange requires higher minimums - be strict here
-                            MIN_ORDER_VALUE = 5.0
-                            order_value = sell_order_sizes[i] * sell_price
-                            if order_value < MIN_ORDER_VALUE or sell_order_sizes[i] < min_order_size:
-                                sell_failed += 1
-                                if i < 3:
-                                    print(f"  [SELL #{i+1}] SKIPPED: Order value {order_value:.2f} USDT < {MIN_ORDER_VALUE} or size {sell_order_sizes[i]:.2f} < {min_order_size}")
-                                continue
+                            temp_buy_price = best_buy_price  # Use the already-capped best_buy_price from above
+                        
+                        # CRITICAL: Ensure buy price NEVER exceeds bid price
+                        if temp_buy_price > bid_price:
+                            log("[WARNING] Buy price (%.6f) exceeds bid (%.6f), capping", temp_buy_price, bid_price)
+                            temp_buy_price = bid_price * 0.999
+                        
+                        # CRITICAL: Ensure buy price NEVER exceeds MAX_BUY_PRICE (if enabled)
+                        if MAX_BUY_PRICE and temp_buy_price > MAX_BUY_PRICE:
+                            log("[MAX_PRICE] Buy price (%.6f) exceeds MAX_BUY_PRICE (%.6f), capping", temp_buy_price, MAX_BUY_PRICE)
+                            temp_buy_price = MAX_BUY_PRICE
+                        
+                        # In compliance mode, cap at 1% instead of 10%
+                        buy_distances = step_distances(actual_buy_orders, base_price_step_percentage, 0.01 if compliance_mode else 0.10)
+                        buy_prices = temp_buy_price * (1 - buy_distances)
+                        
+                        # FINAL CHECK: Ensure buy prices never exceed bid (or MAX_BUY_PRICE, if enabled)
+                        buy_cap = min(bid_price * 0.999, MAX_BUY_PRICE) if MAX_BUY_PRICE else bid_price * 0.999
+                        over_limit = (buy_prices > bid_price) | ((buy_prices > MAX_BUY_PRICE) if MAX_BUY_PRICE else False)
+                        if over_limit.any():
+                            log("[ERROR] %s buy prices exceed bid/MAX_BUY_PRICE, forcing to %.6f", int(over_limit.sum()), buy_cap)
+                            buy_prices = np.where(over_limit, buy_cap, buy_prices)
+                        
+                        # Levels without a size (index out of range) are skipped
+                        buy_sizes = np.asarray(buy_order_sizes[:actual_buy_orders], dtype=np.float64)
+                        if len(buy_sizes) < actual_buy_orders:
+                            buy_failed += actual_buy_orders - len(buy_sizes)
+                            log("  [BUY] SKIPPED %s levels: Order not available (index out of range)", actual_buy_orders - len(buy_sizes))
+                        buy_ladder = make_levels(buy_prices[:len(buy_sizes)], buy_sizes, distance_pct=buy_distances[:len(buy_sizes)] * 100)
+                        buy_levels, skipped_buy = filter_levels(buy_ladder, min_order_size, MIN_ORDER_VALUE)
+                        buy_failed += len(skipped_buy)
+                        for i, _, size, order_value, _ in skipped_buy[skipped_buy["index"] < 3].tolist():
+                            log("  [BUY #%d] SKIPPED: Order value %.2f USDT < %s or size %.2f < %s", i+1, order_value, MIN_ORDER_VALUE, size, min_order_size)
+                    elif max_orders > 0:
+                        log("[PAUSE] Buy orders paused (USDT balance protection)")
+                    
+                    # SELL Orders
+                    if not token_pause and actual_sell_orders > 0:
+                        # Ensure best_sell_price is valid (must be above ask price)
+                        if best_sell_price <= 0 or best_sell_price < ask_price:
+                            log("[WARNING] Invalid best_sell_price (%.6f), recalculating from ask_price %.6f", best_sell_price, ask_price)
+                            best_sell_price = ask_price * 1.02
+                        
+                        # SAFETY FEATURE 4: Dynamic distance adjustment for wide spreads
+                        if compliance_mode:
+                            max_distance = 0.01  # 1% in compliance mode
+                        elif reduce_distance_on_wide_spread and spread_pct > wide_spread_threshold:
+                            # Reduce max distance to 5% when spread > 20%
+                            max_distance = 0.05
+                        else:
+                            max_distance = 0.10  # Default 10%
+                        
+                        # Use best_sell_price (which is above ask) as base
+                        sell_distances = step_distances(actual_sell_orders, base_price_step_percentage, max_distance)
+                        sell_prices = best_sell_price * (1 + sell_distances)
+                        
+                        # Final validation: ensure sell prices are above ask price
+                        below_ask = sell_prices < ask_price
+                        if below_ask.any():
+                            log("[WARNING] %s sell prices below ask %.6f, adjusting", int(below_ask.sum()), ask_price)
+                            sell_prices = np.where(below_ask, ask_price * 1.02, sell_prices)
+                        
+                        # Levels without a size (index out of range) are skipped
+                        sell_sizes = np.asarray(sell_order_sizes[:actual_sell_orders], dtype=np.float64)
+                        if len(sell_sizes) < actual_sell_orders:
+                            sell_failed += actual_sell_orders - len(sell_sizes)
+                            log("  [SELL] SKIPPED %s levels: Order not available (index out of range)", actual_sell_orders - len(sell_sizes))
+                        sell_ladder = make_levels(sell_prices[:len(sell_sizes)], sell_sizes, distance_pct=sell_distances[:len(sell_sizes)] * 100)
+                        sell_levels, skipped_sell = filter_levels(sell_ladder, min_order_size, MIN_ORDER_VALUE)
+                        sell_failed += len(skipped_sell)
+                        for i, _, size, order_value, _ in skipped_sell[skipped_sell["index"] < 3].tolist():
+                            log("  [SELL #%d] SKIPPED: Order value %.2f USDT < %s or size %.2f < %s", i+1, order_value, MIN_ORDER_VALUE, size, min_order_size)
+                    elif max_orders > 0:
+                        log("[PAUSE] Sell orders paused (Token balance protection)")
+                    
+                    # Place every level of both sides concurrently
+                    phase_tracer.phase("placement")
+                    published = publish_ladder(
+                        SYMBOL,
+                        level_pairs(buy_levels),
+                        level_pairs(sell_levels),
+                        max_in_flight=ladder_max_in_flight,
+                    )
+                    tick_journal.ladder(buy_levels, sell_levels, published)
+                    
+                    buy_balance_error_reported = False
+                    for (i, buy_price, size, _, distance_pct), res in zip(buy_levels.tolist(), published["buy"]):
+                        # Check for success - handle different response formats
+                        if is_order_success(res) or order_id_from_response(res):
+                            order_id = order_id_from_response(res) or "N/A"
+                            buy_placed += 1
+                            if i < 3 or i == num_orders - 1:  # Show first 3 and last order
+                                log("  [BUY #%d] Price: %.6f | Size: %.2f | Distance: %.2f%% | Order ID: %s", i+1, buy_price, size, distance_pct, order_id)
+                        else:
+                            buy_failed += 1
+                            error_msg = res.get("error", res.get("msg", "Unknown error"))
+                            error_lower = str(error_msg).lower()
                             
-                            distance_pct = (cumulative_sell_step * 100) if i > 0 else 0
-                            res = place_order(
-                                SYMBOL, "sell_maker", sell_order_sizes[i], sell_price
-                            )
-                            # Check for success - handle different response formats
-                            is_success = (
-                                res.get("msg") == "Success" or 
-                                res.get("result") == "true" or 
-                                res.get("result") is True or
-                                (res.get("data") and res.get("data").get("order_id"))
-                            )
-                            if is_success:
-                                order_id = res.get("data", {}).get("order_id", "N/A")
-                                sell_order_ids.append(order_id)
-                                sell_placed += 1
-                                if i < 3 or i == num_orders - 1:  # Show first 3 and last order
-                                    print(f"  [SELL #{i+1}] Price: {sell_price:.6f} | Size: {sell_order_sizes[i]:.2f} | Distance: {distance_pct:.2f}% | Order ID: {order_id}")
-                            else:
-                                sell_failed += 1
-                                error_msg = res.get("error", res.get("msg", "Unknown error"))
-                                error_lower = str(error_msg).lower()
-                                
-                                # Handle insufficient balance - stop trying more sell orders
-                                if "currency is not enough" in error_lower or "insufficient" in error_lower or "not enough" in error_lower:
-                                    if i == 0:  # First order failed due to balance
-                                        print(f"  [SELL #{i+1}] FAILED: Insufficient {token_symbol.upper()} balance. Need more tokens for sell orders.")
-                                        print(f"  [INFO] Skipping remaining sell orders due to insufficient balance")
-                                    break  # Stop trying more sell orders
-                                # Handle minimum value/quantity errors
-                                elif "minimum value" in error_lower or "minimum" in error_lower and ("quantity" in error_lower or "value" in error_lower):
-                                    print(f"  [SELL #{i+1}] FAILED: {error_msg}")
-                                    print(f"  [INFO] Order size {sell_order_sizes[i]:.2f} or value {sell_order_sizes[i] * sell_price:.2f} below exchange minimum")
-                                    # Skip this and remaining orders (they'll all be too small)
-                                    break
-                                # Handle price validation errors
-                                elif "price must not be lower" in error_lower or "price must not be higher" in error_lower:
-                                    print(f"  [SELL #{i+1}] FAILED: {error_msg}")
-                                    # Skip this order and continue with next
-                                    continue
-                                elif i < 3:  # Show first few other failures
-                                    print(f"  [SELL #{i+1}] FAILED: {error_msg}")
+                            # Handle insufficient balance - report once for the whole side
+                            if "currency is not enough" in error_lower or "insufficient" in error_lower or "not enough" in error_lower:
+                                if not buy_balance_error_reported:
+                                    log("  [BUY #%d] FAILED: Insufficient USDT balance. Need more USDT for buy orders.", i+1, level=logging.WARNING)
+                                    buy_balance_error_reported = True
+                            # Handle minimum value/quantity errors
+                            elif "minimum value" in error_lower or "minimum" in error_lower and ("quantity" in error_lower or "value" in error_lower):
+                                log("  [BUY #%d] FAILED: %s", i+1, error_msg, level=logging.WARNING)
+                                log("  [INFO] Order size %.2f or value %.2f below exchange minimum", size, size * buy_price)
+                            elif i < 3:  # Show first few other failures
+                                log("  [BUY #%d] FAILED: %s", i+1, error_msg, level=logging.WARNING)
+                    
+                    sell_balance_error_reported = False
+                    for (i, sell_price, size, _, distance_pct), res in zip(sell_levels.tolist(), published["sell"]):
+                        # Check for success - handle different response formats
+                        if is_order_success(res) or order_id_from_response(res):
+                            order_id = order_id_from_response(res) or "N/A"
+                            sell_placed += 1
+                            if i < 3 or i == num_orders - 1:  # Show first 3 and last order
+                                log("  [SELL #%d] Price: %.6f | Size: %.2f | Distance: %.2f%% | Order ID: %s", i+1, sell_price, size, distance_pct, order_id)
                         else:
-                            if i == 0:
-                                print("[PAUSE] Sell orders paused (Token balance protection)")
+                            sell_failed += 1
+                            error_msg = res.get("error", res.get("msg", "Unknown error"))
+                            error_lower = str(error_msg).lower()
+                            
+                            # Handle insufficient balance - report once for the whole side
+                            if "currency is not enough" in error_lower or "insufficient" in error_lower or "not enough" in error_lower:
+                                if not sell_balance_error_reported:
+                                    log("  [SELL #%d] FAILED: Insufficient %s balance. Need more tokens for sell orders.", i+1, token_symbol.upper(), level=logging.WARNING)
+                                    sell_balance_error_reported = True
+                            # Handle minimum value/quantity errors
+                            elif "minimum value" in error_lower or "minimum" in error_lower and ("quantity" in error_lower or "value" in error_lower):
+                                log("  [SELL #%d] FAILED: %s", i+1, error_msg, level=logging.WARNING)
+                                log("  [INFO] Order size %.2f or value %.2f below exchange minimum", size, size * sell_price)
+                            # Handle price validation errors
+                            elif "price must not be lower" in error_lower or "price must not be higher" in error_lower:
+                                log("  [SELL #%d] FAILED: %s", i+1, error_msg, level=logging.WARNING)
+                            elif i < 3:  # Show first few other failures
+                                log("  [SELL #%d] FAILED: %s", i+1, error_msg, level=logging.WARNING)
                     
-                    print(f"\n[SUMMARY] Buy Orders: {buy_placed} placed, {buy_failed} failed | Sell Orders: {sell_placed} placed, {sell_failed} failed")
-                    print(f"[SUMMARY] Total Active Orders: {len(buy_order_ids) + len(sell_order_ids)}")
+                    log("\n[SUMMARY] Buy Orders: %s placed, %s failed | Sell Orders: %s placed, %s failed", buy_placed, buy_failed, sell_placed, sell_failed)
+                    log("[SUMMARY] Total Active Orders: %s", order_registry.count())
                     
                     # Check balance AFTER placing orders to detect any changes
+                    phase_tracer.phase("post_balance")
                     balance_after_orders = fetch_account_balance()
                     usdt_free_after = balance_after_orders["usdt"]["free"]
                     usdt_locked_after = balance_after_orders["usdt"]["locked"]
@@ -1442,35 +1578,40 @@ def market_making(
                     
                     # Show locked funds in orders
                     if usdt_locked_after > 0 or token_locked_after > 0:
-                        print(f"[BALANCE] After orders: USDT {usdt_free_after:.2f} free + {usdt_locked_after:.2f} locked = {usdt_total_after:.2f} total")
-                        print(f"[BALANCE] After orders: {token_symbol.upper()} {token_free_after:.2f} free + {token_locked_after:.2f} locked = {token_total_after:.2f} total")
+                        log("[BALANCE] After orders: USDT %.2f free + %.2f locked = %.2f total", usdt_free_after, usdt_locked_after, usdt_total_after)
+                        log("[BALANCE] After orders: %s %.2f free + %.2f locked = %.2f total", token_symbol.upper(), token_free_after, token_locked_after, token_total_after)
                     
                     # Warn if USDT decreased significantly (likely from filled buy orders)
                     if usdt_change_this_iter < -0.1:  # More than 0.1 USDT decrease
-                        print(f"[WARNING] ⚠ USDT decreased by {abs(usdt_change_this_iter):.2f} USDT this iteration!")
-                        print(f"[WARNING] This likely means buy orders filled (consuming USDT) without matching sell fills")
-                        print(f"[WARNING] Check if sell orders are too far from market price to fill")
+                        log("[WARNING] ⚠ USDT decreased by %.2f USDT this iteration!", abs(usdt_change_this_iter))
+                        log("[WARNING] This likely means buy orders filled (consuming USDT) without matching sell fills")
+                        log("[WARNING] Check if sell orders are too far from market price to fill")
                     
                     # Track if tokens increased (from filled buy orders)
                     if token_change_this_iter > 0.1:
-                        print(f"[INFO] Tokens increased by {token_change_this_iter:.2f} (likely from filled buy orders)")
+                        log("[INFO] Tokens increased by %.2f (likely from filled buy orders)", token_change_this_iter)
 
                     sleep_time = get_dynamic_sleep_time(current_volatility)
-                    print(f"\n[WAIT] Sleeping for {sleep_time:.1f} seconds before next iteration...")
-                    time.sleep(sleep_time)
+                    log("\n[WAIT] Sleeping for %.1f seconds before next iteration...", sleep_time)
+                    end_tick("quoted")
+                    scheduler.sleep(sleep_time, reference_mid=mid_price)
 
             except Exception as e:
-                print(f"\n[ERROR] An error occurred in iteration {iteration}: {e}")
-                traceback.print_exc()
-                print("[WAIT] Waiting 10 seconds before retrying...")
+                end_tick("error")
+                log("\n[ERROR] An error occurred in iteration %s: %s", iteration, e, exc_info=True)
+                log("[WAIT] Waiting 10 seconds before retrying...")
                 time.sleep(10)
     except KeyboardInterrupt:
-        print("\n\n[STOP] Bot stopped by user (Ctrl+C)")
-        print("[CLEANUP] Cancelling all active orders...")
-        if buy_order_ids:
-            print(f"[CLEANUP] Cancelling {len(buy_order_ids)} buy orders...")
-            cancel_list_of_orders(SYMBOL, buy_order_ids)
-        if sell_order_ids:
-            print(f"[CLEANUP] Cancelling {len(sell_order_ids)} sell orders...")
-            cancel_list_of_orders(SYMBOL, sell_order_ids)
-        print("[CLEANUP] All orders cancelled. Bot stopped.")
+        log("\n\n[STOP] Bot stopped by user (Ctrl+C)")
+        log("[CLEANUP] Cancelling all active orders...")
+        buy_order_ids = order_registry.ids("buy")
+        sell_order_ids = order_registry.ids("sell")
+        order_ids = buy_order_ids + sell_order_ids
+        if order_ids:
+            log("[CLEANUP] Cancelling %s buy and %s sell orders...", len(buy_order_ids), len(sell_order_ids))
+            # Every batch at once: stale quotes stay exposed for about one round trip
+            cancel_result = cancel_list_of_orders(SYMBOL, order_ids, max_in_flight=len(order_ids))
+            for order_id, error in cancel_result.failed.items():
+                log("[CLEANUP] Could not cancel order %s: %s", order_id, error)
+        log("[CLEANUP] All orders cancelled. Bot stopped.")
+        checkpoint_state()
@@ -0,0 +1,341 @@
+import asyncio
+import json
+import queue
+import threading
+import time
+
+import aiohttp
+
+from src.logger import log
+
+
+def parse_order_update(update):
+    """
+    Normalize an LBank orderUpdate push into the parse_open_orders shape.
+
+    Parameters:
+    - update: The "orderUpdate" object of the push message
+
+    Returns:
+    - tuple: (order dict, closed) - closed is True once the order is filled, cancelled
+      or partially filled and cancelled
+    """
+    trade_type = str(update.get("type", "")).lower()
+    side = "buy" if "buy" in trade_type else "sell" if "sell" in trade_type else None
+    orig_qty = float(update.get("orderAmt", update.get("amount", 0)) or 0)
+    executed_qty = float(update.get("accAmt", update.get("executedQty", 0)) or 0)
+    price = float(update.get("orderPrice", update.get("price", 0)) or 0)
+    status = int(update.get("orderStatus", 0) or 0)
+    order = {
+        "order_id": update.get("uuid") or update.get("orderId") or update.get("order_id"),
+        "side": side,
+        "price": price,
+        "orig_qty": orig_qty,
+        "executed_qty": executed_qty,
+        "remaining_qty": orig_qty - executed_qty if orig_qty >= executed_qty else 0.0,
+        "status": status,
+    }
+    # orderStatus: -1 cancelled, 0 open, 1 partially filled, 2 filled, 3 partially filled and cancelled,
+    # 4 cancelling
+    return order, status in (-1, 2, 3)
+
+
+class MarketStream:
+    """
+    Consumer for LBank's WebSocket push feeds (depth, trades, order updates).
+
+    Runs its own asyncio loop in a daemon thread, keeps the latest best bid/ask
+    and last trade locally, applies order updates to the order registry, and
+    queues events ("price", "trade", "fill", "connected", "disconnected") for the
+    strategy loop. Every event also sets `wakeup`, so a waiting loop can react
+    immediately.
+
+    While the stream is down or quiet for longer than stale_seconds, is_live()
+    is False and callers fall back to REST polling. The connection is retried
+    with exponential backoff. The URL is configurable, so it can be pointed at a
+    local stand-in server.
+    """
+
+    def __init__(
+        self,
+        url,
+        symbol,
+        depth_levels=10,
+        registry=None,
+        subscribe_key_provider=None,
+        subscribe_key_refresher=None,
+        key_refresh_seconds=1800,
+        stale_seconds=10.0,
+        reconnect_max_seconds=30.0,
+        max_events=1000,
+    ):
+        self.url = url
+        self.symbol = symbol
+        self.depth_levels = depth_levels
+        self.registry = registry
+        self.subscribe_key_provider = subscribe_key_provider  # callable -> key, for order updates
+        self.subscribe_key_refresher = subscribe_key_refresher  # callable(key), keeps the key valid
+        self.key_refresh_seconds = key_refresh_seconds
+        self.stale_seconds = stale_seconds
+        self.reconnect_max_seconds = reconnect_max_seconds
+
+        self.wakeup = threading.Event()
+        self._listeners = []  # callables(event), run on the stream thread
+        self._events = queue.Queue(maxsize=max_events)
+        self._lock = threading.Lock()
+        self._state = {
+            "bid": None,
+            "ask": None,
+            "bids": [],
+            "asks": [],
+            "last_trade_price": None,
+            "updated_at": None,  # monotonic time of the last market message
+        }
+        self.connected = False
+        self.messages = 0
+        self.reconnects = 0
+        self._loop = None
+        self._thread = None
+        self._task = None
+        self._stopping = False
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        """
+        Start the consumer thread (no-op if already running).
+        """
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="lbank-market-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the consumer thread and close the connection.
+        """
+        if self._thread is None:
+            return
+        self._stopping = True
+        if self._task is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        self._thread.join(timeout=5)
+        self._thread = None
+        self._loop = None
+        self._task = None
+        self.connected = False
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._task = self._loop.create_task(self._consume_forever())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    # ---------- state accessors (any thread) ----------
+
+    def is_live(self):
+        """
+        Check whether streamed market data can be trusted right now.
+
+        Returns:
+        - bool: True if connected and a market message arrived within stale_seconds
+        """
+        with self._lock:
+            updated_at = self._state["updated_at"]
+        return self.connected and updated_at is not None and time.monotonic() - updated_at <= self.stale_seconds
+
+    def best_bid_ask(self):
+        """
+        Latest streamed best bid/ask.
+
+        Returns:
+        - tuple: (bid, ask), or (None, None) if the stream is not live
+        """
+        if not self.is_live():
+            return None, None
+        with self._lock:
+            return self._state["bid"], self._state["ask"]
+
+    def book_ticker(self):
+        """
+        Latest best bid/ask in the bookTicker.do response format.
+
+        Returns:
+        - dict: {"result": "true", "data": {...}}, or None if the stream is not live
+        """
+        bid, ask = self.best_bid_ask()
+        if not bid or not ask:
+            return None
+        return {
+            "result": "true",
+            "data": {"symbol": self.symbol, "bidPrice": str(bid), "askPrice": str(ask)},
+            "source": "stream",
+        }
+
+    def mid_price(self):
+        """
+        Latest streamed mid price, or None if the stream is not live.
+        """
+        bid, ask = self.best_bid_ask()
+        if not bid or not ask:
+            return None
+        return (bid + ask) / 2
+
+    def add_listener(self, callback):
+        """
+        Call `callback(event)` for every event, on the stream thread (keep it fast).
+
+        Parameters:
+        - callback: Callable taking the event dict
+        """
+        self._listeners.append(callback)
+
+    def drain_events(self):
+        """
+        Take every queued event (oldest first) and clear the wakeup flag.
+
+        Returns:
+        - list: Event dicts, each with "type" and "ts" (unix time)
+        """
+        self.wakeup.clear()
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    # ---------- consumer ----------
+
+    def _emit(self, event_type, **fields):
+        event = {"type": event_type, "ts": time.time(), **fields}
+        try:
+            self._events.put_nowait(event)
+        except queue.Full:
+            # Drop the oldest event: the latest state matters more than history
+            try:
+                self._events.get_nowait()
+            except queue.Empty:
+                pass
+            self._events.put_nowait(event)
+        self.wakeup.set()
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                log(f"[STREAM] Event listener failed: {e}")
+
+    def _subscriptions(self, subscribe_key):
+        subs = [
+            {"action": "subscribe", "subscribe": "depth", "depth": str(self.depth_levels), "pair": self.symbol},
+            {"action": "subscribe", "subscribe": "trade", "pair": self.symbol},
+        ]
+        if subscribe_key:
+            subs.append({"action": "subscribe", "subscribe": "orderUpdate", "subscribeKey": subscribe_key, "pair": self.symbol})
+        return subs
+
+    async def _consume_forever(self):
+        backoff = 1.0
+        async with aiohttp.ClientSession() as session:
+            while not self._stopping:
+                try:
+                    await self._consume_once(session)
+                    backoff = 1.0
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log(f"[STREAM] Connection error: {e}")
+                if self.connected:
+                    self.connected = False
+                    self._emit("disconnected")
+                if self._stopping:
+                    break
+                self.reconnects += 1
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.reconnect_max_seconds)
+
+    async def _consume_once(self, session):
+        loop = asyncio.get_running_loop()
+        subscribe_key = None
+        if self.subscribe_key_provider is not None:
+            try:
+                subscribe_key = await loop.run_in_executor(None, self.subscribe_key_provider)
+            except Exception as e:
+                log(f"[STREAM] Could not get subscribe key, order updates disabled: {e}")
+
+        async with session.ws_connect(self.url, heartbeat=None) as ws:
+            for sub in self._subscriptions(subscribe_key):
+                await ws.send_str(json.dumps(sub))
+            self.connected = True
+            self._emit("connected")
+            log(f"[STREAM] Connected to {self.url} ({self.symbol}{', order updates' if subscribe_key else ''})")
+
+            key_refreshed_at = time.monotonic()
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    await self._handle(ws, msg.data)
+                elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+                if (
+                    subscribe_key
+                    and self.subscribe_key_refresher is not None
+                    and time.monotonic() - key_refreshed_at > self.key_refresh_seconds
+                ):
+                    key_refreshed_at = time.monotonic()
+                    loop.run_in_executor(None, self.subscribe_key_refresher, subscribe_key)
+
+    async def _handle(self, ws, raw):
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return
+        if not isinstance(data, dict):
+            return
+        self.messages += 1
+
+        # Keep-alive: the server pings, we must pong with the same id
+        if data.get("action") == "ping":
+            await ws.send_str(json.dumps({"action": "pong", "pong": data.get("ping")}))
+            return
+
+        message_type = data.get("type")
+        if message_type == "depth":
+            depth = data.get("depth") or {}
+            bids = [(float(p), float(q)) for p, q in (depth.get("bids") or [])[: self.depth_levels]]
+            asks = [(float(p), float(q)) for p, q in (depth.get("asks") or [])[: self.depth_levels]]
+            with self._lock:
+                self._state["bids"] = bids
+                self._state["asks"] = asks
+                self._state["bid"] = bids[0][0] if bids else None
+                self._state["ask"] = asks[0][0] if asks else None
+                self._state["updated_at"] = time.monotonic()
+                bid, ask = self._state["bid"], self._state["ask"]
+            if bid and ask:
+                self._emit("price", bid=bid, ask=ask, mid=(bid + ask) / 2)
+        elif message_type == "trade":
+            trade = data.get("trade") or {}
+            price = float(trade.get("price", 0) or 0)
+            with self._lock:
+                self._state["last_trade_price"] = price
+                self._state["updated_at"] = time.monotonic()
+            self._emit("trade", price=price, volume=float(trade.get("volume", 0) or 0), direction=trade.get("direction"))
+        elif message_type == "orderUpdate":
+            order, closed = parse_order_update(data.get("orderUpdate") or {})
+            new_executed_qty = 0.0
+            if self.registry is not None:
+                new_executed_qty = self.registry.apply_update(order, closed=closed)
+            if new_executed_qty > 0:
+                self._emit(
+                    "fill",
+                    order_id=order["order_id"],
+                    side=order["side"],
+                    price=order["price"],
+                    qty=new_executed_qty,
+                    closed=closed,
+                )
@@ -0,0 +1,156 @@
+from dataclasses import dataclass, field
+
+from src.logger import log
+from src.utils import OPEN_ORDERS_PAGE_LENGTH, get_current_orders, parse_open_orders, pair
+
+
+def _is_ok(res):
+    return bool(res) and (res.get("result") == "true" or res.get("result") is True)
+
+
+def _page_info(res):
+    """
+    Pull the order list and the reported total out of one orders_info_no_deal page.
+    """
+    data = res.get("data", res)
+    if isinstance(data, dict):
+        orders = data.get("orders", []) or []
+        total = data.get("total", res.get("total"))
+    elif isinstance(data, list):
+        orders = data
+        total = None
+    else:
+        orders = []
+        total = None
+    try:
+        total = int(total) if total is not None else None
+    except (TypeError, ValueError):
+        total = None
+    return orders, total
+
+
+def iter_open_order_pages(symbol=None, page_length=OPEN_ORDERS_PAGE_LENGTH, max_pages=50):
+    """
+    Stream the pages of the open-orders query until the account's orders are exhausted.
+
+    A page shorter than page_length, or reaching the reported total, ends the
+    stream. A failed page is yielded as-is and ends the stream, so the caller can
+    tell a partial result from a complete one.
+
+    Parameters:
+    - symbol: Trading pair symbol (optional, defaults to pair from utils.py)
+    - page_length: Orders per page
+    - max_pages: Safety limit on the number of pages requested
+
+    Yields:
+    - tuple: (page number, response dict)
+    """
+    if symbol is None:
+        symbol = pair
+    seen = 0
+    for current_page in range(1, max_pages + 1):
+        res = get_current_orders(symbol, current_page=current_page, page_length=page_length)
+        yield current_page, res
+        if not _is_ok(res):
+            return
+        orders, total = _page_info(res)
+        seen += len(orders)
+        if len(orders) < page_length or (total is not None and seen >= total):
+            return
+    log(f"[WARNING] Open orders for {symbol}: stopped after {max_pages} pages of {page_length}")
+
+
+def iter_open_orders(symbol=None, page_length=OPEN_ORDERS_PAGE_LENGTH):
+    """
+    Stream all open orders (dicts from parse_open_orders) across pages.
+
+    Parameters:
+    - symbol: Trading pair symbol (optional, defaults to pair from utils.py)
+    - page_length: Orders per page
+
+    Yields:
+    - dict: One open order
+    """
+    for _, res in iter_open_order_pages(symbol, page_length):
+        if not _is_ok(res):
+            return
+        yield from parse_open_orders(res)
+
+
+@dataclass
+class OpenOrders:
+    """
+    Result of the single open-orders fetch of one tick.
+
+    ok is False when any page failed; orders then holds what was read before the
+    failure and the registry is left untouched.
+    """
+
+    ok: bool = False
+    orders: list = field(default_factory=list)
+    pages: int = 0
+    buy_depth_usdt: float = 0.0
+    sell_depth_usdt: float = 0.0
+    filled_buy_qty: float = 0.0
+    filled_buy_value: float = 0.0
+    filled_sell_qty: float = 0.0
+    filled_sell_value: float = 0.0
+    vanished_ids: list = field(default_factory=list)
+
+    @property
+    def count(self):
+        return len(self.orders)
+
+    @property
+    def buy_ids(self):
+        return [o["order_id"] for o in self.orders if o["side"] == "buy" and o["order_id"]]
+
+    @property
+    def sell_ids(self):
+        return [o["order_id"] for o in self.orders if o["side"] == "sell" and o["order_id"]]
+
+    @property
+    def has_fills(self):
+        return self.filled_buy_qty > 0 or self.filled_sell_qty > 0
+
+
+def fetch_open_orders(symbol=None, registry=None, page_length=OPEN_ORDERS_PAGE_LENGTH):
+    """
+    Download every page of open orders once and summarize them for the tick.
+
+    Parameters:
+    - symbol: Trading pair symbol (optional, defaults to pair from utils.py)
+    - registry: OrderRegistry to sync (fills are computed against it), optional
+    - page_length: Orders per page
+
+    Returns:
+    - OpenOrders: count, per-side open depth, fills since the last sync and the orders
+    """
+    result = OpenOrders()
+    try:
+        for current_page, res in iter_open_order_pages(symbol, page_length):
+            result.pages = current_page
+            if not _is_ok(res):
+                return result
+            result.orders.extend(parse_open_orders(res))
+    except Exception as e:
+        log(f"[ERROR] Failed to fetch open orders for {symbol or pair}: {e}")
+        return result
+    result.ok = True
+
+    # Open order depth: remaining size * price per side
+    for order in result.orders:
+        if order["remaining_qty"] > 0 and order["price"] > 0:
+            if order["side"] == "buy":
+                result.buy_depth_usdt += order["remaining_qty"] * order["price"]
+            else:
+                result.sell_depth_usdt += order["remaining_qty"] * order["price"]
+
+    if registry is not None:
+        fills = registry.sync(result.orders)
+        result.filled_buy_qty = fills["buy_qty"]
+        result.filled_buy_value = fills["buy_value"]
+        result.filled_sell_qty = fills["sell_qty"]
+        result.filled_sell_value = fills["sell_value"]
+        result.vanished_ids = fills["vanished"]
+    return result
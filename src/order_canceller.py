@@ -0,0 +1,116 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+
+@dataclass
+class CancelReport:
+    """
+    Outcome of cancelling a list of orders.
+
+    results maps every requested order ID to {"ok": bool, "error": str or None}.
+    """
+
+    results: dict = field(default_factory=dict)
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def cancelled(self):
+        return [order_id for order_id, r in self.results.items() if r["ok"]]
+
+    @property
+    def failed(self):
+        return {order_id: r["error"] for order_id, r in self.results.items() if not r["ok"]}
+
+    @property
+    def all_ok(self):
+        return all(r["ok"] for r in self.results.values())
+
+
+def split_ids(value):
+    """
+    Split a comma-joined order ID field ("id1,id2") from a batch cancel response.
+
+    Parameters:
+    - value: String, list or None
+
+    Returns:
+    - list: Order IDs
+    """
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value).split(",") if v.strip()]
+
+
+def parse_batch_cancel(order_ids, res):
+    """
+    Turn a v1/cancel_order.do response into per-order results.
+
+    For several IDs LBank answers with comma-joined "success" and "error" fields;
+    for a single ID it only sets "result" (and echoes "order_id").
+
+    Parameters:
+    - order_ids: IDs sent in the request
+    - res: Response dict
+
+    Returns:
+    - dict: order_id -> {"ok": bool, "error": str or None}
+    """
+    res = res or {}
+    message = res.get("msg") or res.get("error_code") or "cancel rejected"
+    if "success" in res or ("error" in res and len(order_ids) > 1):
+        succeeded = set(split_ids(res.get("success")))
+        return {
+            order_id: {"ok": order_id in succeeded, "error": None if order_id in succeeded else str(message)}
+            for order_id in order_ids
+        }
+    ok = res.get("result") == "true" or res.get("result") is True or res.get("msg") == "Success"
+    return {order_id: {"ok": ok, "error": None if ok else str(message)} for order_id in order_ids}
+
+
+def cancel_orders(symbol, order_ids, cancel_batch, batch_size=3, max_in_flight=8):
+    """
+    Cancel many orders with as few round trips as possible.
+
+    IDs are split into batches of batch_size (LBank's batch cancel takes at most
+    3), and the batches are sent concurrently with at most max_in_flight
+    requests running at once - 20 orders go out as 7 parallel requests, i.e.
+    about one round trip.
+
+    Parameters:
+    - symbol: Trading pair symbol (e.g., pair)
+    - order_ids: Order IDs to cancel (duplicates are dropped)
+    - cancel_batch: Callable(symbol, ids) -> {order_id: {"ok", "error"}} cancelling one batch
+    - batch_size: Maximum IDs per request
+    - max_in_flight: Maximum number of requests running at the same time
+
+    Returns:
+    - CancelReport: Per-order results
+    """
+    unique_ids = list(dict.fromkeys(order_id for order_id in order_ids if order_id))
+    report = CancelReport()
+    if not unique_ids:
+        return report
+
+    batch_size = max(1, batch_size)
+    batches = [unique_ids[i:i + batch_size] for i in range(0, len(unique_ids), batch_size)]
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(batches)))) as pool:
+        futures = [pool.submit(cancel_batch, symbol, batch) for batch in batches]
+        for batch, future in zip(batches, futures):
+            try:
+                results = future.result() or {}
+            except Exception as e:
+                results = {}
+                error = str(e)
+            else:
+                error = "missing from cancel response"
+            for order_id in batch:
+                report.results[order_id] = results.get(order_id) or {"ok": False, "error": error}
+    report.batches = len(batches)
+    report.elapsed_seconds = time.monotonic() - started
+    return report
@@ -0,0 +1,327 @@
+import bisect
+import threading
+from collections import OrderedDict
+
+
+class OrderRegistry:
+    """
+    In-process view of our resting orders, kept up to date incrementally.
+
+    Orders are stored by order ID (side, price, orig/executed qty, status) and
+    indexed per side by price level: a sorted list of distinct prices plus the
+    order IDs resting at each price. Open depth per side is maintained as a
+    running total, so depth-balance checks, MAX_BUY_PRICE scans and fill
+    detection don't have to re-walk the whole open-orders response.
+
+    Updated from placement results (record_placement), cancellations (remove),
+    streamed order updates (apply_update) and open-order queries (sync).
+    Every change that moves funds is forwarded to the balance ledger, if one is
+    attached: placements lock, cancels unlock, fills settle.
+    """
+
+    SIDES = ("buy", "sell")
+    CLOSED_HISTORY = 500  # closed order IDs remembered so a stale query can't resurrect them
+
+    def __init__(self, ledger=None):
+        self.ledger = ledger  # BalanceLedger or None
+        self._orders = {}  # order_id -> order dict (same keys as parse_open_orders)
+        self._prices = {side: [] for side in self.SIDES}  # sorted distinct prices per side
+        self._level_ids = {side: {} for side in self.SIDES}  # price -> set of order IDs
+        self._depth_usdt = {side: 0.0 for side in self.SIDES}  # remaining qty * price per side
+        self._closed = OrderedDict()  # order_id -> None, recently filled/cancelled orders
+        self._unsynced_fills = self._empty_fills()  # fills seen by apply_update since the last sync
+        self._restored = False  # orders came from a checkpoint and have not been checked against the exchange yet
+        self._lock = threading.Lock()  # placements are recorded from ladder worker threads
+
+    @staticmethod
+    def _empty_fills():
+        return {"buy_qty": 0.0, "buy_value": 0.0, "sell_qty": 0.0, "sell_value": 0.0}
+
+    # ---------- internal index maintenance (caller holds the lock) ----------
+
+    def _mark_closed(self, order_id):
+        self._closed[order_id] = None
+        self._closed.move_to_end(order_id)
+        while len(self._closed) > self.CLOSED_HISTORY:
+            self._closed.popitem(last=False)
+
+    def _index(self, order):
+        side, price = order["side"], order["price"]
+        ids = self._level_ids[side].get(price)
+        if ids is None:
+            ids = self._level_ids[side][price] = set()
+            bisect.insort(self._prices[side], price)
+        ids.add(order["order_id"])
+        self._depth_usdt[side] += order["remaining_qty"] * price
+
+    def _unindex(self, order):
+        side, price = order["side"], order["price"]
+        ids = self._level_ids[side].get(price)
+        if ids is not None:
+            ids.discard(order["order_id"])
+            if not ids:
+                del self._level_ids[side][price]
+                prices = self._prices[side]
+                i = bisect.bisect_left(prices, price)
+                if i < len(prices) and prices[i] == price:
+                    del prices[i]
+        self._depth_usdt[side] -= order["remaining_qty"] * price
+        if not self._orders:
+            # Avoid float drift once the book is empty
+            self._depth_usdt = {s: 0.0 for s in self.SIDES}
+
+    def _put(self, order):
+        previous = self._orders.pop(order["order_id"], None)
+        if previous is not None:
+            self._unindex(previous)
+        if order["remaining_qty"] > 0:
+            self._orders[order["order_id"]] = order
+            self._index(order)
+
+    # ---------- updates ----------
+
+    def record_placement(self, order_id, side, price, qty):
+        """
+        Register an order we just placed.
+
+        Parameters:
+        - order_id: Order ID returned by the exchange
+        - side: "buy" or "sell"
+        - price: Order price
+        - qty: Order size in tokens
+        """
+        if not order_id or side not in self.SIDES:
+            return
+        with self._lock:
+            if self.ledger is not None and order_id not in self._orders:
+                self.ledger.on_place(side, float(price), float(qty))
+            self._put({
+                "order_id": order_id,
+                "side": side,
+                "price": float(price),
+                "orig_qty": float(qty),
+                "executed_qty": 0.0,
+                "remaining_qty": float(qty),
+                "status": 0,
+            })
+
+    def remove(self, order_id):
+        """
+        Forget an order (cancelled or no longer open).
+
+        Parameters:
+        - order_id: Order ID
+
+        Returns:
+        - dict: The removed order, or None if it was not registered
+        """
+        with self._lock:
+            order = self._orders.pop(order_id, None)
+            if order is not None:
+                self._unindex(order)
+                if self.ledger is not None:
+                    self.ledger.on_release(order["side"], order["price"], order["remaining_qty"])
+            self._mark_closed(order_id)
+            return order
+
+    def apply_update(self, order, closed=False):
+        """
+        Apply a single-order update (e.g., a streamed order update).
+
+        The executed quantity added since the order was last seen is recorded as a
+        fill and reported by the next sync().
+
+        Parameters:
+        - order: Order dict with the parse_open_orders keys
+        - closed: True if the order is no longer open (filled or cancelled)
+
+        Returns:
+        - float: Newly executed quantity
+        """
+        order_id = order.get("order_id")
+        if not order_id or order.get("side") not in self.SIDES:
+            return 0.0
+        with self._lock:
+            if order_id in self._closed:
+                return 0.0
+            previous = self._orders.get(order_id)
+            new_executed_qty = order["executed_qty"] - (previous["executed_qty"] if previous else 0.0)
+            if new_executed_qty > 0:
+                self._unsynced_fills[f"{order['side']}_qty"] += new_executed_qty
+                self._unsynced_fills[f"{order['side']}_value"] += new_executed_qty * order["price"]
+                if self.ledger is not None:
+                    self.ledger.on_fill(order["side"], order["price"], new_executed_qty)
+            if closed:
+                if previous is not None:
+                    self._unindex(self._orders.pop(order_id))
+                    if self.ledger is not None:
+                        # Whatever was not filled has been cancelled
+                        self.ledger.on_release(
+                            order["side"], order["price"], previous["remaining_qty"] - max(0.0, new_executed_qty)
+                        )
+                self._mark_closed(order_id)
+            else:
+                self._put(dict(order))
+            return max(0.0, new_executed_qty)
+
+    def restore(self, orders):
+        """
+        Load orders saved before a restart (warm start).
+
+        The balance ledger is not touched: balances read from the exchange
+        already include these orders' locked funds. The next sync() compares them
+        with the live book; fills that happened while the bot was down are
+        reported as fills, and orders that are gone count as vanished.
+
+        Parameters:
+        - orders: Order dicts as returned by orders()
+
+        Returns:
+        - int: Number of orders restored
+        """
+        restored = 0
+        with self._lock:
+            for order in orders:
+                if not order.get("order_id") or order.get("side") not in self.SIDES:
+                    continue
+                self._put({
+                    "order_id": order["order_id"],
+                    "side": order["side"],
+                    "price": float(order["price"]),
+                    "orig_qty": float(order.get("orig_qty", order["remaining_qty"])),
+                    "executed_qty": float(order.get("executed_qty", 0.0)),
+                    "remaining_qty": float(order["remaining_qty"]),
+                    "status": order.get("status", 0),
+                })
+                restored += 1
+            self._restored = restored > 0
+        return restored
+
+    def clear(self):
+        """
+        Forget all orders (e.g., after cancel_all_orders).
+        """
+        with self._lock:
+            for order_id, order in self._orders.items():
+                self._mark_closed(order_id)
+                if self.ledger is not None:
+                    self.ledger.on_release(order["side"], order["price"], order["remaining_qty"])
+            self._orders.clear()
+            self._prices = {side: [] for side in self.SIDES}
+            self._level_ids = {side: {} for side in self.SIDES}
+            self._depth_usdt = {side: 0.0 for side in self.SIDES}
+
+    def sync(self, open_orders):
+        """
+        Apply an open-orders query: update known orders, add unknown ones and
+        drop the ones that are no longer open.
+
+        Fills are the executed quantity added since the order was last seen (an
+        order seen for the first time counts its whole executed quantity), plus
+        the fills apply_update recorded since the previous sync.
+
+        Parameters:
+        - open_orders: Open orders (dicts from parse_open_orders)
+
+        Returns:
+        - dict: {"buy_qty", "buy_value", "sell_qty", "sell_value"} filled since the last sync,
+          plus "vanished": IDs we had registered that are no longer open
+        """
+        with self._lock:
+            fills = self._unsynced_fills
+            self._unsynced_fills = self._empty_fills()
+            seen = set()
+            for order in open_orders:
+                order_id = order.get("order_id")
+                if not order_id or order.get("side") not in self.SIDES or order_id in self._closed:
+                    continue
+                seen.add(order_id)
+                previous = self._orders.get(order_id)
+                new_executed_qty = order["executed_qty"] - (previous["executed_qty"] if previous else 0.0)
+                if new_executed_qty > 0:
+                    fills[f"{order['side']}_qty"] += new_executed_qty
+                    fills[f"{order['side']}_value"] += new_executed_qty * order["price"]
+                    if self.ledger is not None:
+                        self.ledger.on_fill(order["side"], order["price"], new_executed_qty)
+                self._put(dict(order))
+            vanished = [order_id for order_id in self._orders if order_id not in seen]
+            for order_id in vanished:
+                self._unindex(self._orders.pop(order_id))
+            if vanished and self.ledger is not None:
+                # Filled or cancelled elsewhere - only the exchange knows which
+                self.ledger.mark_drift(f"{len(vanished)} orders closed outside the bot's view")
+            if self._restored:
+                # Balances read at startup already include fills from while the bot was down
+                self._restored = False
+                if self.ledger is not None and (fills["buy_qty"] > 0 or fills["sell_qty"] > 0):
+                    self.ledger.mark_drift("fills while the bot was restarting")
+        fills["vanished"] = vanished
+        return fills
+
+    # ---------- lookups ----------
+
+    def get(self, order_id):
+        """
+        Get a registered order by ID (a copy), or None.
+        """
+        with self._lock:
+            order = self._orders.get(order_id)
+            return dict(order) if order else None
+
+    def count(self, side=None):
+        """
+        Number of registered open orders (optionally for one side).
+        """
+        with self._lock:
+            if side is None:
+                return len(self._orders)
+            return sum(len(ids) for ids in self._level_ids[side].values())
+
+    def ids(self, side=None):
+        """
+        Order IDs (optionally for one side), as a new list.
+        """
+        with self._lock:
+            if side is None:
+                return list(self._orders)
+            return [order_id for ids in self._level_ids[side].values() for order_id in ids]
+
+    def orders(self, side=None):
+        """
+        Registered open orders (copies), optionally for one side.
+        """
+        with self._lock:
+            return [dict(o) for o in self._orders.values() if side is None or o["side"] == side]
+
+    def depth_usdt(self, side):
+        """
+        Open depth of one side in USDT (sum of remaining qty * price).
+        """
+        with self._lock:
+            return max(0.0, self._depth_usdt[side])
+
+    def best_price(self, side):
+        """
+        Highest resting buy price or lowest resting sell price, or None.
+        """
+        with self._lock:
+            prices = self._prices[side]
+            if not prices:
+                return None
+            return prices[-1] if side == "buy" else prices[0]
+
+    def ids_above(self, side, price):
+        """
+        IDs of orders on one side priced strictly above a limit (e.g., MAX_BUY_PRICE).
+
+        Parameters:
+        - side: "buy" or "sell"
+        - price: Price limit
+
+        Returns:
+        - list: Order IDs, lowest price first
+        """
+        with self._lock:
+            prices = self._prices[side]
+            start = bisect.bisect_right(prices, price)
+            return [order_id for p in prices[start:] for order_id in self._level_ids[side][p]]
@@ -0,0 +1,227 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+from src.logger import log
+
+
+def round_down(value, decimals):
+    """
+    Round towards zero to a number of decimals (None = leave as is).
+    """
+    if decimals is None:
+        return value
+    factor = 10 ** decimals
+    # The small epsilon keeps values that are already on the grid (e.g. 0.29999999999) where they are
+    return math.floor(value * factor + 1e-9) / factor
+
+
+def round_up(value, decimals):
+    """
+    Round away from zero to a number of decimals (None = leave as is).
+    """
+    if decimals is None:
+        return value
+    factor = 10 ** decimals
+    return math.ceil(value * factor - 1e-9) / factor
+
+
+@dataclass(frozen=True)
+class PairRules:
+    """
+    Precision and minimums the exchange enforces for one pair.
+
+    price_decimals / quantity_decimals come from v1/accuracy.do (priceAccuracy /
+    quantityAccuracy) and min_quantity from its minTranQua field; None means
+    unknown and the value is sent unrounded. LBank does not publish a minimum
+    order value, so min_notional is our own setting (ORDER_MIN_NOTIONAL_USDT).
+    """
+
+    symbol: str
+    price_decimals: int = None
+    quantity_decimals: int = None
+    min_quantity: float = 0.0
+    min_notional: float = 0.0
+
+    @property
+    def tick_size(self):
+        return 10 ** -self.price_decimals if self.price_decimals is not None else None
+
+    @property
+    def lot_size(self):
+        return 10 ** -self.quantity_decimals if self.quantity_decimals is not None else None
+
+    def round_price(self, price, side):
+        """
+        Snap a price to the tick size, towards the passive side of the book.
+
+        Buys round down and sells round up, so rounding never moves an order
+        closer to (or across) the spread.
+
+        Parameters:
+        - price: Price to round
+        - side: "buy" or "sell" ("buy_maker"/"sell_maker" also accepted)
+
+        Returns:
+        - float: Rounded price
+        """
+        if str(side).startswith("buy"):
+            return round_down(price, self.price_decimals)
+        return round_up(price, self.price_decimals)
+
+    def round_quantity(self, quantity):
+        """
+        Snap a quantity down to the lot size (never spends more than asked).
+        """
+        return round_down(quantity, self.quantity_decimals)
+
+    def check(self, side, quantity, price=None):
+        """
+        Round an order and check it against the pair's minimums.
+
+        Parameters:
+        - side: Order side
+        - quantity: Amount of the asset to trade
+        - price: Limit price (None for market orders)
+
+        Returns:
+        - tuple: (quantity, price, error) - error is None if the order may be sent
+        """
+        quantity = self.round_quantity(float(quantity))
+        if price is not None:
+            price = self.round_price(float(price), side)
+            if price <= 0:
+                return quantity, price, f"price rounds to 0 at {self.price_decimals} decimals"
+        if quantity <= 0:
+            return quantity, price, f"quantity rounds to 0 at {self.quantity_decimals} decimals"
+        if quantity < self.min_quantity:
+            return quantity, price, f"quantity {quantity} below minimum {self.min_quantity}"
+        if price is not None and quantity * price < self.min_notional:
+            return quantity, price, f"order value {quantity * price:.4f} USDT below minimum {self.min_notional}"
+        return quantity, price, None
+
+
+def parse_accuracy(res):
+    """
+    Parse a v1/accuracy.do response into a table of pair rules.
+
+    v1 answers with a bare list; the v2 variant wraps the same entries in "data".
+
+    Parameters:
+    - res: Response (list, or dict with a "data" list)
+
+    Returns:
+    - dict: lowercase symbol -> {"price_decimals", "quantity_decimals", "min_quantity"}
+    """
+    entries = res.get("data") if isinstance(res, dict) else res
+    table = {}
+    for entry in entries or []:
+        if not isinstance(entry, dict) or not entry.get("symbol"):
+            continue
+        try:
+            table[str(entry["symbol"]).lower()] = {
+                "price_decimals": int(entry["priceAccuracy"]) if entry.get("priceAccuracy") not in (None, "") else None,
+                "quantity_decimals": int(entry["quantityAccuracy"]) if entry.get("quantityAccuracy") not in (None, "") else None,
+                "min_quantity": float(entry.get("minTranQua") or 0.0),
+            }
+        except (TypeError, ValueError):
+            continue
+    return table
+
+
+class PairMetadata:
+    """
+    Pair precision table, loaded once from v1/accuracy.do and cached.
+
+    Every order is rounded and checked against it before it is sent (see
+    PairRules.check), so orders the exchange would reject for precision or size
+    never cost a round trip or rate-limit budget. The table is reloaded every
+    refresh_seconds; if the exchange cannot be reached, the last table is kept
+    (or, before the first load, orders go out unrounded and the load is retried
+    after retry_seconds).
+    """
+
+    def __init__(self, fetch, min_notional=0.0, refresh_seconds=21600.0, retry_seconds=60.0, enabled=True):
+        """
+        Parameters:
+        - fetch: Callable returning the v1/accuracy.do response
+        - min_notional: Minimum order value in USDT applied to every pair
+        - refresh_seconds: Age after which the table is reloaded
+        - retry_seconds: Wait before retrying a failed load
+        - enabled: False skips the exchange table (rules only carry min_notional)
+        """
+        self._fetch = fetch
+        self.min_notional = min_notional
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self.enabled = enabled
+        self._table = None
+        self._next_load = 0.0  # monotonic time of the next (re)load
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.loads = 0
+        self.rejected = 0
+
+    def load(self):
+        """
+        Fetch the table from the exchange now.
+
+        Returns:
+        - bool: True if the table was loaded
+        """
+        try:
+            table = parse_accuracy(self._fetch())
+        except Exception as e:
+            table = {}
+            error = str(e)
+        else:
+            error = "empty accuracy list"
+        with self._lock:
+            now = time.monotonic()
+            if not table:
+                self._next_load = now + self.retry_seconds
+                log(f"[PAIR] Could not load pair precision ({error}), retrying in {self.retry_seconds:.0f}s")
+                return False
+            self._table = table
+            self._next_load = now + self.refresh_seconds
+            self.loads += 1
+        return True
+
+    def rules(self, symbol):
+        """
+        Rules for a pair, loading the table first if it is missing or stale.
+
+        Parameters:
+        - symbol: Trading pair symbol (e.g., pair)
+
+        Returns:
+        - PairRules: Rules for the pair (unrounded, min_notional only if unknown)
+        """
+        if self.enabled and time.monotonic() >= self._next_load:
+            # One caller reloads; concurrent callers keep using the current table
+            # (they only wait when there is no table yet)
+            if self._load_lock.acquire(blocking=self._table is None):
+                try:
+                    if time.monotonic() >= self._next_load:
+                        self.load()
+                finally:
+                    self._load_lock.release()
+        with self._lock:
+            entry = (self._table or {}).get(symbol.lower())
+        if entry is None:
+            return PairRules(symbol=symbol.lower(), min_notional=self.min_notional)
+        return PairRules(symbol=symbol.lower(), min_notional=self.min_notional, **entry)
+
+    def check(self, symbol, side, quantity, price=None):
+        """
+        Round an order for a pair and check its minimums (see PairRules.check).
+
+        Returns:
+        - tuple: (quantity, price, error)
+        """
+        quantity, price, error = self.rules(symbol).check(side, quantity, price)
+        if error:
+            with self._lock:
+                self.rejected += 1
+        return quantity, price, error
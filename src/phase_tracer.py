@@ -0,0 +1,311 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from src.logger import log
+
+# Loop phases in the order market_making() enters them (a tick skips the ones its mode doesn't run)
+PHASES = (
+    "setup",
+    "stream",
+    "fetch_book",
+    "balances",
+    "volatility",
+    "open_orders",
+    "fill_detection",
+    "guards",
+    "cancel",
+    "ladder_build",
+    "placement",
+    "post_balance",
+)
+
+
+class PhaseTracer:
+    """
+    Wall-time breakdown of every strategy loop iteration.
+
+    The loop marks where each phase starts with phase(name); a phase ends
+    where the next one begins, so the spans of a tick are contiguous and add
+    up to its active time (begin_tick() to end_tick(), sleep excluded).
+    Timestamps come from time.perf_counter(). When disabled every call returns
+    after one attribute check, so the marks can stay in the hot path.
+
+    Each tick is appended to a JSONL trace file as
+    {"ts", "iteration", "outcome", "total_ms", "spans": [[phase, start_ms, duration_ms], ...]};
+    the file is rotated at max_bytes, keeping `backups` old files (.1 newest).
+    Run `python -m src.phase_tracer` for per-phase percentiles.
+    """
+
+    def __init__(self, path, max_bytes=10_000_000, backups=3, enabled=False):
+        """
+        Parameters:
+        - path: Trace file (JSONL)
+        - max_bytes: Rotate when the file reaches this size
+        - backups: Rotated files kept (path.1 ... path.N)
+        - enabled: False turns every call into a no-op
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.enabled = enabled
+        self._active = False  # inside a traced tick
+        self._file = None
+        self._size = 0
+        self._tick_start = 0.0
+        self._wall = 0.0
+        self._iteration = None
+        self._phase = None
+        self._phase_start = 0.0
+        self._spans = []
+
+    def begin_tick(self, iteration):
+        """
+        Start tracing an iteration (an unfinished previous tick is dropped).
+
+        Parameters:
+        - iteration: Loop iteration number
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._active = True
+        self._tick_start = now
+        self._wall = time.time()
+        self._iteration = iteration
+        self._phase = None
+        self._phase_start = now
+        self._spans = []
+
+    def phase(self, name):
+        """
+        End the current phase and start `name`.
+
+        Parameters:
+        - name: Phase name (see PHASES)
+        """
+        if not self._active:
+            return
+        now = time.perf_counter()
+        if self._phase is not None:
+            self._spans.append((self._phase, self._phase_start, now))
+        self._phase = name
+        self._phase_start = now
+
+    def end_tick(self, outcome="quoted"):
+        """
+        Close the last phase and append the tick to the trace file.
+
+        Parameters:
+        - outcome: How the tick ended (e.g. "quoted", "skipped", "paused", "error")
+        """
+        if not self._active:
+            return
+        now = time.perf_counter()
+        self._active = False
+        if self._phase is not None:
+            self._spans.append((self._phase, self._phase_start, now))
+        start = self._tick_start
+        record = {
+            "ts": round(self._wall, 3),
+            "iteration": self._iteration,
+            "outcome": outcome,
+            "total_ms": round((now - start) * 1000, 3),
+            "spans": [
+                [name, round((began - start) * 1000, 3), round((ended - began) * 1000, 3)]
+                for name, began, ended in self._spans
+            ],
+        }
+        self._write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def _write(self, line):
+        try:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+                self._size = self._file.tell()
+            if self._size and self._size + len(line) > self.max_bytes:
+                self._rotate()
+            self._file.write(line)
+            self._file.flush()
+            self._size += len(line)
+        except OSError as e:
+            log(f"[TRACE] Could not write {self.path}, tracing disabled: {e}")
+            self.enabled = False
+            self._active = False
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for n in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{n}"):
+                os.replace(f"{self.path}.{n}", f"{self.path}.{n + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = 0
+
+    def close(self):
+        """
+        Close the trace file.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def trace_files(path):
+    """
+    A trace file and its rotated backups, oldest first.
+
+    Parameters:
+    - path: Trace file path as configured (PHASE_TRACE_FILE)
+
+    Returns:
+    - list: Existing files
+    """
+    backups = [p for p in glob.glob(glob.escape(path) + ".*") if p.rsplit(".", 1)[1].isdigit()]
+    backups.sort(key=lambda p: int(p.rsplit(".", 1)[1]), reverse=True)
+    return backups + ([path] if os.path.exists(path) else [])
+
+
+def load_trace(paths):
+    """
+    Read traced ticks.
+
+    Parameters:
+    - paths: Trace files, oldest first
+
+    Returns:
+    - list: Tick records (unreadable lines are skipped)
+    """
+    ticks = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    ticks.append(json.loads(line))
+                except ValueError:
+                    continue  # a line cut short by a crash
+    return ticks
+
+
+def _stats(values):
+    values = np.asarray(values, dtype=np.float64)
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        "count": len(values),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(p50),
+        "p90_ms": float(p90),
+        "p99_ms": float(p99),
+        "max_ms": float(values.max()),
+        "total_ms": float(values.sum()),
+    }
+
+
+def analyze(ticks, outcome=None):
+    """
+    Per-phase latency percentiles over traced ticks.
+
+    Parameters:
+    - ticks: Records from load_trace()
+    - outcome: Only ticks that ended this way (None = all)
+
+    Returns:
+    - dict: {"ticks", "outcomes": {outcome: count}, "tick": stats, "tick_to_quote": stats or None,
+      "phases": {phase: stats + "share_pct" of all traced time}}
+    """
+    outcomes = {}
+    for tick in ticks:
+        outcomes[tick.get("outcome")] = outcomes.get(tick.get("outcome"), 0) + 1
+    if outcome is not None:
+        ticks = [t for t in ticks if t.get("outcome") == outcome]
+    if not ticks:
+        return {"ticks": 0, "outcomes": outcomes, "tick": None, "tick_to_quote": None, "phases": {}}
+
+    durations = {}
+    to_quote = []
+    for tick in ticks:
+        per_tick = {}
+        for name, start_ms, duration_ms in tick["spans"]:
+            # A phase entered twice in one tick counts once with its summed time
+            per_tick[name] = per_tick.get(name, 0.0) + duration_ms
+            if name == "placement":
+                to_quote.append(start_ms + duration_ms)
+        for name, duration_ms in per_tick.items():
+            durations.setdefault(name, []).append(duration_ms)
+
+    tick_stats = _stats([t["total_ms"] for t in ticks])
+    order = {name: i for i, name in enumerate(PHASES)}
+    phases = {}
+    for name in sorted(durations, key=lambda n: (order.get(n, len(order)), n)):
+        stats = _stats(durations[name])
+        stats["share_pct"] = stats["total_ms"] / tick_stats["total_ms"] * 100 if tick_stats["total_ms"] else 0.0
+        phases[name] = stats
+    return {
+        "ticks": len(ticks),
+        "outcomes": outcomes,
+        "tick": tick_stats,
+        "tick_to_quote": _stats(to_quote) if to_quote else None,
+        "phases": phases,
+    }
+
+
+def format_analysis(result):
+    """
+    Human-readable table of analyze() output.
+    """
+    outcomes = ", ".join(f"{k}: {v}" for k, v in sorted(result["outcomes"].items(), key=lambda kv: -kv[1]))
+    lines = [f"[TRACE] {result['ticks']} ticks ({outcomes})"]
+    if not result["ticks"]:
+        return "\n".join(lines)
+    header = f"{'phase':<16}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'share':>8}"
+    lines.append(header)
+    lines.append("-" * len(header))
+    for name, s in result["phases"].items():
+        lines.append(
+            f"{name:<16}{s['count']:>7}{s['p50_ms']:>10.2f}{s['p90_ms']:>10.2f}{s['p99_ms']:>10.2f}"
+            f"{s['max_ms']:>10.2f}{s['share_pct']:>7.1f}%"
+        )
+    lines.append("-" * len(header))
+    for label, s in (("tick", result["tick"]), ("tick_to_quote", result["tick_to_quote"])):
+        if s:
+            lines.append(
+                f"{label:<16}{s['count']:>7}{s['p50_ms']:>10.2f}{s['p90_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['max_ms']:>10.2f}"
+            )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # python -m src.phase_tracer                 (PHASE_TRACE_FILE and its rotated backups)
+    # python -m src.phase_tracer run1.jsonl --last 500 --outcome quoted
+    parser = argparse.ArgumentParser(description="Per-phase latency percentiles from a loop phase trace")
+    parser.add_argument("files", nargs="*", help="Trace files, read with their rotated backups (default: PHASE_TRACE_FILE)")
+    parser.add_argument("--last", type=int, default=None, help="Only the newest N ticks")
+    parser.add_argument("--outcome", help="Only ticks with this outcome (e.g. quoted)")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    paths = args.files or [
+        os.getenv("PHASE_TRACE_FILE") or os.path.join(os.getenv("BOT_DATA_DIR", "data"), "phase_trace.jsonl")
+    ]
+    files = [f for path in paths for f in trace_files(path)]
+    if not files:
+        raise SystemExit("[TRACE] No trace files found (enable PHASE_TRACE_ENABLED and run the bot first)")
+    ticks = load_trace(files)
+    if args.last:
+        ticks = ticks[-args.last:]
+    result = analyze(ticks, outcome=args.outcome)
+    print(json.dumps(result, indent=2) if args.json else format_analysis(result))
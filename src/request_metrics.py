@@ -0,0 +1,487 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lbank.error import CommonError, ServerError
+
+from src.logger import log
+from src.request_scheduler import RequestThrottled
+
+# Latencies are recorded in whole microseconds into log-linear buckets (HdrHistogram layout):
+# values below 2^SUB_BUCKET_BITS get one bucket each, above that every power of two is split
+# into 2^(SUB_BUCKET_BITS-1) equal buckets, so a reported value is within ~3% of the real one.
+SUB_BUCKET_BITS = 6
+SUB_BUCKET_HALF = 1 << (SUB_BUCKET_BITS - 1)
+MAX_TRACKABLE_US = 120_000_000  # longer requests are clamped to 2 minutes
+
+# Quantiles exported for every endpoint
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def bucket_index(value):
+    """
+    Histogram bucket of a value in microseconds.
+
+    Parameters:
+    - value: Non-negative integer
+
+    Returns:
+    - int: Bucket index
+    """
+    if value < 2 * SUB_BUCKET_HALF:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (shift + 1) * SUB_BUCKET_HALF + (value >> shift) - SUB_BUCKET_HALF
+
+
+def bucket_bounds(index):
+    """
+    Range of values [low, high) that fall into a bucket.
+
+    Parameters:
+    - index: Bucket index
+
+    Returns:
+    - tuple: (low, high) in microseconds
+    """
+    if index < 2 * SUB_BUCKET_HALF:
+        return index, index + 1
+    shift = index // SUB_BUCKET_HALF - 1
+    sub = index - shift * SUB_BUCKET_HALF
+    return sub << shift, (sub + 1) << shift
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory latency histogram with bounded relative error.
+
+    record() is O(1) and never allocates; percentiles are read by walking the
+    (few hundred) buckets. Not thread-safe on its own; RequestMetrics holds its
+    lock around it.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (bucket_index(MAX_TRACKABLE_US) + 1)
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def record(self, seconds):
+        """
+        Add one observation.
+
+        Parameters:
+        - seconds: Duration in seconds
+        """
+        value = min(max(int(seconds * 1_000_000), 0), MAX_TRACKABLE_US)
+        self.counts[bucket_index(value)] += 1
+        self.count += 1
+        self.total_us += value
+        if self.min_us is None or value < self.min_us:
+            self.min_us = value
+        if value > self.max_us:
+            self.max_us = value
+
+    def merge(self, other):
+        """
+        Add every observation of another histogram to this one.
+        """
+        for index, n in enumerate(other.counts):
+            if n:
+                self.counts[index] += n
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+            self.min_us = other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, q):
+        """
+        Value below which a fraction q of the observations fall.
+
+        Parameters:
+        - q: Quantile between 0 and 1
+
+        Returns:
+        - float: Seconds (upper edge of the bucket, capped at the exact maximum), or None if empty
+        """
+        if not self.count:
+            return None
+        target = max(1, int(q * self.count + 0.999999))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(bucket_bounds(index)[1] - 1, self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+
+class WindowedHistogram:
+    """
+    Latency histogram over a sliding window plus lifetime count and sum.
+
+    The window is kept as `slices` histograms that are rotated as time passes,
+    so quantiles describe roughly the last window_seconds (what a scrape every
+    15-60s wants), while count/sum keep growing like Prometheus counters.
+    """
+
+    def __init__(self, window_seconds=60.0, slices=6):
+        self.slice_seconds = max(window_seconds / slices, 0.001)
+        self.slices = [LatencyHistogram() for _ in range(slices)]
+        self.current = 0
+        self.rotated_at = time.monotonic()
+        self.count = 0
+        self.total_seconds = 0.0
+
+    def _rotate(self, now):
+        steps = int((now - self.rotated_at) / self.slice_seconds)
+        if steps <= 0:
+            return
+        for _ in range(min(steps, len(self.slices))):
+            self.current = (self.current + 1) % len(self.slices)
+            self.slices[self.current] = LatencyHistogram()
+        self.rotated_at += steps * self.slice_seconds
+
+    def record(self, seconds):
+        self._rotate(time.monotonic())
+        self.slices[self.current].record(seconds)
+        self.count += 1
+        self.total_seconds += seconds
+
+    def window(self):
+        """
+        Merged histogram of the current window.
+        """
+        self._rotate(time.monotonic())
+        merged = LatencyHistogram()
+        for histogram in self.slices:
+            if histogram.count:
+                merged.merge(histogram)
+        return merged
+
+
+def classify_error(error):
+    """
+    Short, bounded label for a failed request (used as a metrics label).
+
+    Parameters:
+    - error: Exception raised by the client, or the decoded response of a rejected request
+
+    Returns:
+    - str: e.g. "timeout", "connection", "rate_limited", "http_5xx", "api_10008", "throttled"
+    """
+    if isinstance(error, dict):
+        code = error.get("error_code")
+        return f"api_{code}" if code not in (None, "", 0, "0") else "api_error"
+    if isinstance(error, ServerError):
+        status = getattr(error, "status_code", None)
+        if status == 429:
+            return "rate_limited"
+        if isinstance(status, int) and 500 <= status < 600:
+            return "http_5xx"
+        if isinstance(status, int) and 400 <= status < 500:
+            return "http_4xx"
+        return "http_error"
+    if isinstance(error, RequestThrottled):
+        return "throttled"
+    message = str(error).lower()
+    if isinstance(error, TimeoutError) or "timeout" in message or "timed out" in message:
+        return "timeout"
+    if "not json" in message:
+        return "invalid_json"
+    if isinstance(error, CommonError):
+        return "connection"
+    return error.__class__.__name__.lower()
+
+
+def is_rejected(response):
+    """
+    True if a decoded LBank response reports a failure (result false).
+    """
+    return isinstance(response, dict) and (response.get("result") is False or response.get("result") == "false")
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class RequestMetrics:
+    """
+    Per-endpoint request metrics for the Prometheus /metrics endpoint.
+
+    Both REST clients report every request here: its latency (a windowed
+    LatencyHistogram per endpoint path), and failures by classify_error()
+    label. Call sites that send a request again (route discovery, endpoint
+    fallbacks) count it with record_retry(). The strategy loop reports its
+    iterations. render() produces the Prometheus text format; gauges added
+    with add_gauge() are read at scrape time.
+    """
+
+    def __init__(self, window_seconds=60.0, enabled=True):
+        """
+        Parameters:
+        - window_seconds: Window the exported quantiles cover
+        - enabled: False turns every record call into a no-op
+        """
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self.started = time.time()
+        self._latency = {}  # endpoint -> WindowedHistogram
+        self._errors = {}  # (endpoint, error) -> count
+        self._retries = {}  # (endpoint, reason) -> count
+        self._iterations = WindowedHistogram(window_seconds)
+        self._iteration_errors = 0
+        self._iteration_started = None
+        self._last_iteration = None
+        self._gauges = []  # (name, help, fn)
+        self._lock = threading.Lock()
+
+    def record_request(self, endpoint, seconds, error=None):
+        """
+        Record one request that was sent to the exchange.
+
+        Parameters:
+        - endpoint: API path
+        - seconds: Time from sending to the decoded response (or the failure)
+        - error: classify_error() label if it failed
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._latency.get(endpoint)
+            if histogram is None:
+                histogram = self._latency[endpoint] = WindowedHistogram(self.window_seconds)
+            histogram.record(seconds)
+            if error is not None:
+                self._errors[(endpoint, error)] = self._errors.get((endpoint, error), 0) + 1
+
+    def record_error(self, endpoint, error):
+        """
+        Count a failure of a request that never reached the exchange (e.g. dropped by the rate limiter).
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._errors[(endpoint, error)] = self._errors.get((endpoint, error), 0) + 1
+
+    def record_retry(self, endpoint, reason):
+        """
+        Count a request sent again after an earlier attempt failed.
+
+        Parameters:
+        - endpoint: API path of the new attempt
+        - reason: Short label (e.g. "route_discovery", "endpoint_fallback")
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._retries[(endpoint, reason)] = self._retries.get((endpoint, reason), 0) + 1
+
+    def begin_iteration(self):
+        """
+        Mark the start of a strategy loop iteration.
+        """
+        self._iteration_started = time.perf_counter()
+        self._last_iteration = time.time()
+
+    def end_iteration(self, failed=False):
+        """
+        Record the active time of the current iteration (once; later calls are ignored).
+
+        Parameters:
+        - failed: The iteration ended with an error
+        """
+        started, self._iteration_started = self._iteration_started, None
+        if not self.enabled or started is None:
+            return
+        with self._lock:
+            self._iterations.record(time.perf_counter() - started)
+            if failed:
+                self._iteration_errors += 1
+
+    def add_gauge(self, name, help_text, fn):
+        """
+        Export a value read at scrape time.
+
+        Parameters:
+        - name: Metric name
+        - help_text: HELP line
+        - fn: Callable returning a number, or {label value: number} (exported with label "key")
+        """
+        self._gauges.append((name, help_text, fn))
+
+    def snapshot(self):
+        """
+        Current numbers as plain data.
+
+        Returns:
+        - dict: {"endpoints": {path: {"count", "p50_ms", "p99_ms", "max_ms", "errors", "retries"}},
+          "iterations": int, "iteration_errors": int}
+        """
+        with self._lock:
+            endpoints = {}
+            for endpoint, histogram in self._latency.items():
+                window = histogram.window()
+                endpoints[endpoint] = {
+                    "count": histogram.count,
+                    "p50_ms": (window.percentile(0.5) or 0.0) * 1000,
+                    "p99_ms": (window.percentile(0.99) or 0.0) * 1000,
+                    "max_ms": window.max_us / 1000,
+                    "errors": {},
+                    "retries": {},
+                }
+            for (endpoint, error), n in self._errors.items():
+                endpoints.setdefault(endpoint, {"count": 0, "errors": {}, "retries": {}})["errors"][error] = n
+            for (endpoint, reason), n in self._retries.items():
+                endpoints.setdefault(endpoint, {"count": 0, "errors": {}, "retries": {}})["retries"][reason] = n
+            return {
+                "endpoints": endpoints,
+                "iterations": self._iterations.count,
+                "iteration_errors": self._iteration_errors,
+            }
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format.
+
+        Returns:
+        - str: Body for GET /metrics
+        """
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            name = "lbank_request_duration_seconds"
+            header(name, "summary", f"REST request latency by endpoint (quantiles over the last {self.window_seconds:.0f}s)")
+            for endpoint in sorted(self._latency):
+                histogram = self._latency[endpoint]
+                window = histogram.window()
+                for q in QUANTILES:
+                    value = window.percentile(q)
+                    lines.append(
+                        f"{name}{{{_labels(endpoint=endpoint, quantile=q)}}} "
+                        + (_number(value) if value is not None else "NaN")
+                    )
+                lines.append(f"{name}_sum{{{_labels(endpoint=endpoint)}}} {_number(histogram.total_seconds)}")
+                lines.append(f"{name}_count{{{_labels(endpoint=endpoint)}}} {histogram.count}")
+
+            name = "lbank_request_duration_max_seconds"
+            header(name, "gauge", f"Slowest REST request by endpoint over the last {self.window_seconds:.0f}s")
+            for endpoint in sorted(self._latency):
+                lines.append(f"{name}{{{_labels(endpoint=endpoint)}}} {_number(self._latency[endpoint].window().max_us / 1_000_000)}")
+
+            name = "lbank_request_errors_total"
+            header(name, "counter", "Failed REST requests by endpoint and error class")
+            for (endpoint, error), n in sorted(self._errors.items()):
+                lines.append(f"{name}{{{_labels(endpoint=endpoint, error=error)}}} {n}")
+
+            name = "lbank_request_retries_total"
+            header(name, "counter", "REST requests sent again after a failed attempt, by endpoint and reason")
+            for (endpoint, reason), n in sorted(self._retries.items()):
+                lines.append(f"{name}{{{_labels(endpoint=endpoint, reason=reason)}}} {n}")
+
+            name = "lbank_bot_iteration_duration_seconds"
+            header(name, "summary", f"Active time of a strategy loop iteration, sleep excluded (last {self.window_seconds:.0f}s)")
+            window = self._iterations.window()
+            for q in QUANTILES:
+                value = window.percentile(q)
+                lines.append(f"{name}{{{_labels(quantile=q)}}} " + (_number(value) if value is not None else "NaN"))
+            lines.append(f"{name}_sum {_number(self._iterations.total_seconds)}")
+            lines.append(f"{name}_count {self._iterations.count}")
+
+            name = "lbank_bot_iteration_errors_total"
+            header(name, "counter", "Strategy loop iterations that ended with an error")
+            lines.append(f"{name} {self._iteration_errors}")
+
+            if self._last_iteration is not None:
+                name = "lbank_bot_last_iteration_timestamp_seconds"
+                header(name, "gauge", "Unix time the latest strategy loop iteration started")
+                lines.append(f"{name} {_number(self._last_iteration)}")
+
+        name = "lbank_bot_start_time_seconds"
+        header(name, "gauge", "Unix time the bot process started")
+        lines.append(f"{name} {_number(self.started)}")
+
+        for name, help_text, fn in self._gauges:
+            try:
+                value = fn()
+            except Exception as e:
+                log(f"[METRICS] Could not read {name}: {e}")
+                continue
+            header(name, "gauge", help_text)
+            if isinstance(value, dict):
+                for key in sorted(value):
+                    lines.append(f"{name}{{{_labels(key=key)}}} {_number(value[key])}")
+            else:
+                lines.append(f"{name} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Serves RequestMetrics.render() on GET /metrics from a daemon thread.
+    """
+
+    def __init__(self, metrics, host="127.0.0.1", port=9108):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """
+        Bind and start serving.
+
+        Returns:
+        - str: URL of the metrics endpoint
+        """
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # one line per scrape would flood logs.txt
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def stop(self):
+        """
+        Stop serving and release the port.
+        """
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
@@ -0,0 +1,265 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from lbank.error import CommonError
+
+from src.logger import log
+
+# Endpoint classes, each with its own token bucket
+CLASS_MARKET = "market"  # public market data (ticker, kline, depth, accuracy)
+CLASS_ACCOUNT = "account"  # signed reads (balances, open orders, subscribe keys)
+CLASS_TRADE = "trade"  # order writes (create / cancel)
+
+# Priority lanes, lowest value served first within a bucket
+PRIORITY_RISK = 0  # kill-switch cancels and the watchdog's mid samples
+PRIORITY_CANCEL = 1  # regular cancellations
+PRIORITY_READ = 2  # market data and account reads
+PRIORITY_PLACE = 3  # new placements (including route discovery retries)
+
+
+def classify_endpoint(path):
+    """
+    Map a REST path to its endpoint class.
+
+    Parameters:
+    - path: API path (e.g., "v2/supplement/create_order.do")
+
+    Returns:
+    - str: CLASS_MARKET, CLASS_ACCOUNT or CLASS_TRADE
+    """
+    path = path.lower()
+    if "create_order" in path or "cancel_order" in path:
+        return CLASS_TRADE
+    if "ticker" in path or "kline" in path or "depth" in path or "accuracy" in path or "trades" in path:
+        return CLASS_MARKET
+    return CLASS_ACCOUNT
+
+
+def default_priority(path):
+    """
+    Priority lane for a REST path when the caller does not pick one.
+    """
+    path = path.lower()
+    if "cancel_order" in path:
+        return PRIORITY_CANCEL
+    if "create_order" in path:
+        return PRIORITY_PLACE
+    return PRIORITY_READ
+
+
+class RequestThrottled(CommonError):
+    """
+    Raised when a low-priority request would wait longer than allowed for a token.
+    """
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, at most `capacity` banked.
+    Not thread-safe on its own; RequestScheduler holds its lock around it.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # set after a 429 from the exchange
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def try_take(self, now):
+        if now < self.blocked_until:
+            return False
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def time_until_token(self, now):
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else 1.0
+
+
+class RequestScheduler:
+    """
+    Central rate limiter for every REST call.
+
+    Each endpoint class (public market data, private reads, order writes) has
+    its own token bucket. Callers block in acquire() until their bucket has a
+    token; waiters on the same bucket are served by priority lane first and
+    arrival order second, so cancels and risk actions always go out before
+    queued placements during a ladder rebuild.
+
+    Placements that would wait longer than max_place_wait_seconds fail fast
+    with RequestThrottled instead of piling up - the level is simply retried on
+    the next tick. A 429 from the exchange empties the bucket and blocks it for
+    a cool-down (penalize()).
+
+    stats() exposes queue depth, request counts and wait times per class.
+    """
+
+    def __init__(self, limits, max_place_wait_seconds=5.0, enabled=True):
+        """
+        Parameters:
+        - limits: {endpoint class: (tokens per second, burst capacity)}
+        - max_place_wait_seconds: Longest a PRIORITY_PLACE request may queue (None = no limit)
+        - enabled: False turns acquire() into a no-op
+        """
+        self.enabled = enabled
+        self.max_place_wait_seconds = max_place_wait_seconds
+        self._buckets = {cls: TokenBucket(rate, burst) for cls, (rate, burst) in limits.items()}
+        self._waiting = {cls: [] for cls in self._buckets}  # heap of (priority, seq) tickets
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stats = {cls: self._empty_stats() for cls in self._buckets}
+
+    @staticmethod
+    def _empty_stats():
+        return {"requests": 0, "waited": 0, "wait_total": 0.0, "wait_max": 0.0, "throttled": 0, "penalties": 0}
+
+    def acquire(self, path, priority=None):
+        """
+        Block until the request may be sent.
+
+        Parameters:
+        - path: API path of the request
+        - priority: Priority lane (default from the path, see default_priority)
+
+        Returns:
+        - float: Seconds spent waiting
+        """
+        if not self.enabled:
+            return 0.0
+        cls = classify_endpoint(path)
+        bucket = self._buckets.get(cls)
+        if bucket is None:
+            return 0.0
+        if priority is None:
+            priority = default_priority(path)
+
+        waiting = self._waiting[cls]
+        started = time.monotonic()
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    at_head = waiting[0] == ticket
+                    if at_head and bucket.try_take(now):
+                        heapq.heappop(waiting)
+                        break
+                    waited = now - started
+                    if (
+                        priority >= PRIORITY_PLACE
+                        and self.max_place_wait_seconds is not None
+                        and waited >= self.max_place_wait_seconds
+                    ):
+                        waiting.remove(ticket)
+                        heapq.heapify(waiting)
+                        self._stats[cls]["throttled"] += 1
+                        raise RequestThrottled(f"rate limit: {cls} request queued {waited:.1f}s, dropped")
+                    # The head sleeps until its token is due; everyone else waits to be notified
+                    timeout = bucket.time_until_token(now) if at_head else 1.0
+                    if priority >= PRIORITY_PLACE and self.max_place_wait_seconds is not None:
+                        timeout = min(timeout, self.max_place_wait_seconds - waited)
+                    self._cond.wait(max(timeout, 0.001))
+            finally:
+                # The head changed (or a ticket left): let the next waiter re-check
+                self._cond.notify_all()
+
+            waited = time.monotonic() - started
+            stats = self._stats[cls]
+            stats["requests"] += 1
+            if waited > 0.001:
+                stats["waited"] += 1
+                stats["wait_total"] += waited
+                stats["wait_max"] = max(stats["wait_max"], waited)
+        return waited
+
+    def penalize(self, path, seconds=1.0):
+        """
+        Back off after the exchange rejected a request for rate reasons (HTTP 429).
+
+        Parameters:
+        - path: API path that was rejected
+        - seconds: Cool-down before the bucket hands out tokens again
+        """
+        cls = classify_endpoint(path)
+        bucket = self._buckets.get(cls)
+        if bucket is None:
+            return
+        with self._cond:
+            now = time.monotonic()
+            bucket.tokens = 0.0
+            bucket.updated = now
+            bucket.blocked_until = max(bucket.blocked_until, now + seconds)
+            self._stats[cls]["penalties"] += 1
+            self._cond.notify_all()
+        log("[RATE] %s requests rate limited by the exchange, backing off %.1fs", cls, seconds, level=logging.WARNING)
+
+    def queue_depth(self, cls=None):
+        """
+        Number of requests currently waiting for a token (optionally for one class).
+        """
+        with self._cond:
+            if cls is not None:
+                return len(self._waiting.get(cls, []))
+            return sum(len(w) for w in self._waiting.values())
+
+    def stats(self, reset=False):
+        """
+        Per-class counters since the last reset.
+
+        Parameters:
+        - reset: Start a new measurement window after reading
+
+        Returns:
+        - dict: {class: {"queued", "requests", "waited", "avg_wait_ms", "max_wait_ms",
+          "throttled", "penalties", "tokens"}}
+        """
+        with self._cond:
+            now = time.monotonic()
+            result = {}
+            for cls, stats in self._stats.items():
+                bucket = self._buckets[cls]
+                bucket._refill(now)
+                result[cls] = {
+                    "queued": len(self._waiting[cls]),
+                    "requests": stats["requests"],
+                    "waited": stats["waited"],
+                    "avg_wait_ms": stats["wait_total"] / stats["waited"] * 1000 if stats["waited"] else 0.0,
+                    "max_wait_ms": stats["wait_max"] * 1000,
+                    "throttled": stats["throttled"],
+                    "penalties": stats["penalties"],
+                    "tokens": bucket.tokens,
+                }
+                if reset:
+                    self._stats[cls] = self._empty_stats()
+            return result
+
+    def summary(self, reset=True):
+        """
+        One-line summary of the classes that had to wait, or None if nothing queued.
+        """
+        parts = []
+        for cls, s in self.stats(reset=reset).items():
+            if s["waited"] or s["throttled"] or s["penalties"] or s["queued"]:
+                parts.append(
+                    f"{cls}: {s['requests']} req, {s['waited']} waited "
+                    f"(avg {s['avg_wait_ms']:.0f}ms, max {s['max_wait_ms']:.0f}ms), "
+                    f"{s['throttled']} dropped, queue {s['queued']}"
+                )
+        return " | ".join(parts) if parts else None
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import deque
+
+from src.event_scheduler import WAKE_RISK
+from src.logger import log
+
+
+class RiskWatchdog:
+    """
+    Volatility kill-switch that runs beside the strategy loop.
+
+    A daemon thread samples the mid price every interval_seconds and applies the
+    adjustments-mode rules on its own clock:
+    - move >= 2% within 60s  -> pause for pause_2pct_60s_minutes
+    - move >= 5% within 5min -> pause for pause_5pct_5m_minutes
+    (move = (max - min) / min of the mids in the window)
+
+    When a rule fires while not already paused, all orders are cancelled right
+    away and on_trigger is called (the event scheduler's notify, so a waiting
+    loop wakes up). The loop reads pause_until / paused() before placing orders.
+    """
+
+    def __init__(
+        self,
+        symbol,
+        sample_mid,
+        cancel_all,
+        on_trigger=None,
+        interval_seconds=1.0,
+        pause_2pct_60s_minutes=10,
+        pause_5pct_5m_minutes=30,
+    ):
+        self.symbol = symbol
+        self.sample_mid = sample_mid  # callable(symbol) -> mid price or None
+        self.cancel_all = cancel_all  # callable(symbol)
+        self.on_trigger = on_trigger  # callable(reason, **info)
+        self.interval_seconds = interval_seconds
+        self.pause_2pct_60s_minutes = pause_2pct_60s_minutes
+        self.pause_5pct_5m_minutes = pause_5pct_5m_minutes
+        self.triggers = 0
+        self.samples = 0
+        self._history = deque(maxlen=int(300 / max(interval_seconds, 0.1)) + 60)  # (timestamp, mid)
+        self._pause_until = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def pause_until(self):
+        with self._lock:
+            return self._pause_until
+
+    def hold_until(self, until_ts):
+        """
+        Keep the kill-switch pause active until a given time (e.g., a pause restored after a restart).
+        """
+        with self._lock:
+            self._pause_until = max(self._pause_until, until_ts)
+
+    def paused(self, now_ts=None):
+        """
+        Check whether a kill-switch pause is active.
+        """
+        return (now_ts or time.time()) < self.pause_until
+
+    def start(self):
+        """
+        Start the sampling thread (no-op if already running).
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="risk-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the sampling thread.
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                mid = self.sample_mid(self.symbol)
+                if mid:
+                    self.observe(time.time(), mid)
+            except Exception as e:
+                log(f"[RISK] Watchdog sample failed: {e}")
+            # Keep a steady cadence regardless of how long the sample took
+            self._stop.wait(max(0.0, self.interval_seconds - (time.monotonic() - started)))
+
+    @staticmethod
+    def _move(mids):
+        low = min(mids)
+        return (max(mids) - low) / low if low > 0 else 0
+
+    def observe(self, now_ts, mid):
+        """
+        Record a mid sample and apply the kill-switch rules.
+
+        Parameters:
+        - now_ts: Sample unix time
+        - mid: Mid price
+
+        Returns:
+        - str: Rule that fired ("2pct_60s" / "5pct_5m"), or None
+        """
+        self.samples += 1
+        self._history.append((now_ts, mid))
+        mids_60 = [m for t, m in self._history if t >= now_ts - 60]
+        mids_300 = [m for t, m in self._history if t >= now_ts - 300]
+
+        rule = None
+        pause_minutes = 0
+        move = 0.0
+        if len(mids_300) >= 2 and self._move(mids_300) >= 0.05:
+            rule, pause_minutes, move = "5pct_5m", self.pause_5pct_5m_minutes, self._move(mids_300)
+        elif len(mids_60) >= 2 and self._move(mids_60) >= 0.02:
+            rule, pause_minutes, move = "2pct_60s", self.pause_2pct_60s_minutes, self._move(mids_60)
+        if rule is None:
+            return None
+
+        with self._lock:
+            was_paused = now_ts < self._pause_until
+            self._pause_until = max(self._pause_until, now_ts + pause_minutes * 60)
+        if was_paused:
+            return rule
+
+        self.triggers += 1
+        log(f"[RISK] Kill-switch: {move * 100:.2f}% move ({rule}) → cancelling all orders, pause {pause_minutes} min")
+        try:
+            self.cancel_all(self.symbol)
+        except Exception as e:
+            log(f"[RISK] Cancel all failed: {e}")
+        if self.on_trigger is not None:
+            self.on_trigger(WAKE_RISK, rule=rule, move_pct=move * 100)
+        return rule
@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+
+from src.logger import log
+
+
+class RouteCache:
+    """
+    Remembers which endpoint / symbol format / order type the exchange accepts per pair.
+
+    place_order and get_current_orders fall back through several endpoint and
+    symbol-format combinations when LBank answers "nonsupport". Once one works it
+    is stored here (and in a small JSON file, so restarts skip discovery), and
+    later calls go straight to it until the exchange rejects it again.
+
+    Routes are keyed by (symbol, operation), e.g. ("acces_usdt", "create_order").
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._routes = {}
+        self._lock = threading.Lock()
+        # Held while one caller runs discovery so concurrent callers don't all fan out
+        self.discovery_lock = threading.Lock()
+        # Serializes file writes: callers share the .tmp path, and the last write must hold the newest routes
+        self._save_lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def _key(symbol, operation):
+        return f"{symbol}|{operation}"
+
+    def load(self):
+        """
+        Load persisted routes (missing or unreadable file means an empty cache).
+        """
+        try:
+            with open(self.path, "r") as f:
+                routes = json.load(f)
+            if isinstance(routes, dict):
+                with self._lock:
+                    self._routes = routes
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log(f"[WARNING] Could not read route cache {self.path}: {e}")
+
+    def get(self, symbol, operation):
+        """
+        Get the cached route for a pair/operation.
+
+        Parameters:
+        - symbol: Trading pair symbol as passed by the caller
+        - operation: "create_order", "open_orders" or "cancel_orders"
+
+        Returns:
+        - dict: Route (e.g., {"path": ..., "symbol": ..., "order_type_style": ...}), or None
+        """
+        with self._lock:
+            route = self._routes.get(self._key(symbol, operation))
+        return dict(route) if route else None
+
+    def remember(self, symbol, operation, route):
+        """
+        Store a working route and persist it.
+
+        Parameters:
+        - symbol: Trading pair symbol as passed by the caller
+        - operation: "create_order", "open_orders" or "cancel_orders"
+        - route: Route dict
+        """
+        key = self._key(symbol, operation)
+        with self._lock:
+            if self._routes.get(key) == route:
+                return
+            self._routes[key] = dict(route)
+        self._save()
+
+    def forget(self, symbol, operation):
+        """
+        Drop a route after the exchange rejected it, so discovery runs again.
+
+        Parameters:
+        - symbol: Trading pair symbol as passed by the caller
+        - operation: "create_order", "open_orders" or "cancel_orders"
+        """
+        with self._lock:
+            if self._routes.pop(self._key(symbol, operation), None) is None:
+                return
+        self._save()
+
+    def _save(self):
+        with self._save_lock:
+            # Snapshot inside the write lock, so writes land in the order the routes changed
+            with self._lock:
+                routes = dict(self._routes)
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(routes, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                log(f"[WARNING] Could not persist route cache {self.path}: {e}")
+
+
+def is_nonsupport_error(error_msg):
+    """
+    Check whether an exchange error means "this endpoint/symbol format is not supported".
+
+    Parameters:
+    - error_msg: Error message from the API
+
+    Returns:
+    - bool: True for "nonsupport"-class errors
+    """
+    error_lower = str(error_msg).lower() if error_msg else ""
+    return "nonsupport" in error_lower or "not support" in error_lower or "unsupported" in error_lower
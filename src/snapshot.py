@@ -0,0 +1,71 @@
+import threading
+import time
+
+
+class MarketSnapshot:
+    """
+    Short-lived cache of market and account reads for one loop iteration.
+
+    The helpers in src/utils.py look up the book ticker, last price, balances
+    and open orders here before hitting the exchange, so one pass of
+    market_making() downloads each of them at most once. Entries expire after
+    ttl_seconds, and anything a write (place/cancel) may have changed is
+    invalidated explicitly.
+
+    Keys are tuples whose first element is the kind of data, e.g.
+    ("book_ticker", "acces_usdt") or ("balances",).
+    """
+
+    def __init__(self, ttl_seconds=3.0):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}  # key -> (monotonic timestamp, value)
+        self._lock = threading.Lock()  # ladder publication calls helpers from worker threads
+        self.hits = 0
+        self.misses = 0
+
+    def begin_tick(self):
+        """
+        Start a new iteration: drop everything captured during the previous one.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def lookup(self, key):
+        """
+        Get a cached value.
+
+        Parameters:
+        - key: Snapshot key tuple
+
+        Returns:
+        - Cached value, or None if missing or older than the TTL
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] <= self.ttl_seconds:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def store(self, key, value):
+        """
+        Cache a value (only successful responses should be stored).
+
+        Parameters:
+        - key: Snapshot key tuple
+        - value: Value to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+
+    def invalidate(self, *kinds):
+        """
+        Drop cached entries of the given kinds (all symbols).
+
+        Parameters:
+        - kinds: Kind names, e.g. "balances", "open_orders"
+        """
+        with self._lock:
+            for key in [k for k in self._entries if k[0] in kinds]:
+                del self._entries[key]
@@ -0,0 +1,101 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class StateStore:
+    """
+    Bot state checkpointed to a small SQLite database, so a restart continues warm.
+
+    The strategy loop saves its state (counters, pause/cooldown deadlines, price
+    and fill history, resting orders, starting balances) at every tick and reads
+    it back on startup. Each part is one row holding JSON; a checkpoint only
+    rewrites the rows whose content changed, in a single transaction. The
+    database runs in WAL mode with synchronous=NORMAL, so a checkpoint is an
+    append to the write-ahead log rather than a rewrite of the file, and a crash
+    leaves the last committed checkpoint intact.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+        - path: Database file (its directory is created if missing)
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._written = {}  # key -> JSON last written, to skip unchanged rows
+        self.checkpoints = 0
+
+    def save(self, values):
+        """
+        Checkpoint state parts.
+
+        Parameters:
+        - values: {key: JSON-serializable value}
+
+        Returns:
+        - int: Number of rows written (unchanged parts are skipped)
+        """
+        now = time.time()
+        rows = []
+        for key, value in values.items():
+            encoded = json.dumps(value, separators=(",", ":"))
+            if self._written.get(key) != encoded:
+                rows.append((key, encoded, now))
+        if not rows:
+            return 0
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT INTO state (key, value, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                    rows,
+                )
+            for key, encoded, _ in rows:
+                self._written[key] = encoded
+            self.checkpoints += 1
+        return len(rows)
+
+    def load(self):
+        """
+        Read the last checkpoint.
+
+        Returns:
+        - tuple: ({key: value}, unix time of the newest row or None if empty)
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value, updated_at FROM state").fetchall()
+        values = {}
+        updated_at = None
+        for key, encoded, row_time in rows:
+            try:
+                values[key] = json.loads(encoded)
+            except ValueError:
+                continue
+            self._written[key] = encoded
+            updated_at = row_time if updated_at is None else max(updated_at, row_time)
+        return values, updated_at
+
+    def clear(self):
+        """
+        Drop the saved state (the next start is cold).
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM state")
+            self._written.clear()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,432 @@
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from src.logger import log
+
+# File layout: a 64-byte header, then fixed-size little-endian records (record_dtype(levels))
+MAGIC = b"MMJRNL\x00\x01"
+VERSION = 1
+HEADER = struct.Struct("<8sIII")  # magic, version, ladder levels per side, record size
+HEADER_SIZE = 64
+
+# How a tick ended (same names as the phase trace outcomes); 0 = unknown
+OUTCOMES = ("quoted", "kept", "paused", "skipped", "error")
+
+# Guard / state bits of the "flags" field
+FLAGS = {
+    "usdt_pause": 1 << 0,  # USDT balance down >10%: buy side paused
+    "token_pause": 1 << 1,  # token balance down >10%: sell side paused
+    "volatility_pause": 1 << 2,  # kill-switch pause active (loop or watchdog)
+    "cooldown": 1 << 3,  # anti-snipe cooldown active
+    "spread_wide": 1 << 4,  # spread above the spread-guard threshold
+    "wide_rebuild": 1 << 5,  # ladder rebuilt at the spread-guard spread
+    "inventory_buy": 1 << 6,  # inventory guard reduced the buy side
+    "inventory_sell": 1 << 7,  # inventory guard reduced the sell side
+    "force_rebuild": 1 << 8,  # depth imbalance or significant fill forced a rebuild
+    "risk_pause": 1 << 9,  # watchdog kill-switch fired during the tick
+    "stream_live": 1 << 10,  # WebSocket feed was live
+}
+
+# Per-level placement result in buy_status / sell_status
+STATUS_NONE, STATUS_PLACED, STATUS_KEPT, STATUS_FAILED = 0, 1, 2, 3
+
+
+def record_dtype(levels):
+    """
+    Journal record layout (packed, little-endian).
+
+    Parameters:
+    - levels: Ladder levels stored per side (deeper levels are dropped)
+
+    Returns:
+    - np.dtype: Structured record dtype
+    """
+    return np.dtype([
+        ("ts", "<f8"),
+        ("iteration", "<u4"),
+        ("outcome", "u1"),
+        ("flags", "<u2"),
+        ("tick_ms", "<f4"),
+        ("bid", "<f8"),
+        ("ask", "<f8"),
+        ("volatility", "<f4"),
+        ("usdt_free", "<f8"),
+        ("usdt_locked", "<f8"),
+        ("token_free", "<f8"),
+        ("token_locked", "<f8"),
+        ("inventory_share", "<f4"),  # token value / total value at the mid
+        ("open_orders", "<u2"),
+        ("filled_buy_qty", "<f8"),
+        ("filled_sell_qty", "<f8"),
+        ("filled_buy_value", "<f8"),
+        ("filled_sell_value", "<f8"),
+        ("buy_levels", "<u2"),
+        ("sell_levels", "<u2"),
+        ("buy_price", "<f8", (levels,)),
+        ("buy_size", "<f4", (levels,)),
+        ("buy_status", "u1", (levels,)),
+        ("sell_price", "<f8", (levels,)),
+        ("sell_size", "<f4", (levels,)),
+        ("sell_status", "u1", (levels,)),
+        ("placed", "<u2"),
+        ("kept", "<u2"),
+        ("failed", "<u2"),
+        ("cancelled", "<u2"),
+    ])
+
+
+def _blank_record(dtype):
+    # Unset floats read as NaN (not measured this tick), counters as 0
+    record = np.zeros((), dtype=dtype)
+    for name in dtype.names:
+        if dtype[name].base.kind == "f":
+            record[name] = np.nan
+    return record
+
+
+class TickJournal:
+    """
+    Append-only binary journal of every strategy loop iteration.
+
+    The loop fills one fixed-size record per tick (market, volatility,
+    balances, fills, guard flags, the ladder it quoted and what happened to
+    each level) and end_tick() appends it to the file. Records are NumPy
+    structured rows, so a journal of weeks is opened with load_journal() as a
+    memory-mapped array and analyzed column-wise without parsing anything.
+    When disabled every call returns after one attribute check.
+
+    Run `python -m src.tick_journal` for a summary or a CSV export.
+    """
+
+    def __init__(self, path, levels=20, enabled=False):
+        """
+        Parameters:
+        - path: Journal file
+        - levels: Ladder levels stored per side
+        - enabled: False turns every call into a no-op
+        """
+        self.path = path
+        self.levels = levels
+        self.enabled = enabled
+        self.dtype = record_dtype(levels)
+        self._blank = _blank_record(self.dtype)
+        self._record = self._blank.copy()
+        self._active = False  # inside a journaled tick
+        self._started = 0.0
+        self._file = None
+
+    def begin_tick(self, iteration):
+        """
+        Start a new record (an unfinished previous tick is dropped).
+
+        Parameters:
+        - iteration: Loop iteration number
+        """
+        if not self.enabled:
+            return
+        self._record[...] = self._blank
+        self._record["ts"] = time.time()
+        self._record["iteration"] = iteration
+        self._started = time.perf_counter()
+        self._active = True
+
+    def set(self, **fields):
+        """
+        Set scalar fields of the current record (e.g. bid=..., ask=...).
+        """
+        if not self._active:
+            return
+        for name, value in fields.items():
+            self._record[name] = value
+
+    def flag(self, name, on=True):
+        """
+        Set a guard/state bit (see FLAGS) of the current record.
+
+        Parameters:
+        - name: Flag name
+        - on: Only set when true (so flag(name, condition) can be called unconditionally)
+        """
+        if not self._active or not on:
+            return
+        self._record["flags"] = int(self._record["flags"]) | FLAGS[name]
+
+    def ladder(self, buy_levels, sell_levels, published=None):
+        """
+        Record the target ladder and the result of each level.
+
+        Parameters:
+        - buy_levels: Buy side (LEVEL_DTYPE array, best level first)
+        - sell_levels: Sell side (LEVEL_DTYPE array)
+        - published: publish_ladder()/reconcile_ladder() result for these levels (None = not placed)
+        """
+        if not self._active:
+            return
+        # Imported here: ladder_publisher imports utils, which creates the journal
+        from src.ladder_publisher import is_order_success
+
+        record = self._record
+        counts = {STATUS_PLACED: 0, STATUS_KEPT: 0, STATUS_FAILED: 0}
+        for side, levels in (("buy", buy_levels), ("sell", sell_levels)):
+            n = min(len(levels), self.levels)
+            record[f"{side}_levels"] = len(levels)
+            record[f"{side}_price"][:n] = levels["price"][:n]
+            record[f"{side}_size"][:n] = levels["size"][:n]
+            if published is None:
+                continue
+            status = record[f"{side}_status"]
+            for i, res in enumerate(published[side]):
+                if res and res.get("kept"):
+                    state = STATUS_KEPT
+                elif is_order_success(res):
+                    state = STATUS_PLACED
+                else:
+                    state = STATUS_FAILED
+                counts[state] += 1
+                if i < n:
+                    status[i] = state
+        if published is not None:
+            record["placed"] = counts[STATUS_PLACED]
+            record["kept"] = counts[STATUS_KEPT]
+            record["failed"] = counts[STATUS_FAILED]
+            record["cancelled"] = published.get("cancelled", 0)
+
+    def end_tick(self, outcome="quoted"):
+        """
+        Complete the record and append it to the journal.
+
+        Parameters:
+        - outcome: How the tick ended (see OUTCOMES)
+        """
+        if not self._active:
+            return
+        self._active = False
+        record = self._record
+        record["tick_ms"] = (time.perf_counter() - self._started) * 1000
+        record["outcome"] = OUTCOMES.index(outcome) + 1 if outcome in OUTCOMES else 0
+        mid = (record["bid"] + record["ask"]) / 2
+        token_value = (record["token_free"] + record["token_locked"]) * mid
+        total_value = record["usdt_free"] + record["usdt_locked"] + token_value
+        if total_value > 0:
+            record["inventory_share"] = token_value / total_value
+        self._write(record.tobytes())
+
+    def _write(self, data):
+        try:
+            if self._file is None:
+                self._file = self._open()
+            self._file.write(data)
+            self._file.flush()
+        except OSError as e:
+            log(f"[JOURNAL] Could not write {self.path}, journal disabled: {e}")
+            self.enabled = False
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        header = HEADER.pack(MAGIC, VERSION, self.levels, self.dtype.itemsize).ljust(HEADER_SIZE, b"\x00")
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "rb") as f:
+                existing = f.read(HEADER_SIZE)
+            if existing == header:
+                f = open(self.path, "r+b")
+                # Drop a record cut short by a crash so every record stays aligned
+                size = os.path.getsize(self.path)
+                f.truncate(HEADER_SIZE + (size - HEADER_SIZE) // self.dtype.itemsize * self.dtype.itemsize)
+                f.seek(0, os.SEEK_END)
+                return f
+            # Written with another layout (e.g. JOURNAL_LEVELS changed): keep it aside
+            moved = f"{self.path}.{int(time.time())}"
+            os.replace(self.path, moved)
+            log(f"[JOURNAL] {self.path} has another record layout, moved to {moved}")
+        f = open(self.path, "wb")
+        f.write(header)
+        return f
+
+    def close(self):
+        """
+        Close the journal file.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_journal(path):
+    """
+    Open a journal as a read-only memory-mapped record array.
+
+    Parameters:
+    - path: Journal file
+
+    Returns:
+    - np.ndarray: Records (np.memmap; empty array if the journal has none)
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is not a tick journal")
+    magic, version, levels, itemsize = HEADER.unpack_from(header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a tick journal (version {VERSION})")
+    dtype = record_dtype(levels)
+    if dtype.itemsize != itemsize:
+        raise ValueError(f"{path}: record size {itemsize} does not match the version {VERSION} layout")
+    count = (os.path.getsize(path) - HEADER_SIZE) // itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def flag_set(records, name):
+    """
+    Boolean mask of the records with a FLAGS bit set.
+    """
+    return (records["flags"] & FLAGS[name]) != 0
+
+
+def summarize(records):
+    """
+    Aggregate view of journaled ticks.
+
+    Parameters:
+    - records: Records from load_journal() (or a slice of them)
+
+    Returns:
+    - dict: ticks, time span, outcomes, spread/volatility, fills, inventory share,
+      guard flag counts and placement totals
+    """
+    if len(records) == 0:
+        return {"ticks": 0}
+    outcomes = np.bincount(records["outcome"], minlength=len(OUTCOMES) + 1)
+    quoted = records[~np.isnan(records["bid"]) & (records["bid"] > 0)]
+    spread_bps = (quoted["ask"] - quoted["bid"]) / quoted["bid"] * 1e4
+    inventory = records["inventory_share"][~np.isnan(records["inventory_share"])]
+    volatility = records["volatility"][~np.isnan(records["volatility"])]
+
+    def mean(values):
+        return float(values.mean()) if len(values) else None
+
+    def filled(name):
+        values = records[name]
+        return float(values[~np.isnan(values)].sum())
+
+    return {
+        "ticks": int(len(records)),
+        "first_ts": float(records["ts"][0]),
+        "last_ts": float(records["ts"][-1]),
+        "outcomes": {
+            name: int(outcomes[i + 1]) for i, name in enumerate(OUTCOMES) if outcomes[i + 1]
+        },
+        "tick_ms_mean": mean(records["tick_ms"]),
+        "spread_bps_mean": mean(spread_bps),
+        "volatility_mean": mean(volatility),
+        "filled_buy_qty": filled("filled_buy_qty"),
+        "filled_sell_qty": filled("filled_sell_qty"),
+        "filled_buy_value": filled("filled_buy_value"),
+        "filled_sell_value": filled("filled_sell_value"),
+        "inventory_share": {
+            "first": float(inventory[0]), "min": float(inventory.min()), "max": float(inventory.max()),
+            "last": float(inventory[-1]),
+        } if len(inventory) else None,
+        "flags": {name: int(flag_set(records, name).sum()) for name in FLAGS if flag_set(records, name).any()},
+        "levels_quoted_mean": mean((records["buy_levels"] + records["sell_levels"]).astype(np.float64)),
+        "placed": int(records["placed"].sum()),
+        "kept": int(records["kept"].sum()),
+        "failed": int(records["failed"].sum()),
+        "cancelled": int(records["cancelled"].sum()),
+    }
+
+
+def format_summary(result):
+    """
+    Human-readable lines of summarize() output.
+    """
+    if not result["ticks"]:
+        return "[JOURNAL] No ticks"
+    span = result["last_ts"] - result["first_ts"]
+    outcomes = ", ".join(f"{k}: {v}" for k, v in result["outcomes"].items())
+    lines = [
+        f"[JOURNAL] {result['ticks']} ticks over {span / 3600:.2f}h ({outcomes})",
+        f"[JOURNAL] Tick: {result['tick_ms_mean']:.1f} ms mean",
+    ]
+    if result["spread_bps_mean"] is not None:
+        lines.append(f"[JOURNAL] Market spread: {result['spread_bps_mean']:.1f} bps mean")
+    if result["volatility_mean"] is not None:
+        lines.append(f"[JOURNAL] Volatility: {result['volatility_mean']:.4f} mean")
+    lines.append(
+        f"[JOURNAL] Filled: buy {result['filled_buy_qty']:.2f} (~{result['filled_buy_value']:.2f} USDT), "
+        f"sell {result['filled_sell_qty']:.2f} (~{result['filled_sell_value']:.2f} USDT)"
+    )
+    inventory = result["inventory_share"]
+    if inventory:
+        lines.append(
+            f"[JOURNAL] Token share of inventory: {inventory['first'] * 100:.1f}% → {inventory['last'] * 100:.1f}% "
+            f"(min {inventory['min'] * 100:.1f}%, max {inventory['max'] * 100:.1f}%)"
+        )
+    if result["flags"]:
+        lines.append("[JOURNAL] Guards: " + ", ".join(f"{k} {v}x" for k, v in result["flags"].items()))
+    lines.append(
+        f"[JOURNAL] Orders: {result['placed']} placed, {result['kept']} kept, {result['failed']} failed, "
+        f"{result['cancelled']} cancelled by requoting | {result['levels_quoted_mean']:.1f} levels quoted per tick"
+    )
+    return "\n".join(lines)
+
+
+def write_csv(records, out):
+    """
+    Export the scalar columns (one row per tick, outcome and flags decoded) as CSV.
+
+    Parameters:
+    - records: Records from load_journal()
+    - out: Writable text file
+    """
+    scalars = [name for name in records.dtype.names if records.dtype[name].shape == ()]
+    writer = csv.writer(out)
+    writer.writerow(scalars + ["mid"])
+    for row in records[scalars].tolist():
+        row = list(row)
+        outcome = row[scalars.index("outcome")]
+        row[scalars.index("outcome")] = OUTCOMES[outcome - 1] if outcome else ""
+        flags = row[scalars.index("flags")]
+        row[scalars.index("flags")] = "|".join(name for name, bit in FLAGS.items() if flags & bit)
+        bid, ask = row[scalars.index("bid")], row[scalars.index("ask")]
+        writer.writerow(row + [(bid + ask) / 2])
+
+
+if __name__ == "__main__":
+    # python -m src.tick_journal                      (TICK_JOURNAL_FILE)
+    # python -m src.tick_journal run1.bin --last 1000 --csv ticks.csv
+    parser = argparse.ArgumentParser(description="Summarize or export a tick journal")
+    parser.add_argument("file", nargs="?", help="Journal file (default: TICK_JOURNAL_FILE)")
+    parser.add_argument("--last", type=int, default=None, help="Only the newest N ticks")
+    parser.add_argument("--csv", help="Write the scalar columns to this CSV file (- for stdout)")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    path = args.file or os.getenv("TICK_JOURNAL_FILE") or os.path.join(os.getenv("BOT_DATA_DIR", "data"), "tick_journal.bin")
+    if not os.path.exists(path):
+        raise SystemExit(f"[JOURNAL] {path} not found (enable TICK_JOURNAL_ENABLED and run the bot first)")
+    records = load_journal(path)
+    if args.last:
+        records = records[-args.last:]
+    if args.csv:
+        if args.csv == "-":
+            write_csv(records, sys.stdout)
+        else:
+            with open(args.csv, "w", newline="") as f:
+                write_csv(records, f)
+    else:
+        result = summarize(records)
+        print(json.dumps(result, indent=2) if args.json else format_summary(result))
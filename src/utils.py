@@ -1,13 +1,52 @@
+import atexit
 import logging
 import numpy as np
 import os
+import time
 from dotenv import load_dotenv
+from lbank.error import ServerError
 from lbank.old_api import BlockHttpClient
-from datetime import datetime, timedelta, timezone
+from src.async_client import AsyncExchangeClient, sign_request
+from src.balance_ledger import BalanceLedger
+from src.bot_config import ConfigWatcher
+from src.exchange_simulator import start_simulator
+from src.kline_buffer import KlineRingBuffer
+from src.logger import DEFAULT_LOG_DEDUP, DEFAULT_LOG_SAMPLE, configure_logging, log, parse_sample
+from src.market_stream import MarketStream
+from src.order_canceller import cancel_orders, parse_batch_cancel
+from src.order_registry import OrderRegistry
+from src.pair_metadata import PairMetadata
+from src.phase_tracer import PhaseTracer
+from src.request_scheduler import (
+    CLASS_ACCOUNT,
+    CLASS_MARKET,
+    CLASS_TRADE,
+    PRIORITY_RISK,
+    RequestScheduler,
+)
+from src.request_metrics import MetricsServer, RequestMetrics, classify_error, is_rejected
+from src.route_cache import RouteCache, is_nonsupport_error
+from src.snapshot import MarketSnapshot
+from src.state_store import StateStore
+from src.tick_journal import TickJournal
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Bot logging: lines are written by a background thread through a bounded queue, so the
+# trading loop never waits on stdout. Chatty per-tick categories are sampled (kept whole on
+# every Nth iteration) and state lines that read the same as last time are collapsed;
+# warnings and errors are always written. LOG_FORMAT=json writes one JSON object per line.
+configure_logging(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    fmt=os.getenv("LOG_FORMAT", "text").lower(),
+    sample=parse_sample(os.getenv("LOG_SAMPLE", DEFAULT_LOG_SAMPLE)),
+    dedup=[c.strip().upper() for c in os.getenv("LOG_DEDUP", DEFAULT_LOG_DEDUP).split(",") if c.strip()],
+    dedup_seconds=float(os.getenv("LOG_DEDUP_SECONDS", "300")),
+    asynchronous=os.getenv("LOG_ASYNC", "true").lower() == "true",
+    queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+)
+
 # Get API credentials from environment variables
 API_KEY = os.getenv("LBANK_API_KEY", "")
 API_SECRET = os.getenv("LBANK_API_SECRET", "")
@@ -18,6 +57,24 @@ BASE_URL = os.getenv("LBANK_BASE_URL", "https://api.lbkex.com/")
 pair = os.getenv("TRADING_PAIR", "acces_usdt")
 token_symbol = os.getenv("TOKEN_SYMBOL", "acces")
 
+# Offline mode: EXCHANGE_SIMULATOR=true runs the bot against the local exchange simulator
+# (src/exchange_simulator.py) instead of LBank. Without SIM_URL a simulator is started in this
+# process; set SIM_URL to use one started with `python -m src.exchange_simulator`. LBANK_BASE_URL
+# is ignored, so simulator mode never sends orders to the real exchange. The simulator does not
+# check signatures, so placeholder credentials are used if none are set.
+EXCHANGE_SIMULATOR = os.getenv("EXCHANGE_SIMULATOR", "false").lower() == "true"
+simulator_server = None
+if EXCHANGE_SIMULATOR:
+    API_KEY = API_KEY or "simulator"
+    API_SECRET = API_SECRET or "simulator"
+    SIGN_METHOD = "HMACSHA256"
+    BASE_URL = os.getenv("SIM_URL", "")
+    if not BASE_URL:
+        simulator_server = start_simulator(pair, port=int(os.getenv("SIM_PORT", "0")))
+        atexit.register(simulator_server.stop)
+        BASE_URL = simulator_server.base_url
+    log(f"[SIM] Trading against the exchange simulator at {BASE_URL}")
+
 # Validate that API credentials are set
 if not API_KEY or not API_SECRET:
     raise ValueError(
@@ -32,6 +89,213 @@ client = BlockHttpClient(
     log_level=logging.ERROR,
 )
 
+# Strategy settings from .env as one typed BotConfig. main.py starts the watcher thread, which
+# hot-swaps the config when the file changes (e.g. through the api-server); the loop picks it up
+# at its next tick. Set CONFIG_HOT_RELOAD=false to keep the settings read at startup.
+CONFIG_FILE = os.getenv("BOT_CONFIG_FILE", ".env")
+CONFIG_HOT_RELOAD = os.getenv("CONFIG_HOT_RELOAD", "true").lower() == "true"
+config_watcher = ConfigWatcher(
+    CONFIG_FILE,
+    interval_seconds=float(os.getenv("CONFIG_RELOAD_INTERVAL_SECONDS", "2")),
+)
+
+# Token buckets per endpoint class in front of every REST call, with priority lanes
+# (risk > cancel > reads > placements). LBank allows ~200 req/10s for market/account
+# endpoints and ~500 req/10s for order writes per IP; the defaults stay below that.
+# Set RATE_LIMIT_ENABLED=false to send requests unthrottled.
+request_scheduler = RequestScheduler(
+    limits={
+        CLASS_MARKET: (
+            float(os.getenv("RATE_LIMIT_MARKET_PER_SECOND", "10")),
+            float(os.getenv("RATE_LIMIT_MARKET_BURST", "20")),
+        ),
+        CLASS_ACCOUNT: (
+            float(os.getenv("RATE_LIMIT_ACCOUNT_PER_SECOND", "8")),
+            float(os.getenv("RATE_LIMIT_ACCOUNT_BURST", "16")),
+        ),
+        CLASS_TRADE: (
+            float(os.getenv("RATE_LIMIT_TRADE_PER_SECOND", "40")),
+            float(os.getenv("RATE_LIMIT_TRADE_BURST", "40")),
+        ),
+    },
+    max_place_wait_seconds=float(os.getenv("RATE_LIMIT_MAX_PLACE_WAIT_SECONDS", "5")),
+    enabled=os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true",
+)
+
+# Per-endpoint latency histograms, error classes and retry counts for every REST call, plus
+# loop iteration timing. main.py serves them on http://METRICS_HOST:METRICS_PORT/metrics for
+# Prometheus; quantiles cover the last METRICS_WINDOW_SECONDS. Set METRICS_ENABLED=false to turn off.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+request_metrics = RequestMetrics(
+    window_seconds=float(os.getenv("METRICS_WINDOW_SECONDS", "60")),
+    enabled=METRICS_ENABLED,
+)
+metrics_server = MetricsServer(
+    request_metrics,
+    host=os.getenv("METRICS_HOST", "127.0.0.1"),
+    port=int(os.getenv("METRICS_PORT", "9108")),
+)
+request_metrics.add_gauge(
+    "lbank_request_queue_depth",
+    "Requests waiting for a rate-limit token, by endpoint class",
+    lambda: {cls: request_scheduler.queue_depth(cls) for cls in (CLASS_MARKET, CLASS_ACCOUNT, CLASS_TRADE)},
+)
+
+# Pooled keep-alive asyncio client; reuses `client` for signing.
+# Set ASYNC_CLIENT_ENABLED=false to send every request through BlockHttpClient instead.
+ASYNC_CLIENT_ENABLED = os.getenv("ASYNC_CLIENT_ENABLED", "true").lower() == "true"
+async_client = AsyncExchangeClient(
+    signer=client,
+    base_url=BASE_URL,
+    max_concurrency=int(os.getenv("ASYNC_CLIENT_MAX_CONCURRENCY", "8")),
+    pool_size=int(os.getenv("ASYNC_CLIENT_POOL_SIZE", "16")),
+    timeout_seconds=float(os.getenv("ASYNC_CLIENT_TIMEOUT_SECONDS", "10")),
+    scheduler=request_scheduler,
+    metrics=request_metrics,
+)
+atexit.register(async_client.close)
+
+# REST paths read at the start of every tick
+BOOK_TICKER_PATH = "v2/supplement/ticker/bookTicker.do"
+PRICE_PATH = "v2/supplement/ticker/price.do"
+BALANCE_PATH = "v2/supplement/user_info_account.do"
+OPEN_ORDERS_PATH = "v2/supplement/orders_info_no_deal.do"
+OPEN_ORDERS_PAGE_LENGTH = int(os.getenv("OPEN_ORDERS_PAGE_LENGTH", "200"))
+KLINE_PATH = "v2/kline.do"
+
+# Cancellation: v1 cancel_order.do takes up to 3 comma-joined IDs per request; batches are
+# sent in parallel. Pairs where the batch endpoint is rejected fall back to one ID per request.
+CANCEL_ORDER_PATH = "v2/supplement/cancel_order.do"
+CANCEL_BATCH_PATH = "v1/cancel_order.do"
+CANCEL_BATCH_SIZE = 3
+CANCEL_BATCH_ENABLED = os.getenv("CANCEL_BATCH_ENABLED", "true").lower() == "true"
+CANCEL_MAX_IN_FLIGHT = int(os.getenv("CANCEL_MAX_IN_FLIGHT", "8"))
+
+# Price / quantity precision per pair from v1/accuracy.do, loaded once and refreshed every
+# PAIR_RULES_REFRESH_SECONDS. Every order is rounded to it and checked against the minimums
+# before it is sent; set PAIR_RULES_ENABLED=false to send orders unrounded (minimum value still checked).
+ACCURACY_PATH = "v1/accuracy.do"
+pair_rules = PairMetadata(
+    fetch=lambda: http_request("get", ACCURACY_PATH),
+    min_notional=float(os.getenv("ORDER_MIN_NOTIONAL_USDT", "5")),
+    refresh_seconds=float(os.getenv("PAIR_RULES_REFRESH_SECONDS", "21600")),
+    enabled=os.getenv("PAIR_RULES_ENABLED", "true").lower() == "true",
+)
+
+# Working (endpoint, symbol format, order type) per pair, persisted across restarts
+BOT_DATA_DIR = os.getenv("BOT_DATA_DIR", "data")
+order_routes = RouteCache(
+    os.getenv("ORDER_ROUTE_CACHE_FILE") or os.path.join(BOT_DATA_DIR, "order_routes.json")
+)
+
+# Strategy state (counters, pauses, price/fill history, resting orders) checkpointed every tick,
+# so a restart adopts the orders still on the book instead of rebuilding from scratch.
+# Checkpoints older than STATE_MAX_AGE_SECONDS are ignored. Set STATE_STORE_ENABLED=false for cold starts.
+STATE_STORE_ENABLED = os.getenv("STATE_STORE_ENABLED", "true").lower() == "true"
+STATE_MAX_AGE_SECONDS = float(os.getenv("STATE_MAX_AGE_SECONDS", "3600"))
+STATE_STORE_FILE = os.getenv("STATE_STORE_FILE") or os.path.join(BOT_DATA_DIR, "bot_state.db")
+state_store = None  # opened by open_state_store() when the bot starts, not on import
+
+# Per-phase wall time of every loop iteration (fetch book, balances, ..., placement), appended to
+# a rotating JSONL trace; `python -m src.phase_tracer` prints per-phase percentiles. Off by default.
+phase_tracer = PhaseTracer(
+    os.getenv("PHASE_TRACE_FILE") or os.path.join(BOT_DATA_DIR, "phase_trace.jsonl"),
+    max_bytes=int(float(os.getenv("PHASE_TRACE_MAX_MB", "10")) * 1024 * 1024),
+    backups=int(os.getenv("PHASE_TRACE_BACKUPS", "3")),
+    enabled=os.getenv("PHASE_TRACE_ENABLED", "false").lower() == "true",
+)
+atexit.register(phase_tracer.close)
+
+# Binary journal of every loop iteration (market, balances, guards, quoted ladder, placement
+# results) as fixed-size NumPy records; `python -m src.tick_journal` summarizes or exports it,
+# load_journal() memory-maps it for analysis. Off by default.
+tick_journal = TickJournal(
+    os.getenv("TICK_JOURNAL_FILE") or os.path.join(BOT_DATA_DIR, "tick_journal.bin"),
+    levels=int(os.getenv("TICK_JOURNAL_LEVELS", "20")),
+    enabled=os.getenv("TICK_JOURNAL_ENABLED", "false").lower() == "true",
+)
+atexit.register(tick_journal.close)
+
+# Per-iteration cache of book ticker, last price, balances and open orders.
+# market_making() calls market_snapshot.begin_tick() at the top of every loop.
+market_snapshot = MarketSnapshot(
+    ttl_seconds=float(os.getenv("MARKET_SNAPSHOT_TTL_SECONDS", "3"))
+)
+
+# Local free/locked balances, moved by our own placements, cancels and fills (via order_registry)
+# and re-read from the exchange every BALANCE_RECONCILE_SECONDS or when drift is suspected.
+# Set BALANCE_LEDGER_ENABLED=false to query balances on every read instead.
+BALANCE_LEDGER_ENABLED = os.getenv("BALANCE_LEDGER_ENABLED", "true").lower() == "true"
+balance_ledger = BalanceLedger(
+    ("usdt", token_symbol),
+    reconcile_seconds=float(os.getenv("BALANCE_RECONCILE_SECONDS", "60")),
+    drift_tolerance_pct=float(os.getenv("BALANCE_DRIFT_TOLERANCE_PCT", "1")),
+)
+
+# Our resting orders by ID and price level, updated from placements, cancels and open-order queries
+order_registry = OrderRegistry(ledger=balance_ledger)
+request_metrics.add_gauge(
+    "lbank_bot_resting_orders",
+    "Our orders on the book, by side",
+    lambda: {side: order_registry.count(side) for side in ("buy", "sell")},
+)
+
+# One-minute closes kept across iterations; only candles newer than the last one held are fetched.
+# Set KLINE_BUFFER_ENABLED=false to download the full kline window on every volatility check.
+KLINE_BUFFER_ENABLED = os.getenv("KLINE_BUFFER_ENABLED", "true").lower() == "true"
+kline_buffer = KlineRingBuffer() if KLINE_BUFFER_ENABLED else None
+
+# WebSocket push feeds (depth, trades, order updates); started by start_market_stream().
+# While it is not live every read falls back to REST polling. In simulator mode the
+# simulator's own feed is used (LBANK_WS_URL is ignored like LBANK_BASE_URL).
+MARKET_STREAM_URL = os.getenv("LBANK_WS_URL", "wss://www.lbkex.net/ws/V2/")
+if EXCHANGE_SIMULATOR:
+    MARKET_STREAM_URL = "ws" + BASE_URL[len("http"):] + "ws/V2/"
+SUBSCRIBE_KEY_PATH = "v2/subscribe/get_key.do"
+SUBSCRIBE_KEY_REFRESH_PATH = "v2/subscribe/refresh_key.do"
+market_stream = None
+
+
+def http_request(method, path, payload=None, priority=None):
+    """
+    Send a signed REST request to LBank.
+
+    Goes through the pooled async client when ASYNC_CLIENT_ENABLED, otherwise
+    through the blocking BlockHttpClient (signing is serialized either way).
+    Either way the request first waits for a request_scheduler token and is
+    recorded in request_metrics.
+
+    Parameters:
+    - method: HTTP method ("get"/"post")
+    - path: API path (e.g., "v2/supplement/ticker/bookTicker.do")
+    - payload: Request parameters (optional)
+    - priority: Scheduler priority lane (optional, default from the path)
+
+    Returns:
+    - dict: Decoded JSON response
+    """
+    if ASYNC_CLIENT_ENABLED:
+        return async_client.request_sync(method, path, payload, priority)
+    try:
+        request_scheduler.acquire(path, priority)
+    except Exception as e:
+        request_metrics.record_error(path, classify_error(e))
+        raise
+    headers, payload = sign_request(client, payload)
+    started = time.perf_counter()
+    try:
+        if method.upper() == "GET":
+            res = client.request(method=method, path=path, headers=headers, params=payload)
+        else:
+            res = client.request(method=method, path=path, headers=headers, data=payload)
+    except Exception as e:
+        request_metrics.record_request(path, time.perf_counter() - started, classify_error(e))
+        if isinstance(e, ServerError) and e.status_code == 429:
+            request_scheduler.penalize(path)
+        raise
+    request_metrics.record_request(path, time.perf_counter() - started, classify_error(res) if is_rejected(res) else None)
+    return res
+
 
 def get_order_book(symbol):
     """
@@ -43,15 +307,49 @@ def get_order_book(symbol):
     Returns:
     - dict: Order book data, or empty dict on error
     """
+    cached = market_snapshot.lookup(("book_ticker", symbol))
+    if cached is not None:
+        return cached
+    streamed = stream_book_ticker(symbol)
+    if streamed is not None:
+        return streamed
     try:
-        api_url = "v2/supplement/ticker/bookTicker.do"
         payload = {"symbol": symbol}
-        return client.http_request("get", api_url, payload=payload)
+        res = http_request("get", BOOK_TICKER_PATH, payload=payload)
+        if res and (res.get("result") == "true" or res.get("result") is True):
+            market_snapshot.store(("book_ticker", symbol), res)
+        return res
     except Exception as e:
-        print(f"[ERROR] Failed to fetch order book for {symbol}: {e}")
+        log(f"[ERROR] Failed to fetch order book for {symbol}: {e}")
         return {}
 
 
+def fetch_mid_price(symbol):
+    """
+    Sample the current mid price, bypassing the per-tick snapshot.
+
+    Uses the WebSocket stream when it is live, otherwise one bookTicker.do request
+    (sent in the risk priority lane: this is the risk watchdog's sample).
+
+    Parameters:
+    - symbol: Trading pair symbol (e.g., pair)
+
+    Returns:
+    - float: Mid price, or None if unavailable
+    """
+    if market_stream is not None and market_stream.symbol == symbol:
+        mid = market_stream.mid_price()
+        if mid:
+            return mid
+    res = http_request("get", BOOK_TICKER_PATH, payload={"symbol": symbol}, priority=PRIORITY_RISK)
+    if not res or not (res.get("result") == "true" or res.get("result") is True):
+        return None
+    data = res.get("data", {})
+    bid = float(data.get("bidPrice", 0) or 0)
+    ask = float(data.get("askPrice", 0) or 0)
+    return (bid + ask) / 2 if bid > 0 and ask > 0 else None
+
+
 def get_buy_price_in_spread():
     """
     Get buy price within spread (should be below bid price, not ask price).
@@ -85,16 +383,16 @@ def get_buy_price_in_spread():
         buy_price = bid_price * 0.999
         return buy_price
     except Exception as e:
-        print(f"[WARNING] Error in get_buy_price_in_spread: {e}")
+        log(f"[WARNING] Error in get_buy_price_in_spread: {e}")
         # Try to get current price as fallback
         try:
             current_price = get_current_price(pair)
             # Use 0.1% below current price as fallback
             fallback_price = current_price * 0.999
-            print(f"[FALLBACK] Using current price fallback: {fallback_price:.6f}")
+            log(f"[FALLBACK] Using current price fallback: {fallback_price:.6f}")
             return fallback_price
         except:
-            print("[ERROR] Could not get fallback price for buy orders")
+            log("[ERROR] Could not get fallback price for buy orders")
             return 0.0
 
 
@@ -130,28 +428,137 @@ def get_sell_price_in_spread():
         sell_price = ask_price * 1.02
         return sell_price
     except Exception as e:
-        print(f"[WARNING] Error in get_sell_price_in_spread: {e}")
+        log(f"[WARNING] Error in get_sell_price_in_spread: {e}")
         # Try to get current price as fallback
         try:
             current_price = get_current_price(pair)
             fallback_price = current_price * 1.02
-            print(f"[FALLBACK] Using current price fallback: {fallback_price:.6f}")
+            log(f"[FALLBACK] Using current price fallback: {fallback_price:.6f}")
             return fallback_price
         except:
-            print("[ERROR] Could not get fallback price for sell orders")
+            log("[ERROR] Could not get fallback price for sell orders")
             return 0.0
 
 
+def order_type_for_path(path, side):
+    """
+    Map an order side to the type field a create_order endpoint expects.
+
+    Parameters:
+    - path: Endpoint path
+    - side: Order side ("buy_maker"/"buy" or "sell_maker"/"sell")
+
+    Returns:
+    - str: "buy"/"sell" for v1 endpoints, the original side for v2 endpoints
+    """
+    # v1 endpoints use "buy"/"sell", v2 endpoints use "buy_maker"/"sell_maker"
+    if path.startswith("v1/"):
+        if side == "buy_maker":
+            return "buy"
+        elif side == "sell_maker":
+            return "sell"
+    return side
+
+
+def send_create_order(path, symbol_format, side, amount, price=None):
+    """
+    Send one create_order request on a specific endpoint and symbol format.
+
+    Parameters:
+    - path: Endpoint path
+    - symbol_format: Symbol exactly as it should be sent
+    - side: Order side ("buy_maker"/"buy" or "sell_maker"/"sell")
+    - amount: Amount of the asset to trade
+    - price: Price at which to place the order
+
+    Returns:
+    - dict: Response from the exchange (error dict if the request raised)
+    """
+    payload = {
+        "symbol": symbol_format,
+        "type": order_type_for_path(path, side),
+        "amount": amount,
+    }
+    if price is not None:
+        payload["price"] = price
+    try:
+        return http_request("post", path, payload=payload)
+    except Exception as e:
+        return {"result": False, "error": str(e), "msg": str(e)}
+
+
+def prepare_order(symbol, side, amount, price=None):
+    """
+    Round an order to the pair's precision and check it against the pair's minimums.
+
+    Parameters:
+    - symbol: Trading pair symbol (e.g., pair)
+    - side: Order side ("buy_maker"/"buy" or "sell_maker"/"sell")
+    - amount: Amount of the asset to trade
+    - price: Price at which to place the order
+
+    Returns:
+    - tuple: (amount, price, error) - rounded values, error is None if the order may be sent
+    """
+    return pair_rules.check(symbol, side, amount, price)
+
+
 def place_order(symbol, side, amount, price=None):
     """
     Place an order on the exchange.
 
+    The order is rounded and checked locally first (see prepare_order); orders
+    the exchange would reject come back as an error without a request.
+
+    The endpoint / symbol format that worked last time for this pair is tried
+    first (see order_routes). Discovery across all combinations only runs when
+    nothing is cached or the cached route gets a "nonsupport" error.
+
     Parameters:
     - symbol: Trading pair symbol (e.g., pair)
     - side: Order side ("buy_maker"/"buy" or "sell_maker"/"sell") - will be converted to "buy"/"sell" per API docs
     - price: Price at which to place the order
     - amount: Amount of the asset to trade
 
+    Returns:
+    - dict: Response from the exchange
+    """
+    amount, price, error = prepare_order(symbol, side, amount, price)
+    if error:
+        return {"result": False, "error": error, "msg": error, "precheck": True}
+
+    # Placing an order locks funds and adds an open order
+    market_snapshot.invalidate("balances", "open_orders")
+
+    # Fast path: one request on the known-good route
+    route = order_routes.get(symbol, "create_order")
+    if route is not None:
+        res = send_create_order(route["path"], route["symbol"], side, amount, price)
+        if not res or not is_nonsupport_error(res.get("error", res.get("msg", ""))):
+            return res
+        log(f"[INFO] Cached order route '{route['path']}' / '{route['symbol']}' was rejected, rediscovering...")
+        order_routes.forget(symbol, "create_order")
+
+    with order_routes.discovery_lock:
+        # Another worker may have finished discovery while we were waiting
+        route = order_routes.get(symbol, "create_order")
+        if route is not None:
+            return send_create_order(route["path"], route["symbol"], side, amount, price)
+        return discover_order_route(symbol, side, amount, price)
+
+
+def discover_order_route(symbol, side, amount, price=None):
+    """
+    Place an order by trying every endpoint and symbol format until one is accepted.
+
+    The first combination that succeeds is stored in order_routes for later calls.
+
+    Parameters:
+    - symbol: Trading pair symbol (e.g., pair)
+    - side: Order side ("buy_maker"/"buy" or "sell_maker"/"sell")
+    - amount: Amount of the asset to trade
+    - price: Price at which to place the order
+
     Returns:
     - dict: Response from the exchange
     """
@@ -160,10 +567,6 @@ def place_order(symbol, side, amount, price=None):
     # Note: v2/supplement/create_order.do is the main endpoint per library code
     paths_to_try = ["v2/supplement/create_order.do", "v2/create_order.do"]
     
-    # For v2 endpoints, keep original order types (buy_maker/sell_maker)
-    # For v1 endpoints, convert to buy/sell per API documentation
-    # We'll handle this per endpoint in the loop below
-    
     # Try different symbol formats
     # Order creation works with lowercase (acces_usdt) - try that first
     # Order book uses lowercase, order creation works with lowercase
@@ -190,25 +593,13 @@ def place_order(symbol, side, amount, price=None):
     total_attempts = len(paths_to_try) * len(symbol_formats)
     
     for path in paths_to_try:
-        # Determine order type based on endpoint version
-        # v1 endpoints use "buy"/"sell", v2 endpoints use "buy_maker"/"sell_maker"
-        if path.startswith("v1/"):
-            # v1 endpoint - convert to buy/sell
-            if side == "buy_maker":
-                order_type = "buy"
-            elif side == "sell_maker":
-                order_type = "sell"
-            else:
-                order_type = side
-        else:
-            # v2 endpoint - keep original buy_maker/sell_maker
-            order_type = side
-        
         for idx, symbol_format in enumerate(symbol_formats):
             attempts += 1
+            if attempts > 1:
+                request_metrics.record_retry(path, "route_discovery")
             payload = {
                 "symbol": symbol_format,
-                "type": order_type,
+                "type": order_type_for_path(path, side),
                 "amount": amount,
             }
 
@@ -216,27 +607,31 @@ def place_order(symbol, side, amount, price=None):
                 payload["price"] = price
 
             try:
-                res = client.http_request("post", path, payload=payload)
+                res = http_request("post", path, payload=payload)
                 
                 # Check response
                 if res:
                     result = res.get("result")
                     error_msg = res.get("error", res.get("msg", ""))
-                    error_lower = str(error_msg).lower() if error_msg else ""
                     
-                    # If successful, return immediately
+                    # If successful, remember the route and return immediately
                     if result == "true" or result is True or res.get("msg") == "Success":
                         if (symbol_format != symbol or path != paths_to_try[0]) and attempts > 1:
-                            print(f"[INFO] Order placed using endpoint '{path}' and symbol format: '{symbol_format}'")
+                            log(f"[INFO] Order placed using endpoint '{path}' and symbol format: '{symbol_format}'")
+                        order_routes.remember(symbol, "create_order", {
+                            "path": path,
+                            "symbol": symbol_format,
+                            "order_type_style": "plain" if path.startswith("v1/") else "maker",
+                        })
                         return res
                     
                     # Store the error for reporting
                     last_error = error_msg
                     
                     # If it's a "nonsupport" error, try next combination
-                    if "nonsupport" in error_lower or "not support" in error_lower or "unsupported" in error_lower:
+                    if is_nonsupport_error(error_msg):
                         if attempts == 1:  # Only print on first attempt
-                            print(f"[INFO] Trying different endpoints and symbol formats for order placement...")
+                            log(f"[INFO] Trying different endpoints and symbol formats for order placement...")
                         # Continue to next combination
                         if idx < len(symbol_formats) - 1:
                             continue
@@ -267,16 +662,17 @@ def place_order(symbol, side, amount, price=None):
     
     # If we get here, all combinations failed
     error_msg = last_error or "All endpoints and symbol formats failed"
-    print(f"[ERROR] Failed to place order after {attempts} attempts. Last error: {error_msg}")
+    log(f"[ERROR] Failed to place order after {attempts} attempts. Last error: {error_msg}")
     return {"result": False, "error": error_msg, "msg": error_msg}
 
 
-def cancel_all_orders(symbol):
+def cancel_all_orders(symbol, priority=None):
     """
     Cancel all orders for a given symbol.
 
     Parameters:
     - symbol: Trading pair symbol (e.g., pair)
+    - priority: Request scheduler lane (e.g., PRIORITY_RISK for the kill-switch)
 
     Returns:
     - dict: Response from the exchange
@@ -284,7 +680,11 @@ def cancel_all_orders(symbol):
 
     path = "v2/supplement/cancel_order_by_symbol.do"
     payload = {"symbol": symbol}
-    return client.http_request("POST", path, payload=payload)
+    market_snapshot.invalidate("balances", "open_orders")
+    res = http_request("POST", path, payload=payload, priority=priority)
+    if res.get("result") == "true" or res.get("result") is True or res.get("msg") == "Success":
+        order_registry.clear()
+    return res
 
 
 def cancel_one_order(symbol, order_id):
@@ -298,36 +698,114 @@ def cancel_one_order(symbol, order_id):
     Returns:
     - dict: Response from the exchange
     """
-    path = "v2/supplement/cancel_order.do"
     payload = {"symbol": symbol, "orderId": order_id}
-    return client.http_request("POST", path, payload=payload)
+    market_snapshot.invalidate("balances", "open_orders")
+    res = http_request("POST", CANCEL_ORDER_PATH, payload=payload)
+    if res.get("result") == "true" or res.get("result") is True or res.get("msg") == "Success":
+        order_registry.remove(order_id)
+    return res
 
 
-def cancel_list_of_orders(symbol, order_ids):
+def cancel_order_batch(symbol, order_ids):
     """
-    Cancel a List of orders used to not intrrupt the other orders
+    Cancel up to CANCEL_BATCH_SIZE orders in one request (v1 cancel_order.do).
+
+    Falls back to one cancel_one_order call per ID when batching is disabled,
+    the exchange rejects the batch endpoint for this pair (remembered in
+    order_routes, so later calls skip the batch attempt) or the batch call
+    cancels nothing (e.g. a signature rejection: v1 endpoints may need RSA, or
+    a timeout).
+    The batch route is only remembered once a batch has cancelled an order.
 
     Parameters:
     - symbol: Trading pair symbol (e.g., pair)
-    - order_ids : List of Order ids that you need to cancel
+    - order_ids: Order IDs (at most CANCEL_BATCH_SIZE)
 
+    Returns:
+    - dict: order_id -> {"ok": bool, "error": str or None}
     """
-    if not order_ids:
-        return
-    cancelled = 0
-    failed = 0
-    for order_id in order_ids[:]:  # Use slice to avoid modification during iteration
+    route = order_routes.get(symbol, "cancel_orders")
+    if CANCEL_BATCH_ENABLED and len(order_ids) > 1 and (route is None or route.get("batch_size", 1) > 1):
+        market_snapshot.invalidate("balances", "open_orders")
+        try:
+            res = http_request("POST", CANCEL_BATCH_PATH, payload={"symbol": symbol, "order_id": ",".join(order_ids)})
+            unsupported = is_nonsupport_error(res.get("msg") or res.get("error_code"))
+        except ServerError as e:
+            res = None
+            unsupported = e.status_code == 404
+            batch_error = e
+        except Exception as e:
+            # Timeouts and connection errors (CommonError): the per-order cancels below still run
+            res = None
+            unsupported = False
+            batch_error = e
+        if res is not None and not unsupported:
+            results = parse_batch_cancel(order_ids, res)
+            if any(result["ok"] for result in results.values()):
+                # The endpoint works for this pair: only now is it worth remembering
+                if route is None:
+                    order_routes.remember(symbol, "cancel_orders", {"path": CANCEL_BATCH_PATH, "batch_size": CANCEL_BATCH_SIZE})
+                for order_id, result in results.items():
+                    if result["ok"]:
+                        order_registry.remove(order_id)
+                return results
+            batch_error = next(iter(results.values()))["error"]
+        if unsupported:
+            log("[CANCEL] Batch cancel not supported for %s, cancelling one order per request", symbol, level=logging.WARNING)
+            request_metrics.record_retry(CANCEL_ORDER_PATH, "batch_unsupported")
+            order_routes.remember(symbol, "cancel_orders", {"path": CANCEL_ORDER_PATH, "batch_size": 1})
+        else:
+            # Nothing cancelled (auth/signature error, server error, ...): not remembered, retried per order
+            log(
+                "[CANCEL] Batch cancel failed for %s (%s), cancelling one order per request",
+                symbol, batch_error, level=logging.WARNING,
+            )
+            request_metrics.record_retry(CANCEL_ORDER_PATH, "batch_failed")
+
+    results = {}
+    for order_id in order_ids:
         try:
             res = cancel_one_order(symbol, order_id)
-            if res.get("result") == "true" or res.get("msg") == "Success":
-                cancelled += 1
-            else:
-                failed += 1
+            ok = res.get("result") == "true" or res.get("result") is True or res.get("msg") == "Success"
+            results[order_id] = {"ok": ok, "error": None if ok else str(res.get("msg") or res.get("error_code"))}
         except Exception as e:
-            failed += 1
-        order_ids.remove(order_id)
-    if cancelled > 0 or failed > 0:
-        print(f"[CANCEL] Cancelled {cancelled} orders, {failed} failed")
+            results[order_id] = {"ok": False, "error": str(e)}
+    return results
+
+
+def cancel_list_of_orders(symbol, order_ids, max_in_flight=None):
+    """
+    Cancel a List of orders used to not intrrupt the other orders
+
+    IDs are sent in batches of CANCEL_BATCH_SIZE, with the batches running in
+    parallel (at most max_in_flight requests at once).
+
+    Parameters:
+    - symbol: Trading pair symbol (e.g., pair)
+    - order_ids : List of Order ids that you need to cancel (emptied once processed)
+    - max_in_flight: Maximum concurrent cancel requests (default CANCEL_MAX_IN_FLIGHT)
+
+    Returns:
+    - CancelReport: Per-order results (cancelled IDs, failed IDs with their errors)
+    """
+    # Pairs known to reject the batch endpoint fan out one ID per request instead
+    route = order_routes.get(symbol, "cancel_orders")
+    batch_size = (route or {}).get("batch_size", CANCEL_BATCH_SIZE) if CANCEL_BATCH_ENABLED else 1
+    report = cancel_orders(
+        symbol,
+        order_ids,
+        cancel_order_batch,
+        batch_size=batch_size,
+        max_in_flight=max_in_flight or CANCEL_MAX_IN_FLIGHT,
+    )
+    # Every ID has been processed: empty the caller's list in one go
+    del order_ids[:]
+    if report.results:
+        log(
+            "[CANCEL] Cancelled %s orders, %s failed (%s requests, %.0f ms)",
+            len(report.cancelled), len(report.failed), report.batches, report.elapsed_seconds * 1000,
+        )
+    return report
 
 
 def get_current_price(symbol):
@@ -340,35 +818,51 @@ def get_current_price(symbol):
     Returns:
     - float: Current price of the trading pair
     """
+    cached = market_snapshot.lookup(("price", symbol))
+    if cached is not None:
+        return cached
     try:
-        path = "v2/supplement/ticker/price.do"
         payload = {"symbol": symbol}
-        res = client.http_request("GET", path, payload=payload)
-        
-        if not res:
-            raise Exception("Empty response from API")
-        
-        # Check if result indicates success
-        result = res.get("result")
-        if result == "true" or result is True:
-            data = res.get("data", [])
-            if isinstance(data, list) and len(data) > 0:
-                price_data = data[0]
-                if isinstance(price_data, dict):
-                    current_price = price_data.get("price")
-                else:
-                    current_price = price_data
-                return float(current_price)
-            else:
-                raise Exception("No price data in response")
-        else:
-            error_msg = res.get("error", res.get("msg", "Unknown error"))
-            raise Exception(f"API error: {error_msg}")
+        res = http_request("GET", PRICE_PATH, payload=payload)
+        current_price = parse_current_price(res)
+        market_snapshot.store(("price", symbol), current_price)
+        return current_price
     except Exception as e:
-        print(f"[ERROR] Failed to get current price for {symbol}: {e}")
+        log(f"[ERROR] Failed to get current price for {symbol}: {e}")
         raise
 
 
+def parse_current_price(res):
+    """
+    Extract the last price from a ticker/price.do response.
+
+    Parameters:
+    - res: Response dict from the API
+
+    Returns:
+    - float: Current price (raises on an empty or failed response)
+    """
+    if not res:
+        raise Exception("Empty response from API")
+    
+    # Check if result indicates success
+    result = res.get("result")
+    if result == "true" or result is True:
+        data = res.get("data", [])
+        if isinstance(data, list) and len(data) > 0:
+            price_data = data[0]
+            if isinstance(price_data, dict):
+                current_price = price_data.get("price")
+            else:
+                current_price = price_data
+            return float(current_price)
+        else:
+            raise Exception("No price data in response")
+    else:
+        error_msg = res.get("error", res.get("msg", "Unknown error"))
+        raise Exception(f"API error: {error_msg}")
+
+
 def calculate_order_size(
     order_type, volatility, max_order_size, min_order_size, risk_percentage=None
 ):
@@ -437,24 +931,21 @@ def get_dynamic_sleep_time(volatility, base_sleep_time=None, max_sleep_time=None
 
     Parameters:
     - volatility: Current market volatility
-    - base_sleep_time: Base sleep time in seconds (default: 8, or from env)
-    - max_sleep_time: Maximum sleep time in seconds (default: 20, or from env)
-    - min_sleep_time: Minimum sleep time in seconds (default: 1, or from env)
+    - base_sleep_time: Base sleep time in seconds (default: BASE_SLEEP_TIME from the current config, 8)
+    - max_sleep_time: Maximum sleep time in seconds (default: MAX_SLEEP_TIME from the current config, 20)
+    - min_sleep_time: Minimum sleep time in seconds (default: MIN_SLEEP_TIME from the current config, 1)
 
     Returns:
     - int: Dynamic sleep time in seconds
     """
-    import os
-    from dotenv import load_dotenv
-    load_dotenv()
-    
-    # Get from environment variables with defaults
+    # Defaults come from the in-memory config (kept current by config_watcher), not from disk
+    config = config_watcher.config
     if base_sleep_time is None:
-        base_sleep_time = float(os.getenv("BASE_SLEEP_TIME", "8"))
+        base_sleep_time = config.base_sleep_time
     if max_sleep_time is None:
-        max_sleep_time = float(os.getenv("MAX_SLEEP_TIME", "20"))
+        max_sleep_time = config.max_sleep_time
     if min_sleep_time is None:
-        min_sleep_time = float(os.getenv("MIN_SLEEP_TIME", "1"))
+        min_sleep_time = config.min_sleep_time
 
     # Adjust sleep time based on volatility
     if volatility > 0.05:  # High volatility threshold
@@ -497,54 +988,13 @@ def fetch_historical_prices(period):
     Returns:
     - list: Historical price data (closing prices)
     """
-    path = "v2/kline.do"
-    end_date = datetime.now(timezone.utc)
-    start_date = end_date - timedelta(minutes=period)
-
-    # Convert dates to timestamps in seconds
-    end_timestamp = int(end_date.timestamp())
-    start_timestamp = int(start_date.timestamp())
-
-    payload = {
-        "symbol": pair,
-        "type": "minute1",
-        "size": period,
-        "time": start_timestamp,
-    }
-    
+    cached = market_snapshot.lookup(("klines", period))
+    if cached is not None:
+        return cached
     try:
-        response = client.http_request("get", path, payload=payload)
-        
-        # Check if request was successful
-        if response.get("result") != "true" and response.get("result") is not True:
-            raise Exception(f"Failed to fetch historical prices: {response.get('error', response.get('msg', 'Unknown error'))}")
-        
-        # Extract kline data - format is typically: [timestamp, open, high, low, close, volume, ...]
-        data = response.get("data", [])
-        
-        if not data or len(data) == 0:
-            raise Exception("No historical price data returned")
-        
-        # Extract closing prices (index 4 in kline data)
-        # Handle both list of lists and list of dicts formats
-        prices = []
-        for item in data:
-            if isinstance(item, list) and len(item) > 4:
-                # Format: [timestamp, open, high, low, close, volume, ...]
-                prices.append(float(item[4]))
-            elif isinstance(item, dict):
-                # Format: {"close": price, ...}
-                prices.append(float(item.get("close", item.get("c", 0))))
-            else:
-                # Try to convert directly if it's a number
-                try:
-                    prices.append(float(item))
-                except (ValueError, TypeError):
-                    continue
-        
-        if len(prices) == 0:
-            raise Exception("No valid price data found in response")
-        
+        response = http_request("get", KLINE_PATH, payload=historical_prices_payload(period))
+        prices = parse_kline_closes(response)
+        market_snapshot.store(("klines", period), prices)
         return prices
         
     except Exception as e:
@@ -558,6 +1008,117 @@ def fetch_historical_prices(period):
             return [1.0] * max(period, 10)
 
 
+def historical_prices_payload(period):
+    """
+    Build the kline.do payload for the last `period` one-minute candles.
+
+    Parameters:
+    - period: Number of minutes of historical data to fetch
+
+    Returns:
+    - dict: Request payload
+    """
+    # Start of the window as a unix timestamp in seconds
+    start_timestamp = int(time.time()) - period * 60
+
+    return {
+        "symbol": pair,
+        "type": "minute1",
+        "size": period,
+        "time": start_timestamp,
+    }
+
+
+def parse_kline_closes(response):
+    """
+    Extract closing prices from a kline.do response.
+
+    Parameters:
+    - response: Response dict from the API
+
+    Returns:
+    - list: Closing prices (raises on a failed or empty response)
+    """
+    # Check if request was successful
+    if response.get("result") != "true" and response.get("result") is not True:
+        raise Exception(f"Failed to fetch historical prices: {response.get('error', response.get('msg', 'Unknown error'))}")
+    
+    # Extract kline data - format is typically: [timestamp, open, high, low, close, volume, ...]
+    data = response.get("data", [])
+    
+    if not data or len(data) == 0:
+        raise Exception("No historical price data returned")
+    
+    # Extract closing prices (index 4 in kline data)
+    # Handle both list of lists and list of dicts formats
+    prices = []
+    for item in data:
+        if isinstance(item, list) and len(item) > 4:
+            # Format: [timestamp, open, high, low, close, volume, ...]
+            prices.append(float(item[4]))
+        elif isinstance(item, dict):
+            # Format: {"close": price, ...}
+            prices.append(float(item.get("close", item.get("c", 0))))
+        else:
+            # Try to convert directly if it's a number
+            try:
+                prices.append(float(item))
+            except (ValueError, TypeError):
+                continue
+    
+    if len(prices) == 0:
+        raise Exception("No valid price data found in response")
+    
+    return prices
+
+
+def parse_klines(response):
+    """
+    Extract (open timestamp, close) pairs from a kline.do response.
+
+    Parameters:
+    - response: Response dict from the API
+
+    Returns:
+    - list: (timestamp in seconds, close) tuples, oldest first (raises on a failed response)
+    """
+    if response.get("result") != "true" and response.get("result") is not True:
+        raise Exception(f"Failed to fetch historical prices: {response.get('error', response.get('msg', 'Unknown error'))}")
+
+    candles = []
+    for item in response.get("data", []) or []:
+        if isinstance(item, list) and len(item) > 4:
+            # Format: [timestamp, open, high, low, close, volume, ...]
+            candles.append((int(float(item[0])), float(item[4])))
+        elif isinstance(item, dict):
+            ts = item.get("t", item.get("timestamp", item.get("time")))
+            if ts is not None:
+                candles.append((int(float(ts)), float(item.get("close", item.get("c", 0)))))
+    # Some responses use milliseconds
+    candles = [(ts // 1000 if ts > 10**11 else ts, close) for ts, close in candles]
+    candles.sort(key=lambda candle: candle[0])
+    return candles
+
+
+def refresh_kline_buffer():
+    """
+    Fetch the candles kline_buffer is missing (nothing if no new minute has started).
+
+    Returns:
+    - bool: True if the buffer is up to date
+    """
+    payload = kline_buffer.next_request(pair, time.time())
+    if payload is None:
+        return True
+    try:
+        response = http_request("get", KLINE_PATH, payload=payload)
+        kline_buffer.ingest(parse_klines(response))
+        return True
+    except Exception as e:
+        log(f"[WARNING] Could not update kline buffer: {e}")
+        return False
+
+
 def calculate_price_changes(price_data):
     """
     Calculate price changes from historical price data.
@@ -609,6 +1170,19 @@ def get_dynamic_volatilit(period):
     - float: volatility
     """
     try:
+        # Rolling volatility from the kline ring buffer (no full download)
+        if kline_buffer is not None and refresh_kline_buffer():
+            while True:
+                current_volatility = kline_buffer.volatility(period)
+                if current_volatility is None:
+                    break  # Not enough candles held, use the full download below
+                if current_volatility > 0:
+                    return max(current_volatility, 0.001)  # Ensure minimum volatility
+                if period >= 300:  # Max 5 hours
+                    return 0.01  # Default volatility
+                # Too low: widen the window (still no request)
+                period += 60
+
         price_data = fetch_historical_prices(period)  # In minutes
         
         if not price_data or len(price_data) < 2:
@@ -634,7 +1208,7 @@ def get_dynamic_volatilit(period):
         
     except Exception as e:
         # Return default volatility on error
-        print(f"Error calculating volatility: {e}")
+        log(f"Error calculating volatility: {e}")
         return 0.01
 
 
@@ -744,22 +1318,37 @@ def get_price_step_percentage(order_num, base_price_step_percentage):
         return base_price_step_percentage * 4
 
 
-def fetch_account_balance():
+def fetch_account_balance(force=False):
     """
     Fetch account balance for specified assets.
 
+    Served from balance_ledger while it is in sync; the exchange is only queried
+    when the ledger is due for reconciliation (or force is set).
+
+    Parameters:
+    - force: Always query the exchange (and reconcile the ledger)
+
     Returns:
     - dict: Account balances for targeted assets, with default 0.0 values on error
     """
+    if BALANCE_LEDGER_ENABLED and not force and not balance_ledger.needs_reconcile():
+        return balance_ledger.balances()
+    cached = None if force else market_snapshot.lookup(("balances",))
+    if cached is not None:
+        # Callers may mutate the result, so hand out a copy
+        return {asset: dict(values) for asset, values in cached.items()}
     try:
         # v1 endpoints may require RSA signature, v2 endpoints work with HMACSHA256
         # Since we're using HMACSHA256, prioritize v2 endpoints
-        paths_to_try = ["v2/supplement/user_info_account.do", "v1/user_info.do"]
+        paths_to_try = [BALANCE_PATH, "v1/user_info.do"]
         
+        checkpoint = balance_ledger.checkpoint()
         res = None
         for path in paths_to_try:
+            if path != paths_to_try[0]:
+                request_metrics.record_retry(path, "endpoint_fallback")
             try:
-                res = client.http_request("POST", path)
+                res = http_request("POST", path)
                 if res:
                     break
             except Exception as e:
@@ -767,58 +1356,16 @@ def fetch_account_balance():
                     raise
                 continue
         
-        if not res:
-            raise Exception("Empty response from API")
-        
-        # Check if result indicates success
-        result = res.get("result")
-        if result == "true" or result is True:
-            # v1 endpoint returns: {"result": "true", "info": {"free": {...}, "freeze": {...}}}
-            # v2 endpoint returns: {"result": "true", "data": {"balances": [...]}}
-            
-            if "info" in res:
-                # v1 format
-                info = res.get("info", {})
-                free = info.get("free", {})
-                freeze = info.get("freeze", {})
-                
-                targeted_assets = {
-                    "usdt": {
-                        "free": float(free.get("usdt", 0)),
-                        "locked": float(freeze.get("usdt", 0)),
-                    },
-                    token_symbol: {
-                        "free": float(free.get(token_symbol, 0)),
-                        "locked": float(freeze.get(token_symbol, 0)),
-                    }
-                }
-            else:
-                # v2 format
-                data = res.get("data", {})
-                balances = data.get("balances", [])
-                
-                targeted_assets = {"usdt": None, token_symbol: None}
-                for balance in balances:
-                    if isinstance(balance, dict) and balance.get("asset") in targeted_assets:
-                        targeted_assets[balance["asset"]] = {
-                            "free": float(balance.get("free", 0)),
-                            "locked": float(balance.get("locked", 0)),
-                        }
-                    if all(value is not None for value in targeted_assets.values()):
-                        break
-                
-                # Ensure we have values for both assets (default to 0 if missing)
-                for asset in ["usdt", token_symbol]:
-                    if targeted_assets[asset] is None:
-                        targeted_assets[asset] = {"free": 0.0, "locked": 0.0}
-            
-            return targeted_assets
-        else:
-            error_msg = res.get("msg", res.get("error", "Unknown error"))
-            raise Exception(f"API error: {error_msg}")
+        targeted_assets = parse_account_balance(res)
+        market_snapshot.store(("balances",), targeted_assets)
+        balance_ledger.reconcile(targeted_assets, since=checkpoint)
+        return {asset: dict(values) for asset, values in targeted_assets.items()}
     except Exception as e:
-        print(f"[ERROR] Failed to fetch account balance: {e}")
-        print("[WARNING] Using default balances (0.0) - bot may not function correctly")
+        log(f"[ERROR] Failed to fetch account balance: {e}")
+        if BALANCE_LEDGER_ENABLED and balance_ledger.seeded:
+            log("[WARNING] Using locally tracked balances until the next successful query")
+            return balance_ledger.balances()
+        log("[WARNING] Using default balances (0.0) - bot may not function correctly")
         # Return default balances to prevent crashes
         return {
             "usdt": {"free": 0.0, "locked": 0.0},
@@ -826,12 +1373,75 @@ def fetch_account_balance():
         }
 
 
-def get_current_orders(symbol=None):
+def parse_account_balance(res):
     """
-    Get the current pending orders
+    Extract the USDT and token balances from a user_info response (v1 or v2 format).
+
+    Parameters:
+    - res: Response dict from the API
+
+    Returns:
+    - dict: {"usdt": {"free", "locked"}, token_symbol: {"free", "locked"}} (raises on a failed response)
+    """
+    if not res:
+        raise Exception("Empty response from API")
+
+    # Check if result indicates success
+    result = res.get("result")
+    if result == "true" or result is True:
+        # v1 endpoint returns: {"result": "true", "info": {"free": {...}, "freeze": {...}}}
+        # v2 endpoint returns: {"result": "true", "data": {"balances": [...]}}
+
+        if "info" in res:
+            # v1 format
+            info = res.get("info", {})
+            free = info.get("free", {})
+            freeze = info.get("freeze", {})
+
+            targeted_assets = {
+                "usdt": {
+                    "free": float(free.get("usdt", 0)),
+                    "locked": float(freeze.get("usdt", 0)),
+                },
+                token_symbol: {
+                    "free": float(free.get(token_symbol, 0)),
+                    "locked": float(freeze.get(token_symbol, 0)),
+                }
+            }
+        else:
+            # v2 format
+            data = res.get("data", {})
+            balances = data.get("balances", [])
+
+            targeted_assets = {"usdt": None, token_symbol: None}
+            for balance in balances:
+                if isinstance(balance, dict) and balance.get("asset") in targeted_assets:
+                    targeted_assets[balance["asset"]] = {
+                        "free": float(balance.get("free", 0)),
+                        "locked": float(balance.get("locked", 0)),
+                    }
+                if all(value is not None for value in targeted_assets.values()):
+                    break
+
+            # Ensure we have values for both assets (default to 0 if missing)
+            for asset in ["usdt", token_symbol]:
+                if targeted_assets[asset] is None:
+                    targeted_assets[asset] = {"free": 0.0, "locked": 0.0}
+
+        return targeted_assets
+    else:
+        error_msg = res.get("msg", res.get("error", "Unknown error"))
+        raise Exception(f"API error: {error_msg}")
+
+
+def get_current_orders(symbol=None, current_page=1, page_length=OPEN_ORDERS_PAGE_LENGTH):
+    """
+    Get the current pending orders (one page)
 
     Parameters:
     - symbol: Trading pair symbol (optional, defaults to pair from utils.py)
+    - current_page: Page number, starting at 1 (see iter_open_order_pages for all pages)
+    - page_length: Orders per page
 
     Returns:
     - dict: Response from API with orders data, or empty dict on error
@@ -839,44 +1449,49 @@ def get_current_orders(symbol=None):
     if symbol is None:
         symbol = pair
     
+    snapshot_key = ("open_orders", symbol) if current_page == 1 else ("open_orders", symbol, current_page)
+    cached = market_snapshot.lookup(snapshot_key)
+    if cached is not None:
+        return cached
     try:
         # v1 endpoints may require RSA signature, v2 endpoints work with HMACSHA256
         # Since we're using HMACSHA256, use v2 endpoints only
-        paths_to_try = ["v2/supplement/orders_info_no_deal.do"]
+        path = OPEN_ORDERS_PATH
         
-        for path in paths_to_try:
-            payload = {"symbol": symbol, "current_page": "1", "page_length": "200"}
-            res = client.http_request("POST", path, payload=payload)
-            
-            # Check if successful
-            if res and (res.get("result") == "true" or res.get("result") is True):
-                return res
-            
-            # Check if we got an error about unsupported pair
-            if res:
-                error_msg = res.get("error", res.get("msg", "")).lower()
-                if "nonsupport" in error_msg or "not support" in error_msg or "unsupported" in error_msg:
-                    # Try uppercase version
-                    symbol_upper = symbol.upper()
-                    if symbol_upper != symbol:
-                        print(f"[INFO] Orders endpoint doesn't support '{symbol}', trying uppercase format: {symbol_upper}")
-                        payload = {"symbol": symbol_upper, "current_page": "1", "page_length": "200"}
-                        res = client.http_request("POST", path, payload=payload)
-                        if res and (res.get("result") == "true" or res.get("result") is True):
-                            return res
-                
-                # If it's not a format error, return the response
-                if path == paths_to_try[-1]:  # Last path tried
-                    return res
-            else:
-                # Empty response, try next path
-                if path != paths_to_try[-1]:
+        # Query with the symbol format that worked last time (if any)
+        route = order_routes.get(symbol, "open_orders")
+        query_symbol = route["symbol"] if route else symbol
+        payload = {"symbol": query_symbol, "current_page": str(current_page), "page_length": str(page_length)}
+        res = http_request("POST", path, payload=payload)
+        
+        # Check if successful
+        if res and (res.get("result") == "true" or res.get("result") is True):
+            order_routes.remember(symbol, "open_orders", {"path": path, "symbol": query_symbol})
+            market_snapshot.store(snapshot_key, res)
+            return res
+        
+        # Check if we got an error about unsupported pair
+        if res and is_nonsupport_error(res.get("error", res.get("msg", ""))):
+            if route is not None:
+                order_routes.forget(symbol, "open_orders")
+            # Try the other symbol format (original / uppercase)
+            for alt_symbol in (symbol, symbol.upper()):
+                if alt_symbol == query_symbol:
                     continue
-                return res
+                log(f"[INFO] Orders endpoint doesn't support '{query_symbol}', trying symbol format: {alt_symbol}")
+                payload = {"symbol": alt_symbol, "current_page": str(current_page), "page_length": str(page_length)}
+                request_metrics.record_retry(path, "route_discovery")
+                res = http_request("POST", path, payload=payload)
+                if res and (res.get("result") == "true" or res.get("result") is True):
+                    order_routes.remember(symbol, "open_orders", {"path": path, "symbol": alt_symbol})
+                    market_snapshot.store(snapshot_key, res)
+                    return res
+                break
         
-        return res if 'res' in locals() else {}
+        # If it's not a format error (or nothing worked), return the response
+        return res
     except Exception as e:
-        print(f"[ERROR] Failed to fetch current orders for {symbol or pair}: {e}")
+        log(f"[ERROR] Failed to fetch current orders for {symbol or pair}: {e}")
         return {}
 
 
@@ -922,12 +1537,262 @@ def get_num_of_orders(symbol=None):
                 return 0
             else:
                 # Other errors, print for debugging
-                print(f"API error getting orders: {error_msg}")
+                log(f"API error getting orders: {error_msg}")
             return 0
             
     except KeyError as e:
-        print(f"KeyError in get_num_of_orders: {e}. Response: {response if 'response' in locals() else 'N/A'}")
+        log(f"KeyError in get_num_of_orders: {e}. Response: {response if 'response' in locals() else 'N/A'}")
         return 0
     except Exception as e:
-        print(f"Error in get_num_of_orders: {e}")
+        log(f"Error in get_num_of_orders: {e}")
         return 0
+
+
+def parse_open_orders(orders_response):
+    """
+    Normalize an orders_info_no_deal response into a list of open orders.
+
+    Parameters:
+    - orders_response: Response dict from get_current_orders
+
+    Returns:
+    - list: Dicts with order_id, side ("buy"/"sell"), price, orig_qty, executed_qty,
+      remaining_qty and status (empty list on a failed response)
+    """
+    if not orders_response or not (orders_response.get("result") == "true" or orders_response.get("result") is True):
+        return []
+    data = orders_response.get("data", {})
+    if isinstance(data, dict):
+        orders = data.get("orders", [])
+    elif isinstance(data, list):
+        orders = data
+    else:
+        orders = []
+
+    open_orders = []
+    for order in orders or []:
+        if not isinstance(order, dict):
+            continue
+        trade_type = str(order.get("tradeType", order.get("type", ""))).lower()
+        if "buy" in trade_type:
+            side = "buy"
+        elif "sell" in trade_type:
+            side = "sell"
+        else:
+            continue
+        orig_qty = float(order.get("origQty", order.get("amount", 0)) or 0)
+        executed_qty = float(order.get("executedQty", order.get("deal_amount", 0)) or 0)
+        open_orders.append({
+            "order_id": order.get("orderId") or order.get("order_id"),
+            "side": side,
+            "price": float(order.get("price", 0) or 0),
+            "orig_qty": orig_qty,
+            "executed_qty": executed_qty,
+            "remaining_qty": orig_qty - executed_qty if orig_qty >= executed_qty else 0.0,
+            "status": order.get("status", 0),
+        })
+    return open_orders
+
+
+def get_subscribe_key():
+    """
+    Create a WebSocket subscribe key (needed for the private orderUpdate feed).
+
+    Returns:
+    - str: Subscribe key (raises on failure)
+    """
+    res = http_request("POST", SUBSCRIBE_KEY_PATH)
+    if not res or not (res.get("result") == "true" or res.get("result") is True):
+        raise Exception(res.get("error", res.get("msg", "Unknown error")) if res else "Empty response")
+    data = res.get("data")
+    return data.get("key") if isinstance(data, dict) else data
+
+
+def refresh_subscribe_key(subscribe_key):
+    """
+    Extend a subscribe key's validity (keys expire after 60 minutes).
+
+    Parameters:
+    - subscribe_key: Key from get_subscribe_key
+    """
+    try:
+        http_request("POST", SUBSCRIBE_KEY_REFRESH_PATH, payload={"subscribeKey": subscribe_key})
+    except Exception as e:
+        log(f"[STREAM] Could not refresh subscribe key: {e}")
+
+
+def start_market_stream(symbol=None, with_order_updates=True):
+    """
+    Start the WebSocket consumer for a pair (once per process).
+
+    Parameters:
+    - symbol: Trading pair symbol (optional, defaults to pair from utils.py)
+    - with_order_updates: Also subscribe to our order updates (needs a subscribe key)
+
+    Returns:
+    - MarketStream: The running stream
+    """
+    global market_stream
+    if symbol is None:
+        symbol = pair
+    if market_stream is None:
+        market_stream = MarketStream(
+            url=MARKET_STREAM_URL,
+            symbol=symbol,
+            registry=order_registry,
+            subscribe_key_provider=get_subscribe_key if with_order_updates else None,
+            subscribe_key_refresher=refresh_subscribe_key,
+            stale_seconds=float(os.getenv("MARKET_STREAM_STALE_SECONDS", "10")),
+        )
+        atexit.register(market_stream.stop)
+    market_stream.start()
+    return market_stream
+
+
+def open_state_store():
+    """
+    Open the state checkpoint database (once per process).
+
+    Returns:
+    - StateStore: The store, or None when STATE_STORE_ENABLED is false
+    """
+    global state_store
+    if STATE_STORE_ENABLED and state_store is None:
+        state_store = StateStore(STATE_STORE_FILE)
+    return state_store
+
+
+def stream_book_ticker(symbol):
+    """
+    Best bid/ask from the WebSocket stream, if it is live for this symbol.
+
+    Parameters:
+    - symbol: Trading pair symbol
+
+    Returns:
+    - dict: bookTicker.do-shaped response, or None (use REST)
+    """
+    if market_stream is None or market_stream.symbol != symbol:
+        return None
+    return market_stream.book_ticker()
+
+
+def prefetch_market_snapshot(symbol=None, volatility_period=60):
+    """
+    Fetch the independent reads of one tick concurrently and seed market_snapshot.
+
+    Book ticker, last price, balances (when the ledger is due for reconciliation),
+    open orders and klines go out together on the pooled async client, so the
+    tick waits for the slowest call instead of the sum of all of them. Anything that fails is simply not cached and the
+    regular helpers fetch it (with their fallbacks) when they need it.
+
+    Parameters:
+    - symbol: Trading pair symbol (optional, defaults to pair from utils.py)
+    - volatility_period: Kline window in minutes used by get_dynamic_volatilit
+    """
+    if not ASYNC_CLIENT_ENABLED:
+        return
+    if symbol is None:
+        symbol = pair
+
+    # Query open orders with the symbol format the exchange accepted last time
+    orders_route = order_routes.get(symbol, "open_orders")
+    orders_symbol = orders_route["symbol"] if orders_route else symbol
+
+    # With the kline buffer only missing candles are requested (often none)
+    if kline_buffer is not None:
+        kline_payload = kline_buffer.next_request(pair, time.time())
+    else:
+        kline_payload = historical_prices_payload(volatility_period)
+
+    # A live WebSocket stream already has the best bid/ask
+    book = stream_book_ticker(symbol)
+
+    # Balances come from the ledger unless it is due for reconciliation
+    need_balances = not BALANCE_LEDGER_ENABLED or balance_ledger.needs_reconcile()
+    checkpoint = balance_ledger.checkpoint()
+
+    requests = [
+        ("get", PRICE_PATH, {"symbol": symbol}),
+        ("post", OPEN_ORDERS_PATH, {"symbol": orders_symbol, "current_page": "1", "page_length": str(OPEN_ORDERS_PAGE_LENGTH)}),
+    ]
+    if need_balances:
+        requests.append(("post", BALANCE_PATH, None))
+    if book is None:
+        requests.append(("get", BOOK_TICKER_PATH, {"symbol": symbol}))
+    if kline_payload is not None:
+        requests.append(("get", KLINE_PATH, kline_payload))
+    try:
+        results = async_client.gather(*requests)
+    except Exception as e:
+        log(f"[WARNING] Concurrent market data prefetch failed: {e}")
+        return
+    price, orders = results[:2]
+    extra = iter(results[2:])
+    balances = next(extra) if need_balances else None
+    if book is None:
+        book = next(extra)
+    klines = next(extra) if kline_payload is not None else None
+
+    def is_ok(res):
+        return isinstance(res, dict) and (res.get("result") == "true" or res.get("result") is True)
+
+    if is_ok(book):
+        market_snapshot.store(("book_ticker", symbol), book)
+    if is_ok(orders):
+        market_snapshot.store(("open_orders", symbol), orders)
+    if kline_buffer is not None and is_ok(klines):
+        try:
+            kline_buffer.ingest(parse_klines(klines))
+        except Exception:
+            pass
+    if is_ok(balances):
+        try:
+            parsed_balances = parse_account_balance(balances)
+            market_snapshot.store(("balances",), parsed_balances)
+            balance_ledger.reconcile(parsed_balances, since=checkpoint)
+        except Exception:
+            pass
+    for key, res, parse in (
+        (("price", symbol), price, parse_current_price),
+        (("klines", volatility_period), None if kline_buffer is not None else klines, parse_kline_closes),
+    ):
+        if is_ok(res):
+            try:
+                market_snapshot.store(key, parse(res))
+            except Exception:
+                pass
+
+
+def resolve_order_routes(symbol=None):
+    """
+    Resolve the working request routes (and load the pair's precision) once at startup.
+
+    The open-orders symbol format is probed with a read-only query. The
+    create_order route cannot be probed without placing an order, so it is taken
+    from the persisted cache (or discovered by the first placement and saved).
+
+    Parameters:
+    - symbol: Trading pair symbol (optional, defaults to pair from utils.py)
+    """
+    if symbol is None:
+        symbol = pair
+    get_current_orders(symbol)
+    orders_route = order_routes.get(symbol, "open_orders")
+    create_route = order_routes.get(symbol, "create_order")
+    if orders_route:
+        log(f"[ROUTES] Open orders: '{orders_route['path']}' with symbol '{orders_route['symbol']}'")
+    if create_route:
+        log(f"[ROUTES] Create order: '{create_route['path']}' with symbol '{create_route['symbol']}' (cached)")
+    else:
+        log("[ROUTES] Create order: not cached yet, will be discovered by the first placement")
+
+    # Load the pair precision table now instead of on the first placement
+    rules = pair_rules.rules(symbol)
+    if rules.price_decimals is not None:
+        log(
+            f"[PAIR] {symbol}: price {rules.price_decimals} decimals, quantity {rules.quantity_decimals} decimals, "
+            f"min quantity {rules.min_quantity}, min order value {rules.min_notional} USDT"
+        )
+    elif pair_rules.enabled:
+        log(f"[PAIR] {symbol}: no precision data, orders are sent unrounded (min order value {rules.min_notional} USDT)")
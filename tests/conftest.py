@@ -0,0 +1,5 @@
+import os
+
+# src.utils reads credentials at import time; the tests never send anything to LBank
+os.environ.setdefault("LBANK_API_KEY", "test")
+os.environ.setdefault("LBANK_API_SECRET", "test")
@@ -0,0 +1,152 @@
+import os
+
+import pytest
+
+from src import bot_config
+from src.bot_config import BotConfig, ConfigWatcher, parse_ladder_sizes
+
+WATCHED = (
+    "MAX_BUY_PRICE",
+    "REFERENCE_PRICE",
+    "ORDERS_PER_SIDE",
+    "LADDER_ORDER_SIZES",
+    "MAX_SPREAD_PCT",
+    "ENABLE_MARKET_STREAM",
+    "TIGHTENING_TRIGGER",
+)
+
+
+def test_defaults_from_an_empty_environment():
+    assert BotConfig.from_env({}) == BotConfig()
+
+
+def test_zero_or_empty_price_disables_it():
+    assert BotConfig.from_env({"MAX_BUY_PRICE": "0"}).max_buy_price is None
+    assert BotConfig.from_env({"MAX_BUY_PRICE": ""}).max_buy_price is None
+    assert BotConfig.from_env({"MAX_BUY_PRICE": "  "}).max_buy_price is None
+    assert BotConfig.from_env({"MAX_BUY_PRICE": "0.25"}).max_buy_price == 0.25
+    assert BotConfig.from_env({"REFERENCE_PRICE": "0"}).reference_price is None
+
+
+def test_invalid_number_names_the_variable():
+    with pytest.raises(ValueError, match="MAX_SPREAD_PCT"):
+        BotConfig.from_env({"MAX_SPREAD_PCT": "thirty"})
+    with pytest.raises(ValueError, match="ORDERS_PER_SIDE"):
+        BotConfig.from_env({"ORDERS_PER_SIDE": "2.5"})
+
+
+def test_ladder_sizes_must_match_orders_per_side():
+    config = BotConfig.from_env({"ORDERS_PER_SIDE": "3", "LADDER_ORDER_SIZES": "10, 20,30"})
+    assert config.ladder_order_sizes == (10.0, 20.0, 30.0)
+    assert config.strategy_kwargs()["ladder_order_sizes"] == [10.0, 20.0, 30.0]
+    assert BotConfig.from_env({"ORDERS_PER_SIDE": "4", "LADDER_ORDER_SIZES": "10,20,30"}).ladder_order_sizes is None
+    assert parse_ladder_sizes("10,x,30", 3) is None
+    assert parse_ladder_sizes("", 3) is None
+
+
+def test_strategy_kwargs_leave_out_loop_timing():
+    kwargs = BotConfig().strategy_kwargs()
+    assert "base_sleep_time" not in kwargs
+    assert kwargs["orders_per_side"] == 10
+
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch):
+    for name in WATCHED:
+        monkeypatch.delenv(name, raising=False)
+    path = tmp_path / ".env"
+    mtime = [1_700_000_000]
+
+    def write(text):
+        path.write_text(text)
+        # A fresh modification time even when two writes land within the clock's resolution
+        mtime[0] += 1
+        os.utime(path, (mtime[0], mtime[0]))
+
+    write("MAX_SPREAD_PCT=30\n")
+    return path, write
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    lines = []
+    monkeypatch.setattr(bot_config, "log", lambda message, *args, **kwargs: lines.append(message))
+    return lines
+
+
+def test_check_swaps_a_changed_config(env_file, logged):
+    path, write = env_file
+    seen = []
+    watcher = ConfigWatcher(str(path), on_change=seen.append)
+    assert watcher.check() is None
+    old = watcher.config
+
+    write("MAX_SPREAD_PCT=25\nMAX_BUY_PRICE=0.3\n")
+    changes = watcher.check()
+    assert changes == {"max_spread_pct": (30.0, 25.0), "max_buy_price": (None, 0.3)}
+    assert seen == [changes]
+    assert watcher.version == 2 and watcher.reloads == 1
+    assert watcher.config.max_spread_pct == 25.0
+    # The old object was replaced, not mutated
+    assert old.max_spread_pct == 30.0
+
+
+def test_version_moves_only_on_a_real_change(env_file, logged):
+    path, write = env_file
+    watcher = ConfigWatcher(str(path))
+    # Rewritten with equivalent values: the file changed, the settings did not
+    write("# comment\nMAX_SPREAD_PCT=30.0\n")
+    assert watcher.check() is None
+    assert watcher.version == 1
+    write("MAX_SPREAD_PCT=31\n")
+    assert watcher.check() is not None
+    assert watcher.version == 2
+    assert watcher.check() is None
+    assert watcher.version == 2
+
+
+def test_invalid_file_keeps_the_previous_config(env_file, logged):
+    path, write = env_file
+    watcher = ConfigWatcher(str(path))
+    before = watcher.config
+    write("MAX_SPREAD_PCT=thirty\n")
+    assert watcher.check() is None
+    assert watcher.config is before
+    assert watcher.version == 1
+    assert any("could not be loaded" in line for line in logged)
+    # Fixed later: picked up on the next check
+    write("MAX_SPREAD_PCT=28\n")
+    assert watcher.check() == {"max_spread_pct": (30.0, 28.0)}
+
+
+def test_ladder_size_mismatch_after_reload_falls_back(env_file, logged):
+    path, write = env_file
+    write("ORDERS_PER_SIDE=2\nLADDER_ORDER_SIZES=10,20\n")
+    watcher = ConfigWatcher(str(path))
+    assert watcher.config.ladder_order_sizes == (10.0, 20.0)
+    write("ORDERS_PER_SIDE=3\nLADDER_ORDER_SIZES=10,20\n")
+    changes = watcher.check()
+    assert changes["ladder_order_sizes"] == ((10.0, 20.0), None)
+    assert watcher.config.ladder_order_sizes is None
+
+
+def test_restart_required_change_is_reported_and_still_swapped(env_file, logged):
+    path, write = env_file
+    watcher = ConfigWatcher(str(path))
+    assert watcher.config.enable_market_stream is True
+    write("MAX_SPREAD_PCT=30\nENABLE_MARKET_STREAM=false\nTIGHTENING_TRIGGER=4\n")
+    changes = watcher.check()
+    assert set(changes) == {"enable_market_stream", "tightening_trigger"}
+    assert watcher.config.enable_market_stream is False
+    assert watcher.version == 2
+    assert "[CONFIG] enable_market_stream: True -> False (takes effect after a restart)" in logged
+    assert "[CONFIG] tightening_trigger: 2 -> 4" in logged
+
+
+def test_file_values_win_over_the_environment(env_file, logged, monkeypatch):
+    path, write = env_file
+    monkeypatch.setenv("MAX_SPREAD_PCT", "10")
+    monkeypatch.setenv("TIGHTENING_TRIGGER", "5")
+    config = bot_config.load_config(str(path))
+    assert config.max_spread_pct == 30.0
+    assert config.tightening_trigger == 5
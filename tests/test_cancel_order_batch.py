@@ -0,0 +1,75 @@
+import pytest
+from lbank.error import CommonError
+
+from src import utils
+from src.route_cache import RouteCache
+
+
+@pytest.fixture
+def exchange(monkeypatch, tmp_path):
+    """
+    Stands in for http_request: records every call and answers from `responses`
+    (path -> callable(payload) returning a response or raising).
+    """
+    calls = []
+    responses = {}
+
+    def http_request(method, path, payload=None, priority=None):
+        calls.append((path, dict(payload or {})))
+        return responses[path](payload)
+
+    monkeypatch.setattr(utils, "http_request", http_request)
+    monkeypatch.setattr(utils, "order_routes", RouteCache(str(tmp_path / "order_routes.json")))
+    monkeypatch.setattr(utils, "CANCEL_BATCH_ENABLED", True)
+    return calls, responses
+
+
+def cancelled(payload):
+    return {"result": "true", "data": {"orderId": payload["orderId"]}}
+
+
+def test_batch_timeout_falls_back_to_one_cancel_per_order(exchange):
+    calls, responses = exchange
+
+    def timeout(payload):
+        raise CommonError("request timed out")
+
+    responses[utils.CANCEL_BATCH_PATH] = timeout
+    responses[utils.CANCEL_ORDER_PATH] = cancelled
+    results = utils.cancel_order_batch("acces_usdt", ["a", "b", "c"])
+    assert results == {order_id: {"ok": True, "error": None} for order_id in ("a", "b", "c")}
+    assert [path for path, _ in calls] == [utils.CANCEL_BATCH_PATH] + [utils.CANCEL_ORDER_PATH] * 3
+    assert [payload["orderId"] for path, payload in calls[1:]] == ["a", "b", "c"]
+    # A timeout says nothing about the endpoint: no route is remembered either way
+    assert utils.order_routes.get("acces_usdt", "cancel_orders") is None
+
+
+def test_batch_that_cancels_nothing_falls_back(exchange):
+    calls, responses = exchange
+    responses[utils.CANCEL_BATCH_PATH] = lambda payload: {"result": "false", "error_code": 10004, "msg": "signature failed"}
+    responses[utils.CANCEL_ORDER_PATH] = cancelled
+    results = utils.cancel_order_batch("acces_usdt", ["a", "b"])
+    assert all(result["ok"] for result in results.values())
+    assert len(calls) == 3
+    assert utils.order_routes.get("acces_usdt", "cancel_orders") is None
+
+
+def test_working_batch_is_remembered(exchange):
+    calls, responses = exchange
+    responses[utils.CANCEL_BATCH_PATH] = lambda payload: {"result": "true", "success": payload["order_id"], "error": ""}
+    results = utils.cancel_order_batch("acces_usdt", ["a", "b"])
+    assert all(result["ok"] for result in results.values())
+    assert len(calls) == 1
+    assert utils.order_routes.get("acces_usdt", "cancel_orders")["path"] == utils.CANCEL_BATCH_PATH
+
+
+def test_unsupported_batch_remembers_the_per_order_route(exchange):
+    calls, responses = exchange
+    responses[utils.CANCEL_BATCH_PATH] = lambda payload: {"result": "false", "msg": "currency pair nonsupport"}
+    responses[utils.CANCEL_ORDER_PATH] = cancelled
+    utils.cancel_order_batch("acces_usdt", ["a", "b"])
+    assert utils.order_routes.get("acces_usdt", "cancel_orders") == {"path": utils.CANCEL_ORDER_PATH, "batch_size": 1}
+    # Later calls skip the batch attempt
+    calls.clear()
+    utils.cancel_order_batch("acces_usdt", ["c", "d"])
+    assert [path for path, _ in calls] == [utils.CANCEL_ORDER_PATH] * 2
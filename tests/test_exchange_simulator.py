@@ -0,0 +1,240 @@
+import pytest
+import requests
+
+from src.exchange_simulator import (
+    ERR_CREATE_FAILED,
+    ERR_INSUFFICIENT_BALANCE,
+    ERR_INVALID_PAIR,
+    ERR_INVALID_PARAMETER,
+    ERR_ORDER_CANCELLED,
+    ERR_ORDER_FILLED,
+    STATUS_CANCELLED,
+    STATUS_FILLED,
+    STATUS_OPEN,
+    STATUS_PARTIAL,
+    STATUS_PARTIAL_CANCELLED,
+    OrderBook,
+    PricePath,
+    SimClock,
+    SimOrder,
+    SimulatedExchange,
+    SimulatorError,
+    SimulatorServer,
+)
+
+SYMBOL = "acces_usdt"
+
+
+@pytest.fixture
+def exchange():
+    # Frozen clock, no taker flow: background quote 0.1998 / 0.2002, only our own orders trade
+    return SimulatedExchange(
+        SYMBOL,
+        balances={"usdt": 1000, "acces": 10000},
+        path=PricePath([(0, 0.2)]),
+        clock=SimClock(speed=0),
+        taker_rate=0.0,
+        history_minutes=5,
+    )
+
+
+def balance(exchange, asset):
+    free, locked = exchange.balances[asset]
+    return pytest.approx(free, abs=1e-9), pytest.approx(locked, abs=1e-9)
+
+
+def test_order_book_matches_best_price_then_arrival():
+    book = OrderBook()
+    orders = [
+        SimOrder("a", "buy", "buy", 0.199, 100, 0.0, 1),
+        SimOrder("b", "buy", "buy", 0.1995, 50, 0.0, 2),
+        SimOrder("c", "buy", "buy", 0.1995, 50, 0.0, 3),
+    ]
+    for order in orders:
+        book.add(order)
+    fills = book.match("sell", 80, 0.199)
+    assert [(o.order_id, qty, price) for o, qty, price in fills] == [("b", 50, 0.1995), ("c", 30, 0.1995)]
+    assert book.best("buy") == 0.1995
+    assert book.levels("buy", 5) == [(0.1995, 20), (0.199, 100)]
+    # The limit stops the sweep
+    assert book.match("sell", 1000, 0.1992) == [(orders[2], 20, 0.1995)]
+    assert book.best("buy") == 0.199
+
+
+def test_taker_fills_own_orders_with_price_time_priority(exchange):
+    a = exchange.create_order(SYMBOL, "buy_maker", "0.199", "100")
+    b = exchange.create_order(SYMBOL, "buy_maker", "0.1995", "50")
+    c = exchange.create_order(SYMBOL, "buy_maker", "0.1995", "50")
+    sell = exchange.create_order(SYMBOL, "sell", "0.199", "80")
+
+    assert [(f["order_id"], f["qty"], f["price"]) for f in exchange.fills if f["order_id"] != sell] == [
+        (b, 50, 0.1995),
+        (c, 30, 0.1995),
+    ]
+    assert exchange.orders[b].status == STATUS_FILLED
+    assert exchange.orders[c].status == STATUS_PARTIAL
+    assert exchange.orders[c].filled == pytest.approx(30)
+    assert exchange.orders[a].status == STATUS_OPEN
+    assert exchange.orders[sell].status == STATUS_FILLED
+    assert [o.order_id for o in exchange.open_orders()] == [a, c]
+    # 80 tokens changed hands at 0.1995 inside our own account; c's 20 and a's 100 stay locked
+    assert balance(exchange, "usdt") == (1000 - 100 * 0.199 - 20 * 0.1995, 100 * 0.199 + 20 * 0.1995)
+    assert balance(exchange, "acces") == (10000, 0.0)
+
+
+def test_taker_remainder_fills_at_the_background_quote(exchange):
+    order_id = exchange.create_order(SYMBOL, "buy", "0.201", "10")
+    order = exchange.orders[order_id]
+    assert order.status == STATUS_FILLED
+    # Price improvement: filled at the ask, the difference is refunded
+    assert exchange.fills[-1]["price"] == pytest.approx(0.2002)
+    assert exchange.fills[-1]["liquidity"] == "taker"
+    assert balance(exchange, "usdt") == (1000 - 10 * 0.2002, 0.0)
+    assert balance(exchange, "acces") == (10010, 0.0)
+
+
+def test_market_trading_through_a_stale_quote_fills_it(exchange):
+    order_id = exchange.create_order(SYMBOL, "sell_maker", "0.2001", "10")
+    exchange.path = PricePath([(0, 0.21)])
+    exchange.clock.advance(1)
+    exchange.advance()
+    assert exchange.orders[order_id].status == STATUS_FILLED
+    assert exchange.fills[-1]["liquidity"] == "maker"
+
+
+def test_post_only_order_that_would_cross_is_rejected(exchange):
+    with pytest.raises(SimulatorError) as e:
+        exchange.create_order(SYMBOL, "buy_maker", "0.2002", "10")
+    assert e.value.code == ERR_CREATE_FAILED
+    assert e.value.message == "maker order would take liquidity"
+    # Crossing our own resting ask counts too
+    exchange.create_order(SYMBOL, "sell_maker", "0.2001", "10")
+    with pytest.raises(SimulatorError) as e:
+        exchange.create_order(SYMBOL, "buy_maker", "0.2001", "10")
+    assert e.value.code == ERR_CREATE_FAILED
+    assert exchange.stats["rejected"] == 2
+    # Nothing was locked for the rejected orders
+    assert balance(exchange, "usdt") == (1000, 0.0)
+
+
+def test_create_order_validation(exchange):
+    cases = [
+        (("btc_usdt", "buy", "0.1", "1"), ERR_INVALID_PAIR),
+        ((SYMBOL, "buy", "0.1234567", "1"), ERR_INVALID_PARAMETER),
+        ((SYMBOL, "buy", "0.1", "1.001"), ERR_INVALID_PARAMETER),
+        ((SYMBOL, "buy_maker", "0.1", "100000"), ERR_INSUFFICIENT_BALANCE),
+    ]
+    for args, code in cases:
+        with pytest.raises(SimulatorError) as e:
+            exchange.create_order(*args)
+        assert e.value.code == code
+
+
+def test_cancel_releases_funds_and_reports_final_state(exchange):
+    buy = exchange.create_order(SYMBOL, "buy_maker", "0.199", "100")
+    exchange.cancel_order(buy)
+    assert exchange.orders[buy].status == STATUS_CANCELLED
+    assert balance(exchange, "usdt") == (1000, 0.0)
+    with pytest.raises(SimulatorError) as e:
+        exchange.cancel_order(buy)
+    assert e.value.code == ERR_ORDER_CANCELLED
+
+    partial = exchange.create_order(SYMBOL, "buy_maker", "0.199", "100")
+    exchange.create_order(SYMBOL, "sell", "0.199", "40")
+    exchange.cancel_order(partial)
+    assert exchange.orders[partial].status == STATUS_PARTIAL_CANCELLED
+    assert balance(exchange, "usdt")[1] == 0.0
+    with pytest.raises(SimulatorError) as e:
+        exchange.cancel_order(partial)
+    assert e.value.code == ERR_ORDER_CANCELLED
+
+    filled = exchange.create_order(SYMBOL, "buy", "0.201", "1")
+    with pytest.raises(SimulatorError) as e:
+        exchange.cancel_order(filled)
+    assert e.value.code == ERR_ORDER_FILLED
+    with pytest.raises(SimulatorError) as e:
+        exchange.cancel_order("sim-999")
+    assert e.value.code == ERR_INVALID_PARAMETER
+
+
+@pytest.fixture
+def server(exchange):
+    server = SimulatorServer(exchange)
+    server.start()
+    yield server
+    server.stop()
+
+
+def call(server, path, **params):
+    response = requests.post(server.base_url + path, data=params, timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+
+def test_cancel_order_by_symbol(exchange, server):
+    ids = [exchange.create_order(SYMBOL, "buy_maker", "0.199", "10") for _ in range(2)]
+    ids.append(exchange.create_order(SYMBOL, "sell_maker", "0.201", "10"))
+    res = call(server, "v2/supplement/cancel_order_by_symbol.do", symbol=SYMBOL)
+    assert res["result"] == "true"
+    assert [o["orderId"] for o in res["data"]] == ids
+    assert exchange.open_orders() == []
+    assert balance(exchange, "usdt") == (1000, 0.0)
+    assert balance(exchange, "acces") == (10000, 0.0)
+
+    res = call(server, "v2/supplement/cancel_order_by_symbol.do", symbol="btc_usdt")
+    assert res["result"] == "false" and res["error_code"] == ERR_INVALID_PAIR
+
+
+def test_cancel_endpoints(exchange, server):
+    a, b = (exchange.create_order(SYMBOL, "buy_maker", "0.199", "10") for _ in range(2))
+    res = call(server, "v2/supplement/cancel_order.do", symbol=SYMBOL, orderId=a)
+    assert res["result"] == "true" and res["data"]["orderId"] == a
+    res = call(server, "v2/supplement/cancel_order.do", symbol=SYMBOL, orderId=a)
+    assert res["result"] == "false" and res["error_code"] == ERR_ORDER_CANCELLED
+    # v1 batch: comma-joined ids, per-id outcome
+    res = call(server, "v1/cancel_order.do", symbol=SYMBOL, order_id=f"{a},{b}")
+    assert res == {"result": "true", "success": b, "error": a}
+
+
+def test_orders_info_no_deal_shape_and_paging(exchange, server):
+    ids = [exchange.create_order(SYMBOL, "buy_maker", f"0.19{i}", "10") for i in range(3)]
+    exchange.create_order(SYMBOL, "sell", "0.19", "4")  # partially fills the best bid (0.192)
+    res = call(server, "v2/supplement/orders_info_no_deal.do", symbol=SYMBOL, current_page=1, page_length=2)
+    assert res["result"] == "true" and res["error_code"] == 0
+    data = res["data"]
+    assert (data["total"], data["page_length"], data["current_page"]) == (3, 2, 1)
+    assert [o["orderId"] for o in data["orders"]] == ids[:2]
+    page2 = call(server, "v2/supplement/orders_info_no_deal.do", symbol=SYMBOL, current_page=2, page_length=2)["data"]
+    order = page2["orders"][0]
+    assert order == {
+        "symbol": SYMBOL,
+        "orderId": ids[2],
+        "clientOrderId": "",
+        "price": "0.192",
+        "origQty": "10",
+        "executedQty": "4",
+        "cummulativeQuoteQty": "0.768",
+        "status": STATUS_PARTIAL,
+        "type": "buy_maker",
+        "time": order["time"],
+        "updateTime": order["updateTime"],
+    }
+
+
+def test_user_info_account_shape(exchange, server):
+    exchange.create_order(SYMBOL, "buy_maker", "0.199", "100")
+    res = call(server, "v2/supplement/user_info_account.do")
+    assert res["result"] == "true"
+    data = res["data"]
+    assert data["makerCommission"] == 0.0 and data["takerCommission"] == 0.0
+    balances = {b["asset"]: b for b in data["balances"]}
+    assert balances["usdt"] == {"asset": "usdt", "free": "980.1", "locked": "19.9"}
+    assert balances["acces"] == {"asset": "acces", "free": "10000", "locked": "0"}
+
+
+def test_book_ticker_includes_our_better_quotes(exchange, server):
+    res = call(server, "v2/supplement/ticker/bookTicker.do", symbol=SYMBOL)
+    assert (float(res["data"]["bidPrice"]), float(res["data"]["askPrice"])) == pytest.approx((0.1998, 0.2002))
+    exchange.create_order(SYMBOL, "buy_maker", "0.1999", "10")
+    res = call(server, "v2/supplement/ticker/bookTicker.do", symbol=SYMBOL)
+    assert float(res["data"]["bidPrice"]) == pytest.approx(0.1999)
@@ -0,0 +1,102 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.kline_buffer import KlineRingBuffer, RollingStats
+
+
+def reference_volatility(closes, period):
+    prices = np.array(closes[-period:])
+    return float(np.std(np.diff(prices) / prices[:-1]))
+
+
+def random_closes(count, seed=1):
+    rng = random.Random(seed)
+    price = 0.2
+    closes = []
+    for _ in range(count):
+        price *= 1 + rng.gauss(0, 0.002)
+        closes.append(price)
+    return closes
+
+
+def test_rolling_stats_window_matches_numpy():
+    rng = random.Random(7)
+    values = [rng.uniform(-1, 1) for _ in range(200)]
+    stats = RollingStats(20)
+    for i, x in enumerate(values):
+        stats.add(x)
+        if stats.n > stats.window:
+            stats.remove(values[i - stats.window])
+        window = values[max(0, i - stats.window + 1):i + 1]
+        assert stats.n == len(window)
+        assert stats.mean == pytest.approx(np.mean(window), abs=1e-12)
+        assert stats.std() == pytest.approx(np.std(window), abs=1e-12)
+
+
+def test_rolling_stats_empties_cleanly():
+    stats = RollingStats(5)
+    assert stats.std() is None
+    stats.add(1.0)
+    stats.add(3.0)
+    stats.remove(1.0)
+    assert stats.n == 1 and stats.mean == pytest.approx(3.0) and stats.std() == pytest.approx(0.0)
+    stats.remove(3.0)
+    assert stats.n == 0 and stats.std() is None
+
+
+def test_volatility_matches_full_recompute_while_the_ring_wraps():
+    buffer = KlineRingBuffer(capacity=31, periods=(10, 30))
+    closes = random_closes(100)
+    for i, close in enumerate(closes):
+        buffer.ingest([(i * 60, close)])
+        held = closes[max(0, i + 1 - buffer.capacity):i + 1]
+        assert buffer.closes() == pytest.approx(held)
+        if len(held) >= 2:
+            for period in (10, 30):
+                assert buffer.volatility(period) == pytest.approx(reference_volatility(held, period), rel=1e-9, abs=1e-15)
+    assert buffer.size == buffer.capacity
+
+
+def test_untracked_period_is_computed_from_the_ring():
+    buffer = KlineRingBuffer(capacity=31, periods=(10,))
+    closes = random_closes(40, seed=3)
+    buffer.ingest([(i * 60, close) for i, close in enumerate(closes)])
+    assert buffer.volatility(25) == pytest.approx(reference_volatility(closes, 25))
+
+
+def test_refetched_last_candle_replaces_its_return():
+    buffer = KlineRingBuffer(capacity=31, periods=(10,))
+    closes = random_closes(20, seed=5)
+    buffer.ingest([(i * 60, close) for i, close in enumerate(closes)])
+    # The newest candle was still forming: it is fetched again with a new close, plus one newer candle
+    closes[-1] *= 1.01
+    closes.append(closes[-1] * 0.995)
+    buffer.ingest([(19 * 60, closes[-2]), (20 * 60, closes[-1])])
+    assert buffer.size == 21
+    assert buffer.volatility(10) == pytest.approx(reference_volatility(closes, 10), rel=1e-9)
+    # Older candles are ignored
+    buffer.ingest([(5 * 60, 1.0)])
+    assert buffer.closes(1) == pytest.approx([closes[-1]])
+
+
+def test_flat_prices_give_zero_volatility():
+    buffer = KlineRingBuffer(capacity=31, periods=(10,))
+    buffer.ingest([(i * 60, 0.2) for i in range(15)])
+    assert buffer.volatility(10) == 0.0
+    assert KlineRingBuffer(capacity=31, periods=(10,)).volatility(10) is None
+
+
+def test_next_request_backfills_then_fetches_only_new_candles():
+    buffer = KlineRingBuffer(capacity=31, periods=(10,))
+    now = 1_700_000_000
+    request = buffer.next_request("acces_usdt", now)
+    assert request == {"symbol": "acces_usdt", "type": "minute1", "size": 31, "time": now - 31 * 60}
+
+    last = now - now % 60
+    buffer.ingest([(last, 0.2)])
+    assert buffer.next_request("acces_usdt", last + 30) is None
+    assert buffer.next_request("acces_usdt", last + 150) == {"symbol": "acces_usdt", "type": "minute1", "size": 3, "time": last}
+    # Too far behind to top up: backfill again
+    assert buffer.next_request("acces_usdt", last + 31 * 60)["size"] == 31
@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+from src.ladder_builder import (
+    build_ladder,
+    consolidate_largest,
+    filter_levels,
+    geometric_sizes,
+    level_pairs,
+    linear_prices,
+    make_levels,
+    merge_same_prices,
+    price_step_percentages,
+    scale_to_budget,
+    step_distances,
+)
+
+
+def test_linear_prices_include_both_ends():
+    assert linear_prices(0.2, 0.198, 3).tolist() == pytest.approx([0.2, 0.199, 0.198])
+    assert linear_prices(0.2, 0.198, 1).tolist() == [0.2]
+    assert len(linear_prices(0.2, 0.198, 0)) == 0
+    assert linear_prices(0.2, 0.19, 4, decimals=4).tolist() == [0.2, 0.1967, 0.1933, 0.19]
+
+
+def test_merge_same_prices_sorts_and_sums_sizes():
+    prices, sizes = merge_same_prices([0.2001, 0.19, 0.200104, 0.2], [10, 20, 30, 40], decimals=4)
+    assert prices.tolist() == [0.19, 0.2, 0.2001]
+    assert sizes.tolist() == [20.0, 40.0, 40.0]
+    prices, sizes = merge_same_prices([], [])
+    assert len(prices) == 0 and len(sizes) == 0
+
+
+def test_scale_to_budget():
+    prices, sizes = [0.2, 0.1], [100.0, 100.0]  # 30 USDT
+    scaled, scale = scale_to_budget(prices, sizes, 15)
+    assert scale == pytest.approx(0.5)
+    assert scaled.tolist() == pytest.approx([50.0, 50.0])
+    # Already fits, or no budget: untouched
+    assert scale_to_budget(prices, sizes, 30)[1] == 1.0
+    assert scale_to_budget(prices, sizes, None)[0].tolist() == sizes
+
+
+def test_scale_to_budget_with_nothing_to_spend_or_nothing_to_scale():
+    for budget in (0, -5):
+        scaled, scale = scale_to_budget([0.2], [100.0], budget)
+        assert scale == 0.0
+        assert scaled.tolist() == [0.0]
+    scaled, scale = scale_to_budget([], [], 10)
+    assert len(scaled) == 0 and scale == 1.0
+    # Zero-value input cannot be scaled
+    assert scale_to_budget([0.2], [0.0], 0)[1] == 1.0
+
+
+def test_make_levels_computes_values():
+    levels = make_levels([0.2, 0.1], [10, 30], distance_pct=[0.0, 50.0])
+    assert levels["index"].tolist() == [0, 1]
+    assert levels["value"].tolist() == pytest.approx([2.0, 3.0])
+    assert levels["distance_pct"].tolist() == [0.0, 50.0]
+    assert level_pairs(levels) == [(10.0, 0.2), (30.0, 0.1)]
+    assert all(type(x) is float for pair in level_pairs(levels) for x in pair)
+
+
+def test_filter_levels_splits_on_size_and_value():
+    levels = make_levels([0.2, 0.2, 0.2, 0.2], [100, 10, 20, 0])  # values 20, 2, 4, 0
+    kept, rejected = filter_levels(levels, min_size=15, min_value=3)
+    assert kept["index"].tolist() == [0, 2]
+    assert rejected["index"].tolist() == [1, 3]
+    # Empty levels never pass, even without minimums
+    kept, rejected = filter_levels(levels)
+    assert kept["index"].tolist() == [0, 1, 2]
+    assert rejected["index"].tolist() == [3]
+
+
+def test_consolidate_largest_walks_greedily_from_the_largest_level():
+    levels = make_levels([1.0] * 4, [5, 10, 20, 40])
+    # 40 fits (15 left), 20 does not, 10 fits (5 left), 5 fits exactly
+    assert consolidate_largest(levels, 55, min_value=5)["value"].tolist() == [5.0, 10.0, 40.0]
+    assert consolidate_largest(levels, 30)["value"].tolist() == [10.0, 20.0]
+
+
+def test_consolidate_largest_stops_below_min_value():
+    levels = make_levels([1.0] * 4, [6, 7, 8, 40])
+    # 4 left after 40: nothing eligible can fit any more
+    assert consolidate_largest(levels, 44, min_value=6)["value"].tolist() == [40.0]
+    # Levels under the minimums are never kept, however much budget is left
+    assert consolidate_largest(levels, 100, min_size=7.5)["value"].tolist() == [8.0, 40.0]
+    assert len(consolidate_largest(levels, 5, min_value=6)) == 0
+
+
+def test_price_steps_widen_after_level_8_and_11():
+    steps = price_step_percentages(14, 0.01)
+    assert steps.tolist() == pytest.approx([0.01] * 9 + [0.025] * 3 + [0.04] * 2)
+
+
+def test_step_distances_with_min_first_distance():
+    assert step_distances(4, 0.001, 0.10, min_first_distance=0.0).tolist() == pytest.approx([0.0, 0.001, 0.002, 0.003])
+    # Level 1 is pushed out to the minimum and the later levels shift with it
+    assert step_distances(4, 0.001, 0.10, min_first_distance=0.0025).tolist() == pytest.approx(
+        [0.0, 0.0025, 0.0035, 0.0045]
+    )
+    # A base step already past the minimum is left alone
+    assert step_distances(3, 0.005, 0.10).tolist() == pytest.approx([0.0, 0.005, 0.01])
+    assert step_distances(5, 0.01, 0.025).tolist() == pytest.approx([0.0, 0.01, 0.02, 0.025, 0.025])
+    assert step_distances(1, 0.01, 0.1).tolist() == [0.0]
+    assert len(step_distances(0, 0.01, 0.1)) == 0
+
+
+def test_geometric_sizes():
+    assert geometric_sizes(100, 3).tolist() == pytest.approx([30.0, 21.0, 14.7])
+
+
+def test_build_ladder_merges_scales_and_filters():
+    kept, rejected, scale = build_ladder(
+        [0.2, 0.20001, 0.19, 0.18],
+        [100, 100, 10, 50],
+        budget=25.45,
+        min_value=2.0,
+        merge_decimals=4,
+    )
+    # 0.2 and 0.20001 merge to 200 tokens; 50.9 USDT in total, scaled by half
+    assert scale == pytest.approx(0.5)
+    assert kept["price"].tolist() == pytest.approx([0.18, 0.2])
+    assert kept["size"].tolist() == pytest.approx([25.0, 100.0])
+    assert rejected["price"].tolist() == pytest.approx([0.19])
+    assert np.all(kept["distance_pct"] == 0.0)
+
+
+def test_build_ladder_keeps_distances_without_merging():
+    kept, rejected, scale = build_ladder([0.2, 0.198], [10, 10], distance_pct=[0.0, 1.0])
+    assert scale == 1.0
+    assert kept["distance_pct"].tolist() == [0.0, 1.0]
+    assert len(rejected) == 0
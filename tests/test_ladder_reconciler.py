@@ -0,0 +1,132 @@
+import pytest
+
+from src import ladder_reconciler
+from src.ladder_reconciler import match_levels
+from src.order_canceller import CancelReport
+
+
+def live(order_id, side, price, remaining_qty):
+    return {
+        "order_id": order_id,
+        "side": side,
+        "price": price,
+        "orig_qty": remaining_qty,
+        "executed_qty": 0.0,
+        "remaining_qty": remaining_qty,
+        "status": 0,
+    }
+
+
+def test_exact_levels_are_kept():
+    orders = [live("a", "buy", 0.199, 100), live("b", "buy", 0.198, 80)]
+    matches, unmatched = match_levels([(100, 0.199), (80, 0.198)], orders, 0.05, 10.0)
+    assert [m["order_id"] for m in matches] == ["a", "b"]
+    assert unmatched == []
+
+
+def test_price_tolerance_is_inclusive_and_relative_to_the_target():
+    target = [(100, 0.2)]
+    # 0.05% of 0.2 is 0.0001
+    matches, _ = match_levels(target, [live("a", "buy", 0.2001, 100)], 0.05, 10.0)
+    assert matches[0]["order_id"] == "a"
+    matches, unmatched = match_levels(target, [live("a", "buy", 0.20011, 100)], 0.05, 10.0)
+    assert matches == [None]
+    assert [o["order_id"] for o in unmatched] == ["a"]
+
+
+def test_size_tolerance_uses_the_remaining_size():
+    target = [(100, 0.2)]
+    matches, _ = match_levels(target, [live("a", "buy", 0.2, 90)], 0.05, 10.0)
+    assert matches[0]["order_id"] == "a"
+    matches, _ = match_levels(target, [live("a", "buy", 0.2, 111)], 0.05, 10.0)
+    assert matches == [None]
+    # A partially filled order no longer stands for the full level
+    partially_filled = dict(live("a", "buy", 0.2, 100), executed_qty=50.0, remaining_qty=50.0)
+    matches, _ = match_levels(target, [partially_filled], 0.05, 10.0)
+    assert matches == [None]
+
+
+def test_closest_price_wins_and_each_order_keeps_one_level():
+    orders = [live("far", "sell", 0.20009, 100), live("near", "sell", 0.20001, 100)]
+    matches, unmatched = match_levels([(100, 0.2), (100, 0.2)], orders, 0.05, 10.0)
+    assert [m["order_id"] for m in matches] == ["near", "far"]
+    assert unmatched == []
+    matches, unmatched = match_levels([(100, 0.2), (100, 0.2)], orders[1:], 0.05, 10.0)
+    assert [m and m["order_id"] for m in matches] == ["near", None]
+
+
+def test_orders_without_id_or_remaining_size_are_ignored():
+    orders = [live("", "buy", 0.2, 100), live("done", "buy", 0.2, 0.0)]
+    matches, unmatched = match_levels([(100, 0.2)], orders, 0.05, 10.0)
+    assert matches == [None]
+    assert unmatched == []
+
+
+def test_zero_tolerance_and_zero_targets():
+    matches, _ = match_levels([(100, 0.2)], [live("a", "buy", 0.2, 100)], 0.0, 0.0)
+    assert matches[0]["order_id"] == "a"
+    matches, _ = match_levels([(0, 0.2), (100, 0.0)], [live("a", "buy", 0.2, 100)], 5.0, 50.0)
+    assert matches == [None, None]
+
+
+@pytest.fixture
+def exchange(monkeypatch):
+    """
+    Fake cancel/publish calls: IDs in `refuse` fail to cancel; placed levels are recorded.
+    """
+    calls = {"cancelled": [], "placed": [], "refuse": set()}
+
+    def fake_cancel(symbol, order_ids, max_in_flight=8):
+        calls["cancelled"].extend(order_ids)
+        return CancelReport(
+            results={
+                order_id: {"ok": order_id not in calls["refuse"], "error": "timeout" if order_id in calls["refuse"] else None}
+                for order_id in order_ids
+            },
+            batches=1,
+        )
+
+    def fake_publish(symbol, buy_levels, sell_levels, max_in_flight=8):
+        calls["placed"].append((list(buy_levels), list(sell_levels)))
+        return {
+            "buy": [{"result": True, "data": {"order_id": f"new-buy-{i}"}} for i in range(len(buy_levels))],
+            "sell": [{"result": True, "data": {"order_id": f"new-sell-{i}"}} for i in range(len(sell_levels))],
+            "elapsed_seconds": 0.0,
+        }
+
+    monkeypatch.setattr(ladder_reconciler, "cancel_list_of_orders", fake_cancel)
+    monkeypatch.setattr(ladder_reconciler, "publish_ladder", fake_publish)
+    return calls
+
+
+def test_reconcile_ladder_cancels_stale_and_places_missing(exchange):
+    live_orders = [live("keep", "buy", 0.199, 100), live("stale", "buy", 0.19, 100), live("s1", "sell", 0.201, 50)]
+    result = ladder_reconciler.reconcile_ladder(
+        "acces_usdt", [(100, 0.199), (100, 0.198)], [(50, 0.201)], live_orders
+    )
+    assert exchange["cancelled"] == ["stale"]
+    assert exchange["placed"] == [([(100, 0.198)], [])]
+    assert result["kept"] == 2
+    assert result["cancelled"] == 1
+    assert [r["data"]["order_id"] for r in result["buy"]] == ["keep", "new-buy-0"]
+    assert result["buy"][0]["kept"]
+    assert [r["data"]["order_id"] for r in result["sell"]] == ["s1"]
+
+
+def test_side_with_an_uncancelled_stale_order_places_nothing(exchange):
+    exchange["refuse"].add("stale-buy")
+    live_orders = [
+        live("keep", "buy", 0.199, 100),
+        live("stale-buy", "buy", 0.19, 100),
+        live("stale-sell", "sell", 0.22, 50),
+    ]
+    result = ladder_reconciler.reconcile_ladder(
+        "acces_usdt", [(100, 0.199), (100, 0.198)], [(50, 0.201)], live_orders
+    )
+    assert sorted(exchange["cancelled"]) == ["stale-buy", "stale-sell"]
+    # The buy replacement would rest on top of the still-locked stale order: not placed
+    assert exchange["placed"] == [([], [(50, 0.201)])]
+    assert result["cancelled"] == 1
+    assert result["buy"][0]["kept"]
+    assert result["buy"][1]["result"] is False and result["buy"][1]["skipped"]
+    assert [r["data"]["order_id"] for r in result["sell"]] == ["new-sell-0"]
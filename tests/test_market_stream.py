@@ -0,0 +1,152 @@
+import time
+
+import pytest
+
+from src.balance_ledger import BalanceLedger
+from src.exchange_simulator import (
+    STATUS_PARTIAL_CANCELLED,
+    PricePath,
+    SimClock,
+    SimulatedExchange,
+    SimulatorServer,
+)
+from src.market_stream import MarketStream, parse_order_update
+from src.order_registry import OrderRegistry
+
+SYMBOL = "acces_usdt"
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+@pytest.fixture
+def exchange():
+    # Frozen clock and no taker flow: only our own orders trade
+    return SimulatedExchange(
+        SYMBOL,
+        balances={"usdt": 1000, "acces": 10000},
+        path=PricePath([(0, 0.2)]),
+        clock=SimClock(speed=0),
+        taker_rate=0.0,
+        history_minutes=5,
+    )
+
+
+@pytest.fixture
+def server(exchange):
+    server = SimulatorServer(exchange, push_seconds=0.05, ping_seconds=0.2)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def ledger(exchange):
+    ledger = BalanceLedger(("usdt", "acces"))
+    ledger.reconcile({asset: {"free": free, "locked": locked} for asset, (free, locked) in exchange.balances.items()})
+    return ledger
+
+
+@pytest.fixture
+def stream(server, ledger):
+    stream = MarketStream(
+        server.ws_url,
+        SYMBOL,
+        registry=OrderRegistry(ledger),
+        subscribe_key_provider=lambda: "sim-subscribe-key",
+        stale_seconds=0.5,
+        reconnect_max_seconds=0.5,
+    )
+    stream.start()
+    yield stream
+    stream.stop()
+
+
+def event_types(stream):
+    return [event["type"] for event in stream.drain_events()]
+
+
+def test_parse_order_update_closes_partially_filled_and_cancelled():
+    order, closed = parse_order_update(
+        {"uuid": "1", "type": "buy_maker", "orderAmt": "100", "accAmt": "40", "orderPrice": "0.2", "orderStatus": 3}
+    )
+    assert closed
+    assert order["side"] == "buy"
+    assert order["executed_qty"] == 40
+    assert order["remaining_qty"] == 60
+    assert not parse_order_update({"uuid": "2", "type": "sell", "orderStatus": 1})[1]
+    assert parse_order_update({"uuid": "3", "type": "sell", "orderStatus": -1})[1]
+    assert parse_order_update({"uuid": "4", "type": "sell", "orderStatus": 2})[1]
+
+
+def test_subscribes_and_answers_pings(exchange, server, stream):
+    assert wait_for(stream.is_live)
+    bid, ask = exchange.book_ticker()
+    ticker = stream.book_ticker()
+    assert ticker["source"] == "stream"
+    assert float(ticker["data"]["bidPrice"]) == pytest.approx(bid)
+    assert float(ticker["data"]["askPrice"]) == pytest.approx(ask)
+    assert stream.mid_price() == pytest.approx((bid + ask) / 2)
+    assert wait_for(lambda: server.stream_stats["pongs"] >= 1)
+    assert server.stream_stats["pongs"] <= server.stream_stats["pings"]
+
+
+def test_falls_back_to_rest_and_reconnects(exchange, server, stream):
+    assert wait_for(stream.is_live)
+    port = server.port
+    server.stop()
+    assert wait_for(lambda: not stream.connected)
+    # Callers see no stream data and poll REST instead
+    assert not stream.is_live()
+    assert stream.book_ticker() is None
+    assert stream.mid_price() is None
+    assert "disconnected" in event_types(stream)
+
+    restarted = SimulatorServer(exchange, port=port, push_seconds=0.05, ping_seconds=0.2)
+    restarted.start()
+    try:
+        assert wait_for(stream.is_live)
+        assert stream.reconnects >= 1
+        assert "connected" in event_types(stream)
+        assert stream.book_ticker()["source"] == "stream"
+    finally:
+        restarted.stop()
+
+
+def test_partially_filled_then_cancelled_order_leaves_no_ghost(exchange, server, stream, ledger):
+    registry = stream.registry
+    assert wait_for(stream.is_live)
+    # Hold the exchange lock so each order is registered before the feed can report it
+    with exchange._lock:
+        buy_id = exchange.create_order(SYMBOL, "buy_maker", "0.2", "100")
+        registry.record_placement(buy_id, "buy", 0.2, 100)
+    assert wait_for(lambda: registry.get(buy_id) is not None and stream.messages > 0)
+    with exchange._lock:
+        # Our own crossing sell fills 40 of the resting buy
+        sell_id = exchange.create_order(SYMBOL, "sell", "0.2", "40")
+        registry.record_placement(sell_id, "sell", 0.2, 40)
+    exchange.cancel_order(buy_id)
+    assert exchange.orders[buy_id].status == STATUS_PARTIAL_CANCELLED
+
+    assert wait_for(lambda: registry.count() == 0)
+    assert registry.get(buy_id) is None
+    fills = [event for event in stream.drain_events() if event["type"] == "fill"]
+    assert sum(event["qty"] for event in fills if event["order_id"] == buy_id) == pytest.approx(40)
+    # A later open-orders query cannot bring the closed order back
+    registry.sync([{"order_id": buy_id, "side": "buy", "price": 0.2, "orig_qty": 100.0,
+                    "executed_qty": 40.0, "remaining_qty": 60.0, "status": 1}])
+    assert registry.count() == 0
+
+    # Nothing stays locked for the cancelled remainder; the ledger matches the exchange
+    balances = ledger.balances()
+    for asset, (free, locked) in exchange.balances.items():
+        assert balances[asset]["free"] == pytest.approx(free)
+        assert balances[asset]["locked"] == pytest.approx(locked, abs=1e-9)
+    assert balances["usdt"]["locked"] == pytest.approx(0.0, abs=1e-9)
+    assert not ledger.needs_reconcile()
@@ -0,0 +1,77 @@
+import threading
+
+from src.order_canceller import cancel_orders, parse_batch_cancel, split_ids
+
+
+def test_split_ids():
+    assert split_ids("a, b,,c") == ["a", "b", "c"]
+    assert split_ids(["a", " ", 3]) == ["a", "3"]
+    assert split_ids(None) == []
+    assert split_ids("") == []
+
+
+def test_parse_batch_cancel_per_id_outcome():
+    res = {"result": "true", "success": "a,c", "error": "b"}
+    assert parse_batch_cancel(["a", "b", "c"], res) == {
+        "a": {"ok": True, "error": None},
+        "b": {"ok": False, "error": "cancel rejected"},
+        "c": {"ok": True, "error": None},
+    }
+
+
+def test_parse_batch_cancel_uses_the_exchange_message_for_failures():
+    res = {"result": "true", "success": "", "error": "a,b", "msg": "order not found"}
+    results = parse_batch_cancel(["a", "b"], res)
+    assert results == {"a": {"ok": False, "error": "order not found"}, "b": {"ok": False, "error": "order not found"}}
+
+
+def test_parse_batch_cancel_ids_missing_from_both_fields_failed():
+    results = parse_batch_cancel(["a", "b"], {"result": "true", "success": "a"})
+    assert results["a"]["ok"]
+    assert not results["b"]["ok"]
+
+
+def test_parse_batch_cancel_single_id_result():
+    assert parse_batch_cancel(["a"], {"result": "true", "order_id": "a"}) == {"a": {"ok": True, "error": None}}
+    assert parse_batch_cancel(["a"], {"result": True}) == {"a": {"ok": True, "error": None}}
+    assert parse_batch_cancel(["a"], {"msg": "Success"}) == {"a": {"ok": True, "error": None}}
+    assert parse_batch_cancel(["a"], {"result": "false", "error_code": 10026}) == {"a": {"ok": False, "error": "10026"}}
+
+
+def test_parse_batch_cancel_rejected_request_fails_every_id():
+    # e.g. a signature error: no per-ID fields at all
+    results = parse_batch_cancel(["a", "b", "c"], {"result": "false", "error_code": 10004, "msg": "signature failed"})
+    assert all(not r["ok"] and r["error"] == "signature failed" for r in results.values())
+    assert parse_batch_cancel(["a"], None) == {"a": {"ok": False, "error": "cancel rejected"}}
+
+
+def test_cancel_orders_batches_and_collects_results():
+    seen = []
+    lock = threading.Lock()
+
+    def cancel_batch(symbol, ids):
+        with lock:
+            seen.append((symbol, list(ids)))
+        if "o5" in ids:
+            raise RuntimeError("timeout")
+        return {order_id: {"ok": order_id != "o2", "error": None if order_id != "o2" else "already filled"} for order_id in ids if order_id != "o3"}
+
+    report = cancel_orders("acces_usdt", ["o1", "o2", "o3", "o1", None, "o4", "o5", "o6", "o7"], cancel_batch, batch_size=3)
+    assert report.batches == 3
+    assert sorted(ids for _, ids in seen) == [["o1", "o2", "o3"], ["o4", "o5", "o6"], ["o7"]]
+    assert all(symbol == "acces_usdt" for symbol, _ in seen)
+    assert sorted(report.cancelled) == ["o1", "o7"]
+    assert report.failed == {
+        "o2": "already filled",
+        "o3": "missing from cancel response",
+        "o4": "timeout",
+        "o5": "timeout",
+        "o6": "timeout",
+    }
+    assert not report.all_ok
+
+
+def test_cancel_orders_with_nothing_to_cancel():
+    report = cancel_orders("acces_usdt", [None, ""], lambda symbol, ids: {})
+    assert report.batches == 0
+    assert report.all_ok
@@ -0,0 +1,106 @@
+import pytest
+
+from src.order_registry import OrderRegistry
+
+
+def open_order(order_id, side, price, orig_qty, executed_qty=0.0, status=0):
+    return {
+        "order_id": order_id,
+        "side": side,
+        "price": price,
+        "orig_qty": orig_qty,
+        "executed_qty": executed_qty,
+        "remaining_qty": orig_qty - executed_qty,
+        "status": status,
+    }
+
+
+@pytest.fixture
+def registry():
+    registry = OrderRegistry()
+    registry.record_placement("b1", "buy", 0.19, 100)
+    registry.record_placement("b2", "buy", 0.18, 50)
+    registry.record_placement("s1", "sell", 0.21, 80)
+    return registry
+
+
+def test_record_placement_indexes_by_side_and_price(registry):
+    assert registry.count() == 3
+    assert registry.count("buy") == 2
+    assert registry.best_price("buy") == 0.19
+    assert registry.best_price("sell") == 0.21
+    assert registry.depth_usdt("buy") == pytest.approx(100 * 0.19 + 50 * 0.18)
+    assert registry.ids_above("buy", 0.185) == ["b1"]
+
+
+def test_apply_update_records_partial_fill(registry):
+    new_qty = registry.apply_update(open_order("b1", "buy", 0.19, 100, executed_qty=30, status=1))
+    assert new_qty == pytest.approx(30)
+    assert registry.get("b1")["remaining_qty"] == pytest.approx(70)
+    assert registry.depth_usdt("buy") == pytest.approx(70 * 0.19 + 50 * 0.18)
+    # The same update again adds nothing
+    assert registry.apply_update(open_order("b1", "buy", 0.19, 100, executed_qty=30, status=1)) == 0.0
+
+
+def test_apply_update_closed_drops_the_order(registry):
+    new_qty = registry.apply_update(open_order("b1", "buy", 0.19, 100, executed_qty=100, status=2), closed=True)
+    assert new_qty == pytest.approx(100)
+    assert registry.get("b1") is None
+    assert registry.best_price("buy") == 0.18
+    # A late update for a closed order is ignored
+    assert registry.apply_update(open_order("b1", "buy", 0.19, 100, executed_qty=100, status=2)) == 0.0
+    assert registry.get("b1") is None
+
+
+def test_sync_reports_fills_since_last_sync(registry):
+    registry.apply_update(open_order("b1", "buy", 0.19, 100, executed_qty=10, status=1))
+    fills = registry.sync([
+        open_order("b1", "buy", 0.19, 100, executed_qty=40, status=1),
+        open_order("b2", "buy", 0.18, 50),
+        open_order("s1", "sell", 0.21, 80, executed_qty=20, status=1),
+    ])
+    assert fills["buy_qty"] == pytest.approx(40)
+    assert fills["buy_value"] == pytest.approx(40 * 0.19)
+    assert fills["sell_qty"] == pytest.approx(20)
+    assert fills["sell_value"] == pytest.approx(20 * 0.21)
+    assert fills["vanished"] == []
+    # Nothing new on the next sync
+    again = registry.sync([
+        open_order("b1", "buy", 0.19, 100, executed_qty=40, status=1),
+        open_order("b2", "buy", 0.18, 50),
+        open_order("s1", "sell", 0.21, 80, executed_qty=20, status=1),
+    ])
+    assert again["buy_qty"] == 0.0 and again["sell_qty"] == 0.0
+
+
+def test_sync_drops_vanished_orders_and_adds_unknown_ones(registry):
+    fills = registry.sync([open_order("b1", "buy", 0.19, 100), open_order("x1", "sell", 0.22, 10, executed_qty=4)])
+    assert sorted(fills["vanished"]) == ["b2", "s1"]
+    assert sorted(registry.ids()) == ["b1", "x1"]
+    # An order seen for the first time counts its whole executed quantity
+    assert fills["sell_qty"] == pytest.approx(4)
+    assert registry.depth_usdt("sell") == pytest.approx(6 * 0.22)
+
+
+def test_sync_does_not_resurrect_closed_orders(registry):
+    registry.remove("b1")
+    registry.apply_update(open_order("s1", "sell", 0.21, 80, executed_qty=80, status=2), closed=True)
+    # A query sent before the cancel/fill still lists both orders
+    fills = registry.sync([
+        open_order("b1", "buy", 0.19, 100),
+        open_order("b2", "buy", 0.18, 50),
+        open_order("s1", "sell", 0.21, 80, executed_qty=50, status=1),
+    ])
+    assert registry.ids() == ["b2"]
+    assert fills["vanished"] == []
+    # The fill was counted once, by apply_update
+    assert fills["sell_qty"] == pytest.approx(80)
+
+
+def test_closed_history_is_bounded():
+    registry = OrderRegistry()
+    for i in range(OrderRegistry.CLOSED_HISTORY + 1):
+        registry.remove(f"o{i}")
+    # The oldest closed ID has been forgotten; the newest is still remembered
+    registry.sync([open_order("o0", "buy", 0.19, 10), open_order(f"o{OrderRegistry.CLOSED_HISTORY}", "buy", 0.19, 10)])
+    assert registry.ids() == ["o0"]
@@ -0,0 +1,153 @@
+import threading
+import time
+
+import pytest
+
+from src.request_scheduler import (
+    CLASS_ACCOUNT,
+    CLASS_MARKET,
+    CLASS_TRADE,
+    PRIORITY_RISK,
+    RequestScheduler,
+    RequestThrottled,
+    classify_endpoint,
+)
+
+CREATE = "v2/supplement/create_order.do"
+CANCEL = "v2/supplement/cancel_order.do"
+TICKER = "v2/supplement/ticker/bookTicker.do"
+
+
+def scheduler(rate=0.001, burst=5, **kwargs):
+    limits = {CLASS_MARKET: (rate, burst), CLASS_ACCOUNT: (rate, burst), CLASS_TRADE: (rate, burst)}
+    return RequestScheduler(limits, **kwargs)
+
+
+def close_bucket(scheduler, cls):
+    scheduler._buckets[cls].blocked_until = time.monotonic() + 60
+
+
+def open_bucket(scheduler, cls):
+    with scheduler._cond:
+        scheduler._buckets[cls].blocked_until = 0.0
+        scheduler._cond.notify_all()
+
+
+def wait_for_queue(scheduler, depth, cls=CLASS_TRADE):
+    deadline = time.monotonic() + 5
+    while scheduler.queue_depth(cls) < depth:
+        assert time.monotonic() < deadline, "waiters never queued"
+        time.sleep(0.001)
+
+
+def test_classify_endpoint():
+    assert classify_endpoint(CREATE) == CLASS_TRADE
+    assert classify_endpoint("v1/cancel_order.do") == CLASS_TRADE
+    assert classify_endpoint(TICKER) == CLASS_MARKET
+    assert classify_endpoint("v2/supplement/user_info_account.do") == CLASS_ACCOUNT
+
+
+def test_cancel_queued_behind_placements_is_served_first():
+    s = scheduler(max_place_wait_seconds=None)
+    served = []
+    lock = threading.Lock()
+
+    def request(name, path, priority=None):
+        s.acquire(path, priority=priority)
+        with lock:
+            served.append(name)
+
+    close_bucket(s, CLASS_TRADE)
+    threads = []
+    for name, path, priority in [
+        ("place-1", CREATE, None),
+        ("place-2", CREATE, None),
+        ("cancel", CANCEL, None),
+        ("kill-switch", CANCEL, PRIORITY_RISK),
+    ]:
+        thread = threading.Thread(target=request, args=(name, path, priority))
+        thread.start()
+        threads.append(thread)
+        # Queue strictly in this order
+        wait_for_queue(s, len(threads))
+    open_bucket(s, CLASS_TRADE)
+    for thread in threads:
+        thread.join(5)
+    # By lane first, arrival order within a lane
+    assert served == ["kill-switch", "cancel", "place-1", "place-2"]
+    assert s.queue_depth() == 0
+    assert s.stats()[CLASS_TRADE]["requests"] == 4
+
+
+def test_placement_fails_fast_after_max_place_wait_seconds():
+    s = scheduler(max_place_wait_seconds=0.1)
+    close_bucket(s, CLASS_TRADE)
+    started = time.monotonic()
+    with pytest.raises(RequestThrottled):
+        s.acquire(CREATE)
+    assert time.monotonic() - started == pytest.approx(0.1, abs=0.05)
+    assert s.queue_depth() == 0
+    assert s.stats()[CLASS_TRADE]["throttled"] == 1
+
+    # Cancels are never dropped, however long they wait
+    result = []
+    thread = threading.Thread(target=lambda: result.append(s.acquire(CANCEL)))
+    thread.start()
+    time.sleep(0.2)
+    assert result == [] and s.queue_depth(CLASS_TRADE) == 1
+    open_bucket(s, CLASS_TRADE)
+    thread.join(5)
+    assert result and result[0] >= 0.2
+
+
+def test_throttled_placement_leaves_the_queue_to_the_next_waiter():
+    s = scheduler(max_place_wait_seconds=0.1)
+    close_bucket(s, CLASS_TRADE)
+    result = []
+    thread = threading.Thread(target=lambda: result.append(s.acquire(CANCEL)))
+    thread.start()
+    wait_for_queue(s, 1)
+    with pytest.raises(RequestThrottled):
+        s.acquire(CREATE)
+    open_bucket(s, CLASS_TRADE)
+    thread.join(5)
+    assert len(result) == 1
+    assert s.queue_depth() == 0
+
+
+def test_penalize_empties_the_bucket_for_the_cool_down():
+    s = scheduler(rate=1000, burst=5)
+    assert s.acquire(CREATE) < 0.01
+    s.penalize(CREATE, seconds=0.2)
+    bucket = s._buckets[CLASS_TRADE]
+    assert bucket.tokens == 0.0
+    assert bucket.blocked_until > time.monotonic()
+    # Other classes keep their own budget
+    assert s.acquire(TICKER) < 0.01
+    waited = s.acquire(CANCEL)
+    assert waited == pytest.approx(0.2, abs=0.05)
+    stats = s.stats()[CLASS_TRADE]
+    assert stats["penalties"] == 1 and stats["waited"] == 1
+
+
+def test_penalize_never_shortens_an_existing_cool_down():
+    s = scheduler()
+    s.penalize(CANCEL, seconds=10)
+    until = s._buckets[CLASS_TRADE].blocked_until
+    s.penalize(CANCEL, seconds=0.1)
+    assert s._buckets[CLASS_TRADE].blocked_until == until
+
+
+def test_burst_then_rate():
+    s = scheduler(rate=20, burst=2)
+    assert s.acquire(TICKER) < 0.01
+    assert s.acquire(TICKER) < 0.01
+    # Bucket empty: the next token is 1/20 s away
+    assert s.acquire(TICKER) == pytest.approx(0.05, abs=0.03)
+
+
+def test_disabled_scheduler_never_waits():
+    s = scheduler(enabled=False)
+    close_bucket(s, CLASS_TRADE)
+    assert s.acquire(CREATE) == 0.0
+    assert s.stats()[CLASS_TRADE]["requests"] == 0
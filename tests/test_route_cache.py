@@ -0,0 +1,68 @@
+import json
+import threading
+
+from src import route_cache
+from src.route_cache import RouteCache, is_nonsupport_error
+
+
+def route(n):
+    return {"path": f"v2/create_order_{n}.do", "symbol": "acces_usdt", "order_type_style": "maker"}
+
+
+def test_routes_survive_a_restart(tmp_path):
+    path = tmp_path / "routes" / "order_routes.json"
+    cache = RouteCache(str(path))
+    assert cache.get("acces_usdt", "create_order") is None
+    cache.remember("acces_usdt", "create_order", route(1))
+    cache.remember("acces_usdt", "open_orders", route(2))
+    cache.forget("acces_usdt", "open_orders")
+
+    reloaded = RouteCache(str(path))
+    assert reloaded.get("acces_usdt", "create_order") == route(1)
+    assert reloaded.get("acces_usdt", "open_orders") is None
+    assert not (tmp_path / "routes" / "order_routes.json.tmp").exists()
+
+
+def test_get_returns_a_copy(tmp_path):
+    cache = RouteCache(str(tmp_path / "order_routes.json"))
+    cache.remember("acces_usdt", "create_order", route(1))
+    cache.get("acces_usdt", "create_order")["path"] = "changed"
+    assert cache.get("acces_usdt", "create_order") == route(1)
+
+
+def test_unreadable_file_means_an_empty_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(route_cache, "log", lambda *args, **kwargs: None)
+    path = tmp_path / "order_routes.json"
+    path.write_text("{not json")
+    assert RouteCache(str(path)).get("acces_usdt", "create_order") is None
+
+
+def test_concurrent_writers_leave_a_complete_file(tmp_path, monkeypatch):
+    failures = []
+    monkeypatch.setattr(route_cache, "log", lambda message, *args, **kwargs: failures.append(message))
+    path = tmp_path / "order_routes.json"
+    cache = RouteCache(str(path))
+    start = threading.Barrier(8)
+
+    def writer(worker):
+        start.wait()
+        for n in range(25):
+            cache.remember(f"pair{worker}_usdt", "create_order", route(n))
+
+    threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    # No writer lost its .tmp file to another one, and the last write holds every final route
+    assert failures == []
+    saved = json.loads(path.read_text())
+    assert saved == {f"pair{worker}_usdt|create_order": route(24) for worker in range(8)}
+
+
+def test_is_nonsupport_error():
+    assert is_nonsupport_error("currency pair nonsupport")
+    assert is_nonsupport_error("Order type not supported")
+    assert not is_nonsupport_error("insufficient balance")
+    assert not is_nonsupport_error(None)
@@ -0,0 +1,117 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from src.state_store import StateStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "state" / "bot_state.db")
+
+
+def rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {key: (value, updated_at) for key, value, updated_at in conn.execute("SELECT key, value, updated_at FROM state")}
+    finally:
+        conn.close()
+
+
+def test_empty_store(path):
+    store = StateStore(path)
+    assert store.load() == ({}, None)
+    store.close()
+
+
+def test_save_only_rewrites_changed_rows(path, monkeypatch):
+    store = StateStore(path)
+    clock = iter([100.0, 200.0, 300.0])
+    monkeypatch.setattr("src.state_store.time.time", lambda: next(clock))
+    assert store.save({"meta": {"iteration": 1}, "orders": [{"order_id": "a"}]}) == 2
+    assert store.save({"meta": {"iteration": 2}, "orders": [{"order_id": "a"}]}) == 1
+    assert rows(path) == {
+        "meta": ('{"iteration":2}', 200.0),
+        "orders": ('[{"order_id":"a"}]', 100.0),
+    }
+    # Nothing changed: no transaction at all
+    assert store.save({"meta": {"iteration": 2}}) == 0
+    assert store.checkpoints == 2
+    store.close()
+
+
+def test_load_returns_values_and_newest_update(path, monkeypatch):
+    store = StateStore(path)
+    clock = iter([100.0, 250.0])
+    monkeypatch.setattr("src.state_store.time.time", lambda: next(clock))
+    store.save({"meta": {"symbol": "acces_usdt"}, "loop": {"pause_until": 0.0}})
+    store.save({"loop": {"pause_until": 500.0}})
+    values, updated_at = store.load()
+    assert values == {"meta": {"symbol": "acces_usdt"}, "loop": {"pause_until": 500.0}}
+    assert updated_at == 250.0
+    store.close()
+
+
+def test_clear(path):
+    store = StateStore(path)
+    store.save({"meta": {"iteration": 3}})
+    store.clear()
+    assert store.load() == ({}, None)
+    # Cleared rows are written again even if the value is the same as before
+    assert store.save({"meta": {"iteration": 3}}) == 1
+    store.close()
+
+
+def test_state_survives_a_reopen(path):
+    store = StateStore(path)
+    state = {
+        "meta": {"symbol": "acces_usdt", "iteration": 42},
+        "price_history": [[1700000000.0, 0.2], [1700000001.0, 0.2001]],
+        "orders": [{"order_id": "a", "side": "buy", "price": 0.19, "remaining_qty": 100.0}],
+    }
+    store.save(state)
+    store.close()
+
+    reopened = StateStore(path)
+    values, updated_at = reopened.load()
+    assert values == state
+    assert updated_at is not None
+    # What was loaded counts as written: an identical checkpoint rewrites nothing
+    assert reopened.save(state) == 0
+    assert reopened.save(dict(state, meta={"symbol": "acces_usdt", "iteration": 43})) == 1
+    reopened.close()
+
+
+def test_unreadable_row_is_skipped(path):
+    store = StateStore(path)
+    store.save({"meta": {"iteration": 1}})
+    store.close()
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO state (key, value, updated_at) VALUES ('broken', '{not json', 1.0)")
+    conn.commit()
+    conn.close()
+    values, _ = StateStore(path).load()
+    assert values == {"meta": {"iteration": 1}}
+
+
+def test_state_file_is_only_created_when_the_bot_opens_it(tmp_path, monkeypatch):
+    # Run from an empty directory: importing src.utils must not create data/ there
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root, LBANK_API_KEY="test", LBANK_API_SECRET="test")
+    env.pop("STATE_STORE_FILE", None)
+    env.pop("BOT_DATA_DIR", None)
+    subprocess.run([sys.executable, "-c", "import src.utils"], cwd=tmp_path, env=env, check=True, capture_output=True)
+    assert list(tmp_path.iterdir()) == []
+
+    from src import utils
+
+    monkeypatch.setattr(utils, "STATE_STORE_FILE", str(tmp_path / "bot_state.db"))
+    monkeypatch.setattr(utils, "STATE_STORE_ENABLED", True)
+    monkeypatch.setattr(utils, "state_store", None)
+    store = utils.open_state_store()
+    assert (tmp_path / "bot_state.db").exists()
+    assert utils.open_state_store() is store
+    store.close()